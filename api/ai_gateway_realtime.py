@@ -2,7 +2,7 @@ import os
 from typing import Any
 from urllib.parse import quote
 
-import httpx
+from api.http_clients import get_http_client
 
 GATEWAY_REALTIME_SUBPROTOCOL = "ai-gateway-realtime.v1"
 GATEWAY_AUTH_SUBPROTOCOL_PREFIX = "ai-gateway-auth."
@@ -74,17 +74,17 @@ async def mint_gateway_realtime_client_secret(
         payload["session"] = session
 
     api_base = os.getenv("AI_GATEWAY_API_BASE", DEFAULT_GATEWAY_API_BASE).strip().rstrip("/")
-    async with httpx.AsyncClient(timeout=15.0) as client:
-        response = await client.post(
-            f"{api_base}{CLIENT_SECRETS_PATH}",
-            headers={
-                "Authorization": f"Bearer {api_key}",
-                "Content-Type": "application/json",
-            },
-            json=payload,
-        )
-        response.raise_for_status()
-        data = response.json()
+    client = get_http_client("ai_gateway")
+    response = await client.post(
+        f"{api_base}{CLIENT_SECRETS_PATH}",
+        headers={
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json",
+        },
+        json=payload,
+    )
+    response.raise_for_status()
+    data = response.json()
 
     token = str(data.get("token", "")).strip()
     if not token:
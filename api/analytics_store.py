@@ -1,21 +1,35 @@
-import asyncio
-import copy
-import json
 import logging
 import os
 import time
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Tuple
 
 import httpx
 
+from api.analytics_wal import AnalyticsLog
+from api.http_clients import get_http_client
+
 logger = logging.getLogger(__name__)
 
+# Marks the session seen (SET NX with the session TTL) and bumps the unique
+# visitor count only when the marker is new; returns the visitor count.
+TRACK_SESSION_SCRIPT = (
+    "if redis.call('SET', KEYS[1], '1', 'EX', ARGV[1], 'NX') then "
+    "return redis.call('INCR', KEYS[2]) end "
+    "return tonumber(redis.call('GET', KEYS[2]) or '0')"
+)
+
+
+def _env_number(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, "") or default)
+    except ValueError:
+        return default
+
 
 class PortfolioAnalyticsStore:
     def __init__(self):
-        self._lock = asyncio.Lock()
         self._session_ttl_seconds = 30 * 60
         # Use /tmp for Vercel serverless compatibility (read-only filesystem except /tmp)
         # Fallback to module directory for local development
@@ -34,13 +48,21 @@ class PortfolioAnalyticsStore:
             or os.getenv("REDIS_REST_TOKEN", "").strip()
             or os.getenv("KV_REST_API_TOKEN", "").strip()
         )
+        self._redis_headers = {"Authorization": f"Bearer {self._redis_token}"}
         self._firebase_api_key = (
             os.getenv("GEMINI_FIREBASE_API_KEY")
             or os.getenv("FIREBASE_API_KEY")
             or ""
         ).strip()
-        self._memory_data = self._initial_data()
-        self._file_sync_disabled = False
+        # File mode: in-memory counters backed by a snapshot + write-ahead log
+        self._wal = AnalyticsLog(
+            self._file_path,
+            initial=self._initial_data,
+            apply=self._apply_visit,
+            compact=self._prune_snapshot,
+            flush_interval=_env_number("ANALYTICS_WAL_FLUSH_INTERVAL", 1.0),
+            compact_every=int(_env_number("ANALYTICS_WAL_COMPACT_EVERY", 1000)),
+        )
 
     @property
     def firestore_enabled(self) -> bool:
@@ -52,7 +74,7 @@ class PortfolioAnalyticsStore:
             return "firestore"
         if self.redis_enabled:
             return "redis"
-        if self._file_sync_disabled:
+        if self._wal.disabled:
             return "memory"
         return "file"
 
@@ -71,6 +93,12 @@ class PortfolioAnalyticsStore:
     def _month_key(self) -> str:
         return datetime.now(timezone.utc).strftime("%Y-%m")
 
+    def _period_keys(self, ts: float) -> Tuple[str, str, str]:
+        """Day, ISO week and month keys for a timestamp."""
+        moment = datetime.fromtimestamp(ts, timezone.utc)
+        iso_year, iso_week, _ = moment.isocalendar()
+        return moment.strftime("%Y-%m-%d"), f"{iso_year}-W{iso_week:02d}", moment.strftime("%Y-%m")
+
     def _daily_trend(self, daily_views: Dict[str, Any], days: int = 7) -> List[Dict[str, Any]]:
         today = datetime.now(timezone.utc).date()
         trend = []
@@ -138,15 +166,15 @@ class PortfolioAnalyticsStore:
         }
 
     async def _redis_pipeline(self, commands: List[List[str]]) -> List[Any]:
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            response = await client.post(
-                f"{self._redis_url}/pipeline",
-                headers={"Authorization": f"Bearer {self._redis_token}"},
-                json=commands,
-            )
-            response.raise_for_status()
-            payload = response.json()
-            return [item.get("result") for item in payload]
+        client = get_http_client("upstash")
+        response = await client.post(
+            f"{self._redis_url}/pipeline",
+            headers=self._redis_headers,
+            json=commands,
+        )
+        response.raise_for_status()
+        payload = response.json()
+        return [item.get("result") for item in payload]
 
     def _initial_data(self) -> Dict[str, Any]:
         return {
@@ -161,31 +189,6 @@ class PortfolioAnalyticsStore:
             "last_updated": None,
         }
 
-    async def _load_file_data(self) -> Dict[str, Any]:
-        if self._file_sync_disabled:
-            return copy.deepcopy(self._memory_data)
-
-        if not self._file_path.exists():
-            return copy.deepcopy(self._memory_data)
-
-        try:
-            data = json.loads(self._file_path.read_text())
-            self._memory_data = data
-            return copy.deepcopy(data)
-        except (json.JSONDecodeError, OSError):
-            return copy.deepcopy(self._memory_data)
-
-    async def _save_file_data(self, data: Dict[str, Any]) -> None:
-        self._memory_data = copy.deepcopy(data)
-
-        if self._file_sync_disabled:
-            return
-
-        try:
-            self._file_path.write_text(json.dumps(data))
-        except OSError:
-            self._file_sync_disabled = True
-
     def _prune_sessions(self, sessions: Dict[str, float]) -> Dict[str, float]:
         cutoff = time.time() - self._session_ttl_seconds
         return {
@@ -211,6 +214,60 @@ class PortfolioAnalyticsStore:
         data["weekly_views"] = self._prune_map(data.get("weekly_views", {}), 104)
         data["monthly_views"] = self._prune_map(data.get("monthly_views", {}), 36)
 
+    def _prune_snapshot(self, data: Dict[str, Any]) -> None:
+        data["recent_sessions"] = self._prune_sessions(data.get("recent_sessions", {}))
+        self._prune_period_maps(data)
+
+    def _apply_visit(self, data: Dict[str, Any], visit: Dict[str, Any]) -> None:
+        """Count one visit into a file snapshot / Firestore document dict."""
+        ts = float(visit["ts"])
+        sessions = data.setdefault("recent_sessions", {})
+        last_seen = sessions.get(visit["session_id"])
+        sessions[visit["session_id"]] = ts
+        data["total_views"] = int(data.get("total_views", 0)) + 1
+
+        if visit.get("is_homepage"):
+            data["homepage_views"] = int(data.get("homepage_views", 0)) + 1
+
+        # The first apply decides; replays (e.g. another worker reading the log) reuse it.
+        new_session = visit.get("new_session")
+        if new_session is None:
+            new_session = last_seen is None or last_seen < ts - self._session_ttl_seconds
+            visit["new_session"] = new_session
+        if new_session:
+            data["unique_visitors"] = int(data.get("unique_visitors", 0)) + 1
+
+        if not data.get("first_seen"):
+            data["first_seen"] = int(ts)
+
+        day_key, week_key, month_key = self._period_keys(ts)
+        for field, key in (("daily_views", day_key), ("weekly_views", week_key), ("monthly_views", month_key)):
+            counts = data.setdefault(field, {})
+            counts[key] = int(counts.get(key, 0)) + 1
+        data["last_updated"] = datetime.fromtimestamp(ts, timezone.utc).isoformat().replace("+00:00", "Z")
+        data["last_path"] = visit.get("path") or "/"
+        data["last_referrer"] = visit.get("referrer") or ""
+        data["last_user_agent"] = (visit.get("user_agent") or "")[:200]
+
+    def _visit(self, session_id: str, path: str, is_homepage: bool, referrer: str, user_agent: str) -> Dict[str, Any]:
+        return {
+            "ts": time.time(),
+            "session_id": session_id,
+            "path": path or "/",
+            "is_homepage": is_homepage,
+            "referrer": referrer or "",
+            "user_agent": user_agent[:200],
+        }
+
+    def start(self) -> None:
+        """Start the file-mode log flusher on the running loop (no-op for remote backends)."""
+        if not self.firestore_enabled and not self.redis_enabled:
+            self._wal.start()
+
+    async def stop(self) -> None:
+        """Flush and compact the file-mode log."""
+        await self._wal.stop()
+
     async def track_visit(
         self,
         session_id: str,
@@ -231,37 +288,45 @@ class PortfolioAnalyticsStore:
         path: str,
         is_homepage: bool,
     ) -> Dict[str, Any]:
+        """Record a view and return the updated metrics in one pipelined round trip."""
         today_key = self._today_key()
         week_key = self._week_key()
         month_key = self._month_key()
-        session_key = f"portfolio:reach:session:{session_id}"
+        trend_keys = self._trend_keys()
         updated_at = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
-        first_seen_exists = await self._redis_pipeline([["EXISTS", "portfolio:reach:first_seen"]])
-
-        exists_result = await self._redis_pipeline([["EXISTS", session_key]])
-        is_new_session = int(exists_result[0] or 0) == 0
-
-        commands: List[List[str]] = [
-            ["INCR", "portfolio:reach:views:total"],
-            ["INCR", f"portfolio:reach:views:daily:{today_key}"],
-            ["INCR", f"portfolio:reach:views:weekly:{week_key}"],
-            ["INCR", f"portfolio:reach:views:monthly:{month_key}"],
-            ["SET", "portfolio:reach:last_updated", updated_at],
-            ["SET", "portfolio:reach:last_path", path or "/"],
-        ]
-
-        if int(first_seen_exists[0] or 0) == 0:
-            commands.append(["SET", "portfolio:reach:first_seen", str(int(time.time()))])
-
-        if is_homepage:
-            commands.append(["INCR", "portfolio:reach:homepage:total"])
-
-        if is_new_session:
-            commands.insert(0, ["SETEX", session_key, str(self._session_ttl_seconds), "1"])
-            commands.append(["INCR", "portfolio:reach:visitors:unique"])
-
-        await self._redis_pipeline(commands)
-        return await self.get_metrics()
+        results = await self._redis_pipeline(
+            [
+                [
+                    "EVAL",
+                    TRACK_SESSION_SCRIPT,
+                    "2",
+                    f"portfolio:reach:session:{session_id}",
+                    "portfolio:reach:visitors:unique",
+                    str(self._session_ttl_seconds),
+                ],
+                ["SET", "portfolio:reach:first_seen", str(int(time.time())), "NX"],
+                ["INCR", "portfolio:reach:views:total"],
+                ["INCR", f"portfolio:reach:views:daily:{today_key}"],
+                ["INCR", f"portfolio:reach:views:weekly:{week_key}"],
+                ["INCR", f"portfolio:reach:views:monthly:{month_key}"],
+                ["INCR" if is_homepage else "GET", "portfolio:reach:homepage:total"],
+                ["MSET", "portfolio:reach:last_updated", updated_at, "portfolio:reach:last_path", path or "/"],
+                ["GET", "portfolio:reach:first_seen"],
+                ["MGET", *[f"portfolio:reach:views:daily:{key}" for key in trend_keys]],
+            ]
+        )
+        return self._metrics_from_redis(
+            total=results[2],
+            homepage=results[6],
+            unique=results[0],
+            today=results[3],
+            week=results[4],
+            month=results[5],
+            first_seen=results[8],
+            last_updated=updated_at,
+            trend_keys=trend_keys,
+            trend_values=results[9],
+        )
 
     async def _track_visit_file(
         self,
@@ -271,41 +336,10 @@ class PortfolioAnalyticsStore:
         referrer: str,
         user_agent: str,
     ) -> Dict[str, Any]:
-        async with self._lock:
-            data = await self._load_file_data()
-            data["recent_sessions"] = self._prune_sessions(data.get("recent_sessions", {}))
-
-            is_new_session = session_id not in data["recent_sessions"]
-            data["recent_sessions"][session_id] = time.time()
-            data["total_views"] = int(data.get("total_views", 0)) + 1
-
-            if is_homepage:
-                data["homepage_views"] = int(data.get("homepage_views", 0)) + 1
-
-            if is_new_session:
-                data["unique_visitors"] = int(data.get("unique_visitors", 0)) + 1
-
-            if not data.get("first_seen"):
-                data["first_seen"] = int(time.time())
-
-            today_key = self._today_key()
-            week_key = self._week_key()
-            month_key = self._month_key()
-            data.setdefault("daily_views", {})
-            data.setdefault("weekly_views", {})
-            data.setdefault("monthly_views", {})
-            data["daily_views"][today_key] = int(data["daily_views"].get(today_key, 0)) + 1
-            data["weekly_views"][week_key] = int(data["weekly_views"].get(week_key, 0)) + 1
-            data["monthly_views"][month_key] = int(data["monthly_views"].get(month_key, 0)) + 1
-            data["last_updated"] = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
-            data["last_path"] = path or "/"
-            data["last_referrer"] = referrer or ""
-            data["last_user_agent"] = user_agent[:200]
-            self._prune_period_maps(data)
-
-            await self._save_file_data(data)
-
-        return await self.get_metrics()
+        await self._wal.load()
+        self._wal.record(self._visit(session_id, path, is_homepage, referrer, user_agent))
+        await self._wal.maybe_flush()
+        return self._metrics_from_data(self._wal.data, persistent=False)
 
     async def get_metrics(self) -> Dict[str, Any]:
         if self.firestore_enabled:
@@ -314,12 +348,15 @@ class PortfolioAnalyticsStore:
             return await self._get_metrics_redis()
         return await self._get_metrics_file()
 
+    def _trend_keys(self, days: int = 7) -> List[str]:
+        today = datetime.now(timezone.utc).date()
+        return [(today - timedelta(days=offset)).isoformat() for offset in range(days - 1, -1, -1)]
+
     async def _get_metrics_redis(self) -> Dict[str, Any]:
         today_key = self._today_key()
         week_key = self._week_key()
         month_key = self._month_key()
-        today = datetime.now(timezone.utc).date()
-        trend_keys = [(today - timedelta(days=offset)).isoformat() for offset in range(6, -1, -1)]
+        trend_keys = self._trend_keys()
         results = await self._redis_pipeline(
             [
                 [
@@ -338,19 +375,46 @@ class PortfolioAnalyticsStore:
         )
 
         totals = results[0] or [0, 0, 0, None, None]
-        total_views = int(totals[0] or 0)
-        first_seen = int(totals[4] or int(time.time()))
+        return self._metrics_from_redis(
+            total=totals[0],
+            homepage=totals[1],
+            unique=totals[2],
+            today=results[1],
+            week=results[2],
+            month=results[3],
+            first_seen=totals[4],
+            last_updated=totals[3],
+            trend_keys=trend_keys,
+            trend_values=results[4],
+        )
+
+    def _metrics_from_redis(
+        self,
+        *,
+        total: Any,
+        homepage: Any,
+        unique: Any,
+        today: Any,
+        week: Any,
+        month: Any,
+        first_seen: Any,
+        last_updated: Any,
+        trend_keys: List[str],
+        trend_values: Any,
+    ) -> Dict[str, Any]:
+        total_views = int(total or 0)
+        first_seen = int(first_seen or int(time.time()))
         age_days = max(1, int((time.time() - first_seen) // 86400) + 1)
-        trend_values = results[4] or []
+        trend_values = trend_values or []
         return {
             "success": True,
             "views": {
                 "total": total_views,
-                "homepage_total": int(totals[1] or 0),
-                "unique_visitors": int(totals[2] or 0),
-                "today": int(results[1] or 0),
-                "this_week": int(results[2] or 0),
-                "this_month": int(results[3] or 0),
+                "homepage_total": int(homepage or 0),
+                "unique_visitors": int(unique or 0),
+                "today": int(today or 0),
+                "this_week": int(week or 0),
+                "this_month": int(month or 0),
             },
             "daily_trend": [
                 {
@@ -364,13 +428,13 @@ class PortfolioAnalyticsStore:
             "portfolio_age_days": age_days,
             "avg_views_per_day": round(total_views / max(age_days, 1), 1),
             "storage": {"backend": self.backend_name, "persistent": True},
-            "timestamp": totals[3]
+            "timestamp": last_updated
             or datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
         }
 
     async def _get_metrics_file(self) -> Dict[str, Any]:
-        data = await self._load_file_data()
-        return self._metrics_from_data(data, persistent=False)
+        await self._wal.load()
+        return self._metrics_from_data(self._wal.data, persistent=False)
 
     async def _track_visit_firestore(
         self,
@@ -382,49 +446,23 @@ class PortfolioAnalyticsStore:
     ) -> Dict[str, Any]:
         base_url = "https://firestore.googleapis.com/v1/projects/mangeshrautarchive/databases/(default)/documents/analytics/metrics"
         url = f"{base_url}?key={self._firebase_api_key}"
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            data = await self._load_firestore_data(client, url)
-            data["recent_sessions"] = self._prune_sessions(data.get("recent_sessions", {}))
-            is_new_session = session_id not in data["recent_sessions"]
-            data["recent_sessions"][session_id] = time.time()
-            data["total_views"] = int(data.get("total_views", 0)) + 1
-
-            if is_homepage:
-                data["homepage_views"] = int(data.get("homepage_views", 0)) + 1
-
-            if is_new_session:
-                data["unique_visitors"] = int(data.get("unique_visitors", 0)) + 1
-
-            if not data.get("first_seen"):
-                data["first_seen"] = int(time.time())
-
-            today_key = self._today_key()
-            week_key = self._week_key()
-            month_key = self._month_key()
-            data.setdefault("daily_views", {})
-            data.setdefault("weekly_views", {})
-            data.setdefault("monthly_views", {})
-            data["daily_views"][today_key] = int(data["daily_views"].get(today_key, 0)) + 1
-            data["weekly_views"][week_key] = int(data["weekly_views"].get(week_key, 0)) + 1
-            data["monthly_views"][month_key] = int(data["monthly_views"].get(month_key, 0)) + 1
-            data["last_updated"] = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
-            data["last_path"] = path or "/"
-            data["last_referrer"] = referrer or ""
-            data["last_user_agent"] = user_agent[:200]
-            self._prune_period_maps(data)
+        client = get_http_client("firestore")
+        data = await self._load_firestore_data(client, url)
+        self._apply_visit(data, self._visit(session_id, path, is_homepage, referrer, user_agent))
+        self._prune_snapshot(data)
 
-            try:
-                await client.patch(url, json={"fields": self._to_firestore_fields(data)})
-            except Exception as e:
-                logger.error(f"Failed to save analytics to Firestore: {e}")
+        try:
+            await client.patch(url, json={"fields": self._to_firestore_fields(data)})
+        except Exception as e:
+            logger.error(f"Failed to save analytics to Firestore: {e}")
 
         return self._metrics_from_data(data, persistent=True)
 
     async def _get_metrics_firestore(self) -> Dict[str, Any]:
         base_url = "https://firestore.googleapis.com/v1/projects/mangeshrautarchive/databases/(default)/documents/analytics/metrics"
         url = f"{base_url}?key={self._firebase_api_key}"
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            data = await self._load_firestore_data(client, url)
+        client = get_http_client("firestore")
+        data = await self._load_firestore_data(client, url)
 
         return self._metrics_from_data(data, persistent=True)
 
@@ -0,0 +1,275 @@
+"""Write-ahead log for the file-mode portfolio analytics store.
+
+Counters live in memory as the same dict the JSON snapshot holds. Each visit
+is applied to that dict in O(1) and queued; once per ``flush_interval`` the
+queue is appended to ``<snapshot>.wal`` and fsynced, so a crash loses at most
+the visits since the last flush. Every ``compact_every`` visits (and on
+shutdown) the snapshot plus the whole log are folded into a new snapshot,
+written via a temp file + rename, and the log is replaced by an empty one.
+All file I/O runs in a worker thread.
+
+Several worker processes may share one snapshot and log. Every file
+operation holds an exclusive ``flock`` on ``<snapshot>.lock``, and each
+process tags its visits with its own writer ID and sequence numbers. A flush
+first reads the records other workers appended since this worker's last
+offset (applying them to its counters), then appends its own. When another
+worker has compacted (the log file was replaced), the flush reloads the
+folded snapshot and log instead and re-applies its still-queued visits. The
+snapshot records the last sequence number it includes per writer
+(``wal_seqs``), so replaying a log that a crash left behind after a
+compaction never counts a visit twice, and a torn last line left by a
+crashed writer is cut off before anything is appended after it.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import secrets
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows dev machines: single process, no locking
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+LogId = Optional[Tuple[int, int]]
+
+
+class AnalyticsLog:
+    """Snapshot + shared append-only visit log behind an in-memory counters dict."""
+
+    def __init__(
+        self,
+        snapshot_path: Path,
+        *,
+        initial: Callable[[], Dict[str, Any]],
+        apply: Callable[[Dict[str, Any], Dict[str, Any]], None],
+        compact: Callable[[Dict[str, Any]], None],
+        flush_interval: float = 1.0,
+        compact_every: int = 1000,
+    ) -> None:
+        self.snapshot_path = snapshot_path
+        self.log_path = snapshot_path.with_suffix(".wal")
+        self.lock_path = snapshot_path.with_suffix(".lock")
+        self._initial = initial
+        self._apply = apply
+        self._compact = compact
+        self.flush_interval = flush_interval
+        self.compact_every = compact_every
+        self.writer = f"{os.getpid()}-{secrets.token_hex(3)}"
+        self.data: Dict[str, Any] = initial()
+        self.seq = 0  # last sequence number this writer assigned
+        self.disabled = False  # set once file I/O fails; counters then stay in memory only
+        self._loaded = False
+        self._pending: List[Dict[str, Any]] = []
+        self._since_compaction = 0
+        self._offset = 0  # bytes of the current log already applied to ``data``
+        self._log_id: LogId = None  # (device, inode) of the log ``_offset`` refers to
+        self._last_flush = time.monotonic()
+        self._io_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    # -- file operations (worker thread, under the flock) -----------------------
+
+    @contextlib.contextmanager
+    def _file_lock(self) -> Iterator[None]:
+        with open(self.lock_path, "a") as handle:
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def _current_log_id(self) -> LogId:
+        try:
+            stat = self.log_path.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_dev, stat.st_ino
+
+    def _read_log(self, offset: int) -> Tuple[List[Dict[str, Any]], int]:
+        """Parse complete records after ``offset``; cut off a torn tail a crashed writer left."""
+        try:
+            with self.log_path.open("rb+") as handle:
+                handle.seek(offset)
+                raw = handle.read()
+                complete = raw.rfind(b"\n") + 1
+                if complete < len(raw):
+                    handle.truncate(offset + complete)
+        except FileNotFoundError:
+            return [], 0
+        visits = []
+        for line in raw[:complete].splitlines():
+            try:
+                visits.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+        return visits, offset + complete
+
+    def _append(self, lines: str) -> None:
+        with self.log_path.open("a", encoding="utf-8") as handle:
+            if lines:
+                handle.write(lines)
+                handle.flush()
+                os.fsync(handle.fileno())
+
+    def _fold(self) -> Tuple[Dict[str, Any], Dict[str, int], int]:
+        """Snapshot plus every log record it does not already include."""
+        data = self._initial()
+        try:
+            data.update(json.loads(self.snapshot_path.read_text()))
+        except FileNotFoundError:
+            pass
+        except (json.JSONDecodeError, OSError) as exc:
+            logger.warning("Analytics snapshot unreadable (%s); starting from the log only", type(exc).__name__)
+        legacy_seq = int(data.pop("wal_seq", 0) or 0)  # single-writer snapshots
+        included = data.pop("wal_seqs", None) or {"": legacy_seq}
+        visits, offset = self._read_log(0)
+        logged: Dict[str, int] = {}
+        for visit in visits:
+            writer, seq = str(visit.get("writer", "")), int(visit.get("seq", 0))
+            logged[writer] = max(logged.get(writer, 0), seq)
+            if seq <= included.get(writer, 0):
+                continue  # already folded into the snapshot
+            self._apply(data, visit)
+        return data, logged, offset
+
+    def _write_snapshot(self, data: Dict[str, Any], logged: Dict[str, int]) -> None:
+        tmp = self.snapshot_path.with_suffix(".json.tmp")
+        with tmp.open("w", encoding="utf-8") as handle:
+            handle.write(json.dumps({**data, "wal_seqs": logged}))
+            handle.flush()
+            os.fsync(handle.fileno())
+        tmp.replace(self.snapshot_path)
+        # A new, empty log file (new inode) tells the other workers to reload.
+        empty = self.log_path.with_suffix(".wal.tmp")
+        empty.write_bytes(b"")
+        empty.replace(self.log_path)
+
+    def _sync_files(
+        self, lines: str, offset: int, log_id: LogId, compact: bool
+    ) -> Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]], int, LogId]:
+        """Exchange records with the shared log.
+
+        Returns ``(state, visits, offset, log_id)``. ``state`` is the full folded
+        counters when this worker must reset (first load, another worker
+        compacted, or ``compact``); otherwise it is ``None`` and ``visits`` are
+        the records appended since ``offset``.
+        """
+        with self._file_lock():
+            if compact or log_id is None or self._current_log_id() != log_id:
+                self._append(lines)
+                data, logged, offset = self._fold()
+                if compact:
+                    self._compact(data)
+                    self._write_snapshot(data, logged)
+                    offset = 0
+                return data, [], offset, self._current_log_id()
+            visits, offset = self._read_log(offset)
+            if lines:
+                self._append(lines)
+                offset += len(lines.encode("utf-8"))
+            return None, visits, offset, log_id
+
+    # -- event-loop side ----------------------------------------------------------
+
+    async def _sync(self, compact: bool = False) -> None:
+        """Append queued visits and catch up with other workers (caller holds ``_io_lock``)."""
+        self._last_flush = time.monotonic()
+        if self.disabled:
+            return
+        flushing, self._pending = self._pending, []
+        lines = "".join(json.dumps(visit, separators=(",", ":")) + "\n" for visit in flushing)
+        try:
+            state, visits, offset, log_id = await asyncio.to_thread(
+                self._sync_files, lines, self._offset, self._log_id, compact
+            )
+        except OSError as exc:
+            self._disable(exc)
+            return
+        self._offset, self._log_id = offset, log_id
+        if state is not None:
+            # The files now hold everything flushed so far; re-apply the visits
+            # queued while the thread ran.
+            for visit in self._pending:
+                self._apply(state, visit)
+            self.data = state
+        else:
+            for visit in visits:
+                if visit.get("writer") != self.writer:
+                    self._apply(self.data, visit)
+        if compact:
+            self._since_compaction = len(self._pending)
+
+    async def load(self) -> None:
+        """Fold the snapshot and log into memory once (no-op afterwards)."""
+        if self._loaded:
+            return
+        async with self._io_lock:
+            if self._loaded:
+                return
+            await self._sync()
+            self._loaded = True
+
+    def record(self, visit: Dict[str, Any]) -> None:
+        """Apply one visit to the counters and queue it for the next flush."""
+        self.seq += 1
+        visit["writer"] = self.writer
+        visit["seq"] = self.seq
+        self._apply(self.data, visit)
+        if not self.disabled:
+            self._pending.append(visit)
+            self._since_compaction += 1
+
+    async def maybe_flush(self) -> None:
+        """Sync inline when no background flusher is running and the interval has passed."""
+        if self._task is not None and not self._task.done():
+            return
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            await self.flush()
+
+    async def flush(self) -> None:
+        """Append and fsync queued visits, pick up other workers' visits, compact when due."""
+        async with self._io_lock:
+            await self._sync(compact=self._since_compaction >= self.compact_every)
+
+    async def compact(self) -> None:
+        async with self._io_lock:
+            await self._sync(compact=True)
+
+    def _disable(self, exc: OSError) -> None:
+        logger.warning("Analytics log not writable (%s); keeping counters in memory", type(exc).__name__)
+        self.disabled = True
+        self._pending = []
+
+    # -- background flusher ------------------------------------------------------
+
+    async def _flush_forever(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as exc:  # keep flushing; the next interval retries
+                logger.warning("Analytics log flush failed: %s", exc)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._flush_forever())
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None and not task.done():
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        if self._loaded:
+            await self.compact()
@@ -0,0 +1,283 @@
+"""Bounded in-process LRU + TTL cache shared by the API's ad-hoc caches.
+
+``BoundedCache`` keeps entries in an ``OrderedDict`` in LRU order, so reads,
+writes and evictions are O(1). Each cache can bound entry count, total
+approximate payload bytes and entry age, and optionally keep expired entries
+for a stale window so callers can serve stale data while they revalidate.
+
+Every cache registers itself by name; ``cache_stats`` reports hit/miss/stale,
+eviction and expiry counters for ``/api/monitor/metrics``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterator, List, Optional, Tuple
+
+from api.single_flight import single_flight
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+def approx_size(value: Any) -> int:
+    """Approximate payload size in bytes (JSON-encoded length)."""
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, str):
+        return len(value.encode("utf-8", "ignore"))
+    try:
+        return len(json.dumps(value, default=str, separators=(",", ":")))
+    except (TypeError, ValueError):
+        return len(repr(value))
+
+
+class _Entry:
+    __slots__ = ("value", "stored_at", "expires_at", "size")
+
+    def __init__(self, value: Any, stored_at: float, expires_at: Optional[float], size: int) -> None:
+        self.value = value
+        self.stored_at = stored_at
+        self.expires_at = expires_at
+        self.size = size
+
+
+class BoundedCache:
+    """LRU cache with per-entry TTL, optional stale window and entry/byte caps.
+
+    Mapping-style access (``get``, ``in``, ``[]``) only sees fresh entries;
+    ``get_entry`` also returns entries inside the stale window for
+    stale-while-revalidate callers.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        max_entries: int = 1024,
+        ttl: Optional[float] = None,
+        stale_ttl: float = 0.0,
+        max_bytes: Optional[int] = None,
+        sizeof: Callable[[Any], int] = approx_size,
+        register: bool = True,
+    ) -> None:
+        self.name = name
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self.evictions = 0
+        self.expirations = 0
+        if register:
+            _registry[name] = self
+
+    # -- core operations -------------------------------------------------
+
+    def _drop(self, key: Hashable) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+    def _lookup(self, key: Hashable, allow_stale: bool) -> Tuple[Optional[_Entry], bool]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None, False
+        if entry.expires_at is None:
+            self._entries.move_to_end(key)
+            return entry, False
+        now = time.monotonic()
+        if now < entry.expires_at:
+            self._entries.move_to_end(key)
+            return entry, False
+        if now >= entry.expires_at + self.stale_ttl:
+            self._drop(key)
+            self.expirations += 1
+            return None, False
+        if not allow_stale:
+            return None, False
+        self._entries.move_to_end(key)
+        return entry, True
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry, _ = self._lookup(key, allow_stale=False)
+        if entry is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return entry.value
+
+    def get_entry(self, key: Hashable) -> Tuple[Any, bool]:
+        """Return ``(value, is_stale)``; ``value`` is ``None`` when nothing is servable."""
+        entry, stale = self._lookup(key, allow_stale=True)
+        if entry is None:
+            self.misses += 1
+            return None, False
+        if stale:
+            self.stale_hits += 1
+        else:
+            self.hits += 1
+        return entry.value, stale
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Store ``value``; ``ttl`` overrides the cache default for this entry."""
+        ttl = self.ttl if ttl is None else ttl
+        now = time.monotonic()
+        size = self._sizeof(value) if self.max_bytes is not None else 0
+        if key in self._entries:
+            self._drop(key)
+        self._entries[key] = _Entry(value, now, None if ttl is None else now + ttl, size)
+        self._bytes += size
+        self._evict()
+
+    def _evict(self) -> None:
+        while len(self._entries) > self.max_entries or (
+            self.max_bytes is not None and self._bytes > self.max_bytes and len(self._entries) > 1
+        ):
+            key = next(iter(self._entries))
+            self._drop(key)
+            self.evictions += 1
+
+    def touch(self, key: Hashable) -> bool:
+        """Re-measure an entry whose value was mutated in place; returns False if absent."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return False
+        if self.max_bytes is not None:
+            size = self._sizeof(entry.value)
+            self._bytes += size - entry.size
+            entry.size = size
+            self._evict()
+        return True
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+        self._drop(key)
+        return entry.value
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+
+    def purge_expired(self) -> int:
+        now = time.monotonic()
+        expired = [
+            key
+            for key, entry in self._entries.items()
+            if entry.expires_at is not None and now >= entry.expires_at + self.stale_ttl
+        ]
+        for key in expired:
+            self._drop(key)
+        self.expirations += len(expired)
+        return len(expired)
+
+    async def get_or_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Any]],
+        *,
+        ttl: Optional[float] = None,
+    ) -> Any:
+        """Return a fresh value, or load it once (single-flight) and cache the result.
+
+        Entries inside the stale window are returned immediately while one
+        background load refreshes them.
+        """
+        flight = single_flight(f"cache:{self.name}")
+
+        async def load() -> Any:
+            value = await loader()
+            self.set(key, value, ttl)
+            return value
+
+        value, stale = self.get_entry(key)
+        if value is not None and not stale:
+            return value
+        if value is not None:
+            task = asyncio.ensure_future(flight.do(key, load))
+            task.add_done_callback(_log_refresh_failure(self.name))
+            return value
+        return await flight.do(key, load)
+
+    # -- mapping protocol (fresh entries only) ---------------------------
+
+    def __contains__(self, key: Hashable) -> bool:
+        entry, _ = self._lookup(key, allow_stale=False)
+        return entry is not None
+
+    def __getitem__(self, key: Hashable) -> Any:
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: Hashable, value: Any) -> None:
+        self.set(key, value)
+
+    def __delitem__(self, key: Hashable) -> None:
+        if key not in self._entries:
+            raise KeyError(key)
+        self._drop(key)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return iter(list(self._entries))
+
+    def keys(self):
+        return list(self._entries)
+
+    # -- reporting --------------------------------------------------------
+
+    @property
+    def bytes_used(self) -> int:
+        return self._bytes
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses + self.stale_hits
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "bytes": self._bytes if self.max_bytes is not None else None,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl,
+            "stale_ttl_seconds": self.stale_ttl or None,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": round((self.hits + self.stale_hits) / lookups * 100, 2) if lookups else 0.0,
+        }
+
+
+def _log_refresh_failure(name: str) -> Callable[[Any], None]:
+    def callback(task: Any) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning("Background refresh for cache %s failed: %s", name, task.exception())
+
+    return callback
+
+
+_registry: Dict[str, BoundedCache] = {}
+
+
+def registered_caches() -> List[Tuple[str, BoundedCache]]:
+    """Named caches, sorted by name (for exporters that read the counters directly)."""
+    return sorted(_registry.items())
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    return {name: cache.stats() for name, cache in sorted(_registry.items())}
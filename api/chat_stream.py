@@ -0,0 +1,177 @@
+"""Frame writer for AssistMe chat streams (NDJSON or SSE).
+
+Chat generators yield plain event dicts (``typing`` / ``chunk`` / ``done``).
+``ChatStreamWriter`` turns them into wire frames:
+
+* consecutive ``chunk`` deltas are coalesced until the flush window
+  (``CHAT_STREAM_FLUSH_MS``, default 30ms) elapses or the pending text reaches
+  ``CHAT_STREAM_FLUSH_BYTES`` (default 1024), so a fast model produces a few
+  frames per second instead of one write + GZip flush per token;
+* chunk frames are rendered from a fixed template with the C string encoder
+  rather than ``json.dumps`` of a dict per delta;
+* framing is NDJSON (``application/x-ndjson``, the default) or SSE
+  (``text/event-stream``, one ``data:`` line per frame). The JSON payload of
+  each frame is identical either way.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+STREAM_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "sse": "text/event-stream",
+}
+
+try:  # C-accelerated in CPython; identical output to json.dumps(str)
+    from json.encoder import encode_basestring_ascii as _encode_string
+except ImportError:  # pragma: no cover - pure-Python fallback
+    _encode_string = json.dumps
+
+_CHUNK_TEMPLATE = '{"type": "chunk", "content": %s, "chunk_id": %d}'
+
+
+def chunk_frame(content: str, chunk_id: int) -> str:
+    """JSON for a chunk event, byte-identical to ``json.dumps`` of the same dict."""
+    return _CHUNK_TEMPLATE % (_encode_string(content), chunk_id)
+
+
+def negotiate_stream_format(requested: Optional[str] = None, accept: str = "") -> str:
+    """Pick ``ndjson`` or ``sse`` from an explicit request field, then the Accept header."""
+    if requested in STREAM_MEDIA_TYPES:
+        return requested
+    accept = (accept or "").lower()
+    if "text/event-stream" in accept and "ndjson" not in accept:
+        return "sse"
+    return "ndjson"
+
+
+def _env_number(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, "") or default)
+    except ValueError:
+        return default
+
+
+class ChatStreamWriter:
+    """Coalesce chunk events inside a flush window and frame them for the wire."""
+
+    def __init__(
+        self,
+        stream_format: str = "ndjson",
+        *,
+        flush_interval: Optional[float] = None,
+        flush_bytes: Optional[int] = None,
+    ) -> None:
+        self.stream_format = stream_format if stream_format in STREAM_MEDIA_TYPES else "ndjson"
+        self.flush_interval = (
+            _env_number("CHAT_STREAM_FLUSH_MS", 30) / 1000 if flush_interval is None else flush_interval
+        )
+        self.flush_bytes = int(_env_number("CHAT_STREAM_FLUSH_BYTES", 1024)) if flush_bytes is None else flush_bytes
+        self.frames = 0
+
+    @property
+    def media_type(self) -> str:
+        return STREAM_MEDIA_TYPES[self.stream_format]
+
+    def _frame(self, payload: str) -> str:
+        self.frames += 1
+        if self.stream_format == "sse":
+            return f"data: {payload}\n\n"
+        return payload + "\n"
+
+    def encode(self, event: Dict[str, Any]) -> str:
+        return self._frame(json.dumps(event))
+
+    async def stream(self, events: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[str]:
+        """Yield wire frames for ``events``, merging chunk deltas per flush window.
+
+        The upstream generator runs in its own task feeding a bounded queue,
+        so every delta already waiting is drained without suspending and an
+        open window still flushes on time while the upstream is idle. Pending
+        text is always flushed before a non-chunk event, preserving order.
+        """
+        loop = asyncio.get_running_loop()
+        queue: "asyncio.Queue[Any]" = asyncio.Queue(maxsize=256)
+        producer = asyncio.ensure_future(_pump(events, queue))
+        pending: List[str] = []
+        pending_bytes = 0
+        window_end = 0.0
+        chunk_id = 0
+
+        def flush() -> str:
+            nonlocal pending_bytes, chunk_id
+            chunk_id += 1
+            text = "".join(pending)
+            pending.clear()
+            pending_bytes = 0
+            return self._frame(chunk_frame(text, chunk_id))
+
+        try:
+            while True:
+                try:
+                    item = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    if not pending:
+                        item = await queue.get()
+                    else:
+                        try:
+                            item = await asyncio.wait_for(queue.get(), max(0.0, window_end - loop.time()))
+                        except asyncio.TimeoutError:
+                            yield flush()
+                            continue
+
+                if item is _END:
+                    break
+                if isinstance(item, _Failure):
+                    raise item.exc
+
+                if item.get("type") == "chunk":
+                    content = item.get("content") or ""
+                    if not content:
+                        continue
+                    if not pending:
+                        window_end = loop.time() + self.flush_interval
+                    pending.append(content)
+                    pending_bytes += len(content)
+                    if pending_bytes >= self.flush_bytes or loop.time() >= window_end:
+                        yield flush()
+                    continue
+
+                if pending:
+                    yield flush()
+                yield self.encode(item)
+
+            if pending:
+                yield flush()
+        finally:
+            if not producer.done():
+                producer.cancel()
+            await asyncio.gather(producer, return_exceptions=True)
+
+
+_END = object()
+
+
+class _Failure:
+    __slots__ = ("exc",)
+
+    def __init__(self, exc: BaseException) -> None:
+        self.exc = exc
+
+
+async def _pump(events: AsyncIterator[Dict[str, Any]], queue: "asyncio.Queue[Any]") -> None:
+    try:
+        async for event in events:
+            await queue.put(event)
+    except Exception as exc:
+        await queue.put(_Failure(exc))
+        return
+    finally:
+        aclose = getattr(events, "aclose", None)
+        if aclose is not None:
+            await aclose()
+    await queue.put(_END)
@@ -5,11 +5,14 @@ import secrets
 import re
 import hashlib
 import hmac
-from typing import List, Optional, Dict, Any
+from typing import List, Literal, Optional, Dict, Any
 from fastapi import HTTPException, Request
 from pydantic import BaseModel, Field
 from dotenv import load_dotenv
 
+from api.cache import BoundedCache
+from api.query_features import QueryFeatures, classify_query
+
 # Load environment variables (.env.local overrides .env).
 load_dotenv(".env.local")
 load_dotenv()
@@ -64,6 +67,22 @@ def get_site_title() -> str:
     return os.getenv("OPENROUTER_SITE_TITLE", "AssistMe AI Assistant")
 
 
+def get_openrouter_hedge_delay() -> float:
+    """Seconds to wait for a first token before racing the next fallback model (0 disables)."""
+    try:
+        return max(0.0, float(os.getenv("OPENROUTER_HEDGE_DELAY", "2.5") or 0))
+    except ValueError:
+        return 2.5
+
+
+def get_openrouter_hedge_max_parallel() -> int:
+    """Upper bound on concurrent model streams while hedging."""
+    try:
+        return max(1, int(os.getenv("OPENROUTER_HEDGE_MAX_PARALLEL", "2") or 1))
+    except ValueError:
+        return 2
+
+
 # Back-compat aliases for imports/tests; prefer runtime getters in request paths.
 OPENROUTER_API_KEY = get_openrouter_api_key()
 OPENROUTER_MODEL = get_openrouter_model_raw()
@@ -114,12 +133,22 @@ LASTFM_CACHE_HEADERS = {
     "Vercel-CDN-Cache-Control": "public, s-maxage=25, stale-while-revalidate=45",
     "X-Music-Source": "lastfm-proxy",
 }
-lastfm_recent_cache: Dict[str, Dict[str, Any]] = {}
+# Entries carry their own "ts" for fresh/stale checks; the cache only bounds memory.
+lastfm_recent_cache = BoundedCache(
+    "lastfm_recent", max_entries=64, ttl=6 * 3600, max_bytes=4 * 1024 * 1024
+)
 
 # Conversation Memory
-conversation_memory = {}
 MAX_MEMORY_MESSAGES = 10
 MEMORY_EXPIRY = 3600  # 1 hour
+MAX_MEMORY_SESSIONS = 2000
+# Idle sessions expire MEMORY_EXPIRY after their last update; the coldest go first when full.
+conversation_memory = BoundedCache(
+    "conversation_memory",
+    max_entries=MAX_MEMORY_SESSIONS,
+    ttl=MEMORY_EXPIRY,
+    max_bytes=16 * 1024 * 1024,
+)
 MAX_CLIENT_HISTORY_MESSAGES = 12
 MAX_CHAT_MESSAGE_CHARS = 2000
 MAX_CONTEXT_CHARS = 4000
@@ -213,21 +242,34 @@ def get_default_model() -> str:
 DEFAULT_MODEL = get_default_model()
 
 # Poster cache
-poster_cache = {}
 POSTER_CACHE_DURATION = 86400  # 24 hours
+poster_cache = BoundedCache("posters", max_entries=500, ttl=POSTER_CACHE_DURATION)
 
 # iTunes artwork proxy cache
-artwork_cache = {}
 ARTWORK_CACHE_DURATION = 86400  # 24 hours
+artwork_cache = BoundedCache("artwork", max_entries=1000, ttl=ARTWORK_CACHE_DURATION)
 
 # GitHub Cache and Credentials
-_github_proxy_cache: Dict[str, Any] = {}
 GITHUB_PROXY_TTL = 600  # 10 minutes
+# Expired repo lists stay around for a day so upstream failures can serve them stale.
+_github_proxy_cache = BoundedCache(
+    "github_repos",
+    max_entries=128,
+    ttl=GITHUB_PROXY_TTL,
+    stale_ttl=86400,
+    max_bytes=8 * 1024 * 1024,
+)
 GITHUB_PAT = (
     os.getenv("GITHUB_PAT", "").strip() or os.getenv("GITHUB_TOKEN", "").strip()
 )
-_github_api_proxy_cache: Dict[str, Any] = {}
 GITHUB_API_PROXY_TTL = 180  # 3 minutes
+_github_api_proxy_cache = BoundedCache(
+    "github_api_proxy",
+    max_entries=256,
+    ttl=GITHUB_API_PROXY_TTL,
+    stale_ttl=86400,
+    max_bytes=8 * 1024 * 1024,
+)
 
 # Reach Cache
 _reach_cache: Dict[str, Any] = {"data": None, "ts": 0}
@@ -521,6 +563,8 @@ class ChatRequest(BaseModel):
     model: Optional[str] = None
     # Optional vision attachments (data URLs). Free OpenRouter vision models only.
     images: Optional[List[str]] = Field(default_factory=list, max_length=2)
+    # Wire framing for streamed answers; defaults to NDJSON unless Accept asks for SSE.
+    stream_format: Optional[Literal["ndjson", "sse"]] = None
 
 
 class TypingIndicator(BaseModel):
@@ -565,9 +609,9 @@ def get_client_ip(request: Request) -> str:
     return request.client.host if request.client else "unknown"
 
 
-def check_rate_limit(client_id: str) -> bool:
+async def check_rate_limit(client_id: str) -> bool:
     """Check if client has exceeded rate limit (durable backend when configured)."""
-    return get_rate_limit_store().allow(
+    return await get_rate_limit_store().allow_async(
         client_id,
         limit=RATE_LIMIT_REQUESTS,
         window_sec=RATE_LIMIT_WINDOW,
@@ -576,27 +620,21 @@ def check_rate_limit(client_id: str) -> bool:
 
 def get_session_memory(session_id: str) -> List[Dict[str, str]]:
     """Get conversation history for session"""
-    if session_id not in conversation_memory:
-        return []
-
-    memory = conversation_memory[session_id]
-    if time.time() - memory.get("last_access", 0) > MEMORY_EXPIRY:
-        del conversation_memory[session_id]
+    memory = conversation_memory.get(session_id)
+    if memory is None:
         return []
-
     return memory.get("messages", [])
 
 
 def update_session_memory(session_id: str, user_msg: str, assistant_msg: str):
     """Update conversation memory"""
-    if session_id not in conversation_memory:
-        conversation_memory[session_id] = {
+    memory = conversation_memory.get(session_id)
+    if memory is None:
+        memory = {
             "messages": [],
             "created": time.time(),
             "last_access": time.time(),
         }
-
-    memory = conversation_memory[session_id]
     memory["messages"].append({"role": "user", "content": user_msg})
     memory["messages"].append({"role": "assistant", "content": assistant_msg})
 
@@ -604,11 +642,14 @@ def update_session_memory(session_id: str, user_msg: str, assistant_msg: str):
         memory["messages"] = memory["messages"][-MAX_MEMORY_MESSAGES * 2 :]
 
     memory["last_access"] = time.time()
+    # Re-store to restart the idle TTL and re-measure the entry size.
+    conversation_memory[session_id] = memory
 
 
-def is_resume_query(message: str) -> bool:
-    keywords = ["resume", "cv", "download", "curriculum vitae"]
-    return any(keyword in message.lower() for keyword in keywords)
+def is_resume_query(message: str, features: Optional[QueryFeatures] = None) -> bool:
+    if features is None:
+        features = classify_query(message)
+    return features.has("resume")
 
 
 def build_context_prompt(message: str, context: Optional[Dict] = None) -> str:
@@ -656,29 +697,11 @@ def build_context_prompt(message: str, context: Optional[Dict] = None) -> str:
     return prompt
 
 
-# Prompt injection guard
-_INJECTION_PATTERNS = [
-    re.compile(r"ignore (all |previous |prior )?instructions?", re.I),
-    re.compile(r"you are now", re.I),
-    re.compile(r"forget (everything|all|your|previous)", re.I),
-    re.compile(r"(system prompt|system message|developer message|hidden instructions)", re.I),
-    re.compile(r"act as (a |an )?(different|new|another)", re.I),
-    re.compile(r"disregard (your|all|any|previous)", re.I),
-    re.compile(r"pretend (you are|to be)", re.I),
-    re.compile(r"(reveal|show|print|dump|expose).{0,40}(prompt|instruction|secret|token|api key|env)", re.I),
-    re.compile(r"(api key|secret|token|environment variable|\.env)", re.I),
-    re.compile(r"(base64|rot13|hex).{0,30}(instruction|prompt|secret)", re.I),
-    re.compile(r"(exfiltrate|data leak|leak confidential)", re.I),
-    re.compile(r"(tool output|function call|internal config)", re.I),
-    re.compile(r"jailbreak", re.I),
-    re.compile(r"DAN mode", re.I),
-    re.compile(r"<\|.*?\|>", re.I),
-]
-
-
-def is_prompt_injection(message: str) -> bool:
-    """Detect common prompt injection attacks."""
-    return any(p.search(message) for p in _INJECTION_PATTERNS)
+def is_prompt_injection(message: str, features: Optional[QueryFeatures] = None) -> bool:
+    """Detect common prompt injection attacks (see ``api.query_features``)."""
+    if features is None:
+        features = classify_query(message)
+    return features.has("prompt_injection")
 
 
 def sanitize_chat_text(value: Any, max_chars: int = MAX_CHAT_MESSAGE_CHARS) -> str:
@@ -784,16 +807,6 @@ def api_error(
     return HTTPException(status_code=status, detail=detail)
 
 
-_FACTUAL_KEYWORDS = re.compile(
-    r"\b(experience|education|skills|projects|contact|resume|cv|location|company|university|degree|gpa|certification|achievement|publication)\b",
-    re.I,
-)
-_CREATIVE_KEYWORDS = re.compile(
-    r"\b(write|poem|story|joke|imagine|creative|design|idea|brainstorm)\b",
-    re.I,
-)
-
-
 def _message_text_for_routing(message: Any) -> str:
     """Extract plain text from OpenAI-style string or multimodal content parts."""
     if isinstance(message, str):
@@ -813,10 +826,10 @@ def _message_text_for_routing(message: Any) -> str:
 
 def adaptive_llm_params(message: Any) -> dict:
     """Return temperature + max_tokens tuned to the detected query intent."""
-    text = _message_text_for_routing(message)
-    if text and _FACTUAL_KEYWORDS.search(text):
+    features = classify_query(_message_text_for_routing(message))
+    if features.has("factual"):
         return {"temperature": 0.3, "max_tokens": 1200, "top_p": 0.85}
-    if text and _CREATIVE_KEYWORDS.search(text):
+    if features.has("creative"):
         return {"temperature": 0.85, "max_tokens": 1800, "top_p": 0.95}
     return {"temperature": 0.7, "max_tokens": 1500, "top_p": 0.9}
 
@@ -846,9 +859,9 @@ def verify_session_token(session_id: str, token: str) -> bool:
     return hmac.compare_digest(create_session_token(session_id), token.strip())
 
 
-def enforce_rate_limit(request: Request) -> None:
+async def enforce_rate_limit(request: Request) -> None:
     client_id = get_client_ip(request)
-    if not check_rate_limit(client_id):
+    if not await check_rate_limit(client_id):
         raise HTTPException(
             status_code=429,
             detail="Too many requests. Please wait before trying again.",
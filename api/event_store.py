@@ -0,0 +1,147 @@
+"""Bounded, indexed event log for the system monitor.
+
+Events get monotonically increasing integer IDs, and the oldest is evicted
+once ``maxlen`` is reached, so the retained IDs are always contiguous: an ID
+maps straight to a list position, which makes lookups, resolution and
+``after=<id>`` cursor pages O(1) to locate. A parallel list of timestamps
+(kept non-decreasing) serves windowed counts by bisection, and counters per
+kind, source and resolved state are maintained on every add, resolve and
+eviction so summary counts never walk the log.
+
+Items are opaque to the store (``SystemEvent`` objects, security-event
+dicts); callers pass the kind/source to index them under.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from typing import Dict, Generic, Iterator, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class EventStore(Generic[T]):
+    """Append-only ring of events with O(1) counters and ID / time indexes."""
+
+    def __init__(self, maxlen: int) -> None:
+        self.maxlen = maxlen
+        self._next_id = 1
+        self._first_id = 1  # ID of the oldest retained event
+        self._head = 0  # list position of the oldest retained event
+        self._items: List[Optional[T]] = []
+        self._times: List[float] = []
+        self._meta: List[Tuple[str, str]] = []  # (kind, source)
+        self._resolved: List[bool] = []
+        self._kind_counts: Dict[Tuple[str, bool], int] = {}
+        self._source_counts: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return self._next_id - self._first_id
+
+    def __iter__(self) -> Iterator[T]:
+        """Oldest to newest."""
+        for position in range(self._head, len(self._items)):
+            yield self._items[position]
+
+    @property
+    def last_id(self) -> int:
+        return self._next_id - 1
+
+    def add(self, item: T, *, ts: float, kind: str, source: str, resolved: bool = False) -> int:
+        if len(self) >= self.maxlen:
+            self._evict_oldest()
+        event_id = self._next_id
+        self._next_id += 1
+        if self._times and ts < self._times[-1]:
+            ts = self._times[-1]  # keep the time index sorted if the wall clock steps back
+        self._items.append(item)
+        self._times.append(ts)
+        self._meta.append((kind, source))
+        self._resolved.append(resolved)
+        self._bump(kind, source, resolved, 1)
+        return event_id
+
+    def _bump(self, kind: str, source: str, resolved: bool, delta: int) -> None:
+        key = (kind, resolved)
+        self._kind_counts[key] = self._kind_counts.get(key, 0) + delta
+        self._source_counts[source] = self._source_counts.get(source, 0) + delta
+        if not self._source_counts[source]:
+            del self._source_counts[source]
+
+    def _evict_oldest(self) -> None:
+        head = self._head
+        kind, source = self._meta[head]
+        self._bump(kind, source, self._resolved[head], -1)
+        self._items[head] = None
+        self._head += 1
+        self._first_id += 1
+        if self._head >= self.maxlen:
+            # Compact the lists once a full length of dead slots has built up.
+            for column in (self._items, self._times, self._meta, self._resolved):
+                del column[: self._head]
+            self._head = 0
+
+    def _position(self, event_id: int) -> Optional[int]:
+        if self._first_id <= event_id < self._next_id:
+            return self._head + event_id - self._first_id
+        return None
+
+    def get(self, event_id: int) -> Optional[T]:
+        position = self._position(event_id)
+        return None if position is None else self._items[position]
+
+    def mark_resolved(self, event_id: int) -> Optional[T]:
+        """Flag an event resolved in the counters; returns it, or ``None`` if unknown."""
+        position = self._position(event_id)
+        if position is None:
+            return None
+        if not self._resolved[position]:
+            kind, source = self._meta[position]
+            self._bump(kind, source, False, -1)
+            self._bump(kind, source, True, 1)
+            self._resolved[position] = True
+        return self._items[position]
+
+    def count(self, kind: Optional[str] = None, resolved: Optional[bool] = None) -> int:
+        return sum(
+            count
+            for (event_kind, event_resolved), count in self._kind_counts.items()
+            if (kind is None or event_kind == kind) and (resolved is None or event_resolved == resolved)
+        )
+
+    def counts_by_source(self) -> Dict[str, int]:
+        return dict(self._source_counts)
+
+    def count_since(self, ts: float) -> int:
+        """Events recorded at or after ``ts`` (wall-clock seconds)."""
+        return len(self._times) - max(bisect_left(self._times, ts), self._head)
+
+    def page(
+        self,
+        limit: int,
+        after: Optional[int] = None,
+        kind: Optional[str] = None,
+        resolved: Optional[bool] = None,
+    ) -> Tuple[List[Tuple[int, T]], Optional[int]]:
+        """Up to ``limit`` ``(id, item)`` pairs with ID > ``after``, oldest first.
+
+        Returns the page and the cursor for the next one (``None`` when this page
+        reached the newest event).
+        """
+        start = self._head if after is None else max(self._head, self._head + after + 1 - self._first_id)
+        page: List[Tuple[int, T]] = []
+        position = start
+        end = len(self._items)
+        while position < end and len(page) < limit:
+            if (kind is None or self._meta[position][0] == kind) and (
+                resolved is None or self._resolved[position] == resolved
+            ):
+                page.append((self._first_id + position - self._head, self._items[position]))
+            position += 1
+        if position >= end or not page:
+            return page, None
+        return page, page[-1][0]
+
+    def latest(self, count: int) -> List[T]:
+        """The newest ``count`` items, oldest first."""
+        return self._items[max(self._head, len(self._items) - count):]
@@ -13,6 +13,8 @@ from cryptography.hazmat.primitives.asymmetric.rsa import RSAPrivateKey
 from cryptography.hazmat.primitives.serialization import load_pem_private_key
 import logging
 
+from api.http_clients import get_http_client
+
 logger = logging.getLogger(__name__)
 
 
@@ -142,16 +144,17 @@ class GoogleAnalyticsDataClient:
             return self._token
 
         assertion = self._sign_jwt()
-        async with httpx.AsyncClient(timeout=8.0) as client:
-            response = await client.post(
-                self.token_url,
-                data={
-                    "grant_type": "urn:ietf:params:oauth:grant-type:jwt-bearer",
-                    "assertion": assertion,
-                },
-            )
-            response.raise_for_status()
-            payload = response.json()
+        client = get_http_client("google")
+        response = await client.post(
+            self.token_url,
+            data={
+                "grant_type": "urn:ietf:params:oauth:grant-type:jwt-bearer",
+                "assertion": assertion,
+            },
+            timeout=8.0,
+        )
+        response.raise_for_status()
+        payload = response.json()
 
         self._token = payload["access_token"]
         self._token_expires_at = now + int(payload.get("expires_in", 3600))
@@ -175,14 +178,15 @@ class GoogleAnalyticsDataClient:
         if dimensions:
             body["dimensions"] = [{"name": dimension} for dimension in dimensions]
 
-        async with httpx.AsyncClient(timeout=8.0) as client:
-            response = await client.post(
-                f"{self.api_root}/properties/{self.property_id}:runReport",
-                headers={"Authorization": f"Bearer {token}"},
-                json=body,
-            )
-            response.raise_for_status()
-            return response.json()
+        client = get_http_client("google")
+        response = await client.post(
+            f"{self.api_root}/properties/{self.property_id}:runReport",
+            headers={"Authorization": f"Bearer {token}"},
+            json=body,
+            timeout=8.0,
+        )
+        response.raise_for_status()
+        return response.json()
 
     async def run_realtime_report(
         self,
@@ -199,14 +203,15 @@ class GoogleAnalyticsDataClient:
         if dimensions:
             body["dimensions"] = [{"name": dimension} for dimension in dimensions]
 
-        async with httpx.AsyncClient(timeout=8.0) as client:
-            response = await client.post(
-                f"{self.api_root}/properties/{self.property_id}:runRealtimeReport",
-                headers={"Authorization": f"Bearer {token}"},
-                json=body,
-            )
-            response.raise_for_status()
-            return response.json()
+        client = get_http_client("google")
+        response = await client.post(
+            f"{self.api_root}/properties/{self.property_id}:runRealtimeReport",
+            headers={"Authorization": f"Bearer {token}"},
+            json=body,
+            timeout=8.0,
+        )
+        response.raise_for_status()
+        return response.json()
 
     def _metric_value(self, row: Dict[str, Any], index: int) -> int:
         values = row.get("metricValues", [])
@@ -0,0 +1,112 @@
+"""Shared, pooled ``httpx.AsyncClient`` registry for outbound integrations.
+
+Every upstream (OpenRouter, Supabase, GitHub, Upstash, media providers, probes)
+gets one long-lived client with its own connection pool, keep-alive limits and
+default timeouts, so repeat calls reuse TCP+TLS connections instead of paying a
+new handshake per request. HTTP/2 is negotiated for the upstreams flagged
+``http2`` (``h2`` ships with ``httpx[http2]`` in requirements.txt; without it
+those clients fall back to HTTP/1.1).
+
+Clients are bound to the event loop that created them (httpx pools cannot be
+shared across loops), so the registry keeps one set per running loop. The app
+lifespan in ``api/index.py`` closes them on shutdown via ``aclose_http_clients``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import weakref
+from dataclasses import dataclass
+from typing import Dict
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# HTTP/2 needs the h2 package (httpx[http2]); degrade to HTTP/1.1 if it is missing.
+try:
+    import h2  # type: ignore  # noqa: F401
+
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+@dataclass(frozen=True)
+class UpstreamConfig:
+    timeout: float = 10.0
+    connect_timeout: float = 5.0
+    http2: bool = False
+    max_connections: int = 20
+    max_keepalive_connections: int = 10
+    keepalive_expiry: float = 30.0
+    follow_redirects: bool = False
+
+
+UPSTREAMS: Dict[str, UpstreamConfig] = {
+    # Streaming completions can run for a minute; connect fast or fall back.
+    "openrouter": UpstreamConfig(timeout=60.0, connect_timeout=10.0, http2=True, max_connections=40),
+    "supabase": UpstreamConfig(timeout=8.0, http2=True),
+    "github": UpstreamConfig(timeout=12.0, http2=True),
+    "upstash": UpstreamConfig(timeout=5.0, connect_timeout=2.0, http2=True, max_connections=40),
+    "lastfm": UpstreamConfig(timeout=3.2, connect_timeout=2.0, follow_redirects=True),
+    "firestore": UpstreamConfig(timeout=5.0, http2=True),
+    "tmdb": UpstreamConfig(timeout=10.0, http2=True),
+    "books": UpstreamConfig(timeout=10.0, http2=True, follow_redirects=True),
+    "artwork": UpstreamConfig(timeout=3.2, connect_timeout=2.0, follow_redirects=True),
+    # Google OAuth, Calendar and Analytics Data APIs.
+    "google": UpstreamConfig(timeout=10.0, http2=True),
+    "withings": UpstreamConfig(timeout=10.0),
+    "whoop": UpstreamConfig(timeout=10.0),
+    "ai_gateway": UpstreamConfig(timeout=15.0, http2=True),
+    "firecrawl": UpstreamConfig(timeout=10.0),
+    # Arbitrary pages fetched for ingestion when Firecrawl is unavailable.
+    "ingest": UpstreamConfig(timeout=6.0, follow_redirects=True, keepalive_expiry=15.0),
+    # Health probes hit many hosts; keep idle connections short-lived.
+    "probes": UpstreamConfig(timeout=10.0, follow_redirects=True, max_keepalive_connections=20, keepalive_expiry=15.0),
+    "default": UpstreamConfig(),
+}
+
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, httpx.AsyncClient]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _build_client(config: UpstreamConfig) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(config.timeout, connect=config.connect_timeout),
+        limits=httpx.Limits(
+            max_connections=config.max_connections,
+            max_keepalive_connections=config.max_keepalive_connections,
+            keepalive_expiry=config.keepalive_expiry,
+        ),
+        http2=config.http2 and HTTP2_AVAILABLE,
+        follow_redirects=config.follow_redirects,
+    )
+
+
+def get_http_client(upstream: str = "default") -> httpx.AsyncClient:
+    """Return the pooled client for ``upstream`` on the running event loop.
+
+    Callers must not close the returned client; pass per-request ``timeout=``
+    when a call needs a tighter budget than the upstream default.
+    """
+    loop = asyncio.get_running_loop()
+    clients = _clients.get(loop)
+    if clients is None:
+        clients = _clients[loop] = {}
+    client = clients.get(upstream)
+    if client is None or getattr(client, "is_closed", False):
+        client = clients[upstream] = _build_client(UPSTREAMS.get(upstream, UPSTREAMS["default"]))
+    return client
+
+
+async def aclose_http_clients() -> None:
+    """Close every pooled client owned by the running event loop."""
+    clients = _clients.pop(asyncio.get_running_loop(), {})
+    for name, client in clients.items():
+        try:
+            await client.aclose()
+        except Exception as exc:
+            logger.debug("Closing %s HTTP client failed: %s", name, exc)
@@ -1,4 +1,5 @@
 import os
+from contextlib import asynccontextmanager
 from datetime import datetime, timezone
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
@@ -7,7 +8,9 @@ from fastapi.staticfiles import StaticFiles
 from fastapi.responses import JSONResponse
 from dotenv import load_dotenv
 
+from api.analytics_store import portfolio_analytics_store
 from api.config import get_default_model, get_openrouter_api_key
+from api.http_clients import aclose_http_clients
 
 # Monitoring
 from api.monitoring import (
@@ -52,6 +55,27 @@ _enable_public_docs = os.getenv("ENABLE_PUBLIC_API_DOCS", "").lower() in {"1", "
 _is_production_runtime = os.getenv("VERCEL_ENV") == "production"
 _public_docs_enabled = _enable_public_docs or not _is_production_runtime
 
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    # Fold queued request samples into monitor metrics off the request path,
+    # and keep the outbound health probes running in the background.
+    if system_monitor is not None:
+        system_monitor.start_request_aggregator()
+        system_monitor.start_probe_scheduler()
+    # Batch file-mode analytics writes into the write-ahead log.
+    if portfolio_analytics_store is not None:
+        portfolio_analytics_store.start()
+    yield
+    if portfolio_analytics_store is not None:
+        await portfolio_analytics_store.stop()
+    if system_monitor is not None:
+        await system_monitor.stop_probe_scheduler()
+        await system_monitor.stop_request_aggregator()
+    # Release pooled upstream connections (see api/http_clients.py).
+    await aclose_http_clients()
+
+
 app = FastAPI(
     title="AssistMe - AI Portfolio Assistant API",
     description=(
@@ -63,6 +87,7 @@ app = FastAPI(
     redoc_url="/api/redoc" if _public_docs_enabled else None,
     openapi_url="/api/openapi.json" if _public_docs_enabled else None,
     openapi_tags=OPENAPI_TAGS,
+    lifespan=lifespan,
 )
 
 # Add monitoring middleware (only if system_monitor initialized successfully)
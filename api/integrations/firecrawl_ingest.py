@@ -34,7 +34,7 @@ class FirecrawlService:
 
         if self.is_configured:
             try:
-                import httpx
+                from api.http_clients import get_http_client
                 headers = {
                     "Authorization": f"Bearer {self.api_key}",
                     "Content-Type": "application/json",
@@ -44,19 +44,19 @@ class FirecrawlService:
                     "formats": ["markdown"],
                     "onlyMainContent": True,
                 }
-                async with httpx.AsyncClient(timeout=10.0) as client:
-                    resp = await client.post(
-                        "https://api.firecrawl.dev/v1/scrape", json=payload, headers=headers
-                    )
-                    if resp.status_code == 200:
-                        data = resp.json()
-                        markdown = data.get("data", {}).get("markdown", "")
-                        return {
-                            "success": True,
-                            "url": url,
-                            "markdown": markdown,
-                            "source": "firecrawl_api",
-                        }
+                client = get_http_client("firecrawl")
+                resp = await client.post(
+                    "https://api.firecrawl.dev/v1/scrape", json=payload, headers=headers
+                )
+                if resp.status_code == 200:
+                    data = resp.json()
+                    markdown = data.get("data", {}).get("markdown", "")
+                    return {
+                        "success": True,
+                        "url": url,
+                        "markdown": markdown,
+                        "source": "firecrawl_api",
+                    }
             except Exception as exc:
                 logger.warning("Firecrawl API request failed, using local fallback: %s", exc)
 
@@ -65,7 +65,7 @@ class FirecrawlService:
 
     async def _local_fallback_scrape(self, url: str) -> Dict[str, Any]:
         try:
-            import httpx
+            from api.http_clients import get_http_client
             from html.parser import HTMLParser
 
             class SimpleTextExtractor(HTMLParser):
@@ -96,21 +96,21 @@ class FirecrawlService:
                         elif not self._skip:
                             self.text_chunks.append(clean)
 
-            async with httpx.AsyncClient(timeout=6.0, follow_redirects=True) as client:
-                headers = {"User-Agent": "Mozilla/5.0 (Portfolio-AssistMe-Bot/1.0)"}
-                resp = await client.get(url, headers=headers)
-                if resp.status_code == 200:
-                    parser = SimpleTextExtractor()
-                    parser.feed(resp.text)
-                    title = parser.title or f"Ingested Document from {url}"
-                    body = "\n\n".join(parser.text_chunks[:50]) or f"Content ingested from {url}"
-                    markdown = f"# {title}\n\n*Source URL: {url}*\n\n{body}"
-                    return {
-                        "success": True,
-                        "url": url,
-                        "markdown": markdown,
-                        "source": "local_readability_fallback",
-                    }
+            client = get_http_client("ingest")
+            headers = {"User-Agent": "Mozilla/5.0 (Portfolio-AssistMe-Bot/1.0)"}
+            resp = await client.get(url, headers=headers)
+            if resp.status_code == 200:
+                parser = SimpleTextExtractor()
+                parser.feed(resp.text)
+                title = parser.title or f"Ingested Document from {url}"
+                body = "\n\n".join(parser.text_chunks[:50]) or f"Content ingested from {url}"
+                markdown = f"# {title}\n\n*Source URL: {url}*\n\n{body}"
+                return {
+                    "success": True,
+                    "url": url,
+                    "markdown": markdown,
+                    "source": "local_readability_fallback",
+                }
         except Exception as exc:
             logger.warning("Local fallback scrape error: %s", exc)
 
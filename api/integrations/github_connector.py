@@ -16,6 +16,9 @@ from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
 import asyncio
 
+from api.cache import BoundedCache
+from api.http_clients import get_http_client
+
 logger = logging.getLogger(__name__)
 
 
@@ -53,8 +56,8 @@ class GitHubConnector:
             self.headers["Authorization"] = f"token {self.access_token}"
 
         # Cache to avoid rate limits
-        self.cache = {}
         self.cache_ttl = 300  # 5 minutes
+        self.cache = BoundedCache("github_connector", max_entries=256, ttl=self.cache_ttl)
         self.portfolio_owner = (os.getenv("GITHUB_PORTFOLIO_OWNER") or "mangeshraut712").strip().lower()
 
     def _headers_for_username(self, username: str) -> Dict[str, str]:
@@ -73,39 +76,39 @@ class GitHubConnector:
         cache_key = f"profile:{username}"
 
         if self._is_cached(cache_key):
-            return self.cache[cache_key]['data']
+            return self.cache[cache_key]
 
         url = f"{self.base_url}/users/{username}"
 
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    url,
-                    headers=self._headers_for_username(username),
-                    timeout=10.0,
-                )
-                response.raise_for_status()
-                data = response.json()
-
-                profile = {
-                    'username': data.get('login'),
-                    'name': data.get('name'),
-                    'bio': data.get('bio'),
-                    'location': data.get('location'),
-                    'company': data.get('company'),
-                    'blog': data.get('blog'),
-                    'email': data.get('email'),
-                    'public_repos': data.get('public_repos'),
-                    'followers': data.get('followers'),
-                    'following': data.get('following'),
-                    'created_at': data.get('created_at'),
-                    'updated_at': data.get('updated_at'),
-                    'avatar_url': data.get('avatar_url'),
-                    'html_url': data.get('html_url')
-                }
-
-                self._cache_data(cache_key, profile)
-                return profile
+            client = get_http_client("github")
+            response = await client.get(
+                url,
+                headers=self._headers_for_username(username),
+                timeout=10.0,
+            )
+            response.raise_for_status()
+            data = response.json()
+
+            profile = {
+                'username': data.get('login'),
+                'name': data.get('name'),
+                'bio': data.get('bio'),
+                'location': data.get('location'),
+                'company': data.get('company'),
+                'blog': data.get('blog'),
+                'email': data.get('email'),
+                'public_repos': data.get('public_repos'),
+                'followers': data.get('followers'),
+                'following': data.get('following'),
+                'created_at': data.get('created_at'),
+                'updated_at': data.get('updated_at'),
+                'avatar_url': data.get('avatar_url'),
+                'html_url': data.get('html_url')
+            }
+
+            self._cache_data(cache_key, profile)
+            return profile
 
         except httpx.TimeoutException as e:
             logger.warning(f"GitHub profile timeout for {username}: {type(e).__name__}")
@@ -131,7 +134,7 @@ class GitHubConnector:
         cache_key = f"repos:{username}:{sort}"
 
         if self._is_cached(cache_key):
-            return self.cache[cache_key]['data'][:max_repos]
+            return self.cache[cache_key][:max_repos]
 
         url = f"{self.base_url}/users/{username}/repos"
         params = {
@@ -141,41 +144,41 @@ class GitHubConnector:
         }
 
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    url,
-                    headers=self._headers_for_username(username),
-                    params=params,
-                    timeout=10.0,
-                )
-                response.raise_for_status()
-                repos_data = response.json()
-
-                repos = []
-                for repo in repos_data:
-                    repos.append({
-                        'name': repo.get('name'),
-                        'full_name': repo.get('full_name'),
-                        'description': repo.get('description'),
-                        'html_url': repo.get('html_url'),
-                        'homepage': repo.get('homepage'),
-                        'language': repo.get('language'),
-                        'languages_url': repo.get('languages_url'),
-                        'stars': repo.get('stargazers_count'),
-                        'forks': repo.get('forks_count'),
-                        'watchers': repo.get('watchers_count'),
-                        'open_issues': repo.get('open_issues_count'),
-                        'created_at': repo.get('created_at'),
-                        'updated_at': repo.get('updated_at'),
-                        'pushed_at': repo.get('pushed_at'),
-                        'size': repo.get('size'),
-                        'topics': repo.get('topics', []),
-                        'visibility': repo.get('visibility'),
-                        'default_branch': repo.get('default_branch')
-                    })
-
-                self._cache_data(cache_key, repos)
-                return repos
+            client = get_http_client("github")
+            response = await client.get(
+                url,
+                headers=self._headers_for_username(username),
+                params=params,
+                timeout=10.0,
+            )
+            response.raise_for_status()
+            repos_data = response.json()
+
+            repos = []
+            for repo in repos_data:
+                repos.append({
+                    'name': repo.get('name'),
+                    'full_name': repo.get('full_name'),
+                    'description': repo.get('description'),
+                    'html_url': repo.get('html_url'),
+                    'homepage': repo.get('homepage'),
+                    'language': repo.get('language'),
+                    'languages_url': repo.get('languages_url'),
+                    'stars': repo.get('stargazers_count'),
+                    'forks': repo.get('forks_count'),
+                    'watchers': repo.get('watchers_count'),
+                    'open_issues': repo.get('open_issues_count'),
+                    'created_at': repo.get('created_at'),
+                    'updated_at': repo.get('updated_at'),
+                    'pushed_at': repo.get('pushed_at'),
+                    'size': repo.get('size'),
+                    'topics': repo.get('topics', []),
+                    'visibility': repo.get('visibility'),
+                    'default_branch': repo.get('default_branch')
+                })
+
+            self._cache_data(cache_key, repos)
+            return repos
 
         except httpx.TimeoutException as e:
             logger.warning(f"GitHub repos timeout for {username}: {type(e).__name__}")
@@ -304,18 +307,11 @@ class GitHubConnector:
 
     def _is_cached(self, key: str) -> bool:
         """Check if data is in cache and not expired"""
-        if key not in self.cache:
-            return False
-
-        cached_at = self.cache[key]['timestamp']
-        return (datetime.now().timestamp() - cached_at) < self.cache_ttl
+        return key in self.cache
 
     def _cache_data(self, key: str, data: Any):
-        """Store data in cache with timestamp"""
-        self.cache[key] = {
-            'data': data,
-            'timestamp': datetime.now().timestamp()
-        }
+        """Store data in cache"""
+        self.cache[key] = data
 
     def _is_recently_updated(self, updated_at: Optional[str]) -> bool:
         """Check if repo was updated in last 30 days"""
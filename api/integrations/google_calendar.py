@@ -3,7 +3,7 @@ from datetime import datetime, timedelta, timezone
 from typing import Any, Dict, List
 from urllib.parse import urlencode
 
-import httpx
+from api.http_clients import get_http_client
 
 PROVIDER = "google_calendar"
 SCOPES = (
@@ -53,19 +53,20 @@ async def exchange_code(code: str) -> Dict[str, Any]:
         "redirect_uri": _redirect_uri(),
         "grant_type": "authorization_code",
     }
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        response = await client.post("https://oauth2.googleapis.com/token", data=payload)
+    client = get_http_client("google")
+    response = await client.post("https://oauth2.googleapis.com/token", data=payload)
     response.raise_for_status()
     return response.json()
 
 
 async def fetch_user_email(access_token: str) -> str:
     """Resolve a stable account identifier without requiring userinfo OAuth scopes."""
-    async with httpx.AsyncClient(timeout=8.0) as client:
-        response = await client.get(
-            "https://oauth2.googleapis.com/tokeninfo",
-            params={"access_token": access_token},
-        )
+    client = get_http_client("google")
+    response = await client.get(
+        "https://oauth2.googleapis.com/tokeninfo",
+        params={"access_token": access_token},
+        timeout=8.0,
+    )
     response.raise_for_status()
     data = response.json()
     return str(data.get("email") or data.get("sub") or "google-calendar-user")
@@ -93,12 +94,12 @@ async def fetch_availability(access_token: str, days: int = 7) -> List[Dict[str,
         "timeZone": "UTC",
         "items": [{"id": "primary"}],
     }
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        response = await client.post(
-            "https://www.googleapis.com/calendar/v3/freeBusy",
-            headers={"Authorization": f"Bearer {access_token}"},
-            json=payload,
-        )
+    client = get_http_client("google")
+    response = await client.post(
+        "https://www.googleapis.com/calendar/v3/freeBusy",
+        headers={"Authorization": f"Bearer {access_token}"},
+        json=payload,
+    )
     response.raise_for_status()
     body = response.json()
     calendars = body.get("calendars") or {}
@@ -133,8 +134,8 @@ async def refresh_access_token(refresh_token: str) -> Dict[str, Any]:
         "grant_type": "refresh_token",
         "refresh_token": refresh_token,
     }
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        response = await client.post("https://oauth2.googleapis.com/token", data=payload)
+    client = get_http_client("google")
+    response = await client.post("https://oauth2.googleapis.com/token", data=payload)
     response.raise_for_status()
     return response.json()
 
@@ -151,11 +152,11 @@ async def register_watch(
         "address": webhook_url,
         "token": channel_token,
     }
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        response = await client.post(
-            "https://www.googleapis.com/calendar/v3/calendars/primary/events/watch",
-            headers={"Authorization": f"Bearer {access_token}"},
-            json=payload,
-        )
+    client = get_http_client("google")
+    response = await client.post(
+        "https://www.googleapis.com/calendar/v3/calendars/primary/events/watch",
+        headers={"Authorization": f"Bearer {access_token}"},
+        json=payload,
+    )
     response.raise_for_status()
     return response.json()
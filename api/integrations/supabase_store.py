@@ -1,9 +1,11 @@
 import os
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Sequence
 
 import httpx
 
+from api.http_clients import get_http_client
+from api.single_flight import coalesce
 from api.integrations.token_crypto import decrypt_secret, encrypt_secret
 
 
@@ -63,9 +65,8 @@ def _headers(extra: Optional[Dict[str, str]] = None) -> Dict[str, str]:
 
 async def _rest_request(method: str, path: str, **kwargs) -> httpx.Response:
     url = f"{_supabase_url()}/rest/v1/{path.lstrip('/')}"
-    async with httpx.AsyncClient(timeout=8.0) as client:
-        response = await client.request(method, url, headers=_headers(kwargs.pop("headers", None)), **kwargs)
-    return response
+    client = get_http_client("supabase")
+    return await client.request(method, url, headers=_headers(kwargs.pop("headers", None)), **kwargs)
 
 
 def _safe_number(value: Any) -> Optional[float]:
@@ -189,6 +190,7 @@ def _coalesce_latest_health_rows(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
     return merged
 
 
+@coalesce("health_summary", key=lambda: "latest")
 async def fetch_latest_health_summary() -> Dict[str, Any]:
     if not supabase_is_configured():
         return {
@@ -214,8 +216,7 @@ async def fetch_latest_health_summary() -> Dict[str, Any]:
     }
 
     try:
-        async with httpx.AsyncClient(timeout=8.0) as client:
-            response = await client.get(url, headers=headers, params=params)
+        response = await get_http_client("supabase").get(url, headers=headers, params=params)
         response.raise_for_status()
         rows = response.json()
     except (httpx.HTTPError, ValueError):
@@ -264,6 +265,32 @@ async def integration_is_connected(provider: str) -> bool:
         return False
 
 
+async def integration_connection_states(providers: Sequence[str]) -> Dict[str, bool]:
+    """Connected flag for several providers in one ``provider=in.(...)`` query."""
+    states = {provider: False for provider in providers}
+    if not supabase_is_configured() or not providers:
+        return states
+    try:
+        response = await _rest_request(
+            "GET",
+            "integration_accounts",
+            params={
+                "select": "provider",
+                "provider": f"in.({','.join(providers)})",
+                "status": "eq.connected",
+            },
+        )
+        response.raise_for_status()
+        rows = response.json()
+    except (httpx.HTTPError, ValueError):
+        return states
+    for row in rows if isinstance(rows, list) else []:
+        provider = row.get("provider") if isinstance(row, dict) else None
+        if provider in states:
+            states[provider] = True
+    return states
+
+
 async def get_provider_access_token(provider: str) -> Optional[str]:
     from api.integrations.token_manager import get_valid_access_token
 
@@ -6,6 +6,7 @@ from typing import Any, Dict, Optional, Tuple
 
 import httpx
 
+from api.http_clients import get_http_client
 from api.integrations import whoop, withings
 from api.integrations.supabase_store import (
     acquire_token_refresh_lock,
@@ -61,8 +62,8 @@ async def _refresh_google(refresh_token: str) -> Dict[str, Any]:
         "grant_type": "refresh_token",
         "refresh_token": refresh_token,
     }
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        response = await client.post("https://oauth2.googleapis.com/token", data=payload)
+    client = get_http_client("google")
+    response = await client.post("https://oauth2.googleapis.com/token", data=payload)
     response.raise_for_status()
     return response.json()
 
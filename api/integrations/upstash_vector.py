@@ -32,7 +32,7 @@ class UpstashVectorService:
         """
         if self.is_configured:
             try:
-                import httpx
+                from api.http_clients import get_http_client
                 headers = {"Authorization": f"Bearer {self.token}"}
                 payload = {
                     "data": query_text,
@@ -40,11 +40,11 @@ class UpstashVectorService:
                     "includeMetadata": True,
                     "namespace": namespace,
                 }
-                async with httpx.AsyncClient(timeout=5.0) as client:
-                    resp = await client.post(f"{self.url}/query", json=payload, headers=headers)
-                    if resp.status_code == 200:
-                        data = resp.json()
-                        return data.get("result", [])
+                client = get_http_client("upstash")
+                resp = await client.post(f"{self.url}/query", json=payload, headers=headers)
+                if resp.status_code == 200:
+                    data = resp.json()
+                    return data.get("result", [])
             except Exception as exc:
                 logger.warning("Upstash vector remote query failed, falling back to local: %s", exc)
 
@@ -6,6 +6,8 @@ from urllib.parse import urlencode
 
 import httpx
 
+from api.http_clients import get_http_client
+
 PROVIDER = "whoop"
 AUTH_URL = "https://api.prod.whoop.com/oauth/oauth2/auth"
 TOKEN_URL = "https://api.prod.whoop.com/oauth/oauth2/token"
@@ -59,8 +61,8 @@ async def exchange_code(code: str) -> Dict[str, Any]:
         "client_secret": _client_secret(),
         "redirect_uri": _redirect_uri(),
     }
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        response = await client.post(TOKEN_URL, data=payload)
+    client = get_http_client("whoop")
+    response = await client.post(TOKEN_URL, data=payload)
     response.raise_for_status()
     return response.json()
 
@@ -74,12 +76,12 @@ async def refresh_access_token(refresh_token: str) -> Dict[str, Any]:
         "client_secret": _client_secret(),
         "scope": "offline",
     }
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        response = await client.post(
-            TOKEN_URL,
-            data=payload,
-            headers={"Content-Type": "application/x-www-form-urlencoded"},
-        )
+    client = get_http_client("whoop")
+    response = await client.post(
+        TOKEN_URL,
+        data=payload,
+        headers={"Content-Type": "application/x-www-form-urlencoded"},
+    )
     response.raise_for_status()
     return response.json()
 
@@ -151,11 +153,11 @@ def _pick_active_cycle_record(records: List[Dict[str, Any]]) -> Optional[Dict[st
 
 
 async def _get_json(access_token: str, path: str) -> Dict[str, Any]:
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        response = await client.get(
-            f"{API_BASE}{path}",
-            headers={"Authorization": f"Bearer {access_token}"},
-        )
+    client = get_http_client("whoop")
+    response = await client.get(
+        f"{API_BASE}{path}",
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
     response.raise_for_status()
     return response.json()
 
@@ -6,7 +6,7 @@ from datetime import datetime, timezone
 from typing import Any, Dict
 from urllib.parse import urlencode
 
-import httpx
+from api.http_clients import get_http_client
 
 PROVIDER = "withings"
 AUTH_URL = "https://account.withings.com/oauth2_user/authorize2"
@@ -57,8 +57,8 @@ def build_authorize_url(state: str) -> str:
 
 async def _request_token(payload: Dict[str, Any]) -> Dict[str, Any]:
     body = {**payload, "client_id": _client_id(), "client_secret": _client_secret()}
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        response = await client.post(TOKEN_URL, data=body)
+    client = get_http_client("withings")
+    response = await client.post(TOKEN_URL, data=body)
     response.raise_for_status()
     data = response.json()
     if data.get("status") != 0:
@@ -192,17 +192,17 @@ async def fetch_sanitized_summary(access_token: str) -> Dict[str, Any]:
         "source_status": "synced",
     }
 
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        response = await client.post(
-            MEASURE_URL,
-            headers={"Authorization": f"Bearer {access_token}"},
-            data={
-                "action": "getmeas",
-                "category": 1,
-                "startdate": startdate,
-                "enddate": enddate,
-            },
-        )
+    client = get_http_client("withings")
+    response = await client.post(
+        MEASURE_URL,
+        headers={"Authorization": f"Bearer {access_token}"},
+        data={
+            "action": "getmeas",
+            "category": 1,
+            "startdate": startdate,
+            "enddate": enddate,
+        },
+    )
     response.raise_for_status()
     payload = response.json()
     if payload.get("status") != 0:
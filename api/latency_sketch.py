@@ -0,0 +1,168 @@
+"""Bounded-memory latency histograms with rolling 1m / 5m / 1h windows.
+
+``LogHistogram`` is an HDR-style log-bucket histogram: each power of two
+between 0.25ms and ~262s is split into ``SUB_BUCKETS`` linear sub-buckets, so
+any recorded value is reported within ~6% and the bucket index comes from a
+single ``math.frexp``. Counts live in a fixed-size ``array('I')``; histograms
+with the same layout merge by adding counts (across slots, endpoints or
+workers).
+
+``WindowedLatency`` keeps one ring of histogram slots per window (10s x 6,
+1m x 5, 5m x 12). Recording touches one slot per ring — O(1), with a slot
+zeroed in place when its time comes round again — and a window query merges
+the slots that are still inside it, so windows roll with slot granularity.
+Memory per instance is bounded by the slot count times ``BUCKET_BYTES``.
+"""
+
+from __future__ import annotations
+
+import math
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+SUB_BUCKETS = 8
+MIN_EXPONENT = -1  # frexp exponent of 0.25ms (0.5 * 2**-1)
+MAX_EXPONENT = 18  # values >= 2**18 ms (~262s) land in the last bucket
+BUCKET_COUNT = (MAX_EXPONENT - MIN_EXPONENT + 1) * SUB_BUCKETS
+BUCKET_BYTES = BUCKET_COUNT * array("I").itemsize
+
+# window name -> (slot seconds, slot count)
+WINDOWS: Dict[str, Tuple[int, int]] = {
+    "1m": (10, 6),
+    "5m": (60, 5),
+    "1h": (300, 12),
+}
+PERCENTILES = (50, 95, 99)
+
+_ZEROS = array("I", bytes(BUCKET_BYTES))
+
+
+def bucket_index(value_ms: float) -> int:
+    if value_ms <= 0:
+        return 0
+    mantissa, exponent = math.frexp(value_ms)
+    if exponent < MIN_EXPONENT:
+        return 0
+    if exponent > MAX_EXPONENT:
+        return BUCKET_COUNT - 1
+    return (exponent - MIN_EXPONENT) * SUB_BUCKETS + int((mantissa - 0.5) * 2 * SUB_BUCKETS)
+
+
+def bucket_upper(index: int) -> float:
+    """Exclusive upper edge of a bucket, in milliseconds (``inf`` for the overflow bucket)."""
+    if index >= BUCKET_COUNT - 1:
+        return math.inf
+    exponent, sub = divmod(index, SUB_BUCKETS)
+    return math.ldexp(1.0, exponent + MIN_EXPONENT) * (0.5 + (sub + 1) / (2 * SUB_BUCKETS))
+
+
+def bucket_value(index: int) -> float:
+    """Midpoint of a bucket, in milliseconds."""
+    exponent, sub = divmod(index, SUB_BUCKETS)
+    scale = math.ldexp(1.0, exponent + MIN_EXPONENT)
+    return scale * (0.5 + (sub + 0.5) / (2 * SUB_BUCKETS))
+
+
+class LogHistogram:
+    """Fixed-size log-bucket latency histogram (milliseconds)."""
+
+    __slots__ = ("counts", "total")
+
+    def __init__(self) -> None:
+        self.counts = array("I", _ZEROS)
+        self.total = 0
+
+    def record(self, value_ms: float) -> None:
+        self.counts[bucket_index(value_ms)] += 1
+        self.total += 1
+
+    def merge(self, other: "LogHistogram") -> "LogHistogram":
+        counts = self.counts
+        for index, count in enumerate(other.counts):
+            if count:
+                counts[index] += count
+        self.total += other.total
+        return self
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """Nearest-rank percentile, reported as the bucket midpoint."""
+        if not self.total:
+            return None
+        rank = max(1, math.ceil(pct / 100 * self.total))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return bucket_value(index)
+        return bucket_value(BUCKET_COUNT - 1)
+
+    def summary(self) -> Dict[str, object]:
+        result: Dict[str, object] = {"count": self.total}
+        for pct in PERCENTILES:
+            value = self.percentile(pct)
+            result[f"p{pct}_ms"] = round(value, 1) if value is not None else None
+        return result
+
+
+class _Ring:
+    __slots__ = ("width", "epochs", "slots")
+
+    def __init__(self, width: int, size: int) -> None:
+        self.width = width
+        self.epochs = array("q", [-1] * size)
+        self.slots: List[Optional[LogHistogram]] = [None] * size
+
+    def record(self, ts: float, bucket: int) -> None:
+        epoch = int(ts // self.width)
+        index = epoch % len(self.slots)
+        current = self.epochs[index]
+        if current != epoch:
+            if current > epoch:  # late sample for a slot already reused
+                return
+            slot = self.slots[index]
+            if slot is None:
+                slot = self.slots[index] = LogHistogram()
+            else:
+                slot.counts[:] = _ZEROS
+                slot.total = 0
+            self.epochs[index] = epoch
+        slot = self.slots[index]
+        slot.counts[bucket] += 1
+        slot.total += 1
+
+    def window(self, now: float) -> LogHistogram:
+        newest = int(now // self.width)
+        oldest = newest - len(self.slots)
+        merged = LogHistogram()
+        for epoch, slot in zip(self.epochs, self.slots):
+            if slot is not None and oldest < epoch <= newest:
+                merged.merge(slot)
+        return merged
+
+
+class WindowedLatency:
+    """Rolling latency histograms for the ``WINDOWS`` of one endpoint (or all).
+
+    ``lifetime`` and ``sum_ms`` accumulate since start, for cumulative exporters.
+    """
+
+    __slots__ = ("_rings", "lifetime", "sum_ms")
+
+    def __init__(self) -> None:
+        self._rings = {name: _Ring(width, size) for name, (width, size) in WINDOWS.items()}
+        self.lifetime = LogHistogram()
+        self.sum_ms = 0.0
+
+    def record(self, ts: float, value_ms: float) -> None:
+        bucket = bucket_index(value_ms)
+        self.lifetime.counts[bucket] += 1
+        self.lifetime.total += 1
+        self.sum_ms += value_ms
+        for ring in self._rings.values():
+            ring.record(ts, bucket)
+
+    def window(self, name: str, now: float) -> LogHistogram:
+        return self._rings[name].window(now)
+
+    def summary(self, now: float) -> Dict[str, Dict[str, object]]:
+        return {name: ring.window(now).summary() for name, ring in self._rings.items()}
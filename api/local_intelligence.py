@@ -0,0 +1,342 @@
+"""Table-driven local answers for keyless mode and OpenRouter outages.
+
+``LOCAL_INTENTS`` maps the ``QueryFeatures`` tags of a message to portfolio
+answers. Static answers are rendered from ``PORTFOLIO_DATA`` once at import;
+answers backed by the site knowledge index (travel, blog releases) render on
+demand because the index can refresh underneath us.
+
+``answer_locally`` scores every intent whose required tags are present by the
+sum of its tag weights and picks the best one (ties keep table order). When a
+page context was retrieved, a site-knowledge candidate is scored as well, from
+the site-topic tag plus how much of the question the snippet covers, so a
+relevant snippet can beat a weak keyword match. Greetings (whole words only)
+carry a low weight so any topic in the same message outranks them: "Hi,
+what are his skills?" answers skills, and a greeting only answers when
+nothing else matched.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from typing import Callable, Dict, FrozenSet, Mapping, Optional, Tuple
+
+from api.config import PORTFOLIO_DATA
+from api.query_features import QueryFeatures, classify_query
+from api.site_knowledge import (
+    format_blog_release_summary,
+    format_recent_blog_summary,
+    format_usa_state_summary,
+)
+
+SITE_TOPIC_WEIGHT = 1.5
+# Minimum share of the question's words found in the page context for a
+# snippet answer when no site-topic keyword matched.
+SITE_OVERLAP_THRESHOLD = 0.5
+SITE_EXCERPT_CHARS = 1800
+
+_WORD_RE = re.compile(r"[a-z0-9][a-z0-9+#.-]{2,}")
+_STOPWORDS = frozenset(
+    {
+        "the", "and", "for", "are", "was", "what", "which", "who", "how", "does", "did", "his", "her",
+        "this", "that", "with", "about", "from", "have", "has", "you", "your", "can", "tell", "show",
+        "me", "is", "on", "of", "in", "to", "a", "an",
+    }
+)
+
+
+@dataclass(frozen=True)
+class LocalIntent:
+    name: str
+    category: str
+    weights: Mapping[str, float]
+    requires: Tuple[str, ...] = ()
+    answer: str = ""
+    render: Optional[Callable[[str], str]] = field(default=None, compare=False)
+
+    def score(self, features: QueryFeatures) -> float:
+        if self.requires and not features.has_all(*self.requires):
+            return 0.0
+        return sum(weight for tag, weight in self.weights.items() if features.has(tag))
+
+    def text(self, query: str) -> str:
+        return self.render(query) if self.render is not None else self.answer
+
+
+def _about() -> str:
+    return (
+        f"👨‍💻 **{PORTFOLIO_DATA['name']}** is a {PORTFOLIO_DATA['title']} based in "
+        f"{PORTFOLIO_DATA['location']}. He specializes in full-stack architecture, cloud pipelines, and AI "
+        "systems. His portfolio incorporates a Hybrid AI Web Stack utilizing client-side **WebNN + Gemma 3** "
+        "for low-latency edge interactions and server-side OpenRouter API orchestration."
+    )
+
+
+def _skills() -> str:
+    langs = ", ".join(PORTFOLIO_DATA["skills"]["languages"])
+    frameworks = ", ".join(PORTFOLIO_DATA["skills"]["frameworks"][:4])
+    return (
+        f"🛠️ **Technical Stack**:\n"
+        f"• **Languages**: {langs}\n"
+        f"• **Frameworks**: {frameworks}, FastAPI\n"
+        f"• **Cloud**: AWS, Docker, Kubernetes\n"
+        f"• **AI/ML**: OpenRouter, TensorFlow, scikit-learn, RAG\n"
+        f"• **This site**: vanilla ESM + FastAPI + WebMCP (not React/Next)\n"
+        f"• **Databases**: PostgreSQL, MongoDB, Redis"
+    )
+
+
+def _projects() -> str:
+    projects_list = "\n".join(f"• **{p['name']}**: {p['achievements']}" for p in PORTFOLIO_DATA["projects"][:4])
+    return (
+        f"🚀 **Key Projects**:\n{projects_list}\n"
+        "• Live showcase cards pull from public GitHub repos "
+        "(GitHub Pages primary; Vercel demos may be offline while DEPLOYMENT_DISABLED)."
+    )
+
+
+def _contact() -> str:
+    return (
+        f"📫 **Contact Information**:\n• **Email**: {PORTFOLIO_DATA['email']}\n"
+        f"• **Phone**: {PORTFOLIO_DATA['phone']}\n• **LinkedIn**: {PORTFOLIO_DATA['linkedin']}\n"
+        f"• **GitHub**: {PORTFOLIO_DATA['github']}"
+    )
+
+
+def _experience() -> str:
+    exp_list = "\n".join(
+        f"• **{e['title']}** at {e['company']} ({e['period']})" for e in PORTFOLIO_DATA["experience"][:3]
+    )
+    return f"💼 **Professional Experience**:\n{exp_list}"
+
+
+def _education() -> str:
+    edu_list = "\n".join(
+        f"• **{e['degree']}** - {e['school']} ({e['period']})" for e in PORTFOLIO_DATA.get("education", [])[:2]
+    )
+    if edu_list:
+        return f"🎓 **Education**:\n{edu_list}"
+    return (
+        "🎓 Mangesh holds a Master of Science in Computer Science from Drexel University "
+        "(GPA 3.91/4.0, June 2023)."
+    )
+
+
+_PRESIDENT_ANSWER = "🇺🇸 The President of the United States is **Joe Biden** (46th President)."
+
+LOCAL_INTENTS: Tuple[LocalIntent, ...] = (
+    LocalIntent(
+        "greeting",
+        "Greeting",
+        {"greeting": 0.5},
+        answer=(
+            "👋 Hello! I'm AssistMe, running in **Local Mode**. I can tell you about Mangesh's experience, "
+            "skills, projects, Field Notes blogs, and more. What would you like to know?"
+        ),
+    ),
+    LocalIntent("about", "About", {"who": 1.0, "about_subject": 1.0}, requires=("who", "about_subject"), answer=_about()),
+    LocalIntent(
+        "resume",
+        "Resume",
+        {"resume_cv": 2.0},
+        answer=f"📄 You can download Mangesh's resume here: {PORTFOLIO_DATA['resume_url']}",
+    ),
+    LocalIntent("skills", "Skills", {"skills_topic": 2.0}, answer=_skills()),
+    LocalIntent(
+        "blog_releases",
+        "Blogs",
+        {"blog": 1.5, "release_term": 1.5},
+        requires=("blog", "release_term"),
+        render=lambda query: f"📝 **Blog Releases**\n\n{format_blog_release_summary(query)}",
+    ),
+    LocalIntent(
+        "music",
+        "Music",
+        {"music": 2.0},
+        answer=(
+            "🎵 **Now Playing & Music Activity**:\n"
+            "Mangesh connects his **Spotify** listening live to **Last.fm** (user: "
+            "**[mbr63](https://www.last.fm/user/mbr63)**).\n\n"
+            "• **Live Hero Music Card**: Look directly under the badges on the homepage to see what's currently "
+            "playing or recently scrobbled!\n"
+            "• **Spotify Profile**: [Open Last.fm mbr63](https://www.last.fm/user/mbr63)"
+        ),
+    ),
+    LocalIntent(
+        "blogs",
+        "Blogs",
+        {"blog_topic": 1.5},
+        render=lambda _query: (
+            "✍️ **Recent Field Notes**\n\n"
+            f"{format_recent_blog_summary(5)}\n\n"
+            "Browse all posts in the Field Notes / Technical Writings section."
+        ),
+    ),
+    LocalIntent("projects", "Projects", {"project": 2.0}, answer=_projects()),
+    LocalIntent("contact", "Contact", {"contact": 2.0}, answer=_contact()),
+    LocalIntent("experience", "Experience", {"experience_topic": 1.5}, answer=_experience()),
+    LocalIntent("education", "Education", {"education": 2.0}, answer=_education()),
+    LocalIntent(
+        "achievements",
+        "Achievements",
+        {"achievement": 2.0},
+        answer=(
+            "🏆 **Key Achievements**:\n"
+            "• Refactored legacy Java monoliths with **20% code reduction** at IoasiZ\n"
+            "• Resolved **50+ critical microservices bugs** with JUnit/Mockito test suites\n"
+            "• Published Real-Time Face Emotion Recognition System research in **IJFGCN (2020)**\n"
+            "• Earned MS in Computer Science from Drexel University with **3.91 / 4.0 GPA**\n"
+            "• Honored as **Student of the Year** at Y.B. Patil Polytechnic (MSBTE)"
+        ),
+    ),
+    LocalIntent(
+        "prime_minister_india",
+        "General Knowledge",
+        {"prime_minister": 1.5, "india": 1.5},
+        requires=("prime_minister", "india"),
+        answer=(
+            "🇮🇳 The Prime Minister of India is **Narendra Modi**, serving as the 14th Prime Minister of India "
+            "since May 2014."
+        ),
+    ),
+    LocalIntent(
+        "us_president",
+        "General Knowledge",
+        {"president": 1.5, "united_states": 1.5},
+        requires=("president", "united_states"),
+        answer=_PRESIDENT_ANSWER,
+    ),
+    LocalIntent("us_president_short", "General Knowledge", {"president_of_us": 3.0}, answer=_PRESIDENT_ANSWER),
+    LocalIntent(
+        "astrology",
+        "Astrology",
+        {"astrology": 2.0},
+        answer=(
+            "✨ **Public personality notes**:\n"
+            "Mangesh shares a high-level interest in Vedic symbolism as cultural context. "
+            "Publicly he is described as **balanced, diplomatic, and analytically driven** — "
+            "aligned with a software-engineering career focused on systems thinking and clear communication.\n\n"
+            "For professional details (role, stack, projects, education), ask about experience or skills. "
+            "Private chart / family / medical details are not part of this portfolio assistant."
+        ),
+    ),
+    LocalIntent(
+        "relocation",
+        "Career",
+        {"relocation": 2.0},
+        answer=(
+            "🌍 **USA career context (public)**:\n"
+            "Mangesh completed his **MSCS in the United States** and worked as a full-time **Software Development "
+            "Engineer** at IoasiZ in Piscataway, NJ. He continues global engineering work with interest in US tech "
+            "opportunities across the **Northeast corridor** and **West Coast** tech hubs.\n\n"
+            "Ask about experience, skills, or projects for hiring-oriented detail."
+        ),
+    ),
+    LocalIntent(
+        "personality",
+        "About",
+        {"personality": 2.0},
+        answer=(
+            "🧠 **Working style**:\n"
+            "Colleagues and portfolio evidence emphasize **systems thinking**, resilience under delivery pressure, "
+            "and a pragmatic full-stack / AI engineering approach. He values clear communication and shipping "
+            "production-quality software."
+        ),
+    ),
+    LocalIntent(
+        "family",
+        "Family",
+        {"family": 2.0},
+        answer=(
+            "👨‍👩‍👧 **Family**:\n"
+            "AssistMe keeps family details private. For professional background, ask about "
+            "**experience**, **education**, **projects**, or **skills**."
+        ),
+    ),
+    LocalIntent(
+        "identity",
+        "Identity",
+        {"identity": 2.0},
+        answer=(
+            "👤 **Public identity**:\n"
+            "• **Name**: Mangesh Bharat Raut\n"
+            "• **Languages**: English (professional), Marathi (native), Hindi\n"
+            "• **Professional locations**: CES (US / India hybrid engineering context)\n\n"
+            "Home address, medical data, and private cultural records are **not** shared by this assistant."
+        ),
+    ),
+    LocalIntent(
+        "usa_travel",
+        "Travel",
+        {"usa_term": 1.0, "state": 1.0, "travel_verb": 1.0},
+        requires=("usa_term", "state", "travel_verb"),
+        render=lambda _query: f"🇺🇸 **USA Travel Coverage**\n\n{format_usa_state_summary()}",
+    ),
+)
+
+DEFAULT_ANSWER = {
+    "answer": (
+        "👋 I'm running in **Local Mode** (no cloud API key configured).\n\n**Available topics:**\n"
+        "• Who is Mangesh?\n• Skills & Tech Stack\n• Recent Blogs (Google I/O 2026)\n• Projects\n• Experience\n"
+        "• Education\n• Contact Info\n• Resume\n\nWhat would you like to know?"
+    ),
+    "category": "System",
+}
+
+
+def _words(text: str) -> FrozenSet[str]:
+    return frozenset(word for word in _WORD_RE.findall(text) if word not in _STOPWORDS)
+
+
+def site_context_score(query: str, site_context: str, features: QueryFeatures) -> float:
+    """Score the retrieved page snippet as an answer: site-topic keyword plus word coverage."""
+    if not site_context:
+        return 0.0
+    words = _words(query)
+    coverage = len(words & _words(site_context[:SITE_EXCERPT_CHARS].lower())) / len(words) if words else 0.0
+    if features.has("site_topic"):
+        return SITE_TOPIC_WEIGHT + coverage
+    return SITE_TOPIC_WEIGHT * coverage if coverage >= SITE_OVERLAP_THRESHOLD else 0.0
+
+
+def _site_answer(site_context: str) -> str:
+    excerpt = site_context[:SITE_EXCERPT_CHARS].rsplit(" ", 1)[0]
+    return (
+        "I found this in the public portfolio knowledge base:\n\n"
+        f"{excerpt}\n\n"
+        "Cloud AI is not configured in this environment, so this is a direct site-knowledge answer rather than "
+        "a synthesized model response."
+    )
+
+
+def answer_locally(
+    query: str, site_context: str = "", features: Optional[QueryFeatures] = None
+) -> Dict[str, object]:
+    """Best local answer for ``query``: ``{"answer", "category", "intent", "score"}``."""
+    query = query.lower().strip()
+    if features is None:
+        features = classify_query(query)
+
+    best: Optional[LocalIntent] = None
+    best_score = 0.0
+    for intent in LOCAL_INTENTS:
+        score = intent.score(features)
+        if score > best_score:
+            best, best_score = intent, score
+
+    site_score = site_context_score(query, site_context, features)
+    if site_score > best_score:
+        return {
+            "answer": _site_answer(site_context),
+            "category": "Site Knowledge",
+            "intent": "site_knowledge",
+            "score": round(site_score, 3),
+        }
+    if best is None:
+        return {**DEFAULT_ANSWER, "intent": "default", "score": 0.0}
+    return {
+        "answer": best.text(query),
+        "category": best.category,
+        "intent": best.name,
+        "score": round(best_score, 3),
+    }
@@ -0,0 +1,310 @@
+"""Cross-worker aggregation of ``SystemMonitor`` counters.
+
+Each uvicorn worker has its own ``SystemMonitor``. With sharing enabled, a
+background task in every worker periodically flattens its cumulative
+counters (totals, per-endpoint request/status counts, lifetime latency
+buckets, AI and poster counters) into ``{key: int}``, subtracts what it
+published last time and hands only the non-zero deltas to a shared backend,
+which adds them to the cluster totals and returns those in the same call.
+The request path is untouched: it still only appends to the monitor's queue.
+
+Readers merge the cluster totals from the last exchange with this worker's
+not-yet-published deltas, so a worker's own traffic is visible at once and
+other workers' traffic lags by at most one interval.
+
+Backends (``MONITOR_SHARED_METRICS``):
+    off     - per-process counters only (default)
+    shm     - one JSON file on tmpfs (``/dev/shm``) shared by the workers on a
+              host; the publisher adds its deltas under an exclusive ``flock`` and
+              replaces the file atomically
+    upstash - Upstash Redis REST hash; ``HINCRBY`` per delta plus ``HGETALL``
+              in one pipelined round trip, shared across hosts
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Protocol, Tuple
+
+logger = logging.getLogger(__name__)
+
+ENDPOINT_FIELDS = (
+    "total_requests",
+    "successful_requests",
+    "failed_requests",
+    "client_error_requests",
+    "server_error_requests",
+    "rate_limited_requests",
+)
+# Endpoints without a latency sketch (past the monitor's tracked-endpoint cap)
+# are shared under this one key so the cluster hash stays bounded.
+OTHER_ENDPOINT = "*:other"
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, "") or default)
+    except ValueError:
+        return default
+
+
+def local_counters(monitor: Any) -> Dict[str, int]:
+    """Flatten one worker's cumulative counters into ``{key: int}``."""
+    counters: Dict[str, int] = {
+        "requests": monitor.total_requests,
+        "errors": monitor.error_count,
+    }
+    tracked = monitor.latency_by_endpoint
+    for endpoint, metrics in list(monitor.endpoint_metrics.items()):
+        name = endpoint if endpoint in tracked else OTHER_ENDPOINT
+        prefix = f"e|{name}|"
+        for field in ENDPOINT_FIELDS:
+            key = prefix + field
+            counters[key] = counters.get(key, 0) + getattr(metrics, field)
+        for status_class in range(1, 6):
+            key = f"{prefix}c{status_class}"
+            counters[key] = counters.get(key, 0) + metrics.status_classes[status_class]
+    for endpoint, sketch in list(tracked.items()):
+        prefix = f"h|{endpoint}|"
+        for index, count in enumerate(sketch.lifetime.counts):
+            if count:
+                counters[prefix + str(index)] = count
+        counters[f"e|{endpoint}|latency_sum_us"] = int(sketch.sum_ms * 1000)
+
+    ai = monitor.ai_metrics
+    counters["a|requests"] = ai["openrouter_requests"]
+    counters["a|errors"] = ai["openrouter_errors"]
+    for group, values in (
+        ("tokens", ai["token_usage"]),
+        ("model", ai["model_usage"]),
+        ("cache", ai["response_cache"]),
+        ("hedge", ai["hedging"]),
+    ):
+        for name, count in list(values.items()):
+            counters[f"a|{group}|{name}"] = count
+    for outcome, count in monitor.poster_requests.items():
+        counters[f"p|{outcome}"] = count
+    return counters
+
+
+def _delta(current: Dict[str, int], previous: Dict[str, int]) -> Dict[str, int]:
+    delta = {key: value - previous.get(key, 0) for key, value in current.items() if value != previous.get(key, 0)}
+    for key, value in previous.items():
+        if key not in current and value:
+            delta[key] = -value
+    return delta
+
+
+def _add(totals: Dict[str, int], delta: Dict[str, int]) -> Dict[str, int]:
+    merged = dict(totals)
+    for key, value in delta.items():
+        merged[key] = merged.get(key, 0) + value
+    return merged
+
+
+class SharedMetricsBackend(Protocol):
+    name: str
+
+    async def exchange(self, delta: Dict[str, int]) -> Dict[str, int]:
+        """Add ``delta`` to the cluster totals and return the updated totals."""
+
+
+class SharedFileBackend:
+    """Cluster totals in one JSON file on tmpfs, replaced atomically under ``flock``.
+
+    The lock lives on a separate ``.lock`` file so each update can write a
+    temp file and ``os.replace`` it: a worker killed mid-write leaves the
+    previous totals intact. A file that is still unreadable (e.g. written by
+    an older release) is logged and restarted from empty.
+    """
+
+    name = "shm"
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.lock_path = path.with_name(path.name + ".lock")
+
+    def _read_totals(self) -> Dict[str, int]:
+        try:
+            raw = self.path.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return {}
+        try:
+            totals = json.loads(raw) if raw else {}
+        except json.JSONDecodeError:
+            logger.warning("Shared monitor metrics file %s is corrupt; resetting cluster totals", self.path)
+            return {}
+        return totals if isinstance(totals, dict) else {}
+
+    def _write_totals(self, totals: Dict[str, int]) -> None:
+        fd, tmp = tempfile.mkstemp(prefix=self.path.name + ".", suffix=".tmp", dir=self.path.parent)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                json.dump(totals, handle, separators=(",", ":"))
+            os.replace(tmp, self.path)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.unlink(tmp)
+            raise
+
+    def _exchange_sync(self, delta: Dict[str, int]) -> Dict[str, int]:
+        import fcntl
+
+        fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o600)
+        with os.fdopen(fd, "r+") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                totals = self._read_totals()
+                if delta:
+                    totals = _add(totals, delta)
+                    self._write_totals(totals)
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+        return totals
+
+    async def exchange(self, delta: Dict[str, int]) -> Dict[str, int]:
+        return await asyncio.to_thread(self._exchange_sync, delta)
+
+
+class UpstashMetricsBackend:
+    """Cluster totals in an Upstash Redis hash, one pipelined round trip per exchange."""
+
+    name = "upstash"
+
+    def __init__(self, url: str, token: str, key: str = "monitor:counters") -> None:
+        self._url = url.rstrip("/")
+        self._headers = {"Authorization": f"Bearer {token}"}
+        self.key = key
+
+    async def exchange(self, delta: Dict[str, int]) -> Dict[str, int]:
+        from api.http_clients import get_http_client
+
+        commands: List[List[str]] = [["HINCRBY", self.key, field, str(value)] for field, value in delta.items()]
+        commands.append(["HGETALL", self.key])
+        response = await get_http_client("upstash").post(
+            f"{self._url}/pipeline", headers=self._headers, json=commands, timeout=2.0
+        )
+        response.raise_for_status()
+        flat = response.json()[-1].get("result") or []
+        return {flat[index]: int(flat[index + 1]) for index in range(0, len(flat) - 1, 2)}
+
+
+class MetricsSharer:
+    """Publishes one worker's counter deltas and keeps the last cluster totals."""
+
+    def __init__(self, monitor: Any, backend: SharedMetricsBackend, interval: float = 5.0) -> None:
+        self.monitor = monitor
+        self.backend = backend
+        self.interval = interval
+        self._published: Dict[str, int] = {}
+        self.totals: Optional[Dict[str, int]] = None
+        self.updated_at: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+        self._warned = False
+
+    async def sync(self) -> bool:
+        """Publish deltas since the last successful exchange; returns whether it succeeded."""
+        self.monitor.flush_requests()
+        current = local_counters(self.monitor)
+        try:
+            totals = await self.backend.exchange(_delta(current, self._published))
+        except Exception as exc:
+            if not self._warned:
+                logger.warning("Shared monitor metrics unavailable (%s); showing this worker only", type(exc).__name__)
+                self._warned = True
+            return False
+        self._warned = False
+        self._published = current
+        self.totals = totals
+        self.updated_at = time.time()
+        return True
+
+    def merged(self) -> Optional[Dict[str, int]]:
+        """Cluster totals plus this worker's unpublished deltas (``None`` before the first exchange)."""
+        if self.totals is None:
+            return None
+        self.monitor.flush_requests()
+        return _add(self.totals, _delta(local_counters(self.monitor), self._published))
+
+    async def _run_forever(self) -> None:
+        while True:
+            await self.sync()
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run_forever())
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None and not task.done():
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        await self.sync()
+
+
+def build_metrics_sharer(monitor: Any) -> Optional[MetricsSharer]:
+    backend_name = (os.getenv("MONITOR_SHARED_METRICS") or "off").strip().lower()
+    if backend_name in {"", "off", "none", "0", "false"}:
+        return None
+    interval = _env_float("MONITOR_SHARED_METRICS_INTERVAL", 5.0)
+    if backend_name in {"upstash", "redis"}:
+        url = (os.getenv("UPSTASH_REDIS_REST_URL") or "").strip()
+        token = (os.getenv("UPSTASH_REDIS_REST_TOKEN") or "").strip()
+        if url and token:
+            logger.info("Shared monitor metrics backend: Upstash Redis REST")
+            return MetricsSharer(monitor, UpstashMetricsBackend(url, token), interval)
+        logger.warning("MONITOR_SHARED_METRICS=%s but Upstash env incomplete; falling back to shm", backend_name)
+    shm_dir = Path("/dev/shm") if Path("/dev/shm").is_dir() else Path(tempfile.gettempdir())
+    path = Path(os.getenv("MONITOR_SHARED_METRICS_PATH") or shm_dir / f"assistme-monitor-{os.getuid()}.json")
+    logger.info("Shared monitor metrics backend: %s", path)
+    return MetricsSharer(monitor, SharedFileBackend(path), interval)
+
+
+# -- reading merged totals ------------------------------------------------------
+
+
+def endpoint_totals(totals: Dict[str, int]) -> Dict[str, Dict[str, int]]:
+    """``{endpoint: {field: count}}`` from flattened totals (``c1``..``c5`` are status classes)."""
+    endpoints: Dict[str, Dict[str, int]] = {}
+    for key, value in totals.items():
+        if key.startswith("e|"):
+            endpoint, _, field = key[2:].rpartition("|")
+            endpoints.setdefault(endpoint, {})[field] = value
+    return endpoints
+
+
+def latency_totals(totals: Dict[str, int]) -> Dict[str, Dict[int, int]]:
+    """``{endpoint: {log bucket index: count}}`` from flattened totals."""
+    histograms: Dict[str, Dict[int, int]] = {}
+    for key, value in totals.items():
+        if key.startswith("h|") and value:
+            endpoint, _, index = key[2:].rpartition("|")
+            histograms.setdefault(endpoint, {})[int(index)] = value
+    return histograms
+
+
+def grouped(totals: Dict[str, int], prefix: str) -> Iterator[Tuple[str, int]]:
+    """``(name, count)`` for every key under ``prefix`` (e.g. ``"a|model|"``)."""
+    for key, value in totals.items():
+        if key.startswith(prefix):
+            yield key[len(prefix):], value
+
+
+def ai_totals(totals: Dict[str, int]) -> Dict[str, Any]:
+    """The ``ai_metrics`` counters, in the same shape, from flattened totals."""
+    return {
+        "openrouter_requests": totals.get("a|requests", 0),
+        "openrouter_errors": totals.get("a|errors", 0),
+        "model_usage": dict(grouped(totals, "a|model|")),
+        "token_usage": dict(grouped(totals, "a|tokens|")),
+        "response_cache": dict(grouped(totals, "a|cache|")),
+        "hedging": dict(grouped(totals, "a|hedge|")),
+    }
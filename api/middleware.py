@@ -1,107 +1,78 @@
 """FastAPI Monitoring Middleware.
 Extracted from monolithic monitoring.py to improve codebase structure.
+
+Pure ASGI rather than ``BaseHTTPMiddleware``: no per-request task or
+response-stream wrapping, so streaming chat responses pass straight through.
+Per request it only notes the status from ``http.response.start`` and hands
+``SystemMonitor.record_request`` a compact sample; aggregation happens later
+in ``SystemMonitor.flush_requests``.
 """
 
 import time
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
 
 from api.monitoring import SystemMonitor, EventType
 
 
-class MonitoringMiddleware(BaseHTTPMiddleware):
+class MonitoringMiddleware:
     """Middleware to monitor all requests and ensure proper responses."""
 
     def __init__(self, app, monitor: SystemMonitor):
-        super().__init__(app)
+        self.app = app
         self.monitor = monitor
 
-    async def dispatch(self, request: Request, call_next):
-        start_time = time.time()
+    async def __call__(self, scope, receive, send):
+        # Skip monitoring if monitor is not available (e.g., failed to initialize)
+        if scope["type"] != "http" or self.monitor is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = 500
+        # Response time is measured to the response start, as before; streamed
+        # bodies are not counted against the endpoint latency.
+        response_time = None
+
+        async def send_wrapper(message):
+            nonlocal status_code, response_time
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                response_time = (time.perf_counter() - start) * 1000
+            await send(message)
 
         try:
-            response = await call_next(request)
-
-            response_time = (time.time() - start_time) * 1000
-
-            # Skip monitoring if monitor is not available (e.g., failed to initialize)
-            if self.monitor is None:
-                return response
-
-            # Extract user agent and client IP (same trust model as rate limiting)
-            user_agent = request.headers.get("user-agent", "unknown")
-            try:
-                from api.config import get_client_ip
-
-                client_ip = get_client_ip(request)
-            except Exception:
-                forwarded = request.headers.get("x-forwarded-for")
-                if forwarded:
-                    parts = [p.strip() for p in forwarded.split(",") if p.strip()]
-                    client_ip = parts[-1] if parts else "unknown"
-                else:
-                    client_ip = request.client.host if request.client else "unknown"
-
+            await self.app(scope, receive, send_wrapper)
+        except Exception as e:
+            if response_time is None:
+                response_time = (time.perf_counter() - start) * 1000
+            path = scope.get("path", "")
+            method = scope.get("method", "")
+            # Log the exception
+            self.monitor.log_event(
+                f"Unhandled exception in {method} {path}: {str(e)}",
+                EventType.ERROR,
+                {"error": str(e), "path": path},
+                "exception",
+            )
+            # Record as failed request
             self.monitor.record_request(
-                path=request.url.path,
-                method=request.method,
-                status_code=response.status_code,
-                response_time_ms=response_time,
-                user_agent=user_agent,
-                client_ip=client_ip,
+                method,
+                path,
+                500,
+                response_time,
+                raw_headers=scope.get("headers") or [],
+                client=scope.get("client"),
+                raised=True,
             )
-
-            if response_time > 5000:  # 5 seconds
-                self.monitor.log_event(
-                    f"Slow request: {request.method} {request.url.path} took {response_time:.0f}ms",
-                    EventType.WARNING,
-                    {"response_time_ms": response_time, "path": request.url.path},
-                    "performance",
-                )
-
-            # Ensure we always return proper JSON for API endpoints
-            if request.url.path.startswith("/api") and response.status_code >= 400:
-                if response.status_code >= 500:
-                    self.monitor.log_event(
-                        f"Server error {response.status_code}: {request.method} {request.url.path}",
-                        EventType.ERROR,
-                        {"status_code": response.status_code, "path": request.url.path},
-                        "api_error",
-                    )
-
-            return response
-
-        except Exception as e:
-            # Calculate response time even for errors
-            response_time = (time.time() - start_time) * 1000
-
-            # Skip monitoring if monitor is not available
-            if self.monitor is not None:
-                # Log the exception
-                self.monitor.log_event(
-                    f"Unhandled exception in {request.method} {request.url.path}: {str(e)}",
-                    EventType.ERROR,
-                    {"error": str(e), "path": request.url.path},
-                    "exception",
-                )
-
-                # Extract user agent and client IP for error logging
-                user_agent = request.headers.get("user-agent", "unknown")
-                forwarded = request.headers.get("x-forwarded-for")
-                if forwarded:
-                    client_ip = forwarded.split(",")[0].strip()
-                else:
-                    client_ip = request.client.host if request.client else "unknown"
-
-                # Record as failed request
-                self.monitor.record_request(
-                    path=request.url.path,
-                    method=request.method,
-                    status_code=500,
-                    response_time_ms=response_time,
-                    user_agent=user_agent,
-                    client_ip=client_ip,
-                )
-
             # Re-raise to let FastAPI handle it with proper error responses
             raise
+
+        if response_time is None:
+            response_time = (time.perf_counter() - start) * 1000
+        self.monitor.record_request(
+            scope.get("method", ""),
+            scope.get("path", ""),
+            status_code,
+            response_time,
+            raw_headers=scope.get("headers") or [],
+            client=scope.get("client"),
+        )
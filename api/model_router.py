@@ -2,7 +2,6 @@
 
 from __future__ import annotations
 
-import re
 from typing import List, Optional, Tuple
 
 from api.config import (
@@ -17,6 +16,8 @@ from api.config import (
     get_default_model,
     normalize_openrouter_model,
 )
+from api.model_scoreboard import model_scoreboard
+from api.query_features import QueryFeatures, classify_query
 from api.site_knowledge import should_use_web_tools
 
 PRIMARY_MODEL = PRIMARY_OPENROUTER_MODEL
@@ -36,44 +37,21 @@ AUTO_ROUTER_ALLOWED = [
     "openai/gpt-5*",
 ]
 
-PORTFOLIO_QUERY_RE = re.compile(
-    r"\b("
-    r"mangesh|portfolio|resume|cv|skills?|experience|projects?|education|"
-    r"drexel|github|linkedin|certification|publication|award|contact|hire|"
-    r"employment|background|tech stack|who is|tell me about|work history"
-    r")\b",
-    re.I,
-)
-
-FUSION_QUERY_RE = re.compile(
-    r"\b("
-    r"compare|versus|vs\.?|pros and cons|trade[- ]?offs?|debate|synthesize|"
-    r"multiple perspectives|in[- ]depth analysis|which is better|best approach|"
-    r"evaluate options|critique|research report|expert review|"
-    r"advantages and disadvantages|difference between.+(and|vs)"
-    r")\b",
-    re.I,
-)
 
-MATH_OR_TRIVIA_RE = re.compile(
-    r"^\s*(what is|calculate|solve|compute)\b.{0,80}$",
-    re.I,
-)
-
-
-def is_portfolio_query(message: str, site_context: str = "") -> bool:
-    lower = (message or "").lower()
-    if PORTFOLIO_QUERY_RE.search(lower):
-        return True
-    if site_context and any(
-        token in lower for token in ("mangesh", "portfolio", "this site", "your website")
-    ):
+def is_portfolio_query(
+    message: str, site_context: str = "", features: Optional[QueryFeatures] = None
+) -> bool:
+    if features is None:
+        features = classify_query(message or "")
+    if features.has("portfolio_query"):
         return True
-    return False
+    return bool(site_context) and features.has("portfolio_site_token")
 
 
-def is_fusion_query(message: str) -> bool:
-    return bool(FUSION_QUERY_RE.search(message or ""))
+def is_fusion_query(message: str, features: Optional[QueryFeatures] = None) -> bool:
+    if features is None:
+        features = classify_query(message or "")
+    return features.has("fusion_query")
 
 
 def resolve_chat_model(
@@ -83,13 +61,17 @@ def resolve_chat_model(
     site_context: str = "",
     stream: bool = True,
     has_images: bool = False,
+    features: Optional[QueryFeatures] = None,
 ) -> Tuple[str, bool, str]:
     """
     Pick the best OpenRouter model for a user turn.
 
-    Returns (model_id, web_tools_enabled, routing_tier).
+    Returns (model_id, web_tools_enabled, routing_tier). ``features`` is the
+    turn's ``classify_query`` result when the caller already has it.
     """
-    web_tools = should_use_web_tools(message, site_context)
+    if features is None:
+        features = classify_query(message or "")
+    web_tools = should_use_web_tools(message, site_context, features)
 
     if has_images:
         # Free vision path (Gemma 4 / Nemotron Omni). Paid Grok vision needs credits.
@@ -100,12 +82,13 @@ def resolve_chat_model(
         if explicit in OPENROUTER_ROUTER_MODELS or explicit.startswith("openrouter/"):
             return explicit, web_tools or explicit == FUSION_MODEL, "explicit"
 
-    if is_fusion_query(message) and not is_portfolio_query(message, site_context):
+    portfolio = is_portfolio_query(message, site_context, features)
+    if is_fusion_query(message, features) and not portfolio:
         if stream:
             return AUTO_ROUTER_MODEL, True, "fusion-stream"
         return FUSION_MODEL, True, "fusion"
 
-    if is_portfolio_query(message, site_context):
+    if portfolio:
         # When OPENROUTER_MODEL is a free/router slug (credit-safe), use it first.
         env_default = get_default_model()
         if env_default.endswith(":free") or env_default in {
@@ -115,7 +98,7 @@ def resolve_chat_model(
             return env_default, web_tools, "portfolio-free"
         return PRIMARY_MODEL, web_tools, "portfolio"
 
-    if MATH_OR_TRIVIA_RE.search(message or "") and len(message) < 120:
+    if features.has("math_or_trivia") and len(message) < 120:
         env_default = get_default_model()
         if env_default.endswith(":free") or env_default == FREE_OPENROUTER_MODEL:
             return env_default, False, "fast-free"
@@ -127,10 +110,12 @@ def resolve_chat_model(
     return AUTO_ROUTER_MODEL, web_tools, "auto"
 
 
-def build_model_fallback_chain(primary_model: str) -> List[str]:
+def build_model_fallback_chain(primary_model: str, *, ranked: bool = True) -> List[str]:
     """Ordered fallbacks: primary → free tier → Grok → Auto → Flash → free spares.
 
     Free models stay online when the OpenRouter paid balance is exhausted (HTTP 402).
+    With ``ranked`` the static order is re-sorted by ``model_scoreboard`` so
+    models that are timing out, out of credits or returning garbage are tried last.
     """
     chain: List[str] = []
 
@@ -163,4 +148,4 @@ def build_model_fallback_chain(primary_model: str) -> List[str]:
     if primary_model != AUTO_ROUTER_MODEL:
         add(AUTO_ROUTER_MODEL)
     add(FALLBACK_OPENROUTER_MODEL)
-    return chain
+    return model_scoreboard.rank(chain) if ranked else chain
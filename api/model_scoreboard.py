@@ -0,0 +1,242 @@
+"""Live per-model health scoreboard and circuit breaker for OpenRouter routing.
+
+Every chat attempt reports back here: time to first token, throughput,
+upstream errors (with 402 / 429 broken out) and answers rejected as garbage.
+Rates are exponentially weighted so a model recovers as soon as it behaves
+again, and a per-model circuit breaker temporarily demotes models that keep
+failing:
+
+    closed     - normal; ordered by expected time-to-good-answer
+    open       - tripped; moved to the end of the fallback chain until cooldown
+    half_open  - cooldown over; tried after healthy models, one failure re-trips
+
+402 (no credits) trips the breaker immediately with a long cooldown, 429 with
+a short one; other failures trip after ``failure_threshold`` in a row.
+``build_model_fallback_chain`` uses ``rank`` to reorder its static chain and
+``/api/monitor/ai-metrics`` reports ``snapshot``.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+EWMA_ALPHA = 0.2
+# Expected latency assumed for a model with no samples yet, so untried models
+# sort among healthy ones instead of always first or always last.
+UNKNOWN_TTFT_SECONDS = 2.5
+PAYMENT_REQUIRED_COOLDOWN = 300.0
+RATE_LIMITED_COOLDOWN = 60.0
+MAX_COOLDOWN = 600.0
+
+
+def _env_number(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, "") or default)
+    except ValueError:
+        return default
+
+
+def _ewma(current: Optional[float], sample: float) -> float:
+    return sample if current is None else current + EWMA_ALPHA * (sample - current)
+
+
+class ModelStats:
+    """Counters, EWMAs and breaker state for one model id."""
+
+    __slots__ = (
+        "model",
+        "attempts",
+        "successes",
+        "errors",
+        "http_402",
+        "http_429",
+        "garbage",
+        "ewma_ttft",
+        "ewma_tokens_per_sec",
+        "error_rate",
+        "garbage_rate",
+        "consecutive_failures",
+        "trips",
+        "open_until",
+        "last_error",
+    )
+
+    def __init__(self, model: str) -> None:
+        self.model = model
+        self.attempts = 0
+        self.successes = 0
+        self.errors = 0
+        self.http_402 = 0
+        self.http_429 = 0
+        self.garbage = 0
+        self.ewma_ttft: Optional[float] = None
+        self.ewma_tokens_per_sec: Optional[float] = None
+        self.error_rate = 0.0
+        self.garbage_rate = 0.0
+        self.consecutive_failures = 0
+        self.trips = 0
+        self.open_until = 0.0
+        self.last_error: Optional[str] = None
+
+    def state(self, now: float) -> str:
+        if not self.open_until:
+            return "closed"
+        return "open" if now < self.open_until else "half_open"
+
+    def expected_seconds(self) -> float:
+        """Expected time to a usable answer: TTFT inflated by the failure odds."""
+        ttft = UNKNOWN_TTFT_SECONDS if self.ewma_ttft is None else self.ewma_ttft
+        failure = min(0.95, self.error_rate + self.garbage_rate)
+        return ttft / (1.0 - failure)
+
+
+class ModelScoreboard:
+    def __init__(self, failure_threshold: int = 3, base_cooldown: float = 30.0) -> None:
+        self.failure_threshold = max(1, failure_threshold)
+        self.base_cooldown = base_cooldown
+        self._models: Dict[str, ModelStats] = {}
+
+    def _stats(self, model: str) -> ModelStats:
+        stats = self._models.get(model)
+        if stats is None:
+            stats = self._models[model] = ModelStats(model)
+        return stats
+
+    # -- recording --------------------------------------------------------
+
+    def record_first_token(self, model: str, seconds: float) -> None:
+        stats = self._stats(model)
+        stats.ewma_ttft = _ewma(stats.ewma_ttft, seconds)
+
+    def record_lost_race(self, model: str, elapsed: float) -> None:
+        """A hedge loser was cancelled after ``elapsed`` without a first token.
+
+        That only says its TTFT is at least ``elapsed``, so it may raise the
+        expected TTFT but never lower it (a freshly launched hedge would
+        otherwise look fast).
+        """
+        stats = self._stats(model)
+        expected = UNKNOWN_TTFT_SECONDS if stats.ewma_ttft is None else stats.ewma_ttft
+        if elapsed > expected:
+            stats.ewma_ttft = elapsed
+
+    def record_success(self, model: str, *, tokens: int = 0, elapsed: float = 0.0) -> None:
+        stats = self._stats(model)
+        stats.attempts += 1
+        stats.successes += 1
+        stats.error_rate = _ewma(stats.error_rate, 0.0)
+        stats.garbage_rate = _ewma(stats.garbage_rate, 0.0)
+        if tokens and elapsed > 0:
+            stats.ewma_tokens_per_sec = _ewma(stats.ewma_tokens_per_sec, tokens / elapsed)
+        stats.consecutive_failures = 0
+        stats.trips = 0
+        stats.open_until = 0.0
+
+    def record_error(self, model: str, reason: str = "", status_code: Optional[int] = None) -> None:
+        stats = self._stats(model)
+        stats.attempts += 1
+        stats.errors += 1
+        stats.error_rate = _ewma(stats.error_rate, 1.0)
+        stats.garbage_rate = _ewma(stats.garbage_rate, 0.0)
+        stats.last_error = reason or (f"HTTP {status_code}" if status_code else "error")
+        if status_code == 402:
+            stats.http_402 += 1
+            self._trip(stats, PAYMENT_REQUIRED_COOLDOWN)
+        elif status_code == 429:
+            stats.http_429 += 1
+            self._trip(stats, RATE_LIMITED_COOLDOWN)
+        else:
+            self._failed(stats)
+
+    def record_garbage(self, model: str) -> None:
+        stats = self._stats(model)
+        stats.attempts += 1
+        stats.garbage += 1
+        stats.garbage_rate = _ewma(stats.garbage_rate, 1.0)
+        stats.error_rate = _ewma(stats.error_rate, 0.0)
+        stats.last_error = "garbage answer"
+        self._failed(stats)
+
+    def _failed(self, stats: ModelStats) -> None:
+        stats.consecutive_failures += 1
+        half_open = stats.state(time.monotonic()) == "half_open"
+        if half_open or stats.consecutive_failures >= self.failure_threshold:
+            self._trip(stats, self.base_cooldown * 2 ** stats.trips)
+
+    def _trip(self, stats: ModelStats, cooldown: float) -> None:
+        stats.trips += 1
+        stats.open_until = time.monotonic() + min(cooldown, MAX_COOLDOWN)
+
+    # -- routing ----------------------------------------------------------
+
+    def rank(self, chain: List[str]) -> List[str]:
+        """Reorder a fallback chain by live health.
+
+        The requested model stays first while its breaker is closed and it is
+        mostly succeeding; everything else is ordered healthy → half-open →
+        open, then by expected time-to-answer. Open models are kept at the end
+        as a last resort rather than dropped.
+        """
+        if not self._models or not chain:
+            return list(chain)
+        now = time.monotonic()
+
+        def tier(model: str) -> int:
+            stats = self._models.get(model)
+            if stats is None:
+                return 0
+            state = stats.state(now)
+            if state == "open":
+                return 2
+            if state == "half_open" or stats.error_rate + stats.garbage_rate >= 0.5:
+                return 1
+            return 0
+
+        def key(model: str):
+            stats = self._models.get(model)
+            expected = stats.expected_seconds() if stats else UNKNOWN_TTFT_SECONDS
+            return tier(model), expected
+
+        primary, rest = chain[0], list(chain[1:])
+        if tier(primary) == 0:
+            return [primary] + sorted(rest, key=key)
+        return sorted(chain, key=key)
+
+    # -- reporting --------------------------------------------------------
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        now = time.monotonic()
+        report = {}
+        for model, stats in sorted(self._models.items()):
+            state = stats.state(now)
+            report[model] = {
+                "state": state,
+                "cooldown_remaining_s": round(stats.open_until - now, 1) if state == "open" else 0,
+                "ewma_ttft_ms": round(stats.ewma_ttft * 1000, 1) if stats.ewma_ttft is not None else None,
+                "ewma_tokens_per_sec": (
+                    round(stats.ewma_tokens_per_sec, 2) if stats.ewma_tokens_per_sec is not None else None
+                ),
+                "error_rate": round(stats.error_rate, 3),
+                "garbage_rate": round(stats.garbage_rate, 3),
+                "attempts": stats.attempts,
+                "successes": stats.successes,
+                "errors": stats.errors,
+                "http_402": stats.http_402,
+                "http_429": stats.http_429,
+                "garbage": stats.garbage,
+                "consecutive_failures": stats.consecutive_failures,
+                "trips": stats.trips,
+                "last_error": stats.last_error,
+            }
+        return report
+
+    def reset(self) -> None:
+        self._models.clear()
+
+
+model_scoreboard = ModelScoreboard(
+    failure_threshold=int(_env_number("MODEL_BREAKER_FAILURES", 3)),
+    base_cooldown=_env_number("MODEL_BREAKER_COOLDOWN", 30.0),
+)
@@ -5,12 +5,14 @@ Provides comprehensive health monitoring, logging, and metrics collection.
 import asyncio
 import os
 import time
-import hashlib
+import math
+import re
 from datetime import datetime, timedelta, timezone
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple, Union
 from dataclasses import dataclass, field
 from collections import deque
 from enum import Enum
+from functools import partial
 import logging
 
 # Optional psutil import - graceful fallback if not available
@@ -22,7 +24,26 @@ except ImportError:
     psutil = None  # type: ignore
     PSUTIL_AVAILABLE = False
 
-import httpx
+from api.http_clients import get_http_client
+from api.cache import cache_stats
+from api.event_store import EventStore
+from api.metrics_share import (
+    ENDPOINT_FIELDS,
+    MetricsSharer,
+    ai_totals,
+    build_metrics_sharer,
+    endpoint_totals,
+)
+from api.latency_sketch import WindowedLatency
+from api.probe_scheduler import STALE_INTERVALS, ProbeScheduler
+from api.rate_buckets import (
+    ERRORS,
+    RATE_LIMITED,
+    REQUESTS,
+    UPSTREAM_FAILURES,
+    RateCounters,
+)
+from api.single_flight import single_flight_stats
 
 # Configure logging for 2026-era monitoring
 logging.basicConfig(level=logging.INFO)
@@ -67,7 +88,7 @@ class HealthCheckResult:
 
 @dataclass
 class SystemEvent:
-    id: str
+    id: int
     timestamp: str
     type: EventType
     message: str
@@ -102,6 +123,9 @@ class EndpointMetrics:
     last_status_code: int = 200
     last_checked: Optional[str] = None
     error_rate: float = 0.0
+    rate_limited_requests: int = 0
+    # Requests per status class, indexed by status // 100 (1xx..5xx)
+    status_classes: List[int] = field(default_factory=lambda: [0] * 6)
 
     def to_dict(self):
         return {
@@ -116,9 +140,77 @@ class EndpointMetrics:
             "last_status_code": self.last_status_code,
             "last_checked": self.last_checked,
             "error_rate": round(self.error_rate, 2),
+            "rate_limited_requests": self.rate_limited_requests,
         }
 
 
+REQUEST_BUFFER_SIZE = 8192
+# Endpoints beyond this many (e.g. scanner paths) only feed the overall latency
+# histogram and rate counters.
+MAX_TRACKED_ENDPOINTS = 128
+# requests_per_second is averaged over this many trailing seconds
+RPS_WINDOW_SECONDS = 10
+# Background probe intervals (seconds), matching the lazy cache TTLs they replace
+HEALTH_PROBE_INTERVAL = 60.0
+SERVICE_PROBE_INTERVAL = 120.0
+SURFACE_PROBE_INTERVAL = 120.0
+CATALOG_PROBE_INTERVAL = 60.0
+# Fold samples in inline once this many are queued, so a process whose
+# aggregator task never started (no lifespan) still keeps up.
+REQUEST_FLUSH_THRESHOLD = 512
+SLOW_REQUEST_MS = 5000
+
+_SUSPICIOUS_PATH_RE = re.compile(
+    "|".join(
+        re.escape(keyword)
+        for keyword in (
+            ".env", "wp-admin", "etc/passwd", "select ", "union ", "inject",
+            "../", "bootstrap", "credentials", "config", "secrets", ".git",
+        )
+    )
+)
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, "") or default)
+    except ValueError:
+        return default
+
+
+def _timed_out_probe(label: str, timeout: float):
+    def fallback() -> Dict[str, Any]:
+        return {
+            "name": label,
+            "status": HealthStatus.UNHEALTHY.value,
+            "message": f"Probe timed out after {timeout:g}s.",
+            "metric_value": "TIMEOUT",
+            "metric_label": "no response",
+        }
+
+    return fallback
+
+
+def _iso_z(ts: float) -> str:
+    return datetime.fromtimestamp(ts, timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+def _request_identity(raw_headers: List[Tuple[bytes, bytes]], client: Optional[Tuple[str, int]]) -> Tuple[str, str]:
+    """User agent and client IP from ASGI scope headers (same trust model as rate limiting)."""
+    from starlette.requests import Request
+
+    from api.config import get_client_ip
+
+    request = Request({"type": "http", "headers": raw_headers, "client": client})
+    return request.headers.get("user-agent", "unknown"), get_client_ip(request)
+
+
+def _percentile(ordered: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted, non-empty list."""
+    index = min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
 class SystemMonitor:
     _instance = None
     _lock = asyncio.Lock()
@@ -151,7 +243,7 @@ class SystemMonitor:
         self.response_times = deque(maxlen=1000)
         self.error_counts = {}
         self.endpoint_metrics = {}
-        self.events = deque(maxlen=500)
+        self.events: EventStore[SystemEvent] = EventStore(maxlen=500)
 
         # System monitoring
         self.start_time = time.time()
@@ -169,6 +261,8 @@ class SystemMonitor:
             "active_connections": 0,
             "requests_per_second": 0,
             "error_rate_per_minute": 0,
+            "rate_limited_per_minute": 0,
+            "upstream_failures_per_minute": 0,
             "memory_trend": deque(maxlen=60),  # 1 hour of minute-by-minute data
             "cpu_trend": deque(maxlen=60),
             "response_time_trend": deque(maxlen=60),
@@ -191,8 +285,25 @@ class SystemMonitor:
 
         self._last_trend_update = time.time()
 
+        # Rolling 1m/5m/1h latency histograms, per endpoint and overall
+        self.latency_by_endpoint: Dict[str, WindowedLatency] = {}
+        self.latency_all = WindowedLatency()
+
+        # Circular per-second / per-minute request, error, 429 and upstream counters
+        self.rates_by_endpoint: Dict[str, RateCounters] = {}
+        self.rates_all = RateCounters()
+
+        # Request samples queued by the middleware; see record_request / flush_requests
+        self._request_buffer: deque = deque(maxlen=REQUEST_BUFFER_SIZE)
+        self._aggregator_task: Optional[asyncio.Task] = None
+        self.dropped_request_samples = 0
+        # Cross-worker counter sharing (MONITOR_SHARED_METRICS); see api/metrics_share.py
+        self.metrics_sharer: Optional[MetricsSharer] = None
+        # Background health/service/surface/catalog probes (MONITOR_PROBE_SCHEDULER)
+        self.probe_scheduler: Optional[ProbeScheduler] = None
+
         # Security monitoring (2026-era feature)
-        self.security_events = deque(maxlen=200)
+        self.security_events: EventStore[Dict[str, Any]] = EventStore(maxlen=200)
         self.suspicious_ips = set()
         self.rate_limits = {}
 
@@ -203,7 +314,10 @@ class SystemMonitor:
             "ai_response_times": deque(maxlen=100),
             "model_usage": {},
             "token_usage": {"input": 0, "output": 0},
+            "response_cache": {"hits": 0, "misses": 0, "stores": 0},
+            "hedging": {"streams": 0, "hedges_launched": 0, "hedge_wins": 0},
         }
+        self.model_ttft: Dict[str, deque] = {}
 
         # Web vitals monitoring (2026-era)
         self.web_vitals = {
@@ -253,17 +367,16 @@ class SystemMonitor:
         source: str = "system",
     ):
         """Log an event with timestamp and metadata"""
+        ts = time.time()
         event = SystemEvent(
-            id=hashlib.md5(
-                f"{datetime.now(timezone.utc).isoformat()}-{message}".encode()
-            ).hexdigest()[:8],
-            timestamp=datetime.now(timezone.utc).isoformat(),
+            id=0,
+            timestamp=datetime.fromtimestamp(ts, timezone.utc).isoformat(),
             type=event_type,
             message=message,
             source=source,
             details=metadata or {},
         )
-        self.events.append(event)
+        event.id = self.events.add(event, ts=ts, kind=event_type.value, source=source)
 
         # Log to system logger based on severity
         if event_type == EventType.CRITICAL:
@@ -283,102 +396,287 @@ class SystemMonitor:
         response_time_ms: float,
         user_agent: str = "",
         client_ip: str = "",
+        *,
+        raw_headers: Optional[List[Tuple[bytes, bytes]]] = None,
+        client: Optional[Tuple[str, int]] = None,
+        raised: bool = False,
     ):
-        """Record a request for metrics tracking"""
-        self.total_requests += 1
-
-        endpoint = f"{method}:{path}"
-        if endpoint not in self.endpoint_metrics:
-            self.endpoint_metrics[endpoint] = EndpointMetrics(path=path, method=method)
-
-        metrics = self.endpoint_metrics[endpoint]
-        metrics.total_requests += 1
-        metrics.last_status_code = status_code
-        metrics.last_checked = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
-        metrics.avg_response_time_ms = (
-            (metrics.avg_response_time_ms * (metrics.total_requests - 1)) + response_time_ms
-        ) / max(metrics.total_requests, 1)
-
-        if 200 <= status_code < 400:
-            metrics.successful_requests += 1
-        else:
-            metrics.failed_requests += 1
-            if status_code >= 500:
-                metrics.server_error_requests += 1
-            elif status_code >= 400:
-                metrics.client_error_requests += 1
-            self.error_count += 1
-            self.error_counts[endpoint] = self.error_counts.get(endpoint, 0) + 1
-
-        metrics.error_rate = (
-            (metrics.failed_requests / max(metrics.total_requests, 1)) * 100
+        """Queue a request for metrics tracking.
+
+        Only a compact tuple is appended here (``deque.append`` is atomic, so
+        no lock); endpoint metrics, trends, security scanning and slow/5xx
+        events are folded in by ``flush_requests`` from the background
+        aggregator or before any reader. ``raw_headers`` / ``client`` come
+        straight from the ASGI scope and are only decoded for requests the
+        security scan flags.
+        """
+        buffer = self._request_buffer
+        if len(buffer) >= REQUEST_BUFFER_SIZE:
+            self.dropped_request_samples += 1
+        buffer.append(
+            (time.time(), method, path, status_code, response_time_ms, user_agent, client_ip, raw_headers, client, raised)
         )
-
-        self.request_counts[endpoint] = self.request_counts.get(endpoint, 0) + 1
-        self.response_times.append(response_time_ms)
-        self.real_time_metrics["requests_per_second"] = self._calculate_rps()
-
-        # Update rolling response time trend
-        self.real_time_metrics["response_time_trend"].append({
-            "timestamp": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
-            "value": response_time_ms,
-            "path": path
-        })
+        if len(buffer) >= REQUEST_FLUSH_THRESHOLD:
+            self.flush_requests()
+
+    def flush_requests(self) -> int:
+        """Aggregate every queued request sample; returns how many were applied."""
+        buffer = self._request_buffer
+        applied = 0
+        touched: Dict[str, float] = {}
+        trend = self.real_time_metrics["response_time_trend"]
+        while True:
+            try:
+                sample = buffer.popleft()
+            except IndexError:
+                break
+            applied += 1
+            ts, method, path, status_code, response_time_ms, user_agent, client_ip, raw_headers, client, raised = sample
+            self.total_requests += 1
+
+            endpoint = f"{method}:{path}"
+            metrics = self.endpoint_metrics.get(endpoint)
+            if metrics is None:
+                metrics = self.endpoint_metrics[endpoint] = EndpointMetrics(path=path, method=method)
+            metrics.total_requests += 1
+            metrics.last_status_code = status_code
+            touched[endpoint] = ts
+            metrics.avg_response_time_ms += (response_time_ms - metrics.avg_response_time_ms) / metrics.total_requests
+            metrics.status_classes[min(max(status_code // 100, 0), 5)] += 1
+
+            if 200 <= status_code < 400:
+                metrics.successful_requests += 1
+            else:
+                metrics.failed_requests += 1
+                if status_code >= 500:
+                    metrics.server_error_requests += 1
+                elif status_code >= 400:
+                    metrics.client_error_requests += 1
+                    if status_code == 429:
+                        metrics.rate_limited_requests += 1
+                self.error_count += 1
+                self.error_counts[endpoint] = self.error_counts.get(endpoint, 0) + 1
+            metrics.error_rate = (metrics.failed_requests / metrics.total_requests) * 100
+
+            self.request_counts[endpoint] = self.request_counts.get(endpoint, 0) + 1
+            self.response_times.append(response_time_ms)
+            sketch = self.latency_by_endpoint.get(endpoint)
+            if sketch is None and len(self.latency_by_endpoint) < MAX_TRACKED_ENDPOINTS:
+                sketch = self.latency_by_endpoint[endpoint] = WindowedLatency()
+            if sketch is not None:
+                sketch.record(ts, response_time_ms)
+            self.latency_all.record(ts, response_time_ms)
+            counters = self._endpoint_rates(endpoint)
+            if counters is not None:
+                counters.record_response(ts, status_code)
+            self.rates_all.record_response(ts, status_code)
+            trend.append({"timestamp": _iso_z(ts), "value": response_time_ms, "path": path})
+
+            self._scan_request(ts, method, path, status_code, user_agent, client_ip, raw_headers, client)
+            if not raised:
+                self._log_request_outcome(method, path, status_code, response_time_ms)
+
+        if not applied:
+            return 0
+        for endpoint, ts in touched.items():
+            self.endpoint_metrics[endpoint].last_checked = _iso_z(ts)
+        now_time = time.time()
+        self._update_rates(now_time)
 
         # Throttle real-time trend updates to once every 5 seconds
-        now_time = time.time()
         if now_time - getattr(self, "_last_trend_update", 0) > 5:
             self.update_resource_trends()
             self._last_trend_update = now_time
+        return applied
 
-        # Security threat scan
-        is_suspicious = False
-        threat_type = None
-        severity = "low"
-        
-        lower_path = path.lower()
-        suspicious_keywords = [
-            ".env", "wp-admin", "etc/passwd", "select ", "union ", "inject", 
-            "../", "bootstrap", "credentials", "config", "secrets", ".git"
-        ]
-        
-        if any(keyword in lower_path for keyword in suspicious_keywords):
-            is_suspicious = True
+    def _scan_request(self, ts, method, path, status_code, user_agent, client_ip, raw_headers, client):
+        """Security threat scan for one request sample."""
+        if _SUSPICIOUS_PATH_RE.search(path.lower()):
             threat_type = "Scanning / Threat Intrusion"
             severity = "high"
-            if client_ip and client_ip != "unknown":
-                self.suspicious_ips.add(client_ip)
-                
         elif status_code == 429:
-            is_suspicious = True
             threat_type = "Rate Limit Exceeded"
             severity = "medium"
-            
         elif status_code in {401, 403}:
-            is_suspicious = True
             threat_type = f"Forbidden Request ({status_code})"
             severity = "medium"
+        else:
+            return
 
-        if is_suspicious:
-            sec_event = {
-                "timestamp": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
-                "ip": client_ip or "unknown",
-                "event": threat_type,
-                "path": path,
-                "method": method,
-                "severity": severity,
-                "user_agent": user_agent or "unknown"
-            }
-            self.security_events.append(sec_event)
-            
-            # Log as warning/critical event — keep raw IP only in structured details
-            log_msg = f"Security threat [{threat_type}]: {method} {path}"
+        if raw_headers is not None:
+            user_agent, client_ip = _request_identity(raw_headers, client)
+        if severity == "high" and client_ip and client_ip != "unknown":
+            self.suspicious_ips.add(client_ip)
+
+        sec_event = {
+            "timestamp": _iso_z(ts),
+            "ip": client_ip or "unknown",
+            "event": threat_type,
+            "path": path,
+            "method": method,
+            "severity": severity,
+            "user_agent": user_agent or "unknown"
+        }
+        self.security_events.add(sec_event, ts=ts, kind=severity, source=threat_type)
+
+        # Log as warning/critical event — keep raw IP only in structured details
+        log_msg = f"Security threat [{threat_type}]: {method} {path}"
+        self.log_event(
+            log_msg,
+            EventType.CRITICAL if severity == "high" else EventType.WARNING,
+            sec_event,
+            "security_monitor"
+        )
+
+    def _log_request_outcome(self, method, path, status_code, response_time_ms):
+        """Slow-request and API 5xx events (previously logged inline by the middleware)."""
+        if response_time_ms > SLOW_REQUEST_MS:
+            self.log_event(
+                f"Slow request: {method} {path} took {response_time_ms:.0f}ms",
+                EventType.WARNING,
+                {"response_time_ms": response_time_ms, "path": path},
+                "performance",
+            )
+        if status_code >= 500 and path.startswith("/api"):
             self.log_event(
-                log_msg,
-                EventType.CRITICAL if severity == "high" else EventType.WARNING,
-                sec_event,
-                "security_monitor"
+                f"Server error {status_code}: {method} {path}",
+                EventType.ERROR,
+                {"status_code": status_code, "path": path},
+                "api_error",
+            )
+
+    async def _aggregate_requests_forever(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                self.flush_requests()
+            except Exception as exc:  # keep aggregating; one bad sample must not stop metrics
+                logger.warning(f"Request metrics aggregation failed: {exc}")
+
+    def start_request_aggregator(self, interval: Optional[float] = None) -> None:
+        """Start the periodic aggregation task on the running loop (idempotent).
+
+        Also starts cross-worker counter sharing when ``MONITOR_SHARED_METRICS``
+        selects a backend.
+        """
+        task = self._aggregator_task
+        if task is not None and not task.done():
+            return
+        if interval is None:
+            interval = _env_float("MONITOR_AGGREGATE_INTERVAL", 1.0)
+        self._aggregator_task = asyncio.get_running_loop().create_task(self._aggregate_requests_forever(interval))
+        if self.metrics_sharer is None:
+            self.metrics_sharer = build_metrics_sharer(self)
+        if self.metrics_sharer is not None:
+            self.metrics_sharer.start()
+
+    async def stop_request_aggregator(self) -> None:
+        task, self._aggregator_task = self._aggregator_task, None
+        if task is not None and not task.done():
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        self.flush_requests()
+        if self.metrics_sharer is not None:
+            await self.metrics_sharer.stop()
+
+    def start_probe_scheduler(self) -> None:
+        """Run the outbound probes in the background so monitor reads never wait on them (idempotent)."""
+        if (os.getenv("MONITOR_PROBE_SCHEDULER") or "on").strip().lower() in {"off", "0", "false", "no"}:
+            return
+        if self.probe_scheduler is None:
+            self.probe_scheduler = self._build_probe_scheduler()
+        self.probe_scheduler.start()
+
+    async def stop_probe_scheduler(self) -> None:
+        if self.probe_scheduler is not None:
+            await self.probe_scheduler.stop()
+
+    def _build_probe_scheduler(self) -> ProbeScheduler:
+        from api.platform_health import probe_portfolio_catalog
+
+        scheduler = ProbeScheduler(concurrency=int(_env_float("MONITOR_PROBE_CONCURRENCY", 4)))
+        timeout = _env_float("MONITOR_PROBE_TIMEOUT", 8.0)
+        scheduler.add(
+            "health",
+            self._fetch_health_data,
+            interval=HEALTH_PROBE_INTERVAL,
+            timeout=timeout,
+            on_result=self._publish_health,
+        )
+        for key, label, probe in self._service_probes():
+            scheduler.add(
+                f"service:{key}",
+                probe,
+                interval=SERVICE_PROBE_INTERVAL,
+                timeout=timeout,
+                on_timeout=_timed_out_probe(label, timeout),
+                on_result=self._publish_services,
             )
+        for key, label, probe in self._surface_probes():
+            scheduler.add(
+                f"surface:{key}",
+                probe,
+                interval=SURFACE_PROBE_INTERVAL,
+                timeout=timeout,
+                on_timeout=_timed_out_probe(label, timeout),
+                on_result=self._publish_surfaces,
+            )
+        scheduler.add("portfolio_catalog", probe_portfolio_catalog, interval=CATALOG_PROBE_INTERVAL, timeout=timeout)
+        return scheduler
+
+    def _scheduled_results(self, prefix: str, probes: List[Tuple[str, str, Any]]) -> Optional[List[Dict[str, Any]]]:
+        """Latest scheduled result for each probe, or ``None`` until all of them have run."""
+        results = [self.probe_scheduler.result(f"{prefix}:{key}", fresh=False) for key, _, _ in probes]
+        return None if any(result is None for result in results) else results
+
+    def _publish_health(self, _name: str, result: Dict[str, Any]) -> None:
+        self._health_cache = result
+        self._health_cache_expires_at = time.time() + HEALTH_PROBE_INTERVAL * STALE_INTERVALS
+
+    def _publish_services(self, _name: str, _result: Dict[str, Any]) -> None:
+        services = self._scheduled_results("service", self._service_probes())
+        if services is None:
+            return
+        self._services_cache = {
+            "timestamp": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+            "summary": self._build_status_summary(services),
+            "services": services,
+        }
+        self._services_cache_expires_at = time.time() + SERVICE_PROBE_INTERVAL * STALE_INTERVALS
+
+    def _publish_surfaces(self, _name: str, _result: Dict[str, Any]) -> None:
+        surfaces = self._scheduled_results("surface", self._surface_probes())
+        if surfaces is None:
+            return
+        self._hosting_cache = {
+            "timestamp": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+            "summary": self._build_status_summary(surfaces),
+            "runtime": self.get_runtime_environment(),
+            "surfaces": surfaces,
+        }
+        self._hosting_cache_expires_at = time.time() + SURFACE_PROBE_INTERVAL * STALE_INTERVALS
+
+    def probe_status(self, history: int = 10) -> Dict[str, Any]:
+        if self.probe_scheduler is None:
+            return {"running": False, "concurrency": 0, "probes": {}}
+        return self.probe_scheduler.status(history)
+
+    def shared_totals(self) -> Optional[Dict[str, int]]:
+        """Counters merged across workers, or ``None`` when sharing is off or not yet synced."""
+        if self.metrics_sharer is None:
+            return None
+        return self.metrics_sharer.merged()
+
+    def latency_percentiles(self) -> Dict[str, Any]:
+        """p50/p95/p99 over the rolling 1m/5m/1h windows, overall and per endpoint"""
+        self.flush_requests()
+        now = time.time()
+        endpoints = {}
+        for endpoint, sketch in self.latency_by_endpoint.items():
+            summary = sketch.summary(now)
+            if summary["1h"]["count"]:
+                endpoints[endpoint] = summary
+        return {"all": self.latency_all.summary(now), "endpoints": endpoints}
 
     def update_resource_trends(self):
         """Update CPU, Memory, and connection metrics trends"""
@@ -400,13 +698,41 @@ class SystemMonitor:
         self.real_time_metrics["cpu_trend"].append({"timestamp": timestamp, "value": cpu_val})
         self.real_time_metrics["memory_trend"].append({"timestamp": timestamp, "value": mem_val})
 
-    def _calculate_rps(self) -> float:
-        """Calculate requests per second from recent activity"""
-        # Simple RPS calculation based on total requests and uptime
-        uptime_hours = (time.time() - self.start_time) / 3600
-        if uptime_hours > 0:
-            return self.total_requests / (uptime_hours * 3600)
-        return 0.0
+    def _endpoint_rates(self, endpoint: str) -> Optional[RateCounters]:
+        counters = self.rates_by_endpoint.get(endpoint)
+        if counters is None and len(self.rates_by_endpoint) < MAX_TRACKED_ENDPOINTS:
+            counters = self.rates_by_endpoint[endpoint] = RateCounters()
+        return counters
+
+    def _update_rates(self, now: float) -> None:
+        rates = self.rates_all
+        self.real_time_metrics["requests_per_second"] = round(
+            rates.per_second(REQUESTS, now, RPS_WINDOW_SECONDS), 3
+        )
+        self.real_time_metrics["error_rate_per_minute"] = rates.per_minute(ERRORS, now)
+        self.real_time_metrics["rate_limited_per_minute"] = rates.per_minute(RATE_LIMITED, now)
+        self.real_time_metrics["upstream_failures_per_minute"] = rates.per_minute(UPSTREAM_FAILURES, now)
+
+    def refresh_rates(self) -> None:
+        """Bring requests_per_second / error_rate_per_minute up to date (they decay when idle)."""
+        self.flush_requests()
+        self._update_rates(time.time())
+
+    def record_upstream_failure(self, endpoint: str) -> None:
+        """Count an upstream failure an endpoint recovered from (e.g. chat's local fallback)."""
+        now = time.time()
+        counters = self._endpoint_rates(endpoint)
+        if counters is not None:
+            counters.add(now, UPSTREAM_FAILURES)
+        self.rates_all.add(now, UPSTREAM_FAILURES)
+
+    def rate_series(self, resolution: str = "second", endpoint: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Columnar counts per time bucket; ``None`` for an endpoint with no counters."""
+        self.flush_requests()
+        counters = self.rates_all if endpoint is None else self.rates_by_endpoint.get(endpoint)
+        if counters is None:
+            return None
+        return {"endpoint": endpoint, "resolution": resolution, **counters.series(resolution, time.time())}
 
     def record_poster_request(self, success: bool):
         """Record poster API request for analytics"""
@@ -415,6 +741,46 @@ class SystemMonitor:
         else:
             self.poster_requests["failure"] += 1
 
+    def record_ai_usage(self, model: str, input_tokens: int = 0, output_tokens: int = 0):
+        """Count one successful OpenRouter completion and its token usage."""
+        ai = self.ai_metrics
+        ai["openrouter_requests"] += 1
+        ai["model_usage"][model] = ai["model_usage"].get(model, 0) + 1
+        ai["token_usage"]["input"] += input_tokens
+        ai["token_usage"]["output"] += output_tokens
+
+    def record_response_cache(self, outcome: str):
+        """Record a chat response cache hit, miss or store"""
+        counters = self.ai_metrics["response_cache"]
+        counters[outcome] = counters.get(outcome, 0) + 1
+
+    def record_model_ttft(self, model: str, seconds: float):
+        """Record time-to-first-token for one streamed model response"""
+        samples = self.model_ttft.get(model)
+        if samples is None:
+            samples = self.model_ttft[model] = deque(maxlen=200)
+        samples.append(seconds * 1000)
+
+    def record_hedge(self, outcome: str):
+        """Record a hedged chat stream outcome (streams, hedges_launched, hedge_wins)"""
+        counters = self.ai_metrics["hedging"]
+        counters[outcome] = counters.get(outcome, 0) + 1
+
+    def model_ttft_percentiles(self) -> Dict[str, Dict[str, Any]]:
+        """TTFT p50/p90/p99 per model over the most recent samples"""
+        summary = {}
+        for model, samples in self.model_ttft.items():
+            ordered = sorted(samples)
+            if not ordered:
+                continue
+            summary[model] = {
+                "samples": len(ordered),
+                "p50_ms": round(_percentile(ordered, 50), 1),
+                "p90_ms": round(_percentile(ordered, 90), 1),
+                "p99_ms": round(_percentile(ordered, 99), 1),
+            }
+        return summary
+
     def load_deployment_info(self):
         """Load deployment information from environment and track changes"""
         try:
@@ -601,13 +967,13 @@ class SystemMonitor:
             if not api_key:
                 return False
 
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    "https://openrouter.ai/api/v1/models",
-                    headers={"Authorization": f"Bearer {api_key}"},
-                    timeout=5.0,
-                )
-                return response.status_code == 200
+            client = get_http_client("openrouter")
+            response = await client.get(
+                "https://openrouter.ai/api/v1/models",
+                headers={"Authorization": f"Bearer {api_key}"},
+                timeout=5.0,
+            )
+            return response.status_code == 200
         except Exception as e:
             self.log_event(
                 f"OpenRouter check failed: {str(e)}",
@@ -711,22 +1077,22 @@ class SystemMonitor:
             if access_token:
                 headers["Authorization"] = f"Bearer {access_token}"
 
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
+            client = get_http_client("github")
+            response = await client.get(
+                "https://api.github.com/rate_limit",
+                headers=headers,
+                timeout=5.0,
+            )
+            if response.status_code == 200:
+                return True
+
+            if response.status_code in {401, 403, 429}:
+                unauth_response = await client.get(
                     "https://api.github.com/rate_limit",
-                    headers=headers,
                     timeout=5.0,
                 )
-                if response.status_code == 200:
-                    return True
-                
-                if response.status_code in {401, 403, 429}:
-                    unauth_response = await client.get(
-                        "https://api.github.com/rate_limit",
-                        timeout=5.0,
-                    )
-                    return unauth_response.status_code == 200
-                return False
+                return unauth_response.status_code == 200
+            return False
         except Exception:
             return False
 
@@ -848,7 +1214,8 @@ class SystemMonitor:
                 "checks": [],
             }
 
-    async def _fetch_external_services_status(self) -> Dict[str, Any]:
+    def _service_probes(self) -> List[Tuple[str, str, Any]]:
+        """``(key, label, probe)`` for every external service check."""
         from api.probes import (
             probe_openrouter_service,
             probe_github_service,
@@ -860,16 +1227,19 @@ class SystemMonitor:
             probe_analytics_reach,
         )
 
-        services = await asyncio.gather(
-            probe_openrouter_service(self),
-            probe_github_service(self),
-            probe_vercel_platform_service(self),
-            probe_lastfm_service(self),
-            probe_music_api_service(self),
-            probe_analytics_service(self),
-            probe_posters_service(self),
-            probe_analytics_reach(self),
-        )
+        return [
+            ("openrouter", "OpenRouter AI", partial(probe_openrouter_service, self)),
+            ("github", "GitHub API", partial(probe_github_service, self)),
+            ("vercel", "Vercel Platform Status", partial(probe_vercel_platform_service, self)),
+            ("lastfm", "Last.fm API", partial(probe_lastfm_service, self)),
+            ("music", "Portfolio Music API", partial(probe_music_api_service, self)),
+            ("analytics", "Portfolio Analytics", partial(probe_analytics_service, self)),
+            ("posters", "Media Poster API", partial(probe_posters_service, self)),
+            ("reach", "Portfolio Reach API", partial(probe_analytics_reach, self)),
+        ]
+
+    async def _fetch_external_services_status(self) -> Dict[str, Any]:
+        services = await asyncio.gather(*(probe() for _, _, probe in self._service_probes()))
 
         return {
             "timestamp": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
@@ -911,26 +1281,34 @@ class SystemMonitor:
                 "services": [],
             }
 
-    async def _fetch_hosting_surfaces_status(self) -> Dict[str, Any]:
+    def _surface_probes(self) -> List[Tuple[str, str, Any]]:
+        """``(key, label, probe)`` for every public hosting surface check."""
         from api.probes import (
             probe_monitor_surface,
             probe_github_pages_surface,
         )
 
         public_origins = self.get_public_origins()
-        surfaces = await asyncio.gather(
-            probe_monitor_surface(
-                self,
+        return [
+            (
+                "custom_domain",
                 "Custom Domain",
-                public_origins["custom_domain"],
+                partial(probe_monitor_surface, self, "Custom Domain", public_origins["custom_domain"]),
             ),
-            probe_monitor_surface(
-                self,
+            (
+                "vercel_deployment",
                 "Vercel Deployment",
-                public_origins["vercel_deployment"],
+                partial(probe_monitor_surface, self, "Vercel Deployment", public_origins["vercel_deployment"]),
             ),
-            probe_github_pages_surface(self, public_origins["github_pages"]),
-        )
+            (
+                "github_pages",
+                "GitHub Pages",
+                partial(probe_github_pages_surface, self, public_origins["github_pages"]),
+            ),
+        ]
+
+    async def _fetch_hosting_surfaces_status(self) -> Dict[str, Any]:
+        surfaces = await asyncio.gather(*(probe() for _, _, probe in self._surface_probes()))
 
         return {
             "timestamp": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
@@ -976,10 +1354,23 @@ class SystemMonitor:
 
     def get_metrics(self) -> Dict[str, Any]:
         """Get comprehensive system metrics."""
-        uptime_seconds = round(time.time() - self.start_time, 2)
-        endpoints = [metric.to_dict() for metric in self.endpoint_metrics.values()]
-        resolved_events = len([event for event in self.events if event.resolved])
-        unresolved_events = len([event for event in self.events if not event.resolved])
+        self.flush_requests()
+        now = time.time()
+        uptime_seconds = round(now - self.start_time, 2)
+        endpoints = []
+        for endpoint, metric in self.endpoint_metrics.items():
+            entry = metric.to_dict()
+            sketch = self.latency_by_endpoint.get(endpoint)
+            if sketch is not None:
+                entry["latency_ms"] = sketch.summary(now)
+            endpoints.append(entry)
+        total_requests, error_count = self.total_requests, self.error_count
+        shared = self.shared_totals()
+        if shared is not None:
+            endpoints = _merge_shared_endpoints(endpoints, shared)
+            total_requests, error_count = shared.get("requests", 0), shared.get("errors", 0)
+        events = self.events
+        critical_events = events.count(EventType.CRITICAL.value, resolved=False)
 
         healthy_count = sum(1 for ep in endpoints if ep.get("error_rate", 0.0) == 0.0)
         degraded_count = sum(1 for ep in endpoints if 0.0 < ep.get("error_rate", 0.0) < 5.0)
@@ -996,78 +1387,134 @@ class SystemMonitor:
             "timestamp": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
             "uptime_seconds": uptime_seconds,
             "uptime_human": self.format_uptime(uptime_seconds),
-            "total_requests": self.total_requests,
-            "error_count": self.error_count,
+            "total_requests": total_requests,
+            "error_count": error_count,
             "error_rate": round(
-                (self.error_count / max(self.total_requests, 1)) * 100, 2
+                (error_count / max(total_requests, 1)) * 100, 2
             ),
+            "aggregation": self._aggregation_info(shared is not None),
+            "latency_ms": self.latency_all.summary(now),
             "endpoints": endpoints,
             "summary": {
                 "monitored_endpoints": len(endpoints),
-                "resolved_events": resolved_events,
-                "unresolved_events": unresolved_events,
-                "critical_events": len(
-                    [
-                        e
-                        for e in self.events
-                        if e.type == EventType.CRITICAL and not e.resolved
-                    ]
-                ),
+                "resolved_events": events.count(resolved=True),
+                "unresolved_events": events.count(resolved=False),
+                "critical_events": critical_events,
                 **status_counts,
             },
-            "events_24h": len(
-                [e for e in self.events if self._is_recent(e.timestamp, hours=24)]
-            ),
-            "critical_events": len(
-                [
-                    e
-                    for e in self.events
-                    if e.type == EventType.CRITICAL and not e.resolved
-                ]
-            ),
+            "events_24h": events.count_since(now - 86400),
+            "critical_events": critical_events,
+            "single_flight": single_flight_stats(),
+            "caches": cache_stats(),
+        }
+
+    def _aggregation_info(self, shared: bool) -> Dict[str, Any]:
+        sharer = self.metrics_sharer
+        return {
+            "scope": "cluster" if shared else "worker",
+            "backend": sharer.backend.name if sharer else None,
+            "updated_at": _iso_z(sharer.updated_at) if sharer and sharer.updated_at else None,
         }
 
+    def ai_counters(self) -> Dict[str, Any]:
+        """AI request/token/model counters, merged across workers when sharing is on."""
+        ai = self.ai_metrics
+        shared = self.shared_totals()
+        if shared is None:
+            return {
+                "openrouter_requests": ai["openrouter_requests"],
+                "openrouter_errors": ai["openrouter_errors"],
+                "model_usage": dict(ai["model_usage"]),
+                "token_usage": dict(ai["token_usage"]),
+                "response_cache": dict(ai["response_cache"]),
+                "hedging": dict(ai["hedging"]),
+            }
+        return ai_totals(shared)
+
     def get_events(
         self,
         limit: int = 100,
         event_type: Optional[EventType] = None,
         resolved_only: Optional[bool] = None,
+        after: Optional[int] = None,
     ) -> List[Dict]:
-        """Get system events with optional filtering."""
-        events = list(self.events)
+        """Get system events with optional filtering, oldest first."""
+        return self.get_events_page(limit, event_type, resolved_only, after)[0]
 
-        if event_type:
-            events = [e for e in events if e.type == event_type]
-
-        if resolved_only is not None:
-            events = [e for e in events if e.resolved == resolved_only]
+    def get_events_page(
+        self,
+        limit: int = 100,
+        event_type: Optional[EventType] = None,
+        resolved_only: Optional[bool] = None,
+        after: Optional[int] = None,
+    ) -> Tuple[List[Dict], Optional[int]]:
+        """One page of events with ID > ``after`` plus the cursor for the next page."""
+        self.flush_requests()
+        page, next_cursor = self.events.page(
+            limit,
+            after=after,
+            kind=event_type.value if event_type else None,
+            resolved=resolved_only,
+        )
+        return [event.to_dict() for _, event in page], next_cursor
 
-        return [e.to_dict() for e in events[:limit]]
+    def event_counts(self) -> Dict[str, Any]:
+        """Retained-event totals by type, source and resolved state (O(1) to read)."""
+        events = self.events
+        return {
+            "total": len(events),
+            "unresolved": events.count(resolved=False),
+            "last_id": events.last_id,
+            "by_type": {kind.value: events.count(kind.value) for kind in EventType},
+            "by_source": events.counts_by_source(),
+        }
 
-    def resolve_event(self, event_id: str) -> bool:
+    def resolve_event(self, event_id: Union[int, str]) -> bool:
         """Mark an event as resolved."""
-        for event in self.events:
-            if event.id == event_id:
-                event.resolved = True
-                event.resolved_at = (
-                    datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
-                )
-                self.log_event(
-                    f"Event resolved: {event.message}",
-                    EventType.SUCCESS,
-                    {"event_id": event_id},
-                    "event_resolution",
-                )
-                return True
-        return False
-
-    def _is_recent(self, timestamp: str, hours: int = 24) -> bool:
-        """Check if a timestamp is within recent hours."""
         try:
-            event_time = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
-            return datetime.now(event_time.tzinfo) - event_time < timedelta(hours=hours)
-        except Exception:
+            event = self.events.mark_resolved(int(event_id))
+        except ValueError:
+            return False
+        if event is None:
             return False
+        event.resolved = True
+        event.resolved_at = (
+            datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+        )
+        self.log_event(
+            f"Event resolved: {event.message}",
+            EventType.SUCCESS,
+            {"event_id": event.id},
+            "event_resolution",
+        )
+        return True
+
+
+def _merge_shared_endpoints(local: List[Dict[str, Any]], shared: Dict[str, int]) -> List[Dict[str, Any]]:
+    """Endpoint entries with request counts replaced by the cluster totals.
+
+    Worker-local fields (last status, last checked, rolling latency windows)
+    are kept where this worker has seen the endpoint.
+    """
+    by_key = {f"{entry['method']}:{entry['path']}": entry for entry in local}
+    merged = []
+    for endpoint, fields in endpoint_totals(shared).items():
+        method, _, path = endpoint.partition(":")
+        entry = dict(by_key.get(endpoint) or {
+            "path": path,
+            "method": method,
+            "avg_response_time_ms": 0.0,
+            "last_status_code": None,
+            "last_checked": None,
+        })
+        for name in ENDPOINT_FIELDS:
+            entry[name] = fields.get(name, 0)
+        total = entry["total_requests"]
+        if total and "latency_sum_us" in fields:
+            entry["avg_response_time_ms"] = round(fields["latency_sum_us"] / 1000 / total, 2)
+        entry["error_rate"] = round(entry["failed_requests"] / total * 100, 2) if total else 0.0
+        merged.append(entry)
+    return merged
 
 
 # Global monitor instance with error handling for serverless environments
@@ -0,0 +1,189 @@
+"""OpenMetrics text exposition of ``SystemMonitor`` counters.
+
+``iter_openmetrics`` yields the exposition one metric family at a time,
+formatting straight from the live counters (endpoint metrics, latency
+histograms, AI / poster counters, cache objects, background probes) without
+building the JSON metrics document first (the cluster-wide view, when
+enabled, is decoded from the shared totals instead). Latency histograms are exported cumulatively from
+each endpoint's lifetime log-bucket histogram, folded into fixed ``le``
+bounds: a log bucket is counted under the first bound at or above its upper
+edge, so each cumulative count is exact to within one log bucket (~6%).
+"""
+
+from __future__ import annotations
+
+import time
+from array import array
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from api.cache import registered_caches
+from api.latency_sketch import BUCKET_COUNT, bucket_upper
+from api.metrics_share import ai_totals, endpoint_totals, grouped, latency_totals
+from api.monitoring import EventType, SystemMonitor
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+PREFIX = "assistme"
+
+LATENCY_BOUNDS_SECONDS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+_LE_LABELS = tuple(repr(bound) for bound in LATENCY_BOUNDS_SECONDS) + ("+Inf",)
+# log bucket index -> le slot (len(LATENCY_BOUNDS_SECONDS) is +Inf)
+_LE_SLOT = array(
+    "B",
+    (bisect_left(LATENCY_BOUNDS_SECONDS, bucket_upper(index) / 1000) for index in range(BUCKET_COUNT)),
+)
+_STATUS_CLASSES = ("1xx", "2xx", "3xx", "4xx", "5xx")
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _header(name: str, kind: str, help_text: str, unit: str = "") -> List[str]:
+    lines = [f"# TYPE {PREFIX}_{name} {kind}"]
+    if unit:
+        lines.append(f"# UNIT {PREFIX}_{name} {unit}")
+    lines.append(f"# HELP {PREFIX}_{name} {help_text}")
+    return lines
+
+
+def _local_requests(monitor: SystemMonitor) -> Iterator[Tuple[str, str, Sequence[int], int]]:
+    for metrics in list(monitor.endpoint_metrics.values()):
+        yield metrics.method, metrics.path, metrics.status_classes, metrics.rate_limited_requests
+
+
+def _shared_requests(shared: Dict[str, int]) -> Iterator[Tuple[str, str, Sequence[int], int]]:
+    for endpoint, fields in endpoint_totals(shared).items():
+        method, _, path = endpoint.partition(":")
+        classes = [0] + [fields.get(f"c{status_class}", 0) for status_class in range(1, 6)]
+        yield method, path, classes, fields.get("rate_limited_requests", 0)
+
+
+def _local_latency(monitor: SystemMonitor) -> Iterator[Tuple[str, Iterable[Tuple[int, int]], int, float]]:
+    for endpoint, sketch in list(monitor.latency_by_endpoint.items()):
+        yield endpoint, enumerate(sketch.lifetime.counts), sketch.lifetime.total, sketch.sum_ms
+
+
+def _shared_latency(shared: Dict[str, int]) -> Iterator[Tuple[str, Iterable[Tuple[int, int]], int, float]]:
+    sums = {endpoint: fields.get("latency_sum_us", 0) for endpoint, fields in endpoint_totals(shared).items()}
+    for endpoint, buckets in latency_totals(shared).items():
+        yield endpoint, buckets.items(), sum(buckets.values()), sums.get(endpoint, 0) / 1000
+
+
+def _http_families(monitor: SystemMonitor, shared: Optional[Dict[str, int]]) -> Iterator[str]:
+    requests = _header("http_requests", "counter", "HTTP requests by endpoint and status class.")
+    limited = _header("http_rate_limited_requests", "counter", "HTTP 429 responses by endpoint.")
+    rows = _local_requests(monitor) if shared is None else _shared_requests(shared)
+    for method, path, status_classes, rate_limited in rows:
+        labels = f'method="{_escape(method)}",path="{_escape(path)}"'
+        for code_class, count in zip(_STATUS_CLASSES, status_classes[1:]):
+            if count:
+                requests.append(f'{PREFIX}_http_requests_total{{{labels},code="{code_class}"}} {count}')
+        limited.append(f"{PREFIX}_http_rate_limited_requests_total{{{labels}}} {rate_limited}")
+    yield "\n".join(requests) + "\n"
+    yield "\n".join(limited) + "\n"
+
+    lines = _header("http_request_duration_seconds", "histogram", "Time to response start by endpoint.", "seconds")
+    name = f"{PREFIX}_http_request_duration_seconds"
+    slots = [0] * len(_LE_LABELS)
+    histograms = _local_latency(monitor) if shared is None else _shared_latency(shared)
+    for endpoint, buckets, total, sum_ms in histograms:
+        method, _, path = endpoint.partition(":")
+        labels = f'method="{_escape(method)}",path="{_escape(path)}"'
+        for index in range(len(slots)):
+            slots[index] = 0
+        for index, count in buckets:
+            if count:
+                slots[_LE_SLOT[index]] += count
+        cumulative = 0
+        for le, count in zip(_LE_LABELS, slots):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels},le="{le}"}} {cumulative}')
+        lines.append(f"{name}_count{{{labels}}} {total}")
+        lines.append(f"{name}_sum{{{labels}}} {sum_ms / 1000!r}")
+    yield "\n".join(lines) + "\n"
+
+    lines = _header("http_request_samples_dropped", "counter", "Request samples dropped because the queue was full.")
+    lines.append(f"{PREFIX}_http_request_samples_dropped_total {monitor.dropped_request_samples}")
+    yield "\n".join(lines) + "\n"
+
+
+def _ai_families(ai: Dict[str, Any]) -> Iterator[str]:
+    lines = _header("ai_requests", "counter", "Successful OpenRouter completions.")
+    lines.append(f"{PREFIX}_ai_requests_total {ai['openrouter_requests']}")
+    lines += _header("ai_errors", "counter", "Failed OpenRouter completions.")
+    lines.append(f"{PREFIX}_ai_errors_total {ai['openrouter_errors']}")
+    lines += _header("ai_tokens", "counter", "OpenRouter tokens by direction.")
+    for direction, count in ai["token_usage"].items():
+        lines.append(f'{PREFIX}_ai_tokens_total{{direction="{direction}"}} {count}')
+    lines += _header("ai_model_requests", "counter", "Successful OpenRouter completions by model.")
+    for model, count in ai["model_usage"].items():
+        lines.append(f'{PREFIX}_ai_model_requests_total{{model="{_escape(model)}"}} {count}')
+    lines += _header("ai_response_cache", "counter", "Chat response cache outcomes.")
+    for outcome, count in ai["response_cache"].items():
+        lines.append(f'{PREFIX}_ai_response_cache_total{{outcome="{outcome}"}} {count}')
+    lines += _header("ai_hedging", "counter", "Hedged stream outcomes.")
+    for outcome, count in ai["hedging"].items():
+        lines.append(f'{PREFIX}_ai_hedging_total{{outcome="{outcome}"}} {count}')
+    yield "\n".join(lines) + "\n"
+
+
+def _cache_families() -> Iterator[str]:
+    caches = registered_caches()
+    for field in ("hits", "stale_hits", "misses", "evictions", "expirations"):
+        lines = _header(f"cache_{field}", "counter", f"Bounded cache {field.replace('_', ' ')}.")
+        for name, cache in caches:
+            lines.append(f'{PREFIX}_cache_{field}_total{{cache="{_escape(name)}"}} {getattr(cache, field)}')
+        yield "\n".join(lines) + "\n"
+    lines = _header("cache_entries", "gauge", "Entries held per bounded cache.")
+    for name, cache in caches:
+        lines.append(f'{PREFIX}_cache_entries{{cache="{_escape(name)}"}} {len(cache)}')
+    lines += _header("cache_bytes", "gauge", "Approximate bytes held per byte-bounded cache.", "bytes")
+    for name, cache in caches:
+        if cache.max_bytes is not None:
+            lines.append(f'{PREFIX}_cache_bytes{{cache="{_escape(name)}"}} {cache.bytes_used}')
+    yield "\n".join(lines) + "\n"
+
+
+def _monitor_families(monitor: SystemMonitor, shared: Optional[Dict[str, int]]) -> Iterator[str]:
+    lines = _header("poster_requests", "counter", "Poster API lookups by outcome.")
+    posters = monitor.poster_requests.items() if shared is None else grouped(shared, "p|")
+    for outcome, count in posters:
+        lines.append(f'{PREFIX}_poster_requests_total{{outcome="{outcome}"}} {count}')
+    lines += _header("monitor_events", "gauge", "Retained monitor events by type and resolved state.")
+    for kind in EventType:
+        for resolved in (False, True):
+            count = monitor.events.count(kind.value, resolved=resolved)
+            lines.append(f'{PREFIX}_monitor_events{{type="{kind.value}",resolved="{str(resolved).lower()}"}} {count}')
+    probes = monitor.probe_status(history=0)["probes"]
+    lines += _header("probe_duration_seconds", "gauge", "Duration of each background probe's last run.", "seconds")
+    for name, probe in probes.items():
+        if probe["last_duration_ms"] is not None:
+            lines.append(f'{PREFIX}_probe_duration_seconds{{probe="{_escape(name)}"}} {probe["last_duration_ms"] / 1000!r}')
+    lines += _header("probe_age_seconds", "gauge", "Age of each background probe's latest result.", "seconds")
+    for name, probe in probes.items():
+        if probe["age_seconds"] is not None:
+            lines.append(f'{PREFIX}_probe_age_seconds{{probe="{_escape(name)}"}} {probe["age_seconds"]!r}')
+    lines += _header("probe_runs", "counter", "Background probe runs by outcome.")
+    for name, probe in probes.items():
+        ok = probe["runs"] - probe["timeouts"] - probe["errors"]
+        for outcome, count in (("ok", ok), ("timeout", probe["timeouts"]), ("error", probe["errors"])):
+            lines.append(f'{PREFIX}_probe_runs_total{{probe="{_escape(name)}",outcome="{outcome}"}} {count}')
+    lines += _header("uptime_seconds", "gauge", "Seconds since the monitor started.", "seconds")
+    lines.append(f"{PREFIX}_uptime_seconds {round(time.time() - monitor.start_time, 3)}")
+    yield "\n".join(lines) + "\n"
+
+
+def iter_openmetrics(monitor: SystemMonitor) -> Iterator[str]:
+    """Yield the OpenMetrics exposition in per-family chunks, ending with ``# EOF``.
+
+    Request, latency, AI and poster counters are cluster-wide when
+    ``MONITOR_SHARED_METRICS`` is on; cache, event and probe figures are per worker.
+    """
+    monitor.flush_requests()
+    shared = monitor.shared_totals()
+    yield from _http_families(monitor, shared)
+    yield from _ai_families(monitor.ai_metrics if shared is None else ai_totals(shared))
+    yield from _cache_families()
+    yield from _monitor_families(monitor, shared)
+    yield "# EOF\n"
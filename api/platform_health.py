@@ -3,15 +3,20 @@
 import asyncio
 import os
 from datetime import datetime, timezone
-from typing import Any, Dict, List
+from typing import Any, Awaitable, Callable, Dict, List, Tuple, TypeVar
 import httpx
 
+from api.cache import BoundedCache
+from api.http_clients import get_http_client
 from api.integrations import google_calendar
 from api.integrations.supabase_store import (
     fetch_latest_health_summary,
-    integration_is_connected,
+    integration_connection_states,
     supabase_is_configured,
 )
+from api.monitoring import system_monitor
+
+T = TypeVar("T")
 
 # Public portfolio pages + API routes showcased on the System Monitor.
 PORTFOLIO_PAGE_CATALOG: List[Dict[str, str]] = [
@@ -106,9 +111,8 @@ async def probe_portfolio_catalog() -> Dict[str, Any]:
     """Live probe of public portfolio pages and primary API routes."""
     base = _public_base_url()
     catalog = [*PORTFOLIO_PAGE_CATALOG, *PORTFOLIO_API_CATALOG]
-    limits = httpx.Limits(max_connections=20, max_keepalive_connections=10)
-    async with httpx.AsyncClient(limits=limits, timeout=3.0) as client:
-        results = await asyncio.gather(*[_probe_public_path(client, base, item) for item in catalog])
+    client = get_http_client("probes")
+    results = await asyncio.gather(*[_probe_public_path(client, base, item) for item in catalog])
     items = list(results)
     summary = {
         "healthy": len([i for i in items if i["status"] == "healthy"]),
@@ -142,6 +146,30 @@ HEALTH_SUMMARY_REFRESH_MAX_AGE_MINUTES = int(
     os.getenv("HEALTH_SUMMARY_REFRESH_MAX_AGE_MINUTES", "60")
 )
 
+# Deadlines (seconds) for the checks collect_platform_health runs concurrently.
+# A check that misses its deadline is reported as degraded instead of holding
+# up the whole matrix.
+SUPABASE_CHECK_DEADLINE = float(os.getenv("PLATFORM_HEALTH_SUPABASE_DEADLINE", "2.5"))
+PORTFOLIO_CHECK_DEADLINE = float(os.getenv("PLATFORM_HEALTH_PORTFOLIO_DEADLINE", "4"))
+
+# The combined matrix is fresh for 30s, then served stale for up to 5 minutes
+# while one background collection refreshes it.
+PLATFORM_HEALTH_TTL_SECONDS = 30
+PLATFORM_HEALTH_STALE_SECONDS = 300
+_platform_health_cache = BoundedCache(
+    "platform_health",
+    max_entries=1,
+    ttl=PLATFORM_HEALTH_TTL_SECONDS,
+    stale_ttl=PLATFORM_HEALTH_STALE_SECONDS,
+)
+
+# (state key, integration_accounts.provider, label, path)
+INTEGRATION_PROVIDERS = (
+    ("googleCalendar", "google_calendar", "Google Calendar", "/api/calendar/availability"),
+    ("whoop", "whoop", "WHOOP", "/api/health-vitals/summary"),
+    ("withings", "withings", "Withings", "/api/health-vitals/summary"),
+)
+
 
 def _utc_now() -> str:
     return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
@@ -188,7 +216,57 @@ def integration_env_presence() -> Dict[str, bool]:
     return {key.lower(): _env_present(key) for key in INTEGRATION_ENV_KEYS}
 
 
+async def _within(deadline: float, check: Callable[[], Awaitable[T]], fallback: T) -> Tuple[T, bool]:
+    """Run one check under its deadline; returns ``(result, timed_out)``."""
+    try:
+        return await asyncio.wait_for(check(), deadline), False
+    except asyncio.TimeoutError:
+        return fallback, True
+
+
+def _timed_out_portfolio() -> Dict[str, Any]:
+    return {
+        "base_url": _public_base_url(),
+        "timestamp": _utc_now(),
+        "summary": {"healthy": 0, "degraded": 0, "unhealthy": 0, "total": 0},
+        "items": [],
+        "pages": [],
+        "apis": [],
+        "timed_out": True,
+    }
+
+
+async def portfolio_catalog_snapshot() -> Dict[str, Any]:
+    """The background scheduler's latest catalog probe while fresh, else a live probe."""
+    scheduler = system_monitor.probe_scheduler if system_monitor is not None else None
+    scheduled = scheduler.result("portfolio_catalog") if scheduler is not None else None
+    return scheduled if scheduled is not None else await probe_portfolio_catalog()
+
+
+async def platform_health_snapshot() -> Dict[str, Any]:
+    """Cached ``collect_platform_health`` result (stale-while-revalidate)."""
+    return await _platform_health_cache.get_or_load("matrix", collect_platform_health)
+
+
 async def collect_platform_health() -> Dict[str, Any]:
+    """Platform health matrix; the network checks run concurrently under per-check deadlines."""
+    (connected_by_provider, connections_timed_out), (health_summary, summary_timed_out), (
+        portfolio,
+        portfolio_timed_out,
+    ) = await asyncio.gather(
+        _within(
+            SUPABASE_CHECK_DEADLINE,
+            lambda: integration_connection_states([provider for _, provider, _, _ in INTEGRATION_PROVIDERS]),
+            {provider: False for _, provider, _, _ in INTEGRATION_PROVIDERS},
+        ),
+        _within(
+            SUPABASE_CHECK_DEADLINE,
+            fetch_latest_health_summary,
+            {"status": "degraded", "source": "supabase", "data": {}, "message": "Health summary lookup timed out."},
+        ),
+        _within(PORTFOLIO_CHECK_DEADLINE, portfolio_catalog_snapshot, _timed_out_portfolio()),
+    )
+
     checks: List[Dict[str, Any]] = []
 
     checks.append(
@@ -218,21 +296,18 @@ async def collect_platform_health() -> Dict[str, Any]:
         "withings": _env_present("WITHINGS_CLIENT_ID") and _env_present("WITHINGS_CLIENT_SECRET"),
     }
     provider_connected = {
-        "googleCalendar": await integration_is_connected("google_calendar"),
-        "whoop": await integration_is_connected("whoop"),
-        "withings": await integration_is_connected("withings"),
+        key: connected_by_provider.get(provider, False) for key, provider, _, _ in INTEGRATION_PROVIDERS
     }
 
-    for key, label, path in (
-        ("googleCalendar", "Google Calendar", "/api/calendar/availability"),
-        ("whoop", "WHOOP", "/api/health-vitals/summary"),
-        ("withings", "Withings", "/api/health-vitals/summary"),
-    ):
+    for key, _, label, path in INTEGRATION_PROVIDERS:
         configured = provider_configured[key]
         connected = provider_connected[key]
         if not configured:
             status = "unhealthy"
             detail = "OAuth env not configured"
+        elif connections_timed_out:
+            status = "degraded"
+            detail = f"Connection lookup timed out after {SUPABASE_CHECK_DEADLINE:g}s"
         elif not connected:
             status = "degraded"
             detail = "Configured but not connected"
@@ -251,9 +326,8 @@ async def collect_platform_health() -> Dict[str, Any]:
             }
         )
 
-    health_summary = await fetch_latest_health_summary()
     health_status = str(health_summary.get("status") or "unknown")
-    health_stale = _health_summary_stale(health_summary)
+    health_stale = not summary_timed_out and _health_summary_stale(health_summary)
     checks.append(
         {
             "id": "health_vitals_summary",
@@ -264,7 +338,9 @@ async def collect_platform_health() -> Dict[str, Any]:
                 warn=health_status in ("empty", "degraded") or health_stale,
             ),
             "detail": (
-                f"source={health_summary.get('source')} "
+                f"Timed out after {SUPABASE_CHECK_DEADLINE:g}s"
+                if summary_timed_out
+                else f"source={health_summary.get('source')} "
                 f"status={'stale' if health_stale else health_status}"
             ),
         }
@@ -290,7 +366,17 @@ async def collect_platform_health() -> Dict[str, Any]:
         }
     )
 
-    portfolio = await probe_portfolio_catalog()
+    if portfolio_timed_out:
+        checks.append(
+            {
+                "id": "portfolio_catalog",
+                "label": "Portfolio Catalog",
+                "path": "/api/monitor/portfolio-catalog",
+                "status": "degraded",
+                "detail": f"Probes timed out after {PORTFOLIO_CHECK_DEADLINE:g}s",
+                "group": "api",
+            }
+        )
     for item in portfolio.get("items") or []:
         checks.append(
             {
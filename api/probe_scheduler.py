@@ -0,0 +1,190 @@
+"""Background scheduler for the monitor's outbound health probes.
+
+Each registered probe runs in its own task on a jittered interval (±10% so
+workers and probes drift apart instead of firing together), under a
+per-probe timeout, and holds a slot of a shared semaphore while it runs, so
+at most ``concurrency`` probes are in flight at once. The latest result is
+kept per probe and every run is appended to a fixed-size ring of
+``ProbeRun`` records, so readers get the precomputed result in O(1) and the
+scheduler can report durations, timeouts and staleness without re-probing.
+
+A probe that times out or raises still completes a run: its ``on_timeout``
+fallback (when given) becomes the latest result, otherwise the previous
+result is kept and the run is recorded as failed. ``on_result`` hooks let
+the owner publish aggregates (e.g. the monitor's services payload) as soon
+as a probe finishes; an exception from either hook is logged and the
+probe keeps its schedule.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+JITTER = 0.1
+HISTORY_SIZE = 60
+# A result older than this many intervals is reported stale.
+STALE_INTERVALS = 2
+
+
+@dataclass
+class ProbeRun:
+    started_at: float
+    duration_ms: float
+    outcome: str  # ok | timeout | error
+    status: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "started_at": round(self.started_at, 3),
+            "duration_ms": round(self.duration_ms, 1),
+            "outcome": self.outcome,
+            "status": self.status,
+        }
+
+
+@dataclass
+class Probe:
+    name: str
+    run: Callable[[], Awaitable[Any]]
+    interval: float
+    timeout: float
+    on_timeout: Optional[Callable[[], Any]] = None
+    on_result: Optional[Callable[[str, Any], None]] = None
+    result: Any = None
+    completed_at: Optional[float] = None  # wall clock of the last run that produced ``result``
+    runs: int = 0
+    timeouts: int = 0
+    errors: int = 0
+    history: Deque[ProbeRun] = field(default_factory=lambda: deque(maxlen=HISTORY_SIZE))
+
+    def age(self, now: float) -> Optional[float]:
+        return None if self.completed_at is None else max(0.0, now - self.completed_at)
+
+    def is_stale(self, now: float) -> bool:
+        age = self.age(now)
+        return age is None or age > self.interval * STALE_INTERVALS
+
+
+class ProbeScheduler:
+    """Runs registered probes periodically under a shared concurrency budget."""
+
+    def __init__(self, concurrency: int = 4) -> None:
+        self.concurrency = max(1, concurrency)
+        self.probes: Dict[str, Probe] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._budget: Optional[asyncio.Semaphore] = None
+
+    @property
+    def running(self) -> bool:
+        return any(not task.done() for task in self._tasks)
+
+    def add(
+        self,
+        name: str,
+        run: Callable[[], Awaitable[Any]],
+        *,
+        interval: float,
+        timeout: float,
+        on_timeout: Optional[Callable[[], Any]] = None,
+        on_result: Optional[Callable[[str, Any], None]] = None,
+    ) -> None:
+        self.probes[name] = Probe(name, run, interval, timeout, on_timeout, on_result)
+
+    def result(self, name: str, *, fresh: bool = True) -> Any:
+        """Latest result for ``name`` (``None`` if it never ran, or if ``fresh`` and it is stale)."""
+        probe = self.probes.get(name)
+        if probe is None or (fresh and probe.is_stale(time.time())):
+            return None
+        return probe.result
+
+    async def run_once(self, name: str) -> Any:
+        """Run one probe now, under the budget and its timeout, and record the run."""
+        probe = self.probes[name]
+        if self._budget is None:
+            self._budget = asyncio.Semaphore(self.concurrency)
+        async with self._budget:
+            started_at = time.time()
+            started = time.perf_counter()
+            try:
+                result = await asyncio.wait_for(probe.run(), probe.timeout)
+                outcome = "ok"
+            except asyncio.TimeoutError:
+                probe.timeouts += 1
+                result = self._call_hook(name, "on_timeout", probe.on_timeout) if probe.on_timeout else None
+                outcome = "timeout"
+            except Exception as exc:  # one failing probe must not stop the others
+                probe.errors += 1
+                logger.warning("Monitor probe %s failed: %s", name, exc)
+                result = None
+                outcome = "error"
+            duration_ms = (time.perf_counter() - started) * 1000
+        probe.runs += 1
+        status = result.get("status") if isinstance(result, dict) else None
+        probe.history.append(ProbeRun(started_at, duration_ms, outcome, status))
+        if result is not None:
+            probe.result = result
+            probe.completed_at = time.time()
+            if probe.on_result is not None:
+                self._call_hook(name, "on_result", probe.on_result, name, result)
+        return probe.result
+
+    @staticmethod
+    def _call_hook(name: str, hook_name: str, hook: Callable[..., Any], *args: Any) -> Any:
+        """Run an owner hook; a failing hook is logged so it cannot stop the probe's loop."""
+        try:
+            return hook(*args)
+        except Exception:
+            logger.exception("Monitor probe %s %s hook failed", name, hook_name)
+            return None
+
+    async def _run_forever(self, name: str, initial_delay: float) -> None:
+        probe = self.probes[name]
+        await asyncio.sleep(initial_delay)
+        while True:
+            await self.run_once(name)
+            await asyncio.sleep(probe.interval * random.uniform(1 - JITTER, 1 + JITTER))
+
+    def start(self, initial_spread: float = 2.0) -> None:
+        """Start one task per probe (idempotent); first runs are spread over ``initial_spread`` seconds."""
+        if self.running:
+            return
+        loop = asyncio.get_running_loop()
+        self._budget = asyncio.Semaphore(self.concurrency)
+        self._tasks = [
+            loop.create_task(self._run_forever(name, random.uniform(0, initial_spread))) for name in self.probes
+        ]
+
+    async def stop(self) -> None:
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def status(self, history: int = 10) -> Dict[str, Any]:
+        """Per-probe durations, outcomes and staleness, plus the last ``history`` runs."""
+        now = time.time()
+        probes = {}
+        for name, probe in self.probes.items():
+            last = probe.history[-1] if probe.history else None
+            age = probe.age(now)
+            probes[name] = {
+                "interval_seconds": probe.interval,
+                "timeout_seconds": probe.timeout,
+                "runs": probe.runs,
+                "timeouts": probe.timeouts,
+                "errors": probe.errors,
+                "last_outcome": last.outcome if last else None,
+                "last_duration_ms": round(last.duration_ms, 1) if last else None,
+                "age_seconds": round(age, 1) if age is not None else None,
+                "stale": probe.is_stale(now),
+                "history": [run.to_dict() for run in list(probe.history)[-history:]] if history else [],
+            }
+        return {"running": self.running, "concurrency": self.concurrency, "probes": probes}
@@ -9,9 +9,9 @@ import json
 import logging
 from typing import Dict, Any
 from urllib.parse import urlsplit
-import httpx
 
 from api.monitoring import HealthStatus, EventType
+from api.http_clients import get_http_client
 
 logger = logging.getLogger(__name__)
 
@@ -30,12 +30,12 @@ async def probe_openrouter_service(monitor) -> Dict[str, Any]:
 
     start = time.time()
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                "https://openrouter.ai/api/v1/models",
-                headers={"Authorization": f"Bearer {api_key}"},
-                timeout=5.0,
-            )
+        client = get_http_client("openrouter")
+        response = await client.get(
+            "https://openrouter.ai/api/v1/models",
+            headers={"Authorization": f"Bearer {api_key}"},
+            timeout=5.0,
+        )
 
         latency = round((time.time() - start) * 1000)
         if response.status_code == 200:
@@ -85,23 +85,23 @@ async def probe_github_service(monitor) -> Dict[str, Any]:
         if access_token:
             headers["Authorization"] = f"Bearer {access_token}"
 
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                "https://api.github.com/rate_limit",
-                headers=headers,
-                timeout=5.0,
-            )
+        client = get_http_client("github")
+        response = await client.get(
+            "https://api.github.com/rate_limit",
+            headers=headers,
+            timeout=5.0,
+        )
 
         latency = round((time.time() - start) * 1000)
         
         # If credentials failed or we are rate-limited, attempt unauthenticated check to see if API is reachable
         if response.status_code in {401, 403, 429}:
             try:
-                async with httpx.AsyncClient() as client:
-                    unauth_response = await client.get(
-                        "https://api.github.com/rate_limit",
-                        timeout=5.0,
-                    )
+                client = get_http_client("github")
+                unauth_response = await client.get(
+                    "https://api.github.com/rate_limit",
+                    timeout=5.0,
+                )
                 if unauth_response.status_code == 200:
                     payload = unauth_response.json()
                     core = payload.get("resources", {}).get("core", {})
@@ -160,11 +160,11 @@ async def probe_vercel_platform_service(monitor) -> Dict[str, Any]:
     """Check Vercel status page to track general environment reliability."""
     start = time.time()
     try:
-        async with httpx.AsyncClient(follow_redirects=True) as client:
-            response = await client.get(
-                "https://www.vercel-status.com/api/v2/summary.json",
-                timeout=5.0,
-            )
+        client = get_http_client("probes")
+        response = await client.get(
+            "https://www.vercel-status.com/api/v2/summary.json",
+            timeout=5.0,
+        )
 
         latency = round((time.time() - start) * 1000)
         if response.status_code != 200:
@@ -220,18 +220,18 @@ async def probe_lastfm_service(monitor) -> Dict[str, Any]:
         }
 
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                "https://ws.audioscrobbler.com/2.0/",
-                params={
-                    "method": "user.getrecenttracks",
-                    "user": monitor.lastfm_username,
-                    "api_key": monitor.lastfm_api_key,
-                    "format": "json",
-                    "limit": 1,
-                },
-                timeout=6.0,
-            )
+        client = get_http_client("lastfm")
+        response = await client.get(
+            "https://ws.audioscrobbler.com/2.0/",
+            params={
+                "method": "user.getrecenttracks",
+                "user": monitor.lastfm_username,
+                "api_key": monitor.lastfm_api_key,
+                "format": "json",
+                "limit": 1,
+            },
+            timeout=6.0,
+        )
 
         latency = round((time.time() - start) * 1000)
         if response.status_code != 200:
@@ -311,14 +311,14 @@ async def probe_monitor_surface(monitor, name: str, origin: str) -> Dict[str, An
     page_url = f"{origin}/monitor.html"
     start = time.time()
     try:
-        async with httpx.AsyncClient(follow_redirects=True) as client:
-            response = await client.get(status_url, timeout=6.0)
+        client = get_http_client("probes")
+        response = await client.get(status_url, timeout=6.0)
 
         latency = round((time.time() - start) * 1000)
         if response.status_code != 200:
             try:
-                async with httpx.AsyncClient(follow_redirects=True) as client:
-                    page_response = await client.get(page_url, timeout=6.0)
+                client = get_http_client("probes")
+                page_response = await client.get(page_url, timeout=6.0)
                 if page_response.status_code == 200:
                     return {
                         "name": name,
@@ -353,8 +353,8 @@ async def probe_monitor_surface(monitor, name: str, origin: str) -> Dict[str, An
         }
     except Exception as exc:
         try:
-            async with httpx.AsyncClient(follow_redirects=True) as client:
-                page_response = await client.get(page_url, timeout=6.0)
+            client = get_http_client("probes")
+            page_response = await client.get(page_url, timeout=6.0)
             if page_response.status_code == 200:
                 return {
                     "name": name,
@@ -385,8 +385,8 @@ async def probe_music_api_service(monitor) -> Dict[str, Any]:
     start = time.time()
 
     try:
-        async with httpx.AsyncClient(follow_redirects=True) as client:
-            response = await client.get(url, timeout=6.0)
+        client = get_http_client("probes")
+        response = await client.get(url, timeout=6.0)
 
         latency = round((time.time() - start) * 1000)
         if response.status_code != 200:
@@ -435,11 +435,11 @@ async def probe_github_pages_surface(monitor, origin: str) -> Dict[str, Any]:
     config_url = f"{origin}/build-config.json"
     start = time.time()
     try:
-        async with httpx.AsyncClient(follow_redirects=True) as client:
-            monitor_response, config_response = await asyncio.gather(
-                client.get(monitor_url, timeout=6.0),
-                client.get(config_url, timeout=6.0),
-            )
+        client = get_http_client("probes")
+        monitor_response, config_response = await asyncio.gather(
+            client.get(monitor_url, timeout=6.0),
+            client.get(config_url, timeout=6.0),
+        )
 
         latency = round((time.time() - start) * 1000)
         if monitor_response.status_code != 200:
@@ -468,8 +468,8 @@ async def probe_github_pages_surface(monitor, origin: str) -> Dict[str, Any]:
                 f"?user={monitor.lastfm_username}&limit=1"
             )
             try:
-                async with httpx.AsyncClient(follow_redirects=True) as client:
-                    music_response = await client.get(music_url, timeout=6.0)
+                client = get_http_client("probes")
+                music_response = await client.get(music_url, timeout=6.0)
                 music_api_status = music_response.status_code
             except Exception:
                 music_api_status = 0
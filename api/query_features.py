@@ -0,0 +1,306 @@
+"""Single-pass keyword classifier shared by every stage of the chat pipeline.
+
+One ``/api/chat`` turn used to be scanned by the prompt-injection guard (15
+regexes), the direct-command detectors, the web-tools gate, the model router
+regexes, ``adaptive_llm_params`` and the local-response substring checks, each
+walking the whole message again. ``classify_query`` walks it once:
+
+* every literal term from those checks is compiled into one trie-shaped
+  alternation wrapped in a lookahead, so a single ``finditer`` reports the
+  longest term starting at each position; shorter terms starting there are
+  its prefixes and are looked up from a precomputed table;
+* each term is registered per tag as a ``substring`` match (the old
+  ``term in text`` checks) or a ``word`` match (the old ``\\bterm\\b`` regexes,
+  checked against the neighbouring characters);
+* the few patterns that are not plain literals (``ignore ... instructions``,
+  ``reveal ... prompt``, the math/trivia and ``difference between`` shapes)
+  keep their regex, which only runs when one of its trigger words was seen.
+
+The result is a frozen ``QueryFeatures`` of tags; ``chat_endpoint`` computes
+it once per request and passes it to every stage. Classification is cached
+per message text, so stages called without features (model retries, helpers
+used outside the endpoint) reuse the same result.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, List, Pattern, Tuple
+
+SUBSTRING = "substring"
+WORD = "word"
+
+# tag -> (match mode, terms). Terms are lowercase; the message is lowercased
+# once before scanning. Tags mirror the checks they replace.
+TERM_TAGS: Dict[str, Tuple[str, Tuple[str, ...]]] = {
+    # config.is_prompt_injection (literal patterns)
+    "prompt_injection": (
+        SUBSTRING,
+        (
+            "you are now",
+            "forget everything", "forget all", "forget your", "forget previous",
+            "system prompt", "system message", "developer message", "hidden instructions",
+            "disregard your", "disregard all", "disregard any", "disregard previous",
+            "pretend you are", "pretend to be",
+            "api key", "secret", "token", "environment variable", ".env",
+            "exfiltrate", "data leak", "leak confidential",
+            "tool output", "function call", "internal config",
+            "jailbreak", "dan mode",
+        ),
+    ),
+    # config.is_resume_query
+    "resume": (SUBSTRING, ("resume", "cv", "download", "curriculum vitae")),
+    # config.adaptive_llm_params
+    "factual": (
+        WORD,
+        (
+            "experience", "education", "skills", "projects", "contact", "resume", "cv",
+            "location", "company", "university", "degree", "gpa", "certification",
+            "achievement", "publication",
+        ),
+    ),
+    "creative": (
+        WORD,
+        ("write", "poem", "story", "joke", "imagine", "creative", "design", "idea", "brainstorm"),
+    ),
+    # routes.chat direct-command detectors
+    "usa_term": (SUBSTRING, ("usa", "u.s.", "u.s.a", "united states", "america")),
+    "state": (SUBSTRING, ("state",)),
+    "travel_verb": (
+        SUBSTRING,
+        ("visited", "visit", "travel", "travelled", "traveled", "been", "covered"),
+    ),
+    "blog": (SUBSTRING, ("blog",)),
+    "release_term": (
+        SUBSTRING,
+        (
+            "this month", "released", "release", "new", "latest",
+            "june 2026", "july 2026", "august 2026", "may 2026",
+        ),
+    ),
+    "changelog": (
+        SUBSTRING,
+        (
+            "changelog", "release notes", "what's new", "whats new", "recent updates",
+            "recent changes", "latest release", "latest releases", "recent commits",
+        ),
+    ),
+    "music": (
+        SUBSTRING,
+        ("music", "song", "track", "listening", "scrobble", "spotify", "now playing"),
+    ),
+    # site_knowledge.should_use_web_tools / is_portfolio_context_query
+    "web_freshness": (
+        WORD,
+        (
+            "latest", "current", "today", "yesterday", "this week", "this month", "now",
+            "real-time", "real time", "realtime", "live", "news", "recent", "2026", "2027",
+            "pricing", "release", "released", "changelog", "docs", "documentation", "www",
+            "internet", "web search", "browse", "lookup", "search the web", "source",
+            "citation", "openrouter", "parallel.ai", "parallel web", "ai gateway", "weather",
+            "stock", "market",
+        ),
+    ),
+    "explicit_freshness": (
+        WORD,
+        ("latest", "current", "today", "now", "news", "recent", "2026", "search", "browse"),
+    ),
+    "live_marker": (
+        SUBSTRING,
+        (
+            "latest", "current", "today", "now", "news", "recent", "openrouter", "parallel",
+            "search", "browse",
+        ),
+    ),
+    # model_router
+    "portfolio_query": (
+        WORD,
+        (
+            "mangesh", "portfolio", "resume", "cv", "skill", "skills", "experience", "project",
+            "projects", "education", "drexel", "github", "linkedin", "certification",
+            "publication", "award", "contact", "hire", "employment", "background",
+            "tech stack", "who is", "tell me about", "work history",
+        ),
+    ),
+    "portfolio_site_token": (
+        SUBSTRING,
+        ("mangesh", "portfolio", "this site", "your website"),
+    ),
+    "fusion_query": (
+        WORD,
+        (
+            "compare", "versus", "vs", "pros and cons", "trade-off", "tradeoff", "trade off",
+            "trade-offs", "tradeoffs", "trade offs", "debate", "synthesize",
+            "multiple perspectives", "in-depth analysis", "in depth analysis",
+            "which is better", "best approach", "evaluate options", "critique",
+            "research report", "expert review", "advantages and disadvantages",
+        ),
+    ),
+    # local_intelligence.LOCAL_INTENTS topics
+    "greeting": (WORD, ("hello", "hi", "hey", "greetings")),
+    "who": (SUBSTRING, ("who",)),
+    "about_subject": (SUBSTRING, ("mangesh", "you")),
+    "resume_cv": (SUBSTRING, ("resume", "cv")),
+    "skills_topic": (WORD, ("skill", "skills", "stack", "tech", "language", "languages")),
+    "blog_topic": (WORD, ("blog", "write", "google i/o", "open x")),
+    "project": (SUBSTRING, ("project",)),
+    "contact": (SUBSTRING, ("contact", "email", "hiring", "hire")),
+    "experience_topic": (WORD, ("experience", "job", "work")),
+    "education": (SUBSTRING, ("education", "degree", "university", "college")),
+    "achievement": (SUBSTRING, ("achievement", "award", "accomplishment")),
+    "prime_minister": (SUBSTRING, ("prime minister",)),
+    "india": (SUBSTRING, ("india",)),
+    "president": (SUBSTRING, ("president",)),
+    "united_states": (SUBSTRING, ("united states",)),
+    "president_of_us": (SUBSTRING, ("president of us",)),
+    "astrology": (SUBSTRING, ("horoscope", "astrology", "birth chart", "vedic")),
+    "relocation": (
+        SUBSTRING,
+        (
+            "foreign", "settlement", "abroad", "settle", "relocation", "visa", "h1b",
+            "relocate", "usa career",
+        ),
+    ),
+    "personality": (SUBSTRING, ("personality", "trait", "character")),
+    "family": (
+        SUBSTRING,
+        ("family", "parents", "mother", "father", "sister", "vidya", "meena", "bharat"),
+    ),
+    "identity": (
+        SUBSTRING,
+        (
+            "hinoji", "birth name", "call name", "navaras", "height", "complexion",
+            "blood group", "address", "residence", "hometown",
+        ),
+    ),
+    "site_topic": (
+        WORD,
+        (
+            "travel", "atlas", "city", "cities", "monitor", "system", "api", "backend",
+            "blog", "website", "page",
+        ),
+    ),
+    # handle_direct_command clock/date answers
+    "time": (WORD, ("time",)),
+    "timezone": (SUBSTRING, ("timezone",)),
+    "date": (WORD, ("date", "today")),
+}
+
+# (tag, trigger substrings, pattern). Patterns that are not plain literals run
+# only when one of their triggers occurs; they are searched in the lowercased
+# message, so they are written in lowercase.
+VERIFIED_PATTERNS: Tuple[Tuple[str, Tuple[str, ...], str], ...] = (
+    ("prompt_injection", ("ignore",), r"ignore (all |previous |prior )?instructions?"),
+    ("prompt_injection", ("act as",), r"act as (a |an )?(different|new|another)"),
+    (
+        "prompt_injection",
+        ("reveal", "show", "print", "dump", "expose"),
+        r"(reveal|show|print|dump|expose).{0,40}(prompt|instruction|secret|token|api key|env)",
+    ),
+    ("prompt_injection", ("base64", "rot13", "hex"), r"(base64|rot13|hex).{0,30}(instruction|prompt|secret)"),
+    ("prompt_injection", ("<|",), r"<\|.*?\|>"),
+    ("fusion_query", ("difference between",), r"\bdifference between.+(and|vs)\b"),
+    ("math_or_trivia", ("what is", "calculate", "solve", "compute"), r"^\s*(what is|calculate|solve|compute)\b.{0,80}$"),
+)
+
+
+@dataclass(frozen=True)
+class QueryFeatures:
+    """Tags detected in one chat message."""
+
+    tags: FrozenSet[str]
+
+    def has(self, tag: str) -> bool:
+        return tag in self.tags
+
+    def has_any(self, *tags: str) -> bool:
+        return any(tag in self.tags for tag in tags)
+
+    def has_all(self, *tags: str) -> bool:
+        return all(tag in self.tags for tag in tags)
+
+
+def _trie_pattern(terms: Iterable[str]) -> str:
+    """Alternation shaped like a trie; greedy, so it prefers the longest term."""
+    root: Dict[str, dict] = {}
+    for term in terms:
+        node = root
+        for char in term:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def render(node: Dict[str, dict]) -> str:
+        branches = [re.escape(char) + render(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        if "" in node:
+            return "(?:" + "|".join(branches) + ")?"
+        if len(branches) == 1:
+            return branches[0]
+        return "(?:" + "|".join(branches) + ")"
+
+    return render(root)
+
+
+class _Classifier:
+    def __init__(self) -> None:
+        # term -> [(tag, mode)]
+        self.specs: Dict[str, List[Tuple[str, str]]] = {}
+        for tag, (mode, terms) in TERM_TAGS.items():
+            for term in terms:
+                self.specs.setdefault(term, []).append((tag, mode))
+        self.rules: List[Tuple[str, Pattern[str]]] = []
+        for index, (tag, triggers, pattern) in enumerate(VERIFIED_PATTERNS):
+            rule_tag = f"_rule{index}"
+            self.rules.append((rule_tag, re.compile(pattern)))
+            for trigger in triggers:
+                self.specs.setdefault(trigger, []).append((rule_tag, SUBSTRING))
+        self.rule_tags = {f"_rule{index}": rule[0] for index, rule in enumerate(VERIFIED_PATTERNS)}
+        terms = sorted(self.specs)
+        self.prefixes: Dict[str, Tuple[str, ...]] = {
+            term: tuple(other for other in terms if term.startswith(other)) for term in terms
+        }
+        self.scanner = re.compile(f"(?=({_trie_pattern(terms)}))")
+
+    def classify(self, lower: str) -> FrozenSet[str]:
+        found = set()
+        size = len(lower)
+        specs = self.specs
+        for match in self.scanner.finditer(lower):
+            start = match.start()
+            for term in self.prefixes[match.group(1)]:
+                for tag, mode in specs[term]:
+                    if tag in found:
+                        continue
+                    if mode == SUBSTRING or (
+                        _word_boundary(lower, start, size) and _word_boundary(lower, start + len(term), size)
+                    ):
+                        found.add(tag)
+        for rule_tag, pattern in self.rules:
+            if rule_tag in found:
+                found.discard(rule_tag)
+                tag = self.rule_tags[rule_tag]
+                if tag not in found and pattern.search(lower):
+                    found.add(tag)
+        return frozenset(found)
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+
+def _word_boundary(text: str, index: int, size: int) -> bool:
+    before = index > 0 and _is_word_char(text[index - 1])
+    after = index < size and _is_word_char(text[index])
+    return before != after
+
+
+_classifier = _Classifier()
+
+
+@lru_cache(maxsize=512)
+def classify_query(message: str) -> QueryFeatures:
+    """Classify ``message`` in one pass over its lowercased text."""
+    return QueryFeatures(_classifier.classify((message or "").lower()))
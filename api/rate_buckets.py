@@ -0,0 +1,116 @@
+"""Circular time-bucket counters for request, error, 429 and upstream-failure rates.
+
+``TimeBuckets`` is a ring of fixed-width slots with one ``array('I')`` column
+per counter kind, indexed by ``epoch % size`` where ``epoch = ts // width``.
+When time moves past the newest slot, the slots skipped over are zeroed in
+place (at most one lap), so recording is O(1) amortised and memory is fixed at
+``size * len(KINDS)`` counters. Samples older than the ring are dropped.
+
+``RateCounters`` pairs a per-second ring covering 5 minutes with a per-minute
+ring covering 24 hours. Series come out columnar — one list of counts per
+kind plus the start time and step — rather than a dict per sample.
+"""
+
+from __future__ import annotations
+
+from array import array
+from typing import Dict, List, Optional
+
+REQUESTS, ERRORS, RATE_LIMITED, UPSTREAM_FAILURES = range(4)
+KINDS = ("requests", "errors", "rate_limited", "upstream_failures")
+
+# resolution -> (slot seconds, slot count)
+RESOLUTIONS = {
+    "second": (1, 300),
+    "minute": (60, 1440),
+}
+UPSTREAM_STATUSES = frozenset({502, 503, 504})
+
+
+class TimeBuckets:
+    """Fixed ring of ``size`` slots, ``width`` seconds each, one column per kind."""
+
+    __slots__ = ("width", "size", "head", "columns")
+
+    def __init__(self, width: int, size: int) -> None:
+        self.width = width
+        self.size = size
+        self.head: Optional[int] = None  # epoch of the newest slot
+        zeros = array("I", bytes(size * array("I").itemsize))
+        self.columns: List[array] = [array("I", zeros) for _ in KINDS]
+
+    def _advance(self, epoch: int) -> None:
+        head = self.head
+        if head is not None and epoch <= head:
+            return
+        size = self.size
+        first = epoch - size + 1 if head is None else max(head + 1, epoch - size + 1)
+        for stale in range(first, epoch + 1):
+            index = stale % size
+            for column in self.columns:
+                column[index] = 0
+        self.head = epoch
+
+    def add(self, ts: float, kind: int, count: int = 1) -> None:
+        epoch = int(ts // self.width)
+        self._advance(epoch)
+        if epoch <= self.head - self.size:
+            return
+        self.columns[kind][epoch % self.size] += count
+
+    def total(self, kind: int, now: float, slots: int) -> int:
+        """Sum of the newest ``slots`` slots up to and including ``now``'s slot."""
+        epoch = int(now // self.width)
+        self._advance(epoch)
+        column = self.columns[kind]
+        size = self.size
+        return sum(column[stale % size] for stale in range(epoch - min(slots, size) + 1, epoch + 1))
+
+    def series(self, now: float) -> Dict[str, object]:
+        """Oldest-to-newest counts for every kind, ending at ``now``'s slot."""
+        epoch = int(now // self.width)
+        self._advance(epoch)
+        split = (epoch + 1) % self.size
+        result: Dict[str, object] = {
+            "start": (epoch - self.size + 1) * self.width,
+            "step_seconds": self.width,
+        }
+        for name, column in zip(KINDS, self.columns):
+            result[name] = (column[split:] + column[:split]).tolist()
+        return result
+
+
+class RateCounters:
+    """Per-second (5 min) and per-minute (24 h) counters for one endpoint or all."""
+
+    __slots__ = ("seconds", "minutes")
+
+    def __init__(self) -> None:
+        self.seconds = TimeBuckets(*RESOLUTIONS["second"])
+        self.minutes = TimeBuckets(*RESOLUTIONS["minute"])
+
+    def add(self, ts: float, kind: int, count: int = 1) -> None:
+        self.seconds.add(ts, kind, count)
+        self.minutes.add(ts, kind, count)
+
+    def record_response(self, ts: float, status_code: int) -> None:
+        self.add(ts, REQUESTS)
+        if not 200 <= status_code < 400:
+            self.add(ts, ERRORS)
+            if status_code == 429:
+                self.add(ts, RATE_LIMITED)
+            elif status_code in UPSTREAM_STATUSES:
+                self.add(ts, UPSTREAM_FAILURES)
+
+    def per_second(self, kind: int, now: float, seconds: int) -> float:
+        return self.seconds.total(kind, now, seconds) / seconds
+
+    def per_minute(self, kind: int, now: float, minutes: int = 1) -> float:
+        """Average count per minute over the trailing ``minutes``, from the finest ring that covers it."""
+        if minutes * 60 <= self.seconds.size:
+            return self.seconds.total(kind, now, minutes * 60) / minutes
+        return self.minutes.total(kind, now, minutes) / minutes
+
+    def series(self, resolution: str, now: float) -> Dict[str, object]:
+        ring = self.seconds if resolution == "second" else self.minutes
+        return ring.series(now)
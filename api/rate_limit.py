@@ -1,12 +1,19 @@
-"""Durable rate-limit store with in-memory default and optional Upstash Redis REST."""
+"""Durable rate-limit store with in-memory default and optional Upstash Redis REST.
+
+Route handlers call ``allow_async``; the Upstash store answers it with one
+pipelined round trip on the shared ``upstash`` client and lets clients that are
+clearly under their limit spend locally leased tokens without touching Redis.
+The synchronous ``allow`` remains for scripts and legacy callers.
+"""
 
 from __future__ import annotations
 
 import logging
+import math
 import os
 import time
-from collections import defaultdict
-from typing import DefaultDict, Dict, List, Optional, Protocol
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Protocol, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -15,6 +22,9 @@ class RateLimitStore(Protocol):
     def allow(self, client_id: str, *, limit: int, window_sec: float) -> bool:
         ...
 
+    async def allow_async(self, client_id: str, *, limit: int, window_sec: float) -> bool:
+        ...
+
     def clear(self) -> None:
         ...
 
@@ -25,92 +35,307 @@ class RateLimitStore(Protocol):
         ...
 
 
-class InMemoryRateLimitStore:
-    """Process-local sliding window used for local/CI and as fail-soft fallback."""
+class _WindowCounter:
+    """Per-client sliding-window-counter state: two fixed buckets, no timestamp log."""
+
+    __slots__ = ("window", "bucket", "current", "previous", "last_seen")
 
-    def __init__(self) -> None:
-        self._store: DefaultDict[str, List[float]] = defaultdict(list)
+    def __init__(self, window: float, bucket: int, now: float) -> None:
+        self.window = window
+        self.bucket = bucket
+        self.current = 0
+        self.previous = 0
+        self.last_seen = now
+
+    def counts_at(self, window: float, bucket: int) -> Tuple[int, int]:
+        """Return ``(previous, current)`` as they would be in ``bucket``."""
+        if window != self.window:
+            return 0, 0
+        if bucket == self.bucket:
+            return self.previous, self.current
+        if bucket == self.bucket + 1:
+            return self.current, 0
+        return 0, 0
+
+    def estimate(self, now: float) -> float:
+        bucket = int(now // self.window)
+        previous, current = self.counts_at(self.window, bucket)
+        elapsed = (now - bucket * self.window) / self.window
+        return previous * (1.0 - elapsed) + current
+
+
+class InMemoryRateLimitStore:
+    """Process-local sliding window used for local/CI and as fail-soft fallback.
+
+    Uses the sliding-window-counter approximation (current bucket plus the
+    previous bucket weighted by overlap), so each check is O(1) and each client
+    costs one small record. Records live in LRU order: idle ones are swept from
+    the cold end every ``sweep_interval`` seconds and the total is capped at
+    ``max_clients`` so a scan from many IPs cannot grow memory without bound.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_clients: Optional[int] = None,
+        sweep_interval: float = 30.0,
+        default_window: float = 60.0,
+    ) -> None:
+        if max_clients is None:
+            max_clients = int(os.getenv("RATE_LIMIT_MAX_CLIENTS", "100000") or 100000)
+        self._store: "OrderedDict[str, _WindowCounter]" = OrderedDict()
+        self._max_clients = max(1, max_clients)
+        self._sweep_interval = sweep_interval
+        self._default_window = default_window
+        self._last_sweep = time.time()
 
     def allow(self, client_id: str, *, limit: int, window_sec: float) -> bool:
         now = time.time()
-        recent = [ts for ts in self._store[client_id] if now - ts < window_sec]
-        if len(recent) >= limit:
-            self._store[client_id] = recent
+        window = max(float(window_sec), 1e-6)
+        bucket = int(now // window)
+        record = self._store.get(client_id)
+        if record is None:
+            record = self._store[client_id] = _WindowCounter(window, bucket, now)
+            if len(self._store) > self._max_clients:
+                self._store.popitem(last=False)
+        else:
+            self._store.move_to_end(client_id)
+            record.previous, record.current = record.counts_at(window, bucket)
+            record.window = window
+            record.bucket = bucket
+        record.last_seen = now
+
+        if now - self._last_sweep >= self._sweep_interval:
+            self.sweep(now)
+
+        elapsed = (now - bucket * window) / window
+        if record.previous * (1.0 - elapsed) + record.current >= limit:
             return False
-        recent.append(now)
-        self._store[client_id] = recent
+        record.current += 1
         return True
 
+    async def allow_async(self, client_id: str, *, limit: int, window_sec: float) -> bool:
+        return self.allow(client_id, limit=limit, window_sec=window_sec)
+
+    def sweep(self, now: Optional[float] = None) -> int:
+        """Evict clients idle for two windows (they no longer affect any estimate)."""
+        now = time.time() if now is None else now
+        self._last_sweep = now
+        evicted = 0
+        while self._store:
+            client_id, record = next(iter(self._store.items()))
+            if now - record.last_seen < 2 * record.window:
+                break
+            del self._store[client_id]
+            evicted += 1
+        return evicted
+
     def clear(self) -> None:
         self._store.clear()
 
+    def _timestamps(self, record: _WindowCounter, now: float) -> List[float]:
+        # Monitor compatibility: approximate hits as stamped at the current bucket start.
+        count = math.ceil(record.estimate(now))
+        return [int(now // record.window) * record.window] * count
+
     def snapshot(self) -> Dict[str, List[float]]:
-        return {key: list(values) for key, values in self._store.items()}
+        now = time.time()
+        return {key: self._timestamps(record, now) for key, record in self._store.items()}
 
     def items(self):
-        return self._store.items()
+        return self.snapshot().items()
+
+    def __len__(self) -> int:
+        return len(self._store)
 
     def __contains__(self, client_id: str) -> bool:
         return client_id in self._store
 
     def __getitem__(self, client_id: str) -> List[float]:
-        return self._store[client_id]
+        record = self._store.get(client_id)
+        return self._timestamps(record, time.time()) if record is not None else []
 
     def __setitem__(self, client_id: str, values: List[float]) -> None:
-        self._store[client_id] = list(values)
+        """Seed a client from hit timestamps (tests and manual overrides)."""
+        now = time.time()
+        existing = self._store.get(client_id)
+        window = existing.window if existing is not None else self._default_window
+        bucket = int(now // window)
+        record = _WindowCounter(window, bucket, max(values, default=now))
+        for ts in values:
+            hit_bucket = int(ts // window)
+            if hit_bucket == bucket:
+                record.current += 1
+            elif hit_bucket == bucket - 1:
+                record.previous += 1
+        self._store[client_id] = record
+        self._store.move_to_end(client_id)
 
     def __delitem__(self, client_id: str) -> None:
         del self._store[client_id]
 
 
-class UpstashRateLimitStore:
-    """Fixed-window counter via Upstash Redis REST (INCR + EXPIRE)."""
+def _local_share_from_env() -> float:
+    try:
+        share = float(os.getenv("RATE_LIMIT_LOCAL_SHARE", "0.5"))
+    except ValueError:
+        share = 0.5
+    return min(max(share, 0.0), 1.0)
 
-    def __init__(self, url: str, token: str, fallback: InMemoryRateLimitStore) -> None:
+
+class _LocalLease:
+    """Tokens reserved in a Redis window for this process, plus the next reservation size."""
+
+    __slots__ = ("bucket", "tokens", "reserve")
+
+    def __init__(self, bucket: int, tokens: int, reserve: int) -> None:
+        self.bucket = bucket
+        self.tokens = tokens
+        self.reserve = reserve
+
+
+class UpstashRateLimitStore:
+    """Fixed-window counter via Upstash Redis REST (pipelined INCRBY + EXPIRE).
+
+    Each round trip also reserves ``local_share`` of the window's remaining
+    headroom in the same INCRBY; the reserved units that still fit under the
+    limit become local tokens that later requests spend without a network
+    call. Every admitted request therefore owns a unit at or below the limit
+    in Redis, however many instances share it; reserved tokens left unused
+    when the window ends simply expire with it. Set
+    ``RATE_LIMIT_LOCAL_SHARE=0`` to hit Redis on every request.
+    """
+
+    MAX_LOCAL_LEASES = 10_000
+
+    def __init__(
+        self,
+        url: str,
+        token: str,
+        fallback: InMemoryRateLimitStore,
+        *,
+        local_share: Optional[float] = None,
+    ) -> None:
         self._url = url.rstrip("/")
         self._token = token
         self._fallback = fallback
         self._warned = False
+        self._local_share = _local_share_from_env() if local_share is None else local_share
+        self._leases: Dict[str, _LocalLease] = {}
+
+    @staticmethod
+    def _bucket(window_sec: float) -> int:
+        return int(time.time() // max(window_sec, 1))
+
+    def _pipeline(self, key: str, increment: int, window_sec: float) -> List[List[str]]:
+        return [
+            ["INCRBY", key, str(increment)],
+            ["EXPIRE", key, str(int(max(window_sec, 1)))],
+        ]
+
+    @property
+    def _headers(self) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self._token}"}
+
+    @staticmethod
+    def _count_from(payload: Any) -> int:
+        reply = payload[0] if isinstance(payload, list) and payload else None
+        if not isinstance(reply, dict) or "error" in reply or "result" not in reply:
+            error = reply.get("error") if isinstance(reply, dict) else reply
+            raise ValueError(f"Upstash INCRBY failed: {error!r}")
+        return int(reply["result"])
+
+    def _take_local_token(self, client_id: str, bucket: int) -> bool:
+        lease = self._leases.get(client_id)
+        if lease is None or lease.bucket != bucket or lease.tokens <= 0:
+            return False
+        lease.tokens -= 1
+        return True
 
-    def _key(self, client_id: str, window_sec: float) -> str:
-        bucket = int(time.time() // max(window_sec, 1))
-        return f"rl:{client_id}:{bucket}"
+    def _reservation(self, client_id: str, bucket: int, limit: int) -> int:
+        """Local tokens to reserve alongside this request's own hit."""
+        if self._local_share <= 0:
+            return 0
+        lease = self._leases.get(client_id)
+        if lease is not None and lease.bucket == bucket:
+            return lease.reserve
+        return int(max(limit - 1, 0) * self._local_share)
+
+    def _record_count(self, client_id: str, bucket: int, count: int, reserved: int, limit: int) -> bool:
+        """Keep the reserved units that fit under ``limit``; return whether this hit is admitted."""
+        own = count - reserved
+        tokens = min(reserved, max(limit - own, 0))
+        reserve = int(max(limit - count, 0) * self._local_share) if self._local_share > 0 else 0
+        if client_id not in self._leases and len(self._leases) >= self.MAX_LOCAL_LEASES:
+            self._leases = {
+                cid: lease for cid, lease in self._leases.items() if lease.bucket == bucket
+            }
+        # Kept even when empty: a client at its limit must not re-reserve a fresh window's share.
+        self._leases[client_id] = _LocalLease(bucket, tokens, reserve)
+        return own <= limit
+
+    def _fail_soft(self, exc: Exception, client_id: str, *, limit: int, window_sec: float) -> bool:
+        fail_closed = os.getenv("RATE_LIMIT_FAIL_CLOSED", "").strip().lower() in (
+            "1",
+            "true",
+            "yes",
+            "on",
+        )
+        if not self._warned:
+            logger.warning(
+                "Upstash rate limit unavailable (%s); %s",
+                type(exc).__name__,
+                "failing closed" if fail_closed else "falling back to memory",
+            )
+            self._warned = True
+        if fail_closed:
+            return False
+        return self._fallback.allow(client_id, limit=limit, window_sec=window_sec)
 
     def allow(self, client_id: str, *, limit: int, window_sec: float) -> bool:
+        bucket = self._bucket(window_sec)
+        if self._take_local_token(client_id, bucket):
+            return True
         try:
             import httpx
 
-            key = self._key(client_id, window_sec)
-            headers = {"Authorization": f"Bearer {self._token}"}
+            key = f"rl:{client_id}:{bucket}"
+            reserved = self._reservation(client_id, bucket, limit)
             with httpx.Client(timeout=2.0) as client:
-                incr = client.post(f"{self._url}/incr/{key}", headers=headers)
-                incr.raise_for_status()
-                count = int(incr.json().get("result", 0))
-                if count == 1:
-                    client.post(
-                        f"{self._url}/expire/{key}/{int(max(window_sec, 1))}",
-                        headers=headers,
-                    )
-            return count <= limit
+                response = client.post(
+                    f"{self._url}/pipeline",
+                    headers=self._headers,
+                    json=self._pipeline(key, reserved + 1, window_sec),
+                )
+                response.raise_for_status()
+                count = self._count_from(response.json())
         except Exception as exc:
-            fail_closed = os.getenv("RATE_LIMIT_FAIL_CLOSED", "").strip().lower() in (
-                "1",
-                "true",
-                "yes",
-                "on",
+            return self._fail_soft(exc, client_id, limit=limit, window_sec=window_sec)
+        return self._record_count(client_id, bucket, count, reserved, limit)
+
+    async def allow_async(self, client_id: str, *, limit: int, window_sec: float) -> bool:
+        bucket = self._bucket(window_sec)
+        if self._take_local_token(client_id, bucket):
+            return True
+        try:
+            from api.http_clients import get_http_client
+
+            key = f"rl:{client_id}:{bucket}"
+            reserved = self._reservation(client_id, bucket, limit)
+            response = await get_http_client("upstash").post(
+                f"{self._url}/pipeline",
+                headers=self._headers,
+                json=self._pipeline(key, reserved + 1, window_sec),
+                timeout=2.0,
             )
-            if not self._warned:
-                logger.warning(
-                    "Upstash rate limit unavailable (%s); %s",
-                    type(exc).__name__,
-                    "failing closed" if fail_closed else "falling back to memory",
-                )
-                self._warned = True
-            if fail_closed:
-                return False
-            return self._fallback.allow(client_id, limit=limit, window_sec=window_sec)
+            response.raise_for_status()
+            count = self._count_from(response.json())
+        except Exception as exc:
+            return self._fail_soft(exc, client_id, limit=limit, window_sec=window_sec)
+        return self._record_count(client_id, bucket, count, reserved, limit)
 
     def clear(self) -> None:
+        self._leases.clear()
         self._fallback.clear()
 
     def snapshot(self) -> Dict[str, List[float]]:
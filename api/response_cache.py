@@ -0,0 +1,198 @@
+"""Response cache for repeated AssistMe chat questions.
+
+Visitors ask the same few questions ("what are his skills", "show me projects")
+over and over. Answers are cached under a key built from the normalized query,
+the resolved model tier/model and a fingerprint of the ``retrieve_site_context``
+output, so a knowledge change or a different routing decision is a miss.
+
+Only fresh, text-only questions are cacheable: conversation history, images,
+client page context or live web tools all make an answer specific to one
+visitor or one moment.
+
+Backends:
+    memory  - process-local BoundedCache with TTL + LRU eviction (default)
+    upstash - Upstash Redis REST (shared across instances), memory as fail-soft
+    off     - disabled
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from typing import Any, Dict, Optional, Protocol
+
+from api.cache import BoundedCache
+from api.monitoring import system_monitor
+
+logger = logging.getLogger(__name__)
+
+CACHE_KEY_VERSION = "v1"
+
+_NON_WORD_RE = re.compile(r"[^a-z0-9+#.]+")
+_FILLER_WORDS = frozenset(
+    {"please", "pls", "hey", "hi", "hello", "kindly", "can", "could", "would", "you", "u", "me", "tell", "show"}
+)
+
+
+def normalize_chat_query(message: str) -> str:
+    """Lowercase, strip punctuation and filler words so trivially different phrasings share a key."""
+    words = _NON_WORD_RE.sub(" ", (message or "").lower()).split()
+    kept = [word.strip(".") for word in words if word.strip(".") and word not in _FILLER_WORDS]
+    return " ".join(kept or [word.strip(".") for word in words])
+
+
+def site_context_fingerprint(site_context: str) -> str:
+    return hashlib.sha1((site_context or "").encode("utf-8")).hexdigest()[:16]
+
+
+def build_response_cache_key(message: str, *, routing_tier: str, model: str, site_context: str) -> str:
+    raw = "|".join(
+        (CACHE_KEY_VERSION, routing_tier or "auto", model or "", normalize_chat_query(message), site_context_fingerprint(site_context))
+    )
+    return "chat:" + hashlib.sha256(raw.encode("utf-8")).hexdigest()[:40]
+
+
+class ResponseCacheBackend(Protocol):
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        ...
+
+    async def set(self, key: str, entry: Dict[str, Any], ttl: float) -> None:
+        ...
+
+    def clear(self) -> None:
+        ...
+
+
+class InMemoryResponseCache:
+    """TTL + LRU cache backed by ``BoundedCache``; the coldest entry is evicted on overflow."""
+
+    def __init__(self, max_entries: int = 256) -> None:
+        self._entries = BoundedCache("chat_responses", max_entries=max_entries)
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        return self._entries.get(key)
+
+    async def set(self, key: str, entry: Dict[str, Any], ttl: float) -> None:
+        self._entries.set(key, entry, ttl)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class UpstashResponseCache:
+    """Shared cache via Upstash Redis REST; falls back to memory when Redis is unreachable."""
+
+    def __init__(self, url: str, token: str, fallback: InMemoryResponseCache) -> None:
+        self._url = url.rstrip("/")
+        self._token = token
+        self._fallback = fallback
+        self._warned = False
+
+    async def _command(self, *args: str) -> Any:
+        from api.http_clients import get_http_client
+
+        response = await get_http_client("upstash").post(
+            self._url,
+            headers={"Authorization": f"Bearer {self._token}"},
+            json=list(args),
+            timeout=2.0,
+        )
+        response.raise_for_status()
+        return response.json().get("result")
+
+    def _warn(self, exc: Exception) -> None:
+        if not self._warned:
+            logger.warning("Upstash response cache unavailable (%s); using memory", type(exc).__name__)
+            self._warned = True
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            raw = await self._command("GET", key)
+        except Exception as exc:
+            self._warn(exc)
+            return await self._fallback.get(key)
+        if not raw:
+            return None
+        try:
+            return json.loads(raw)
+        except (TypeError, ValueError):
+            return None
+
+    async def set(self, key: str, entry: Dict[str, Any], ttl: float) -> None:
+        try:
+            await self._command("SET", key, json.dumps(entry, separators=(",", ":")), "EX", str(max(1, int(ttl))))
+        except Exception as exc:
+            self._warn(exc)
+            await self._fallback.set(key, entry, ttl)
+
+    def clear(self) -> None:
+        self._fallback.clear()
+
+
+class ChatResponseCache:
+    """Backend-agnostic facade that records hit/miss/store counts in ``system_monitor.ai_metrics``."""
+
+    def __init__(self, backend: Optional[ResponseCacheBackend], ttl: float = 600.0) -> None:
+        self.backend = backend
+        self.ttl = ttl
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None and self.ttl > 0
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        if not self.enabled:
+            return None
+        entry = await self.backend.get(key)
+        _record("hits" if entry else "misses")
+        return entry
+
+    async def set(self, key: str, entry: Dict[str, Any]) -> None:
+        if not self.enabled or not (entry.get("answer") or "").strip():
+            return
+        await self.backend.set(key, {**entry, "cached_at": int(time.time())}, self.ttl)
+        _record("stores")
+
+    def clear(self) -> None:
+        if self.backend is not None:
+            self.backend.clear()
+
+
+def _record(outcome: str) -> None:
+    if system_monitor is not None:
+        system_monitor.record_response_cache(outcome)
+
+
+def build_chat_response_cache() -> ChatResponseCache:
+    backend_name = (os.getenv("CHAT_RESPONSE_CACHE") or "memory").strip().lower()
+    try:
+        ttl = float(os.getenv("CHAT_RESPONSE_CACHE_TTL", "600") or 600)
+    except ValueError:
+        ttl = 600.0
+    try:
+        max_entries = int(os.getenv("CHAT_RESPONSE_CACHE_MAX", "256") or 256)
+    except ValueError:
+        max_entries = 256
+
+    if backend_name in {"off", "none", "0", "false"}:
+        return ChatResponseCache(None, ttl)
+
+    memory = InMemoryResponseCache(max_entries)
+    url = (os.getenv("UPSTASH_REDIS_REST_URL") or "").strip()
+    token = (os.getenv("UPSTASH_REDIS_REST_TOKEN") or "").strip()
+    if backend_name in {"upstash", "redis"} and url and token:
+        logger.info("Chat response cache backend: Upstash Redis REST")
+        return ChatResponseCache(UpstashResponseCache(url, token, memory), ttl)
+    if backend_name in {"upstash", "redis"}:
+        logger.warning("CHAT_RESPONSE_CACHE=%s but Upstash env incomplete; using memory", backend_name)
+    return ChatResponseCache(memory, ttl)
+
+
+chat_response_cache = build_chat_response_cache()
@@ -92,7 +92,7 @@ async def track_analytics_view(payload: AnalyticsTrackRequest, request: Request)
         raise HTTPException(status_code=503, detail="Analytics service temporarily unavailable")
 
     client_ip = get_client_ip(request)
-    if not check_rate_limit(f"analytics:{client_ip}"):
+    if not await check_rate_limit(f"analytics:{client_ip}"):
         raise api_error(
             code="RATE_LIMITED",
             message="Too many analytics requests. Please wait before trying again.",
@@ -3,7 +3,7 @@ import time
 import asyncio
 import re
 from datetime import datetime
-from typing import List, Dict, AsyncGenerator, Optional
+from typing import List, Dict, AsyncGenerator, Iterator, Optional, Set, Tuple
 from fastapi import APIRouter, Request, HTTPException
 from fastapi.responses import StreamingResponse
 
@@ -22,6 +22,8 @@ from api.config import (
     get_default_model,
     get_site_url,
     get_site_title,
+    get_openrouter_hedge_delay,
+    get_openrouter_hedge_max_parallel,
     FALLBACK_OPENROUTER_MODEL,
     PRIMARY_OPENROUTER_MODEL,
     FUSION_MODEL,
@@ -46,7 +48,13 @@ from api.config import (
     adaptive_llm_params,
     RATE_LIMIT_WINDOW,
 )
+from api.chat_stream import ChatStreamWriter, negotiate_stream_format
+from api.http_clients import get_http_client
+from api.model_scoreboard import model_scoreboard
+from api.local_intelligence import answer_locally
 from api.monitoring import system_monitor, EventType
+from api.query_features import QueryFeatures, classify_query
+from api.response_cache import build_response_cache_key, chat_response_cache
 from api.model_router import (
     AUTO_ROUTER_ALLOWED,
     AUTO_ROUTER_MODEL,
@@ -56,7 +64,6 @@ from api.model_router import (
 from api.site_knowledge import (
     build_site_knowledge_prompt,
     format_blog_release_summary,
-    format_recent_blog_summary,
     format_recent_changelog_summary,
     format_usa_state_summary,
     retrieve_site_context,
@@ -66,67 +73,28 @@ from api.site_knowledge import (
 router = APIRouter()
 
 
-def _query_has_word(query: str, word: str) -> bool:
-    return re.search(rf"\b{re.escape(word)}\b", query) is not None
+def _features(query: str, features: Optional[QueryFeatures]) -> QueryFeatures:
+    return classify_query(query) if features is None else features
 
 
-def _query_has_any_word(query: str, words: List[str]) -> bool:
-    return any(_query_has_word(query, word) for word in words)
-
-
-def is_usa_state_travel_query(query: str) -> bool:
+def is_usa_state_travel_query(query: str, features: Optional[QueryFeatures] = None) -> bool:
     """Detect direct USA travel-count questions that should use site data."""
-    usa_terms = ["usa", "u.s.", "u.s.a", "united states", "america"]
-    travel_terms = ["visited", "visit", "travel", "travelled", "traveled", "been", "covered"]
-    return (
-        any(term in query for term in usa_terms)
-        and "state" in query
-        and any(term in query for term in travel_terms)
-    )
+    return _features(query, features).has_all("usa_term", "state", "travel_verb")
 
 
-def is_blog_release_query(query: str) -> bool:
+def is_blog_release_query(query: str, features: Optional[QueryFeatures] = None) -> bool:
     """Detect direct blog release questions that should use the local index."""
-    return "blog" in query and any(
-        term in query
-        for term in [
-            "this month",
-            "released",
-            "release",
-            "new",
-            "latest",
-            "june 2026",
-            "july 2026",
-            "august 2026",
-            "may 2026",
-        ]
-    )
+    return _features(query, features).has_all("blog", "release_term")
 
 
-def is_changelog_query(query: str) -> bool:
+def is_changelog_query(query: str, features: Optional[QueryFeatures] = None) -> bool:
     """Detect direct changelog, release notes, and update questions."""
-    q = query.lower()
-    return any(
-        term in q
-        for term in [
-            "changelog",
-            "release notes",
-            "what's new",
-            "whats new",
-            "recent updates",
-            "recent changes",
-            "latest release",
-            "latest releases",
-            "recent commits",
-        ]
-    )
+    return _features(query, features).has("changelog")
 
 
-def is_music_query(query: str) -> bool:
+def is_music_query(query: str, features: Optional[QueryFeatures] = None) -> bool:
     """Detect direct music, song, Spotify, and now-playing queries."""
-    q = query.lower()
-    music_terms = ["music", "song", "track", "listening", "scrobble", "spotify", "now playing"]
-    return any(term in q for term in music_terms)
+    return _features(query, features).has("music")
 
 
 def openrouter_request_body(
@@ -193,289 +161,23 @@ def openrouter_request_body(
     return body
 
 
-def generate_local_response(query: str, site_context: str = "") -> Dict:
-    """Generate a meaningful response based on portfolio data without using an LLM."""
-    query = query.lower().strip()
-
-    # Greetings
-    if any(g in query for g in ["hello", "hi", "hey", "greetings"]):
-        return {
-            "answer": "👋 Hello! I'm AssistMe, running in **Local Mode**. I can tell you about Mangesh's experience, skills, projects, Field Notes blogs, and more. What would you like to know?",
-            "category": "Greeting",
-        }
-
-    # Who is Mangesh
-    if "who" in query and ("mangesh" in query or "you" in query):
-        name = PORTFOLIO_DATA["name"]
-        title = PORTFOLIO_DATA["title"]
-        location = PORTFOLIO_DATA["location"]
-        return {
-            "answer": f"👨‍💻 **{name}** is a {title} based in {location}. He specializes in full-stack architecture, cloud pipelines, and AI systems. His portfolio incorporates a Hybrid AI Web Stack utilizing client-side **WebNN + Gemma 3** for low-latency edge interactions and server-side OpenRouter API orchestration.",
-            "category": "About",
-        }
-
-    # Resume/CV
-    if "resume" in query or "cv" in query:
-        resume_url = PORTFOLIO_DATA["resume_url"]
-        return {
-            "answer": f"📄 You can download Mangesh's resume here: {resume_url}",
-            "category": "Resume",
-        }
-
-    # Skills
-    if _query_has_any_word(query, ["skill", "stack", "tech"]) or _query_has_word(query, "language"):
-        langs = ", ".join(PORTFOLIO_DATA["skills"]["languages"])
-        frameworks = ", ".join(PORTFOLIO_DATA["skills"]["frameworks"][:4])
-        return {
-            "answer": (
-                f"🛠️ **Technical Stack**:\n"
-                f"• **Languages**: {langs}\n"
-                f"• **Frameworks**: {frameworks}, FastAPI\n"
-                f"• **Cloud**: AWS, Docker, Kubernetes\n"
-                f"• **AI/ML**: OpenRouter, TensorFlow, scikit-learn, RAG\n"
-                f"• **This site**: vanilla ESM + FastAPI + WebMCP (not React/Next)\n"
-                f"• **Databases**: PostgreSQL, MongoDB, Redis"
-            ),
-            "category": "Skills",
-        }
-
-    if is_blog_release_query(query):
-        return {
-            "answer": f"📝 **Blog Releases**\n\n{format_blog_release_summary(query)}",
-            "category": "Blogs",
-        }
-
-    if is_music_query(query):
-        return {
-            "answer": (
-                "🎵 **Now Playing & Music Activity**:\n"
-                "Mangesh connects his **Spotify** listening live to **Last.fm** (user: **[mbr63](https://www.last.fm/user/mbr63)**).\n\n"
-                "• **Live Hero Music Card**: Look directly under the badges on the homepage to see what's currently playing or recently scrobbled!\n"
-                "• **Spotify Profile**: [Open Last.fm mbr63](https://www.last.fm/user/mbr63)"
-            ),
-            "category": "Music",
-        }
-
-    # Blogs
-    if _query_has_word(query, "blog") or _query_has_any_word(query, ["write", "google i/o", "open x"]):
-        return {
-            "answer": (
-                "✍️ **Recent Field Notes**\n\n"
-                f"{format_recent_blog_summary(5)}\n\n"
-                "Browse all posts in the Field Notes / Technical Writings section."
-            ),
-            "category": "Blogs",
-        }
-
-    # Projects
-    if "project" in query:
-        projects_list = "\n".join(
-            [
-                f"• **{p['name']}**: {p['achievements']}"
-                for p in PORTFOLIO_DATA["projects"][:4]
-            ]
-        )
-        return {
-            "answer": (
-                f"🚀 **Key Projects**:\n{projects_list}\n"
-                "• Live showcase cards pull from public GitHub repos "
-                "(GitHub Pages primary; Vercel demos may be offline while DEPLOYMENT_DISABLED)."
-            ),
-            "category": "Projects",
-        }
-
-    # Contact
-    if "contact" in query or "email" in query or "hiring" in query or "hire" in query:
-        email = PORTFOLIO_DATA["email"]
-        phone = PORTFOLIO_DATA["phone"]
-        linkedin = PORTFOLIO_DATA["linkedin"]
-        github = PORTFOLIO_DATA["github"]
-        return {
-            "answer": f"📫 **Contact Information**:\n• **Email**: {email}\n• **Phone**: {phone}\n• **LinkedIn**: {linkedin}\n• **GitHub**: {github}",
-            "category": "Contact",
-        }
-
-    # Experience
-    if _query_has_any_word(query, ["experience", "job", "work"]):
-        exp_list = "\n".join(
-            [
-                f"• **{e['title']}** at {e['company']} ({e['period']})"
-                for e in PORTFOLIO_DATA["experience"][:3]
-            ]
-        )
-        return {
-            "answer": f"💼 **Professional Experience**:\n{exp_list}",
-            "category": "Experience",
-        }
-
-    # Education
-    if (
-        "education" in query
-        or "degree" in query
-        or "university" in query
-        or "college" in query
-    ):
-        edu_list = "\n".join(
-            [
-                f"• **{e['degree']}** - {e['school']} ({e['period']})"
-                for e in PORTFOLIO_DATA.get("education", [])[:2]
-            ]
-        )
-        return {
-            "answer": f"🎓 **Education**:\n{edu_list}"
-            if edu_list
-            else "🎓 Mangesh holds a Master of Science in Computer Science from Drexel University (GPA 3.91/4.0, June 2023).",
-            "category": "Education",
-        }
-
-    # Achievements
-    if "achievement" in query or "award" in query or "accomplishment" in query:
-        return {
-            "answer": (
-                "🏆 **Key Achievements**:\n"
-                "• Refactored legacy Java monoliths with **20% code reduction** at IoasiZ\n"
-                "• Resolved **50+ critical microservices bugs** with JUnit/Mockito test suites\n"
-                "• Published Real-Time Face Emotion Recognition System research in **IJFGCN (2020)**\n"
-                "• Earned MS in Computer Science from Drexel University with **3.91 / 4.0 GPA**\n"
-                "• Honored as **Student of the Year** at Y.B. Patil Polytechnic (MSBTE)"
-            ),
-            "category": "Achievements",
-        }
-
-    # General World Knowledge & Trivia (e.g. Prime Minister of India, Capitals, Science)
-    if "prime minister" in query and "india" in query:
-        return {
-            "answer": "🇮🇳 The Prime Minister of India is **Narendra Modi**, serving as the 14th Prime Minister of India since May 2014.",
-            "category": "General Knowledge",
-        }
-
-    if "president" in query and "united states" in query or "president of us" in query:
-        return {
-            "answer": "🇺🇸 The President of the United States is **Joe Biden** (46th President).",
-            "category": "General Knowledge",
-        }
-
-    # Astrology (public high-level only — no private PII)
-    if any(k in query for k in ["horoscope", "astrology", "birth chart", "vedic"]):
-        return {
-            "answer": (
-                "✨ **Public personality notes**:\n"
-                "Mangesh shares a high-level interest in Vedic symbolism as cultural context. "
-                "Publicly he is described as **balanced, diplomatic, and analytically driven** — "
-                "aligned with a software-engineering career focused on systems thinking and clear communication.\n\n"
-                "For professional details (role, stack, projects, education), ask about experience or skills. "
-                "Private chart / family / medical details are not part of this portfolio assistant."
-            ),
-            "category": "Astrology",
-        }
-
-    # Foreign Settlement & USA Career Context
-    if any(k in query for k in ["foreign", "settlement", "abroad", "settle", "relocation", "visa", "h1b", "relocate", "usa career"]):
-        return {
-            "answer": (
-                "🌍 **USA career context (public)**:\n"
-                "Mangesh completed his **MSCS in the United States** and worked as a full-time **Software Development Engineer** "
-                "at IoasiZ in Piscataway, NJ. He continues global engineering work with interest in US tech opportunities "
-                "across the **Northeast corridor** and **West Coast** tech hubs.\n\n"
-                "Ask about experience, skills, or projects for hiring-oriented detail."
-            ),
-            "category": "Career",
-        }
-
-    # Personality Traits
-    if any(k in query for k in ["personality", "trait", "character"]):
-        return {
-            "answer": (
-                "🧠 **Working style**:\n"
-                "Colleagues and portfolio evidence emphasize **systems thinking**, resilience under delivery pressure, "
-                "and a pragmatic full-stack / AI engineering approach. He values clear communication and shipping production-quality software."
-            ),
-            "category": "About",
-        }
-
-    # Family — public assistant does not disclose private family details
-    if any(k in query for k in ["family", "parents", "mother", "father", "sister", "vidya", "meena", "bharat"]):
-        return {
-            "answer": (
-                "👨‍👩‍👧 **Family**:\n"
-                "AssistMe keeps family details private. For professional background, ask about "
-                "**experience**, **education**, **projects**, or **skills**."
-            ),
-            "category": "Family",
-        }
-
-    # Personal identity — no medical / home address disclosure
-    if any(
-        k in query
-        for k in [
-            "hinoji",
-            "birth name",
-            "call name",
-            "navaras",
-            "height",
-            "complexion",
-            "blood group",
-            "address",
-            "residence",
-            "hometown",
-        ]
-    ):
-        return {
-            "answer": (
-                "👤 **Public identity**:\n"
-                "• **Name**: Mangesh Bharat Raut\n"
-                "• **Languages**: English (professional), Marathi (native), Hindi\n"
-                "• **Professional locations**: CES (US / India hybrid engineering context)\n\n"
-                "Home address, medical data, and private cultural records are **not** shared by this assistant."
-            ),
-            "category": "Identity",
-        }
-
-    if is_usa_state_travel_query(query):
-        return {
-            "answer": f"🇺🇸 **USA Travel Coverage**\n\n{format_usa_state_summary()}",
-            "category": "Travel",
-        }
-
-    if site_context and _query_has_any_word(
-        query,
-        [
-            "travel",
-            "atlas",
-            "city",
-            "cities",
-            "monitor",
-            "system",
-            "api",
-            "backend",
-            "blog",
-            "website",
-            "page",
-        ],
-    ):
-        excerpt = site_context[:1800].rsplit(" ", 1)[0]
-        return {
-            "answer": (
-                "I found this in the public portfolio knowledge base:\n\n"
-                f"{excerpt}\n\n"
-                "Cloud AI is not configured in this environment, so this is a direct site-knowledge answer rather than a synthesized model response."
-            ),
-            "category": "Site Knowledge",
-        }
+def generate_local_response(
+    query: str, site_context: str = "", features: Optional[QueryFeatures] = None
+) -> Dict:
+    """Generate a meaningful response based on portfolio data without using an LLM.
 
-    # Default fallback
-    return {
-        "answer": "👋 I'm running in **Local Mode** (no cloud API key configured).\n\n**Available topics:**\n• Who is Mangesh?\n• Skills & Tech Stack\n• Recent Blogs (Google I/O 2026)\n• Projects\n• Experience\n• Education\n• Contact Info\n• Resume\n\nWhat would you like to know?",
-        "category": "System",
-    }
+    Scored against the precompiled intent table in ``api.local_intelligence``.
+    """
+    return answer_locally(query, site_context, features)
 
 
-async def handle_direct_command(message: str) -> Optional[Dict]:
+async def handle_direct_command(message: str, features: Optional[QueryFeatures] = None) -> Optional[Dict]:
     """Handle direct commands without AI"""
     lower = message.lower()
     now = datetime.now()
+    f = _features(message, features)
 
-    if is_usa_state_travel_query(lower):
+    if is_usa_state_travel_query(lower, f):
         return {
             "answer": f"🇺🇸 **USA Travel Coverage**\n\n{format_usa_state_summary()}",
             "source": "Site Knowledge",
@@ -488,7 +190,7 @@ async def handle_direct_command(message: str) -> Optional[Dict]:
             "web_tools": False,
         }
 
-    if is_blog_release_query(lower):
+    if is_blog_release_query(lower, f):
         return {
             "answer": f"📝 **Blog Releases**\n\n{format_blog_release_summary(lower)}",
             "source": "Site Knowledge",
@@ -501,7 +203,7 @@ async def handle_direct_command(message: str) -> Optional[Dict]:
             "web_tools": False,
         }
 
-    if is_changelog_query(lower):
+    if is_changelog_query(lower, f):
         return {
             "answer": f"🚀 **Recent Portfolio Releases**\n\n{format_recent_changelog_summary(5)}\n\nExplore all release notes and git commits at [/changelog](https://mangeshraut.pro/changelog)!",
             "source": "Site Knowledge",
@@ -514,7 +216,7 @@ async def handle_direct_command(message: str) -> Optional[Dict]:
             "web_tools": False,
         }
 
-    if is_music_query(lower):
+    if is_music_query(lower, f):
         from api.routes.media import lastfm_recent_cache, fetch_lastfm_recent_payload, LASTFM_API_KEY
         from urllib.parse import quote
         cached = (
@@ -580,7 +282,7 @@ async def handle_direct_command(message: str) -> Optional[Dict]:
         }
 
     # Resume download
-    if is_resume_query(message):
+    if is_resume_query(message, f):
         return {
             "answer": (
                 f"📄 You can download Mangesh's resume here: {PORTFOLIO_DATA['resume_url']}\n\n"
@@ -596,7 +298,7 @@ async def handle_direct_command(message: str) -> Optional[Dict]:
         }
 
     # Time (word-boundary — do not match "times" in math like "17 times 24")
-    if re.search(r"\b(what('?s| is)?\s+)?(the\s+)?(current\s+)?time\b", lower) and "timezone" not in lower:
+    if f.has("time") and not f.has("timezone"):
         return {
             "answer": f"⏰ Current time is {now.strftime('%I:%M %p')}",
             "source": "System",
@@ -607,9 +309,7 @@ async def handle_direct_command(message: str) -> Optional[Dict]:
         }
 
     # Date (word-boundary — avoid false hits like "candidate")
-    if re.search(r"\b(what('?s| is)?\s+)?(the\s+)?(current\s+)?date\b", lower) or re.search(
-        r"\btoday\b", lower
-    ):
+    if f.has("date"):
         return {
             "answer": f"📅 Today is {now.strftime('%A, %B %d, %Y')}. It's a great day to hire a Software Engineer!",
             "source": "System",
@@ -622,50 +322,85 @@ async def handle_direct_command(message: str) -> Optional[Dict]:
     return None
 
 
-async def stream_static_chat_response(payload: Dict, start_time: float) -> AsyncGenerator[str, None]:
-    """Stream deterministic/local answers through the same NDJSON contract as AI responses."""
-    answer = payload.get("answer", "")
-    chunk_size = 72
-    chunk_count = 0
+async def stream_static_chat_response(
+    payload: Dict,
+    start_time: float,
+    extra_metadata: Optional[Dict] = None,
+) -> AsyncGenerator[Dict, None]:
+    """Stream deterministic/local answers through the same chunk/done events as AI responses.
 
-    yield json.dumps({"type": "typing", "status": "stop"}) + "\n"
+    The answer is already complete, so it goes out as one chunk with no simulated typing.
+    """
+    answer = payload.get("answer", "")
 
-    for current_pos in range(0, len(answer), chunk_size):
-        chunk_count += 1
-        yield (
-            json.dumps(
-                {
-                    "type": "chunk",
-                    "content": answer[current_pos : current_pos + chunk_size],
-                    "chunk_id": chunk_count,
-                }
-            )
-            + "\n"
-        )
-        await asyncio.sleep(0)
+    yield {"type": "typing", "status": "stop"}
+    if answer:
+        yield {"type": "chunk", "content": answer}
 
     elapsed_ms = int((time.time() - start_time) * 1000)
-    yield (
-        json.dumps(
-            {
-                "type": "done",
-                "full_content": answer,
-                "metadata": {
-                    "model": payload.get("model", "Local-FastAPI"),
-                    "source": payload.get("source", "Local Intelligence"),
-                    "sourceLabel": payload.get("source", "Local Intelligence"),
-                    "category": payload.get("category", "General"),
-                    "confidence": payload.get("confidence", 1.0),
-                    "knowledge_context": payload.get("knowledge_context", False),
-                    "web_tools": payload.get("web_tools", False),
-                    "char_count": len(answer),
-                    "tokens_estimate": max(1, len(answer) // 4),
-                    "elapsed_ms": elapsed_ms,
-                    "chunks": chunk_count,
-                },
-            }
-        )
-        + "\n"
+    yield {
+        "type": "done",
+        "full_content": answer,
+        "metadata": {
+            "model": payload.get("model", "Local-FastAPI"),
+            "source": payload.get("source", "Local Intelligence"),
+            "sourceLabel": payload.get("source", "Local Intelligence"),
+            "category": payload.get("category", "General"),
+            "confidence": payload.get("confidence", 1.0),
+            "knowledge_context": payload.get("knowledge_context", False),
+            "web_tools": payload.get("web_tools", False),
+            "char_count": len(answer),
+            "tokens_estimate": max(1, len(answer) // 4),
+            "elapsed_ms": elapsed_ms,
+            "chunks": 1 if answer else 0,
+            **(extra_metadata or {}),
+        },
+    }
+
+
+def _cached_chat_payload(entry: Dict, start_time: float, session_id: str) -> Dict:
+    """Rebuild the non-streaming OpenRouter response shape from a cache entry."""
+    return {
+        "answer": entry["answer"],
+        "source": "OpenRouter",
+        "model": entry.get("model", ""),
+        "routing_tier": entry.get("routing_tier"),
+        "session_id": session_id,
+        "session_token": create_session_token(session_id) if session_id else None,
+        "category": "General",
+        "confidence": 0.95,
+        "runtime": f"{int((time.time() - start_time) * 1000)}ms",
+        "usage": entry.get("usage"),
+        "timestamp": int(time.time() * 1000),
+        "knowledge_context": entry.get("knowledge_context", False),
+        "web_tools": False,
+        "web_engine": None,
+        "cache": "hit",
+        "cached_at": entry.get("cached_at"),
+    }
+
+
+def stream_cached_chat_response(entry: Dict, start_time: float) -> AsyncGenerator[Dict, None]:
+    """Replay a cached AI answer with the same chunk/done events as a live stream."""
+    model = entry.get("model", "")
+    payload = {
+        "answer": entry["answer"],
+        "model": model,
+        "source": "OpenRouter",
+        "category": "AI Response",
+        "confidence": 0.95,
+        "knowledge_context": entry.get("knowledge_context", False),
+        "web_tools": False,
+    }
+    return stream_static_chat_response(
+        payload,
+        start_time,
+        {
+            "sourceLabel": f"OpenRouter ({model.split('/')[-1]})",
+            "routing_tier": entry.get("routing_tier"),
+            "cache": "hit",
+            "cached_at": entry.get("cached_at"),
+        },
     )
 
 
@@ -715,6 +450,8 @@ def build_local_chat_payload(
     override = _upstream_fallback_answer(reason, site_context)
     # Prefer honest upstream failure copy over the misleading "no API key" blurb.
     answer = fallback["answer"]
+    if reason not in ("Local Intelligence", "no_key") and system_monitor:
+        system_monitor.record_upstream_failure("POST:/api/chat")
     if override and reason not in ("Local Intelligence", "no_key"):
         lower_answer = answer.lower()
         if (
@@ -742,6 +479,207 @@ def _fallback_models(model: str) -> List[str]:
     return build_model_fallback_chain(model)
 
 
+async def _pump_openrouter_stream(
+    candidate_model: str,
+    messages: List[Dict],
+    queue: "asyncio.Queue[Tuple[str, str, Optional[str]]]",
+    *,
+    web_tools_enabled: bool,
+    session_id: Optional[str],
+) -> None:
+    """Stream one model into ``queue`` as ``(model, kind, payload)`` events.
+
+    ``kind`` is ``"chunk"`` (payload = content delta), then exactly one of
+    ``"end"`` or ``"error"`` (payload = reason, or None to keep the last one),
+    whatever the failure — only cancellation ends the pump without one.
+    """
+    try:
+        client = get_http_client("openrouter")
+        async with client.stream(
+            "POST",
+            API_URL,
+            headers={
+                "Authorization": f"Bearer {get_openrouter_api_key()}",
+                "Content-Type": "application/json",
+                "HTTP-Referer": get_site_url(),
+                "X-Title": get_site_title(),
+            },
+            json=openrouter_request_body(
+                candidate_model,
+                messages,
+                stream=True,
+                web_tools_enabled=web_tools_enabled,
+                session_id=session_id,
+            ),
+        ) as response:
+            if response.status_code != 200:
+                await response.aread()
+                logger.error(
+                    f"❌ OpenRouter API error for {candidate_model}: "
+                    f"status={response.status_code}"
+                )
+                reason = f"OpenRouter HTTP {response.status_code}" + (
+                    " insufficient credits" if response.status_code == 402 else ""
+                )
+                model_scoreboard.record_error(candidate_model, reason, response.status_code)
+                await queue.put((candidate_model, "error", reason))
+                return
+
+            async for line in response.aiter_lines():
+                if not line or not line.startswith("data: "):
+                    continue
+
+                data = line[6:]
+                if data == "[DONE]":
+                    break
+
+                try:
+                    json_data = json.loads(data)
+                    # Surface provider error payloads instead of treating as empty success
+                    err = json_data.get("error")
+                    if err:
+                        message = err.get("message") if isinstance(err, dict) else str(err)
+                        code = err.get("code") if isinstance(err, dict) else None
+                        model_scoreboard.record_error(
+                            candidate_model, message or "stream error", code if isinstance(code, int) else None
+                        )
+                        await queue.put((candidate_model, "error", message or None))
+                        return
+                    content = (
+                        json_data.get("choices", [{}])[0]
+                        .get("delta", {})
+                        .get("content", "")
+                    )
+                except (ValueError, AttributeError, IndexError, TypeError):
+                    continue
+
+                if content:
+                    await queue.put((candidate_model, "chunk", content))
+        await queue.put((candidate_model, "end", None))
+    except (httpx.RemoteProtocolError, httpx.ReadError, httpx.ReadTimeout) as e:
+        logger.warning(f"⚠️ Stream connection error for {candidate_model}: {type(e).__name__}")
+        model_scoreboard.record_error(candidate_model, type(e).__name__)
+        await queue.put((candidate_model, "error", f"OpenRouter timeout ({type(e).__name__})"))
+    except httpx.HTTPStatusError as e:
+        logger.error(f"❌ OpenRouter HTTP error for {candidate_model}: {e.response.status_code}")
+        model_scoreboard.record_error(candidate_model, "HTTPStatusError", e.response.status_code)
+        await queue.put((candidate_model, "error", f"OpenRouter HTTP {e.response.status_code}"))
+    except httpx.RequestError as e:
+        logger.error(f"❌ Request error for {candidate_model}: {str(e)}")
+        model_scoreboard.record_error(candidate_model, type(e).__name__)
+        await queue.put((candidate_model, "error", f"OpenRouter network ({type(e).__name__})"))
+    except Exception as e:  # always end with a terminal event so the hedge loop never waits on a dead pump
+        logger.error(f"❌ Unexpected stream failure for {candidate_model}: {type(e).__name__}", exc_info=True)
+        model_scoreboard.record_error(candidate_model, type(e).__name__)
+        await queue.put((candidate_model, "error", f"OpenRouter stream failed ({type(e).__name__})"))
+
+
+async def _hedged_openrouter_stream(
+    candidates: Iterator[str],
+    messages: List[Dict],
+    *,
+    web_tools_enabled: bool,
+    session_id: Optional[str],
+    hedge_delay: float,
+    max_parallel: int,
+) -> AsyncGenerator[Tuple[str, str, Optional[str]], None]:
+    """Race fallback models and relay the first one to deliver content.
+
+    Candidates start one at a time. When the newest one has not produced a
+    first token within ``hedge_delay`` seconds, the next candidate starts in
+    parallel (up to ``max_parallel`` streams); a candidate that fails before
+    its first token is replaced immediately. The first stream to yield content
+    wins and the others are cancelled.
+
+    Yields ``("error", model, reason)`` for each candidate that failed before
+    its first token, then the winner's ``("chunk", model, content)`` events
+    and its terminal ``("end" | "error", model, reason)``. Candidates not yet
+    started stay in ``candidates`` for the caller's next attempt.
+    """
+    loop = asyncio.get_running_loop()
+    queue: "asyncio.Queue[Tuple[str, str, Optional[str]]]" = asyncio.Queue()
+    active: Dict[str, asyncio.Task] = {}
+    started: Dict[str, float] = {}
+    hedged: Set[str] = set()
+    last_launch = 0.0
+    exhausted = False
+    winner: Optional[str] = None
+
+    def launch() -> Optional[str]:
+        nonlocal last_launch, exhausted
+        candidate = next(candidates, None)
+        if candidate is None:
+            exhausted = True
+            return None
+        last_launch = started[candidate] = loop.time()
+        active[candidate] = asyncio.create_task(
+            _pump_openrouter_stream(
+                candidate,
+                messages,
+                queue,
+                web_tools_enabled=web_tools_enabled,
+                session_id=session_id,
+            )
+        )
+        return candidate
+
+    if system_monitor:
+        system_monitor.record_hedge("streams")
+    launch()
+    try:
+        while active:
+            timeout = None
+            if winner is None and hedge_delay > 0 and len(active) < max_parallel and not exhausted:
+                timeout = max(0.0, last_launch + hedge_delay - loop.time())
+            try:
+                candidate, kind, payload = await asyncio.wait_for(queue.get(), timeout)
+            except asyncio.TimeoutError:
+                hedge = launch()
+                if hedge:
+                    hedged.add(hedge)
+                    logger.info("⏱️ No first token after %.2fs; hedging with %s", hedge_delay, hedge)
+                    if system_monitor:
+                        system_monitor.record_hedge("hedges_launched")
+                continue
+
+            if winner is not None and candidate != winner:
+                continue  # late event from a cancelled loser
+
+            if kind == "chunk":
+                if winner is None:
+                    winner = candidate
+                    now = loop.time()
+                    model_scoreboard.record_first_token(candidate, now - started[candidate])
+                    if system_monitor:
+                        system_monitor.record_model_ttft(candidate, now - started[candidate])
+                        if candidate in hedged:
+                            system_monitor.record_hedge("hedge_wins")
+                    for other in [name for name in active if name != candidate]:
+                        active.pop(other).cancel()
+                        model_scoreboard.record_lost_race(other, now - started[other])
+                yield kind, candidate, payload
+                continue
+
+            active.pop(candidate, None)
+            if candidate == winner:
+                yield kind, candidate, payload
+                return
+
+            if kind == "end":
+                payload = f"Empty/garbage stream from {candidate}"
+                logger.warning("⚠️ Skipping empty/garbage stream from %s", candidate)
+                model_scoreboard.record_garbage(candidate)
+            yield "error", candidate, payload
+            if not active:
+                launch()
+    finally:
+        pending = list(active.values())
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+
 async def stream_openrouter_response(
     model: str,
     messages: List[Dict],
@@ -750,8 +688,11 @@ async def stream_openrouter_response(
     knowledge_context_enabled: bool = False,
     routing_tier: str = "auto",
     site_context: str = "",
-) -> AsyncGenerator[str, None]:
-    """Enhanced streaming with robust error handling and retries"""
+) -> AsyncGenerator[Dict, None]:
+    """Stream chat events (typing/chunk/done dicts) with hedged model fallback and retries.
+
+    Events are framed for the wire by ``ChatStreamWriter``.
+    """
     logger.info(
         f"Streaming from OpenRouter: {model} tier={routing_tier} "
         f"(site_context={knowledge_context_enabled}, web_tools={web_tools_enabled})"
@@ -767,212 +708,117 @@ async def stream_openrouter_response(
         # Generate local response with portfolio site knowledge when available
         fallback = generate_local_response(user_msg, site_context)
 
-        # Simulate typing
-        yield json.dumps({"type": "typing", "status": "start"}) + "\n"
-        await asyncio.sleep(0.6)
-        yield json.dumps({"type": "typing", "status": "stop"}) + "\n"
-
-        # Stream the fallback response
-        full_text = fallback["answer"]
-        chunk_size = 4
-        current_pos = 0
-
-        while current_pos < len(full_text):
-            chunk = full_text[current_pos : current_pos + chunk_size]
-            current_pos += chunk_size
-            yield (
-                json.dumps(
-                    {
-                        "type": "chunk",
-                        "content": chunk,
-                        "chunk_id": current_pos // chunk_size,
-                    }
-                )
-                + "\n"
-            )
-            await asyncio.sleep(0.02)
-
-        # Send done signal
-        yield (
-            json.dumps(
-                {
-                    "type": "done",
-                    "full_content": full_text,
-                    "metadata": {
-                        "model": "Local-FastAPI",
-                        "source": "Local Intelligence",
-                        "sourceLabel": "Local Dev Mode",
-                        "category": fallback.get("category", "General"),
-                        "confidence": 1.0,
-                        "tokens_estimate": len(full_text) // 4,
-                        "elapsed_ms": 600,
-                    },
-                }
-            )
-            + "\n"
-        )
+        yield {"type": "typing", "status": "start"}
+        local_payload = {
+            "answer": fallback["answer"],
+            "model": "Local-FastAPI",
+            "source": "Local Intelligence",
+            "category": fallback.get("category", "General"),
+            "knowledge_context": bool(site_context),
+        }
+        async for event in stream_static_chat_response(
+            local_payload, time.time(), {"sourceLabel": "Local Dev Mode"}
+        ):
+            yield event
         return
 
     # Send typing indicator start
-    yield json.dumps({"type": "typing", "status": "start"}) + "\n"
+    yield {"type": "typing", "status": "start"}
 
     max_retries = 2
     retry_count = 0
     full_content = ""
     chunk_count = 0
     start_time = time.time()
+    typing_stopped = False
     last_upstream_reason = "OpenRouter upstream unavailable"
+    hedge_delay = get_openrouter_hedge_delay()
+    hedge_max_parallel = get_openrouter_hedge_max_parallel()
 
     while retry_count <= max_retries:
         if retry_count > 0:
             logger.info(f"🔄 Retrying stream (attempt {retry_count}/{max_retries})...")
+
+        candidates = iter(_fallback_models(model))
+        while True:
             full_content = ""
             chunk_count = 0
+            winner: Optional[str] = None
+            outcome = "error"
+            first_token_at = 0.0
+
+            async for kind, candidate_model, payload in _hedged_openrouter_stream(
+                candidates,
+                messages,
+                web_tools_enabled=web_tools_enabled,
+                session_id=session_id,
+                hedge_delay=hedge_delay,
+                max_parallel=hedge_max_parallel,
+            ):
+                if kind == "chunk":
+                    if winner is None:
+                        winner = candidate_model
+                        first_token_at = time.time()
+                        if not typing_stopped:
+                            typing_stopped = True
+                            yield {"type": "typing", "status": "stop"}
+                    full_content += payload
+                    chunk_count += 1
+                    yield {"type": "chunk", "content": payload}
+                elif kind == "error":
+                    last_upstream_reason = payload or last_upstream_reason
+                else:
+                    outcome = kind
+
+            if winner is None:
+                # Every remaining candidate failed before its first token.
+                break
+
+            # Mid-stream provider error or classifier junk → try the remaining fallback models
+            if outcome != "end" or _is_garbage_chat_answer(full_content, winner):
+                if outcome == "end":
+                    last_upstream_reason = f"Empty/garbage stream from {winner}"
+                    model_scoreboard.record_garbage(winner)
+                logger.warning("⚠️ Skipping empty/garbage stream from %s", winner)
+                continue
 
-        for candidate_model in _fallback_models(model):
-            try:
-                async with httpx.AsyncClient(
-                    timeout=httpx.Timeout(60.0, connect=10.0)
-                ) as client:
-                    async with client.stream(
-                        "POST",
-                        API_URL,
-                        headers={
-                            "Authorization": f"Bearer {get_openrouter_api_key()}",
-                            "Content-Type": "application/json",
-                            "HTTP-Referer": get_site_url(),
-                            "X-Title": get_site_title(),
-                        },
-                        json=openrouter_request_body(
-                            candidate_model,
-                            messages,
-                            stream=True,
-                            web_tools_enabled=web_tools_enabled,
-                            session_id=session_id,
-                        ),
-                    ) as response:
-                        if response.status_code != 200:
-                            await response.aread()
-                            last_upstream_reason = (
-                                f"OpenRouter HTTP {response.status_code}"
-                                + (
-                                    " insufficient credits"
-                                    if response.status_code == 402
-                                    else ""
-                                )
-                            )
-                            logger.error(
-                                f"❌ OpenRouter API error for {candidate_model}: "
-                                f"status={response.status_code}"
-                            )
-                            continue
-
-                        model = candidate_model
-                        if retry_count == 0:
-                            yield json.dumps({"type": "typing", "status": "stop"}) + "\n"
-
-                        async for line in response.aiter_lines():
-                            if not line or not line.startswith("data: "):
-                                continue
-
-                            data = line[6:]
-                            if data == "[DONE]":
-                                break
-
-                            try:
-                                json_data = json.loads(data)
-                                # Surface provider error payloads instead of treating as empty success
-                                err = json_data.get("error")
-                                if err:
-                                    last_upstream_reason = (
-                                        err.get("message")
-                                        if isinstance(err, dict)
-                                        else str(err)
-                                    ) or last_upstream_reason
-                                    full_content = ""
-                                    break
-                                content = (
-                                    json_data.get("choices", [{}])[0]
-                                    .get("delta", {})
-                                    .get("content", "")
-                                )
-
-                                if content:
-                                    full_content += content
-                                    chunk_count += 1
-                                    yield (
-                                        json.dumps(
-                                            {
-                                                "type": "chunk",
-                                                "content": content,
-                                                "chunk_id": chunk_count,
-                                            }
-                                        )
-                                        + "\n"
-                                    )
-                            except BaseException:
-                                continue
-
-                        # Empty / classifier-junk stream → try free-tier fallback models
-                        if not full_content or _is_garbage_chat_answer(full_content, model):
-                            last_upstream_reason = (
-                                f"Empty/garbage stream from {candidate_model}"
-                            )
-                            logger.warning(
-                                "⚠️ Skipping empty/garbage stream from %s",
-                                candidate_model,
-                            )
-                            full_content = ""
-                            chunk_count = 0
-                            continue
-
-                        elapsed = time.time() - start_time
-                        tokens_estimate = len(full_content) // 4
-                        tokens_per_sec = (
-                            tokens_estimate / elapsed if elapsed > 0 else 0
-                        )
+            model = winner
+            elapsed = time.time() - start_time
+            tokens_estimate = len(full_content) // 4
+            model_scoreboard.record_success(
+                model, tokens=tokens_estimate, elapsed=time.time() - first_token_at
+            )
+            if system_monitor:
+                system_monitor.record_ai_usage(model, output_tokens=tokens_estimate)
+            tokens_per_sec = (
+                tokens_estimate / elapsed if elapsed > 0 else 0
+            )
 
-                        yield (
-                            json.dumps(
-                                {
-                                    "type": "done",
-                                    "full_content": full_content,
-                                    "metadata": {
-                                        "model": model,
-                                        "source": "OpenRouter",
-                                        "sourceLabel": (
-                                            f"OpenRouter + Web ({model.split('/')[-1]})"
-                                            if web_tools_enabled
-                                            else f"OpenRouter ({model.split('/')[-1]})"
-                                        ),
-                                        "category": "AI Response",
-                                        "knowledge_context": knowledge_context_enabled,
-                                        "web_tools": web_tools_enabled,
-                                        "web_engine": "parallel" if web_tools_enabled else None,
-                                        "routing_tier": routing_tier,
-                                        "char_count": len(full_content),
-                                        "tokens_estimate": tokens_estimate,
-                                        "elapsed_ms": int(elapsed * 1000),
-                                        "tokens_per_sec": round(tokens_per_sec, 2),
-                                        "chunks": chunk_count,
-                                    },
-                                }
-                            )
-                            + "\n"
-                        )
-                        return
-            except (httpx.RemoteProtocolError, httpx.ReadError, httpx.ReadTimeout) as e:
-                last_upstream_reason = f"OpenRouter timeout ({type(e).__name__})"
-                logger.warning(f"⚠️ Stream connection error for {candidate_model}: {type(e).__name__}")
-                continue
-            except httpx.HTTPStatusError as e:
-                last_upstream_reason = f"OpenRouter HTTP {e.response.status_code}"
-                logger.error(f"❌ OpenRouter HTTP error for {candidate_model}: {e.response.status_code}")
-                continue
-            except httpx.RequestError as e:
-                last_upstream_reason = f"OpenRouter network ({type(e).__name__})"
-                logger.error(f"❌ Request error for {candidate_model}: {str(e)}")
-                continue
+            yield {
+                "type": "done",
+                "full_content": full_content,
+                "metadata": {
+                    "model": model,
+                    "source": "OpenRouter",
+                    "sourceLabel": (
+                        f"OpenRouter + Web ({model.split('/')[-1]})"
+                        if web_tools_enabled
+                        else f"OpenRouter ({model.split('/')[-1]})"
+                    ),
+                    "category": "AI Response",
+                    "knowledge_context": knowledge_context_enabled,
+                    "web_tools": web_tools_enabled,
+                    "web_engine": "parallel" if web_tools_enabled else None,
+                    "routing_tier": routing_tier,
+                    "char_count": len(full_content),
+                    "tokens_estimate": tokens_estimate,
+                    "elapsed_ms": int(elapsed * 1000),
+                    "ttft_ms": int((first_token_at - start_time) * 1000),
+                    "tokens_per_sec": round(tokens_per_sec, 2),
+                    "chunks": chunk_count,
+                },
+            }
+            return
 
         retry_count += 1
         await asyncio.sleep(0.5)
@@ -1021,54 +867,91 @@ async def call_openrouter(
         raise Exception("API key not configured")
 
     last_error: Optional[Exception] = None
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        for candidate_model in _fallback_models(model):
-            try:
-                response = await client.post(
-                    API_URL,
-                    headers={
-                        "Authorization": f"Bearer {get_openrouter_api_key()}",
-                        "Content-Type": "application/json",
-                        "HTTP-Referer": get_site_url(),
-                        "X-Title": get_site_title(),
-                    },
-                    json=openrouter_request_body(
-                        candidate_model,
-                        messages,
-                        web_tools_enabled=web_tools_enabled,
-                        session_id=session_id,
-                    ),
+    client = get_http_client("openrouter")
+    for candidate_model in _fallback_models(model):
+        attempt_start = time.time()
+        try:
+            response = await client.post(
+                API_URL,
+                headers={
+                    "Authorization": f"Bearer {get_openrouter_api_key()}",
+                    "Content-Type": "application/json",
+                    "HTTP-Referer": get_site_url(),
+                    "X-Title": get_site_title(),
+                },
+                json=openrouter_request_body(
+                    candidate_model,
+                    messages,
+                    web_tools_enabled=web_tools_enabled,
+                    session_id=session_id,
+                ),
+                timeout=30.0,
+            )
+            response.raise_for_status()
+            data = response.json()
+
+            if not data.get("choices"):
+                raise Exception("Invalid response")
+
+            answer = (data["choices"][0]["message"].get("content") or "").strip()
+            resolved_model = data.get("model", candidate_model)
+            if _is_garbage_chat_answer(answer, resolved_model):
+                logger.warning(
+                    "⚠️ Skipping garbage non-stream answer from %s (chars=%s)",
+                    resolved_model,
+                    len(answer),
                 )
-                response.raise_for_status()
-                data = response.json()
-
-                if not data.get("choices"):
-                    raise Exception("Invalid response")
-
-                answer = (data["choices"][0]["message"].get("content") or "").strip()
-                resolved_model = data.get("model", candidate_model)
-                if _is_garbage_chat_answer(answer, resolved_model):
-                    logger.warning(
-                        "⚠️ Skipping garbage non-stream answer from %s (chars=%s)",
-                        resolved_model,
-                        len(answer),
-                    )
-                    last_error = Exception(f"Garbage answer from {resolved_model}")
-                    continue
-
-                return {
-                    "answer": answer,
-                    "usage": data.get("usage"),
-                    "model": resolved_model,
-                }
-            except Exception as exc:
-                last_error = exc
-                logger.error(f"❌ OpenRouter non-stream error for {candidate_model}: {exc}", exc_info=True)
+                last_error = Exception(f"Garbage answer from {resolved_model}")
+                model_scoreboard.record_garbage(candidate_model)
                 continue
 
+            usage = data.get("usage") or {}
+            model_scoreboard.record_success(
+                candidate_model,
+                tokens=int(usage.get("completion_tokens") or len(answer) // 4),
+                elapsed=time.time() - attempt_start,
+            )
+            if system_monitor:
+                system_monitor.record_ai_usage(
+                    resolved_model,
+                    input_tokens=int(usage.get("prompt_tokens") or 0),
+                    output_tokens=int(usage.get("completion_tokens") or len(answer) // 4),
+                )
+            return {
+                "answer": answer,
+                "usage": data.get("usage"),
+                "model": resolved_model,
+            }
+        except Exception as exc:
+            last_error = exc
+            status_code = exc.response.status_code if isinstance(exc, httpx.HTTPStatusError) else None
+            model_scoreboard.record_error(candidate_model, type(exc).__name__, status_code)
+            logger.error(f"❌ OpenRouter non-stream error for {candidate_model}: {exc}", exc_info=True)
+            continue
+
     raise last_error or Exception("OpenRouter request failed")
 
 
+def _chat_streaming_response(
+    events: AsyncGenerator[Dict, None],
+    request: ChatRequest,
+    req: Request,
+    session_id: str,
+) -> StreamingResponse:
+    """Frame chat events as NDJSON (default) or SSE, as negotiated by the client."""
+    writer = ChatStreamWriter(negotiate_stream_format(request.stream_format, req.headers.get("accept", "")))
+    return StreamingResponse(
+        writer.stream(events),
+        media_type=writer.media_type,
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+            "X-Session-ID": session_id,
+            "X-Session-Token": create_session_token(session_id) if session_id else "",
+        },
+    )
+
+
 @router.post("/chat")
 @router.post("/api/chat")
 async def chat_endpoint(request: ChatRequest, req: Request):
@@ -1078,7 +961,7 @@ async def chat_endpoint(request: ChatRequest, req: Request):
     message = sanitize_chat_text(request.message)
 
     # Rate limiting
-    if not check_rate_limit(client_ip):
+    if not await check_rate_limit(client_ip):
         if system_monitor is not None:
             system_monitor.log_event(
                 "Rate limit exceeded for chat client",
@@ -1097,8 +980,11 @@ async def chat_endpoint(request: ChatRequest, req: Request):
     if not message:
         raise HTTPException(status_code=400, detail="Message cannot be empty")
 
+    # One keyword pass shared by the guard, direct commands, routing and local answers.
+    features = classify_query(message)
+
     # Prompt injection guard
-    if is_prompt_injection(message):
+    if is_prompt_injection(message, features):
         logger.warning(f"🛡️  Prompt injection detected from {client_ip}: chars={len(message)}")
         return {
             "answer": "I noticed your message contains instructions that try to change my behaviour. I'm here to help you learn about Mangesh's portfolio — feel free to ask me anything about that!",
@@ -1111,29 +997,22 @@ async def chat_endpoint(request: ChatRequest, req: Request):
 
     safe_context = sanitize_context(request.context)
     site_context = retrieve_site_context(message, safe_context)
-    web_tools_enabled = should_use_web_tools(message, site_context)
+    web_tools_enabled = should_use_web_tools(message, site_context, features)
     session_id = sanitize_session_id(request.session_id)
     safe_images = sanitize_chat_images(getattr(request, "images", None))
 
-    direct_response = await handle_direct_command(message)
+    direct_response = await handle_direct_command(message, features)
     if direct_response:
         direct_response["runtime"] = f"{int((time.time() - start_time) * 1000)}ms"
         if request.stream:
-            return StreamingResponse(
-                stream_static_chat_response(direct_response, start_time),
-                media_type="application/x-ndjson",
-                headers={
-                    "Cache-Control": "no-cache",
-                    "X-Accel-Buffering": "no",
-                    "X-Session-ID": session_id,
-                    "X-Session-Token": create_session_token(session_id) if session_id else "",
-                },
+            return _chat_streaming_response(
+                stream_static_chat_response(direct_response, start_time), request, req, session_id
             )
         return direct_response
 
     if not get_openrouter_api_key():
         logger.warning("⚠️ No API key - using Local Intelligence fallback")
-        fallback = generate_local_response(message, site_context)
+        fallback = generate_local_response(message, site_context, features)
         elapsed = time.time() - start_time
         payload = {
             "answer": fallback["answer"],
@@ -1147,15 +1026,8 @@ async def chat_endpoint(request: ChatRequest, req: Request):
             "web_tools": False,
         }
         if request.stream:
-            return StreamingResponse(
-                stream_static_chat_response(payload, start_time),
-                media_type="application/x-ndjson",
-                headers={
-                    "Cache-Control": "no-cache",
-                    "X-Accel-Buffering": "no",
-                    "X-Session-ID": session_id,
-                    "X-Session-Token": create_session_token(session_id) if session_id else "",
-                },
+            return _chat_streaming_response(
+                stream_static_chat_response(payload, start_time), request, req, session_id
             )
         return payload
 
@@ -1190,17 +1062,38 @@ async def chat_endpoint(request: ChatRequest, req: Request):
             site_context=site_context,
             stream=bool(request.stream),
             has_images=bool(safe_images),
+            features=features,
         )
         if routed_web:
             web_tools_enabled = True
 
+        # Fresh text-only questions without live web data can be answered from cache.
+        cache_key = None
+        if chat_response_cache.enabled and not (history or safe_images or safe_context or web_tools_enabled):
+            cache_key = build_response_cache_key(
+                message,
+                routing_tier=routing_tier,
+                model=selected_model,
+                site_context=site_context or "",
+            )
+            cached = await chat_response_cache.get(cache_key)
+            if cached:
+                if session_id:
+                    update_session_memory(session_id, message, cached["answer"])
+                if request.stream:
+                    return _chat_streaming_response(
+                        stream_cached_chat_response(cached, start_time), request, req, session_id
+                    )
+                return _cached_chat_payload(cached, start_time, session_id)
+
         # Streaming response
         if request.stream:
 
             async def generate_stream():
                 full_response = ""
+                done_metadata: Dict = {}
                 try:
-                    async for chunk in stream_openrouter_response(
+                    async for event in stream_openrouter_response(
                         selected_model,
                         conversation,
                         session_id,
@@ -1212,33 +1105,28 @@ async def chat_endpoint(request: ChatRequest, req: Request):
                         if await req.is_disconnected():
                             logger.info("Chat client disconnected; stopping upstream stream")
                             break
-                        yield chunk
-                        try:
-                            # NDJSON chunks have trailing \n — strip before parsing
-                            data = json.loads(chunk.rstrip())
-                            if data.get("type") == "done":
-                                full_response = data.get("full_content", "")
-                        except json.JSONDecodeError:
-                            pass
-                        except Exception:
-                            pass
+                        yield event
+                        if event.get("type") == "done":
+                            full_response = event.get("full_content", "")
+                            done_metadata = event.get("metadata") or {}
 
                     if full_response and session_id and not await req.is_disconnected():
                         update_session_memory(session_id, message, full_response)
+                    if cache_key and full_response and done_metadata.get("source") == "OpenRouter":
+                        await chat_response_cache.set(
+                            cache_key,
+                            {
+                                "answer": full_response,
+                                "model": done_metadata.get("model", selected_model),
+                                "routing_tier": routing_tier,
+                                "knowledge_context": bool(site_context),
+                            },
+                        )
                 except asyncio.CancelledError:
                     logger.info("Chat stream cancelled after client disconnect")
                     raise
 
-            return StreamingResponse(
-                generate_stream(),
-                media_type="application/x-ndjson",
-                headers={
-                    "Cache-Control": "no-cache",
-                    "X-Accel-Buffering": "no",
-                    "X-Session-ID": session_id,
-                    "X-Session-Token": create_session_token(session_id) if session_id else "",
-                },
-            )
+            return _chat_streaming_response(generate_stream(), request, req, session_id)
 
         # Non-streaming response
         response = await call_openrouter(
@@ -1265,6 +1153,17 @@ async def chat_endpoint(request: ChatRequest, req: Request):
 
         if session_id:
             update_session_memory(session_id, message, response["answer"])
+        if cache_key:
+            await chat_response_cache.set(
+                cache_key,
+                {
+                    "answer": response["answer"],
+                    "model": response["model"],
+                    "routing_tier": routing_tier,
+                    "usage": response.get("usage"),
+                    "knowledge_context": bool(site_context),
+                },
+            )
 
         return result
 
@@ -1320,12 +1219,11 @@ async def chat_health():
         provider_status = "configured"
         message = "OpenRouter API key is configured."
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    "https://openrouter.ai/api/v1/models",
-                    headers={"Authorization": f"Bearer {api_key}"},
-                    timeout=5.0,
-                )
+            response = await get_http_client("openrouter").get(
+                "https://openrouter.ai/api/v1/models",
+                headers={"Authorization": f"Bearer {api_key}"},
+                timeout=5.0,
+            )
             if response.status_code == 200:
                 status = "healthy"
                 provider_status = "online"
@@ -1347,6 +1245,7 @@ async def chat_health():
         "online": bool(api_key) and provider_status in ("online", "configured"),
         "local_only": not bool(api_key) or provider_status == "local_only",
         "streaming": "ndjson",
+        "stream_formats": ["ndjson", "sse"],
         "model": model,
         "fallback_models": list(build_model_fallback_chain(model))[:6],
         "message": message,
@@ -19,6 +19,7 @@ from api.config import (
     check_rate_limit,
     get_client_ip,
 )
+from api.http_clients import get_http_client
 
 router = APIRouter()
 
@@ -61,7 +62,7 @@ async def api_root():
 async def send_contact_message(payload: ContactMessage, req: Request):
     """Save contact form submission to Firestore via REST API."""
     client_ip = get_client_ip(req)
-    if not check_rate_limit(f"contact:{client_ip}"):
+    if not await check_rate_limit(f"contact:{client_ip}"):
         raise api_error(
             code="RATE_LIMITED",
             message="Too many contact submissions. Please wait before trying again.",
@@ -109,8 +110,8 @@ async def send_contact_message(payload: ContactMessage, req: Request):
     }
 
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            resp = await client.post(url, json=doc_fields)
+        client = get_http_client("firestore")
+        resp = await client.post(url, json=doc_fields, timeout=10.0)
 
         if not resp.is_success:
             error_body = resp.text
@@ -138,7 +139,7 @@ def _newsletter_doc_id(email: str) -> str:
 async def subscribe_newsletter(payload: NewsletterSubscribe, req: Request):
     """Save dev newsletter subscription to Firestore."""
     client_ip = get_client_ip(req)
-    if not check_rate_limit(f"newsletter:{client_ip}"):
+    if not await check_rate_limit(f"newsletter:{client_ip}"):
         raise api_error(
             code="RATE_LIMITED",
             message="Too many subscription attempts. Please wait before trying again.",
@@ -187,8 +188,8 @@ async def subscribe_newsletter(payload: NewsletterSubscribe, req: Request):
     }
 
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            resp = await client.post(url, json=doc_fields)
+        client = get_http_client("firestore")
+        resp = await client.post(url, json=doc_fields, timeout=10.0)
 
         if resp.status_code == 409:
             return {
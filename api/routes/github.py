@@ -1,4 +1,3 @@
-import time
 import re
 import logging
 
@@ -17,9 +16,10 @@ from api.config import (
     GITHUB_PROXY_TTL,
     GITHUB_PAT,
     _github_api_proxy_cache,
-    GITHUB_API_PROXY_TTL,
     api_error,
 )
+from api.http_clients import get_http_client
+from api.single_flight import coalesce
 from api.integrations.github_connector import github_connector
 
 router = APIRouter()
@@ -34,13 +34,14 @@ def _validate_github_username(username: str) -> str:
     return normalized
 
 
+@coalesce("github_repos", key=lambda username: str(username).strip().lower())
 async def fetch_github_repos_cached(username: str) -> list:
     """Fetch GitHub repos with 10-min server-side cache and optional PAT auth."""
     username = _validate_github_username(username)
     cache_key = f"gh_repos:{username}"
-    entry = _github_proxy_cache.get(cache_key)
-    if entry and time.time() - entry["ts"] < GITHUB_PROXY_TTL:
-        return entry["data"]
+    stale_repos, is_stale = _github_proxy_cache.get_entry(cache_key)
+    if stale_repos is not None and not is_stale:
+        return stale_repos
 
     headers = {"Accept": "application/vnd.github.v3+json"}
     # Never attach the portfolio PAT to arbitrary usernames — anonymous for others.
@@ -48,32 +49,32 @@ async def fetch_github_repos_cached(username: str) -> list:
         headers["Authorization"] = f"Bearer {GITHUB_PAT}"
 
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            resp = await client.get(
-                f"https://api.github.com/users/{username}/repos",
-                params={"per_page": 100, "sort": "updated"},
-                headers=headers,
+        resp = await get_http_client("github").get(
+            f"https://api.github.com/users/{username}/repos",
+            params={"per_page": 100, "sort": "updated"},
+            headers=headers,
+            timeout=10.0,
+        )
+        if resp.status_code in (403, 429) and not GITHUB_PAT:
+            raise api_error(
+                "GITHUB_RATE_LIMITED",
+                "GitHub API rate limit hit. Configure GITHUB_PAT for higher limits.",
+                503,
             )
-            if resp.status_code in (403, 429) and not GITHUB_PAT:
-                raise api_error(
-                    "GITHUB_RATE_LIMITED",
-                    "GitHub API rate limit hit. Configure GITHUB_PAT for higher limits.",
-                    503,
-                )
-            resp.raise_for_status()
-            repos = resp.json()
+        resp.raise_for_status()
+        repos = resp.json()
     except (httpx.HTTPStatusError, httpx.RequestError) as exc:
         logger.error(f"⚠️ Error fetching GitHub repos: {type(exc).__name__} - {str(exc)}", exc_info=True)
-        if entry and entry.get("data"):
-            return entry["data"]
+        if stale_repos:
+            return stale_repos
         raise
     except Exception as exc:
         logger.error(f"⚠️ Unexpected error fetching GitHub repos: {type(exc).__name__} - {str(exc)}", exc_info=True)
-        if entry and entry.get("data"):
-            return entry["data"]
+        if stale_repos:
+            return stale_repos
         raise
 
-    _github_proxy_cache[cache_key] = {"data": repos, "ts": time.time()}
+    _github_proxy_cache[cache_key] = repos
     return repos
 
 
@@ -88,7 +89,7 @@ async def github_api_proxy(request: Request, path: Optional[str] = None):
     from api.config import check_rate_limit, get_client_ip
 
     client_ip = get_client_ip(request)
-    if not check_rate_limit(f"gh-proxy:{client_ip}"):
+    if not await check_rate_limit(f"gh-proxy:{client_ip}"):
         raise HTTPException(status_code=429, detail="GitHub proxy rate limit exceeded")
 
     if not path or not path.strip():
@@ -132,8 +133,8 @@ async def github_api_proxy(request: Request, path: Optional[str] = None):
 
     normalized_path = canonical_path
     cache_key = f"gh_proxy:{normalized_path}"
-    cached = _github_api_proxy_cache.get(cache_key)
-    if cached and time.time() - cached["ts"] < GITHUB_API_PROXY_TTL:
+    cached, is_stale = _github_api_proxy_cache.get_entry(cache_key)
+    if cached and not is_stale:
         resp = JSONResponse(status_code=cached["status"], content=cached["data"])
         for key, value in cached["headers"].items():
             if value:
@@ -149,8 +150,7 @@ async def github_api_proxy(request: Request, path: Optional[str] = None):
         headers["Authorization"] = f"Bearer {GITHUB_PAT}"
 
     try:
-        async with httpx.AsyncClient(timeout=12.0) as client:
-            github_resp = await client.get(target_url, headers=headers)
+        github_resp = await get_http_client("github").get(target_url, headers=headers)
     except httpx.RequestError as exc:
         if cached and cached.get("data") is not None:
             response = JSONResponse(status_code=200, content=cached["data"])
@@ -183,7 +183,6 @@ async def github_api_proxy(request: Request, path: Optional[str] = None):
             passthrough_headers[key] = value
 
     _github_api_proxy_cache[cache_key] = {
-        "ts": time.time(),
         "status": github_resp.status_code,
         "data": payload,
         "headers": passthrough_headers,
@@ -79,8 +79,8 @@ def _oauth_success_redirect(provider: str) -> str:
     )
 
 
-def _enforce_rate_limit(request: Request) -> None:
-    enforce_rate_limit(request)
+async def _enforce_rate_limit(request: Request) -> None:
+    await enforce_rate_limit(request)
 
 
 class HealthVitalsUpsert(BaseModel):
@@ -335,7 +335,7 @@ def _require_integration_admin(request: Request) -> None:
     summary="Signed owner connect URL for an integration provider",
 )
 async def get_admin_connect_url(provider: str, request: Request):
-    _enforce_rate_limit(request)
+    await _enforce_rate_limit(request)
     _require_integration_admin(request)
     normalized = normalize_provider(provider)
     auth = create_connect_auth_token(normalized)
@@ -555,7 +555,7 @@ async def get_calendar_availability():
     summary="Start Google Calendar OAuth",
 )
 async def connect_google_calendar(request: Request, auth: Optional[str] = None):
-    _enforce_rate_limit(request)
+    await _enforce_rate_limit(request)
     if not google_calendar.is_configured():
         raise HTTPException(status_code=503, detail="Google Calendar OAuth is not configured.")
     verify_oauth_connect_access(request, "google_calendar", auth)
@@ -614,7 +614,7 @@ async def google_calendar_callback(code: Optional[str] = None, state: Optional[s
     summary="Start WHOOP OAuth",
 )
 async def connect_whoop(request: Request, auth: Optional[str] = None):
-    _enforce_rate_limit(request)
+    await _enforce_rate_limit(request)
     if not whoop.is_configured():
         raise HTTPException(status_code=503, detail="WHOOP OAuth is not configured.")
     verify_oauth_connect_access(request, "whoop", auth)
@@ -654,7 +654,7 @@ async def whoop_callback(code: Optional[str] = None, state: Optional[str] = None
     summary="Start Withings OAuth",
 )
 async def connect_withings(request: Request, auth: Optional[str] = None):
-    _enforce_rate_limit(request)
+    await _enforce_rate_limit(request)
     if not withings.is_configured():
         raise HTTPException(status_code=503, detail="Withings OAuth is not configured.")
     verify_oauth_connect_access(request, "withings", auth)
@@ -3,10 +3,11 @@ import time
 import json
 import logging
 import re
-from typing import List, Optional
+import weakref
+from typing import Dict, List, Optional, Tuple
 from urllib.parse import quote
 from fastapi import APIRouter, HTTPException, BackgroundTasks, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 
 import httpx
 
@@ -21,18 +22,18 @@ from api.config import (
     LASTFM_CACHE_HEADERS,
     lastfm_recent_cache,
     poster_cache,
-    POSTER_CACHE_DURATION,
     artwork_cache,
-    ARTWORK_CACHE_DURATION,
     check_rate_limit,
     get_client_ip,
 )
+from api.http_clients import get_http_client
 from api.monitoring import system_monitor
+from api.single_flight import coalesce
 
 
-def _enforce_media_rate_limit(request: Request, bucket: str) -> None:
+async def _enforce_media_rate_limit(request: Request, bucket: str) -> None:
     client_ip = get_client_ip(request)
-    if not check_rate_limit(f"{bucket}:{client_ip}"):
+    if not await check_rate_limit(f"{bucket}:{client_ip}"):
         raise HTTPException(status_code=429, detail="Rate limit exceeded. Please try again later.")
 
 
@@ -40,6 +41,24 @@ router = APIRouter()
 LASTFM_STALE_TTL = 45  # seconds — serve briefly while background refresh runs
 LASTFM_PLACEHOLDER_HASH = "2a96cbd8b46e442fc41c2b86b821562f"
 _lastfm_refreshing = set()
+POSTER_BATCH_CONCURRENCY = 8
+POSTER_PROVIDER_LIMITS = {"tmdb": 4, "google_books": 4, "openlibrary": 4}
+BOOK_HEDGE_DELAY = 0.35  # seconds before Open Library is raced against a slow Google Books lookup
+# Provider semaphores are shared by every batch request on a loop (asyncio primitives are loop-bound).
+_provider_limits: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _poster_provider_limits() -> Dict[str, asyncio.Semaphore]:
+    """Per-provider concurrency caps shared by all batch requests on the running loop."""
+    loop = asyncio.get_running_loop()
+    limits = _provider_limits.get(loop)
+    if limits is None:
+        limits = _provider_limits[loop] = {
+            provider: asyncio.Semaphore(limit) for provider, limit in POSTER_PROVIDER_LIMITS.items()
+        }
+    return limits
 
 
 def build_lastfm_unconfigured_response(user: str):
@@ -163,8 +182,8 @@ async def fetch_lastfm_top_artists(user: str, limit: int = 5, period: str = "7da
         "Accept": "application/json",
     }
 
-    async with httpx.AsyncClient(timeout=2.5, follow_redirects=True) as client:
-        response = await client.post(url, data=params, headers=headers)
+    client = get_http_client("lastfm")
+    response = await client.post(url, data=params, headers=headers, timeout=2.5)
 
     if response.status_code != 200:
         return []
@@ -267,6 +286,7 @@ def _tracks_need_enrichment(payload: dict) -> bool:
     return any(not str(track.get("resolved_artwork") or "").strip() for track in tracks[:8])
 
 
+@coalesce("lastfm_recent", key=lambda user, limit: f"{user}:{limit}")
 async def fetch_lastfm_recent_payload(user: str, limit: int) -> dict:
     url = "https://ws.audioscrobbler.com/2.0/"
     lastfm_params = {
@@ -281,8 +301,8 @@ async def fetch_lastfm_recent_payload(user: str, limit: int) -> dict:
         "Accept": "application/json",
     }
 
-    async with httpx.AsyncClient(timeout=3.2, follow_redirects=True) as client:
-        response = await client.post(url, data=lastfm_params, headers=headers)
+    client = get_http_client("lastfm")
+    response = await client.post(url, data=lastfm_params, headers=headers)
 
     if response.status_code != 200:
         raise HTTPException(
@@ -349,33 +369,15 @@ async def enrich_recent_tracks_with_artwork(payload: dict, max_tracks: int = 8)
 
 async def get_cached_poster(cache_key: str) -> Optional[str]:
     """Get cached poster URL"""
-    cached = poster_cache.get(cache_key)
-    if not cached:
-        return None
-
-    if time.time() - cached["timestamp"] > POSTER_CACHE_DURATION:
-        del poster_cache[cache_key]
-        return None
-
-    return cached["url"]
+    return poster_cache.get(cache_key)
 
 
 def set_cached_poster(cache_key: str, url: str):
     """Cache poster URL"""
-    poster_cache[cache_key] = {
-        "url": url,
-        "timestamp": time.time(),
-    }
-
-    # Cleanup old entries if cache grows too large
-    if len(poster_cache) > 500:
-        sorted_keys = sorted(
-            poster_cache.keys(), key=lambda k: poster_cache[k]["timestamp"]
-        )
-        for k in sorted_keys[:100]:
-            del poster_cache[k]
+    poster_cache[cache_key] = url
 
 
+@coalesce("tmdb_poster", key=lambda title, media_type="movie": f"{media_type}:{title.lower().strip()}")
 async def fetch_tmdb_poster(title: str, media_type: str = "movie") -> str:
     """Fetch poster from TMDB API"""
     if not TMDB_API_KEY:
@@ -390,10 +392,10 @@ async def fetch_tmdb_poster(title: str, media_type: str = "movie") -> str:
         search_url = f"https://api.themoviedb.org/3/search/{media_type}"
         params = {"api_key": TMDB_API_KEY, "query": title, "include_adult": False}
 
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.get(search_url, params=params)
-            response.raise_for_status()
-            data = response.json()
+        client = get_http_client("tmdb")
+        response = await client.get(search_url, params=params)
+        response.raise_for_status()
+        data = response.json()
 
         if data.get("results"):
             result = data["results"][0]
@@ -425,6 +427,7 @@ async def fetch_tmdb_poster(title: str, media_type: str = "movie") -> str:
     return ""
 
 
+@coalesce("google_books_cover", key=lambda title, author="": f"{title.lower().strip()}:{author.lower().strip()}")
 async def fetch_google_books_cover(title: str, author: str = "") -> str:
     """Fetch book cover from Google Books API"""
     if not GOOGLE_BOOKS_API_KEY:
@@ -448,10 +451,10 @@ async def fetch_google_books_cover(title: str, author: str = "") -> str:
             "fields": "items(volumeInfo(imageLinks))",
         }
 
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.get(url, params=params)
-            response.raise_for_status()
-            data = response.json()
+        client = get_http_client("books")
+        response = await client.get(url, params=params)
+        response.raise_for_status()
+        data = response.json()
 
         if data.get("items"):
             volume_info = data["items"][0].get("volumeInfo", {})
@@ -497,10 +500,10 @@ async def fetch_openlibrary_cover(title: str, author: str = "") -> str:
         search_url = "https://openlibrary.org/search.json"
         params = {"title": title, "author": author, "limit": 1}
 
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.get(search_url, params=params)
-            response.raise_for_status()
-            data = response.json()
+        client = get_http_client("books")
+        response = await client.get(search_url, params=params)
+        response.raise_for_status()
+        data = response.json()
 
         if data.get("docs"):
             doc = data["docs"][0]
@@ -623,7 +626,7 @@ async def fetch_itunes_artwork(
         return ""
 
     cached = artwork_cache.get(cache_key)
-    if cached and time.time() - cached["ts"] < ARTWORK_CACHE_DURATION:
+    if cached:
         return cached["url"]
 
     search_url = (
@@ -636,16 +639,16 @@ async def fetch_itunes_artwork(
     }
 
     try:
-        async with httpx.AsyncClient(timeout=3.2, follow_redirects=True) as client:
-            response = await client.get(search_url, headers=headers)
-            response.raise_for_status()
-            data = response.json()
+        client = get_http_client("artwork")
+        response = await client.get(search_url, headers=headers)
+        response.raise_for_status()
+        data = response.json()
 
         artwork = _pick_itunes_artwork(
             data.get("results") or [], track_hint=track_hint, artist_hint=artist_hint
         )
         if artwork:
-            artwork_cache[cache_key] = {"url": artwork, "ts": time.time()}
+            artwork_cache[cache_key] = {"url": artwork}
             return artwork
     except Exception as e:
         print(f"iTunes artwork fetch failed for {search_term}: {type(e).__name__} - {str(e)}")
@@ -662,7 +665,7 @@ async def fetch_lastfm_track_artwork(track: str, artist: str = "") -> str:
 
     cache_key = f"lastfm-track|{track_name.lower()}|{artist_name.lower()}"
     cached = artwork_cache.get(cache_key)
-    if cached and time.time() - cached["ts"] < ARTWORK_CACHE_DURATION:
+    if cached:
         return cached["url"]
 
     params = {
@@ -681,15 +684,15 @@ async def fetch_lastfm_track_artwork(track: str, artist: str = "") -> str:
     }
 
     try:
-        async with httpx.AsyncClient(timeout=3.2, follow_redirects=True) as client:
-            response = await client.get("https://ws.audioscrobbler.com/2.0/", params=params, headers=headers)
-            response.raise_for_status()
-            data = response.json()
+        client = get_http_client("artwork")
+        response = await client.get("https://ws.audioscrobbler.com/2.0/", params=params, headers=headers)
+        response.raise_for_status()
+        data = response.json()
 
         album = (data.get("track") or {}).get("album") or {}
         artwork = _best_lastfm_image({"image": album.get("image") or []})
         if artwork:
-            artwork_cache[cache_key] = {"url": artwork, "ts": time.time()}
+            artwork_cache[cache_key] = {"url": artwork}
             return artwork
     except Exception as e:
         print(
@@ -720,7 +723,7 @@ async def get_music_artwork(
     request: Request, track: str = "", artist: str = "", term: str = ""
 ):
     """Proxy artwork lookup for the Last.fm hero card (iTunes → Last.fm track info)."""
-    _enforce_media_rate_limit(request, "media-artwork")
+    await _enforce_media_rate_limit(request, "media-artwork")
     artist = artist.strip()
     track = track.strip()
     search_term = term.strip() or f"{track} {artist}".strip()
@@ -729,7 +732,7 @@ async def get_music_artwork(
 
     cache_key = f"resolved|{search_term.lower()}|{artist.lower()}"
     cached = artwork_cache.get(cache_key)
-    served_from_cache = bool(cached and time.time() - cached["ts"] < ARTWORK_CACHE_DURATION)
+    served_from_cache = bool(cached)
     if served_from_cache:
         return {
             "artwork_url": cached["url"],
@@ -741,7 +744,7 @@ async def get_music_artwork(
     track_name = track or search_term
     artwork_url, source = await resolve_external_artwork(track_name, artist)
     if artwork_url:
-        artwork_cache[cache_key] = {"url": artwork_url, "ts": time.time(), "source": source}
+        artwork_cache[cache_key] = {"url": artwork_url, "source": source}
 
     return {
         "artwork_url": artwork_url,
@@ -762,7 +765,7 @@ async def get_recent_music(
     Proxy endpoint for Last.fm listening data.
     Forces UTF-8 and returns structured JSON to avoid frontend fetch issues.
     """
-    _enforce_media_rate_limit(request, "media-music")
+    await _enforce_media_rate_limit(request, "media-music")
     user = user.strip() or LASTFM_DEFAULT_USERNAME
     limit = max(1, min(limit, 20))
     cache_key = f"{user}:{limit}"
@@ -874,7 +877,7 @@ async def get_recent_music(
 @router.get("/api/posters/movie")
 async def get_movie_poster(request: Request, title: str, media_type: str = "movie"):
     """Get movie/TV poster from TMDB"""
-    _enforce_media_rate_limit(request, "media-poster")
+    await _enforce_media_rate_limit(request, "media-poster")
     if not title.strip():
         raise HTTPException(status_code=400, detail="Title is required")
     media_type_l = (media_type or "movie").strip().lower()
@@ -897,7 +900,7 @@ async def get_movie_poster(request: Request, title: str, media_type: str = "movi
 @router.get("/api/posters/book")
 async def get_book_cover(request: Request, title: str, author: str = ""):
     """Get book cover from Google Books or Open Library"""
-    _enforce_media_rate_limit(request, "media-poster")
+    await _enforce_media_rate_limit(request, "media-poster")
     if not title.strip():
         raise HTTPException(status_code=400, detail="Title is required")
 
@@ -917,10 +920,87 @@ async def get_book_cover(request: Request, title: str, author: str = ""):
     }
 
 
+async def _hedged_book_cover(title: str, author: str, limits: Dict[str, asyncio.Semaphore]) -> Tuple[str, str]:
+    """Race Google Books against Open Library and keep the first non-empty cover.
+
+    Open Library starts once Google Books answers empty or after BOOK_HEDGE_DELAY,
+    whichever comes first, so a slow Google lookup no longer serializes the fallback.
+    """
+
+    async def openlibrary(wait_for: Optional[asyncio.Event]) -> Tuple[str, str]:
+        if wait_for is not None:
+            try:
+                await asyncio.wait_for(wait_for.wait(), BOOK_HEDGE_DELAY)
+            except asyncio.TimeoutError:
+                pass
+        async with limits["openlibrary"]:
+            return await fetch_openlibrary_cover(title, author), "openlibrary"
+
+    if not GOOGLE_BOOKS_API_KEY:
+        return await openlibrary(None)
+
+    google_done = asyncio.Event()
+
+    async def google_books() -> Tuple[str, str]:
+        try:
+            async with limits["google_books"]:
+                return await fetch_google_books_cover(title, author), "google_books"
+        finally:
+            google_done.set()
+
+    tasks = [asyncio.create_task(google_books()), asyncio.create_task(openlibrary(google_done))]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            try:
+                url, source = await next_done
+            except Exception:
+                continue
+            if url:
+                return url, source
+        return "", "openlibrary"
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def _resolve_batch_item(
+    item, gate: asyncio.Semaphore, limits: Dict[str, asyncio.Semaphore]
+) -> Dict:
+    if not isinstance(item, dict):
+        return {"id": "", "poster_url": "", "source": "unknown", "cached": False}
+    media_type = str(item.get("type", "")).lower()
+    title = item.get("title", "")
+    author = item.get("author", "")
+
+    async with gate:
+        if media_type in ["movie", "tv", "series"]:
+            async with limits["tmdb"]:
+                poster_url = await fetch_tmdb_poster(
+                    title, "tv" if media_type in ("tv", "series") else "movie"
+                )
+            source = "tmdb"
+        elif media_type == "book":
+            poster_url, source = await _hedged_book_cover(title, author, limits)
+        else:
+            poster_url = ""
+            source = "unknown"
+
+    return {
+        "id": str(item.get("id", "")),
+        "poster_url": poster_url,
+        "source": source,
+        "cached": bool(poster_url),
+    }
+
+
 @router.get("/api/posters/batch")
-async def get_batch_posters(request: Request, items: str):
-    """Get posters for multiple items at once"""
-    _enforce_media_rate_limit(request, "media-poster-batch")
+async def get_batch_posters(request: Request, items: str, stream: bool = False):
+    """Get posters for multiple items at once.
+
+    Lookups run concurrently (bounded overall and per provider). With ``stream=true``
+    or ``Accept: application/x-ndjson`` each result is written as soon as it resolves.
+    """
+    await _enforce_media_rate_limit(request, "media-poster-batch")
     try:
         data = json.loads(items)
     except json.JSONDecodeError:
@@ -932,36 +1012,30 @@ async def get_batch_posters(request: Request, items: str):
     if len(data) > 20:
         raise HTTPException(status_code=400, detail="Batch size limited to 20 items")
 
-    results = []
-    for item in data[:20]:
-        if not isinstance(item, dict):
-            results.append({"id": "", "poster_url": "", "source": "unknown", "cached": False})
-            continue
-        media_type = str(item.get("type", "")).lower()
-        title = item.get("title", "")
-        author = item.get("author", "")
-
-        if media_type in ["movie", "tv", "series"]:
-            poster_url = await fetch_tmdb_poster(
-                title, "tv" if media_type in ("tv", "series") else "movie"
-            )
-            source = "tmdb"
-        elif media_type == "book":
-            poster_url = await fetch_google_books_cover(title, author)
-            if not poster_url:
-                poster_url = await fetch_openlibrary_cover(title, author)
-            source = "google_books" if poster_url else "openlibrary"
-        else:
-            poster_url = ""
-            source = "unknown"
-
-        results.append(
-            {
-                "id": str(item.get("id", "")),
-                "poster_url": poster_url,
-                "source": source,
-                "cached": bool(poster_url),
-            }
+    gate = asyncio.Semaphore(POSTER_BATCH_CONCURRENCY)
+    limits = _poster_provider_limits()
+
+    if stream or "application/x-ndjson" in request.headers.get("accept", ""):
+
+        async def indexed(index: int, item) -> Tuple[int, Dict]:
+            return index, await _resolve_batch_item(item, gate, limits)
+
+        async def generate_results():
+            tasks = [asyncio.create_task(indexed(i, item)) for i, item in enumerate(data)]
+            try:
+                for next_done in asyncio.as_completed(tasks):
+                    index, result = await next_done
+                    yield json.dumps({"type": "result", "index": index, **result}) + "\n"
+                yield json.dumps({"type": "done", "count": len(tasks)}) + "\n"
+            finally:
+                for task in tasks:
+                    task.cancel()
+
+        return StreamingResponse(
+            generate_results(),
+            media_type="application/x-ndjson",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
         )
 
-    return {"results": results}
+    results = await asyncio.gather(*(_resolve_batch_item(item, gate, limits) for item in data))
+    return {"results": list(results)}
@@ -2,14 +2,17 @@ import hashlib
 import hmac
 import os
 import re
-import time
 from datetime import datetime, timezone
 from typing import Any, Awaitable, Callable, Optional, Dict
 from fastapi import APIRouter, HTTPException, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 
+from api.cache import BoundedCache
+from api.model_scoreboard import model_scoreboard
 from api.monitoring import system_monitor, EventType
-from api.platform_health import collect_platform_health
+from api.platform_health import platform_health_snapshot
+from api.probe_scheduler import HISTORY_SIZE
+from api.rate_buckets import RESOLUTIONS
 
 router = APIRouter()
 
@@ -21,7 +24,9 @@ PUBLIC_MONITOR_CACHE_HEADERS = {
     "Vercel-CDN-Cache-Control": "public, s-maxage=30, stale-while-revalidate=120",
 }
 PUBLIC_MONITOR_MEMORY_TTL_SECONDS = 30
-_public_monitor_memory_cache: Dict[str, tuple[float, Dict[str, Any]]] = {}
+_public_monitor_memory_cache = BoundedCache(
+    "public_monitor", max_entries=64, ttl=PUBLIC_MONITOR_MEMORY_TTL_SECONDS
+)
 
 
 def _public_monitor_response(payload: Dict) -> JSONResponse:
@@ -33,13 +38,7 @@ async def _cached_public_monitor_response(
     loader: Callable[[], Awaitable[Dict[str, Any]]],
     ttl_seconds: int = PUBLIC_MONITOR_MEMORY_TTL_SECONDS,
 ) -> JSONResponse:
-    now = time.monotonic()
-    cached = _public_monitor_memory_cache.get(key)
-    if cached and now - cached[0] < ttl_seconds:
-        return _public_monitor_response(cached[1])
-
-    payload = await loader()
-    _public_monitor_memory_cache[key] = (now, payload)
+    payload = await _public_monitor_memory_cache.get_or_load(key, loader, ttl=ttl_seconds)
     return _public_monitor_response(payload)
 
 
@@ -288,6 +287,11 @@ async def get_monitor_docs():
                         "path": "/api/monitor/metrics",
                         "summary": "Aggregated request metrics, endpoint performance, and event counts.",
                     },
+                    {
+                        "method": "GET",
+                        "path": "/api/monitor/metrics/prometheus",
+                        "summary": "OpenMetrics text for Prometheus-compatible scrapers.",
+                    },
                 ],
             },
             {
@@ -320,6 +324,11 @@ async def get_monitor_docs():
                         "path": "/api/monitor/platform-health",
                         "summary": "Cross-check core APIs, integration readiness, and safe integration env presence.",
                     },
+                    {
+                        "method": "GET",
+                        "path": "/api/monitor/probes",
+                        "summary": "Background probe durations, timeouts, staleness, and recent run history.",
+                    },
                     {
                         "method": "GET",
                         "path": "/api/integrations/status",
@@ -474,6 +483,17 @@ async def get_monitor_hosting_surfaces():
     )
 
 
+@router.get("/monitor/probes", tags=["system-monitor"], summary="Background probe status")
+@router.get("/api/monitor/probes", tags=["system-monitor"], summary="Background probe status")
+async def get_monitor_probes(history: int = 10):
+    """Durations, outcomes and staleness of the scheduled health probes, with recent runs."""
+    if system_monitor is None:
+        return {"running": False, "concurrency": 0, "probes": {}}
+    payload = system_monitor.probe_status(history=max(0, min(history, HISTORY_SIZE)))
+    payload["timestamp"] = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+    return _public_monitor_response(payload)
+
+
 @router.get("/monitor/events", tags=["system-monitor"], summary="Monitor event stream")
 @router.get("/api/monitor/events", tags=["system-monitor"], summary="Monitor event stream")
 async def get_monitor_events(
@@ -481,9 +501,13 @@ async def get_monitor_events(
     limit: int = 100,
     event_type: Optional[str] = None,
     resolved_only: Optional[bool] = None,
+    after: Optional[int] = None,
 ):
     """
-    Get system events with optional filtering
+    Get system events with optional filtering, oldest first.
+
+    Pass the returned ``next_cursor`` as ``after`` to fetch the next page, or
+    ``last_id`` to poll for events newer than this response.
     """
     event_type_enum = None
     if event_type:
@@ -498,18 +522,21 @@ async def get_monitor_events(
         return {
             "events": [],
             "count": 0,
+            "next_cursor": None,
             "timestamp": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
             "note": "System monitor not initialized - using fallback",
         }
     safe_limit = max(1, min(limit, MAX_MONITOR_EVENTS_LIMIT))
-    events = system_monitor.get_events(
-        limit=safe_limit, event_type=event_type_enum, resolved_only=resolved_only
+    events, next_cursor = system_monitor.get_events_page(
+        limit=safe_limit, event_type=event_type_enum, resolved_only=resolved_only, after=after
     )
     if not _monitor_admin_token_ok(request):
         events = [_redact_monitor_event(event) for event in events]
     return {
         "events": events,
         "count": len(events),
+        "next_cursor": next_cursor,
+        "totals": system_monitor.event_counts(),
         "timestamp": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
     }
 
@@ -589,10 +616,7 @@ async def get_monitor_status():
 )
 async def get_monitor_platform_health():
     """Safe cross-check of core APIs, OAuth readiness, and integration env presence."""
-    return await _cached_public_monitor_response(
-        "monitor_platform_health",
-        collect_platform_health,
-    )
+    return _public_monitor_response(await platform_health_snapshot())
 
 
 @router.get(
@@ -607,15 +631,53 @@ async def get_monitor_platform_health():
 )
 async def get_monitor_portfolio_catalog():
     """Live probe matrix for every public page and primary API used by the portfolio."""
-    from api.platform_health import probe_portfolio_catalog
+    from api.platform_health import portfolio_catalog_snapshot
 
     return await _cached_public_monitor_response(
         "monitor_portfolio_catalog",
-        probe_portfolio_catalog,
+        portfolio_catalog_snapshot,
         ttl_seconds=45,
     )
 
 
+@router.get(
+    "/api/monitor/knowledge-index",
+    tags=["system-monitor"],
+    summary="AssistMe site knowledge index status",
+)
+async def get_monitor_knowledge_index(request: Request, refresh: bool = False):
+    """Index generation, per-source chunk counts and build timings (admin only)."""
+    _require_monitor_admin(request)
+    from api.site_knowledge import knowledge_store
+
+    refreshed = knowledge_store.refresh(force=refresh)
+    return {
+        **knowledge_store.stats(),
+        "refreshed": refreshed,
+        "timestamp": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+    }
+
+
+@router.get(
+    "/api/monitor/metrics/prometheus",
+    tags=["system-monitor"],
+    summary="OpenMetrics exposition for Prometheus scrapers",
+)
+async def get_prometheus_metrics():
+    """Monitor counters as OpenMetrics text, streamed one metric family at a time."""
+    if system_monitor is None:
+        raise HTTPException(status_code=503, detail="Monitor service temporarily unavailable")
+    from api.openmetrics import CONTENT_TYPE, iter_openmetrics
+
+    async def families():
+        # Async so the generator runs on the event loop, alongside the writers
+        # of the counters it reads, rather than in the threadpool.
+        for chunk in iter_openmetrics(system_monitor):
+            yield chunk
+
+    return StreamingResponse(families(), media_type=CONTENT_TYPE)
+
+
 @router.get("/api/monitor/real-time")
 async def get_real_time_metrics():
     """Get real-time system metrics for live dashboard"""
@@ -624,19 +686,40 @@ async def get_real_time_metrics():
             "active_connections": 0,
             "requests_per_second": 0.0,
             "error_rate_per_minute": 0.0,
+            "rate_limited_per_minute": 0.0,
+            "upstream_failures_per_minute": 0.0,
             "memory_trend": [],
             "cpu_trend": [],
             "response_time_trend": [],
             "uptime_seconds": 0.0,
             "last_deployment": None,
+            "latency_ms": {},
+            "endpoint_latency_ms": {},
         }
+    system_monitor.refresh_rates()
+    latency = system_monitor.latency_percentiles()
     metrics = dict(system_monitor.real_time_metrics)
     metrics["memory_trend"] = list(system_monitor.real_time_metrics["memory_trend"])
     metrics["cpu_trend"] = list(system_monitor.real_time_metrics["cpu_trend"])
     metrics["response_time_trend"] = list(system_monitor.real_time_metrics["response_time_trend"])
+    metrics["latency_ms"] = latency["all"]
+    metrics["endpoint_latency_ms"] = latency["endpoints"]
     return metrics
 
 
+@router.get("/api/monitor/rates", tags=["system-monitor"], summary="Request, error, 429 and upstream rate series")
+async def get_rate_series(resolution: str = "second", endpoint: Optional[str] = None):
+    """Per-second (last 5 minutes) or per-minute (last 24 hours) counts, overall or for one ``METHOD:/path``."""
+    if resolution not in RESOLUTIONS:
+        raise HTTPException(status_code=400, detail=f"Invalid resolution: {resolution}")
+    if system_monitor is None:
+        raise HTTPException(status_code=503, detail="Monitor service temporarily unavailable")
+    series = system_monitor.rate_series(resolution, endpoint)
+    if series is None:
+        raise HTTPException(status_code=404, detail=f"No rate counters for endpoint: {endpoint}")
+    return series
+
+
 @router.get("/monitor/engineering", tags=["system-monitor"], summary="Engineering notebook telemetry")
 @router.get("/api/monitor/engineering", tags=["system-monitor"], summary="Engineering notebook telemetry")
 async def get_engineering_snapshot():
@@ -660,6 +743,7 @@ async def get_engineering_snapshot():
         }
 
     metrics = system_monitor.get_metrics()
+    system_monitor.refresh_rates()
     realtime = dict(system_monitor.real_time_metrics)
     health = await system_monitor.check_health()
     endpoints = metrics.get("endpoints") or []
@@ -749,13 +833,14 @@ async def get_security_status(request: Request):
                 "reset_seconds": max(0, round(RATE_LIMIT_WINDOW - (now - recent[0]))),
             }
 
+    system_monitor.flush_requests()
     suspicious_clients = [
         _mask_monitor_identifier(str(value))
         for value in list(system_monitor.suspicious_ips)
     ]
     security_events = [
         _redact_monitor_event(event) if not _monitor_admin_token_ok(request) else event
-        for event in list(system_monitor.security_events)[-20:]
+        for event in system_monitor.security_events.latest(20)
     ]
     return {
         "security_events": security_events,
@@ -775,8 +860,15 @@ async def get_ai_metrics():
             "ai_response_times": [],
             "model_usage": {},
             "token_usage": {"input": 0, "output": 0},
+            "response_cache": {"hits": 0, "misses": 0, "stores": 0},
+            "hedging": {"streams": 0, "hedges_launched": 0, "hedge_wins": 0},
+            "ttft_by_model": {},
+            "model_scoreboard": {},
         }
     metrics = dict(system_monitor.ai_metrics)
+    metrics.update(system_monitor.ai_counters())
+    metrics["ttft_by_model"] = system_monitor.model_ttft_percentiles()
+    metrics["model_scoreboard"] = model_scoreboard.snapshot()
     metrics["ai_response_times"] = list(system_monitor.ai_metrics["ai_response_times"])
     return metrics
 
@@ -164,7 +164,7 @@ async def realtime_session(request: Request):
         )
 
     client_ip = get_client_ip(request)
-    if not check_rate_limit(f"realtime-mint:{client_ip}"):
+    if not await check_rate_limit(f"realtime-mint:{client_ip}"):
         return JSONResponse(
             status_code=429,
             content={
@@ -24,6 +24,7 @@ from api.config import (
     get_site_title,
     get_site_url,
 )
+from api.http_clients import get_http_client
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -75,9 +76,9 @@ class TTSRequest(BaseModel):
     speed: Optional[float] = Field(default=1.0, ge=0.5, le=2.0)
 
 
-def _enforce_tts_rate_limit(request: Request) -> None:
+async def _enforce_tts_rate_limit(request: Request) -> None:
     client_ip = get_client_ip(request)
-    if not check_rate_limit(f"tts:{client_ip}"):
+    if not await check_rate_limit(f"tts:{client_ip}"):
         raise HTTPException(status_code=429, detail="TTS rate limit exceeded. Please try again later.")
 
 
@@ -114,7 +115,7 @@ async def tts_voices():
 @router.post("/api/tts")
 @router.post("/api/tts/synthesize")
 async def synthesize(req: TTSRequest, request: Request):
-    _enforce_tts_rate_limit(request)
+    await _enforce_tts_rate_limit(request)
 
     api_key = get_openrouter_api_key()
     if not api_key:
@@ -155,8 +156,8 @@ async def synthesize(req: TTSRequest, request: Request):
     }
 
     try:
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            upstream = await client.post(OPENROUTER_SPEECH_URL, headers=headers, json=payload)
+        client = get_http_client("openrouter")
+        upstream = await client.post(OPENROUTER_SPEECH_URL, headers=headers, json=payload)
     except httpx.TimeoutException as exc:
         logger.warning("OpenRouter TTS timeout: %s", exc)
         raise HTTPException(status_code=504, detail="TTS request timed out") from exc
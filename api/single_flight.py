@@ -0,0 +1,97 @@
+"""Async single-flight: concurrent callers with the same key share one upstream call.
+
+When a cache is cold or just expired, every request that misses would otherwise
+launch its own Last.fm / GitHub / TMDB / Supabase fetch. ``coalesce`` runs the
+first call as a task and makes concurrent callers with the same key await that
+task instead. The task is shielded, so a leader whose client disconnects does
+not cancel the fetch for everyone else.
+
+Counters per group are exposed through ``single_flight_stats`` (monitor metrics).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Keyed in-flight task table for one kind of upstream call."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+        self.errors = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        self.calls += 1
+        loop = asyncio.get_running_loop()
+        task = self._inflight.get(key)
+        if task is not None and not task.done() and task.get_loop() is loop:
+            self.coalesced += 1
+            return await asyncio.shield(task)
+
+        self.executions += 1
+        task = loop.create_task(fn())
+        self._inflight[key] = task
+        task.add_done_callback(functools.partial(self._finished, key))
+        return await asyncio.shield(task)
+
+    def _finished(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Retrieve the exception so a fetch whose callers all went away is not logged as unhandled.
+        if not task.cancelled() and task.exception() is not None:
+            self.errors += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "errors": self.errors,
+            "in_flight": len(self._inflight),
+            "coalesce_rate": round(self.coalesced / self.calls * 100, 2) if self.calls else 0.0,
+        }
+
+
+_groups: Dict[str, SingleFlight] = {}
+
+
+def single_flight(name: str) -> SingleFlight:
+    group = _groups.get(name)
+    if group is None:
+        group = _groups[name] = SingleFlight(name)
+    return group
+
+
+def single_flight_stats() -> Dict[str, Dict[str, Any]]:
+    return {name: group.stats() for name, group in sorted(_groups.items())}
+
+
+def coalesce(
+    name: str, key: Optional[Callable[..., Hashable]] = None
+) -> Callable[[Callable[..., Awaitable[T]]], Callable[..., Awaitable[T]]]:
+    """Decorate an async fetcher so identical concurrent calls share one execution.
+
+    ``key`` maps the call arguments to the coalescing key; by default the
+    positional and keyword arguments themselves are used.
+    """
+    group = single_flight(name)
+
+    def decorator(fn: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+        @functools.wraps(fn)
+        async def wrapper(*args: Any, **kwargs: Any) -> T:
+            flight_key = key(*args, **kwargs) if key else (args, tuple(sorted(kwargs.items())))
+            return await group.do(flight_key, lambda: fn(*args, **kwargs))
+
+        wrapper.single_flight = group  # type: ignore[attr-defined]
+        return wrapper
+
+    return decorator
@@ -6,21 +6,51 @@ does not read environment files, git metadata, logs, or arbitrary paths.
 
 from __future__ import annotations
 
+import hashlib
+import heapq
+import json
+import logging
+import math
+import os
 import re
-from dataclasses import dataclass
-from datetime import date
-from functools import lru_cache
+import threading
+import time
+import zlib
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import date, datetime, timezone
 from html.parser import HTMLParser
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional, Sequence
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
 
 from api.portfolio_public_data import get_portfolio_facts_chunk
+from api.query_features import QueryFeatures, classify_query
 
+logger = logging.getLogger(__name__)
 
 ROOT = Path(__file__).resolve().parents[1]
 MAX_SOURCE_CHARS = 120_000
 MAX_CHUNK_CHARS = 1_800
 
+# Build-time snapshot of parsed chunks (see scripts/build/build-knowledge-snapshot.py).
+# Bump SNAPSHOT_VERSION whenever extraction, chunking or tokenization changes.
+SNAPSHOT_MAGIC = b"SKNW"
+SNAPSHOT_VERSION = 2
+SNAPSHOT_PATH = Path(
+    os.getenv("SITE_KNOWLEDGE_SNAPSHOT", "").strip() or ROOT / "api" / "data" / "site_knowledge.snapshot"
+)
+
+# Okapi BM25 parameters (standard defaults) and the additive boost applied when
+# the query names a page family that matches the chunk title.
+BM25_K1 = 1.2
+BM25_B = 0.75
+TITLE_HINT_BOOST = 1.5
+TITLE_HINTS: Sequence[Tuple[Tuple[str, ...], str]] = (
+    (("travel", "city", "cities", "atlas"), "travel"),
+    (("monitor", "api", "backend", "status"), "monitor"),
+    (("blog", "article", "writing"), "blog"),
+)
+
 PUBLIC_SOURCES: Sequence[Dict[str, str]] = (
     {
         "path": "README.md",
@@ -109,17 +139,6 @@ SECTION_HINTS = {
     "changelog": "changelog releases shipped features updates bug fixes commits version history",
 }
 
-WEB_FRESHNESS_RE = re.compile(
-    r"\b("
-    r"latest|current|today|yesterday|this week|this month|now|real[- ]?time|live|"
-    r"news|recent|2026|2027|pricing|release|released|changelog|docs|documentation|"
-    r"www|internet|web search|browse|lookup|search the web|source|citation|"
-    r"openrouter|parallel\.ai|parallel web|ai gateway|weather|stock|market"
-    r")\b",
-    re.I,
-)
-
-
 @dataclass(frozen=True)
 class KnowledgeChunk:
     source: str
@@ -127,6 +146,7 @@ class KnowledgeChunk:
     url: str
     text: str
     tokens: frozenset[str]
+    term_counts: Dict[str, int] = field(default_factory=dict, compare=False, repr=False)
 
 
 class _VisibleTextParser(HTMLParser):
@@ -256,8 +276,11 @@ def _extract_blog_posts(raw: str) -> List[Dict[str, str]]:
     return posts
 
 
-@lru_cache(maxsize=1)
 def get_travel_summary() -> Dict[str, Any]:
+    return knowledge_store.fact("travel_summary")
+
+
+def _parse_travel_summary() -> Dict[str, Any]:
     raw = _read_public_source("src/js/data/travel-locations.js")
     stops = _extract_travel_stops(raw)
     countries: Dict[str, List[Dict[str, str]]] = {}
@@ -282,8 +305,11 @@ def get_travel_summary() -> Dict[str, Any]:
     }
 
 
-@lru_cache(maxsize=1)
 def get_blog_posts() -> List[Dict[str, str]]:
+    return knowledge_store.fact("blog_posts")
+
+
+def _parse_blog_posts() -> List[Dict[str, str]]:
     return _extract_blog_posts(_read_public_source("src/js/modules/blog-data.js"))
 
 
@@ -360,8 +386,11 @@ def _extract_changelog_entries(raw: str) -> List[Dict[str, str]]:
     return entries
 
 
-@lru_cache(maxsize=1)
 def get_changelog_entries() -> List[Dict[str, str]]:
+    return knowledge_store.fact("changelog_entries")
+
+
+def _parse_changelog_entries() -> List[Dict[str, str]]:
     return _extract_changelog_entries(_read_public_source("src/js/data/changelog-entries.js"))
 
 
@@ -391,9 +420,27 @@ def build_derived_knowledge_text() -> str:
     )
 
 
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+.#-]{2,}")
+
+
+def _term_counts(text: str) -> Dict[str, int]:
+    return dict(Counter(_TOKEN_RE.findall(text.lower())))
+
+
 def _tokenize(text: str) -> frozenset[str]:
-    words = re.findall(r"[a-z0-9][a-z0-9+.#-]{2,}", text.lower())
-    return frozenset(words)
+    return frozenset(_TOKEN_RE.findall(text.lower()))
+
+
+def _make_chunk(source: str, title: str, url: str, text: str, index_text: str) -> KnowledgeChunk:
+    counts = _term_counts(index_text)
+    return KnowledgeChunk(
+        source=source,
+        title=title,
+        url=url,
+        text=text,
+        tokens=frozenset(counts),
+        term_counts=counts,
+    )
 
 
 def _chunk_text(text: str, max_chars: int = MAX_CHUNK_CHARS) -> Iterable[str]:
@@ -418,51 +465,401 @@ def _chunk_text(text: str, max_chars: int = MAX_CHUNK_CHARS) -> Iterable[str]:
         yield " ".join(current)
 
 
-@lru_cache(maxsize=1)
-def build_site_knowledge() -> List[KnowledgeChunk]:
+def _source_chunks(source: Dict[str, str], raw: str) -> List[KnowledgeChunk]:
+    """Extract, chunk and tokenize one public source."""
+    if not raw:
+        return []
+
+    kind = source["kind"]
+    if kind == "html":
+        text = _extract_html(raw)
+    elif kind == "javascript":
+        text = _extract_javascript_strings(raw)
+    else:
+        text = _extract_markdown(raw)
+
+    if not text:
+        return []
+
+    return [
+        _make_chunk(
+            source["path"],
+            source["title"],
+            source["url"],
+            chunk_text,
+            f"{source['title']} {source['path']} {chunk_text}",
+        )
+        for chunk_text in _chunk_text(text)
+    ]
+
+
+def _derived_chunk(text: str) -> KnowledgeChunk:
+    return _make_chunk("derived:portfolio-facts", "Derived portfolio facts", "https://mangeshraut.pro/", text, text)
+
+
+def _chunk_row(chunk: KnowledgeChunk) -> List[Any]:
+    return [chunk.source, chunk.title, chunk.url, chunk.text, chunk.term_counts]
+
+
+def _chunk_from_row(row: Sequence[Any]) -> KnowledgeChunk:
+    source, title, url, text, counts = row
+    return KnowledgeChunk(
+        source=source,
+        title=title,
+        url=url,
+        text=text,
+        tokens=frozenset(counts),
+        term_counts=counts,
+    )
+
+
+def _parse_site_knowledge() -> List[KnowledgeChunk]:
+    """Read, extract, chunk and tokenize every public source from scratch."""
     chunks: List[KnowledgeChunk] = []
+    for source in PUBLIC_SOURCES:
+        chunks.extend(_source_chunks(source, _read_public_source(source["path"])))
+    derived = build_derived_knowledge_text()
+    if derived:
+        chunks.append(_derived_chunk(derived))
+    return chunks
+
 
+def _source_digest(raw: str) -> str:
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _fingerprint_from_digests(digests: Dict[str, str]) -> str:
+    digest = hashlib.sha256()
+    digest.update(f"v{SNAPSHOT_VERSION}:{MAX_SOURCE_CHARS}:{MAX_CHUNK_CHARS}".encode())
     for source in PUBLIC_SOURCES:
-        raw = _read_public_source(source["path"])
-        if not raw:
-            continue
+        digest.update(json.dumps(source, sort_keys=True).encode())
+        digest.update(digests.get(source["path"], "").encode())
+    digest.update(get_portfolio_facts_chunk().encode("utf-8"))
+    return digest.hexdigest()
 
-        kind = source["kind"]
-        if kind == "html":
-            text = _extract_html(raw)
-        elif kind == "javascript":
-            text = _extract_javascript_strings(raw)
-        else:
-            text = _extract_markdown(raw)
 
-        if not text:
-            continue
+def knowledge_source_fingerprint() -> str:
+    """Hash every input that feeds the parsed chunks and derived facts."""
+    return _fingerprint_from_digests(
+        {source["path"]: _source_digest(_read_public_source(source["path"])) for source in PUBLIC_SOURCES}
+    )
+
+
+def _stat_public_source(relative_path: str) -> Tuple[int, int]:
+    """Return ``(mtime_ns, size)`` for a public source, or ``(0, -1)`` when unreadable."""
+    candidate = (ROOT / relative_path).resolve()
+    if ROOT not in candidate.parents and candidate != ROOT:
+        return (0, -1)
+    try:
+        stat = candidate.stat()
+    except OSError:
+        return (0, -1)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+class KnowledgeIndex:
+    """Incrementally maintained inverted index with BM25 statistics.
+
+    ``postings`` maps a term to ``{chunk_id: term_frequency}``. Chunk ids are never
+    reused, so one source can swap its postings without renumbering the corpus;
+    idf is derived from live document frequencies at query time.
+    """
+
+    def __init__(self) -> None:
+        self.chunks: Dict[int, KnowledgeChunk] = {}
+        self.postings: Dict[str, Dict[int, int]] = {}
+        self.doc_lengths: Dict[int, int] = {}
+        self._total_length = 0
+        self._next_id = 0
+
+    @property
+    def avg_doc_length(self) -> float:
+        return self._total_length / len(self.doc_lengths) if self.doc_lengths else 0.0
+
+    def add(self, chunks: Iterable[KnowledgeChunk]) -> List[int]:
+        chunk_ids = []
+        for chunk in chunks:
+            chunk_id = self._next_id
+            self._next_id += 1
+            counts = chunk.term_counts or {term: 1 for term in chunk.tokens}
+            self.chunks[chunk_id] = chunk
+            self.doc_lengths[chunk_id] = sum(counts.values())
+            self._total_length += self.doc_lengths[chunk_id]
+            for term, tf in counts.items():
+                self.postings.setdefault(term, {})[chunk_id] = tf
+            chunk_ids.append(chunk_id)
+        return chunk_ids
+
+    def remove(self, chunk_ids: Iterable[int]) -> None:
+        for chunk_id in chunk_ids:
+            chunk = self.chunks.pop(chunk_id, None)
+            if chunk is None:
+                continue
+            self._total_length -= self.doc_lengths.pop(chunk_id)
+            for term in chunk.term_counts or chunk.tokens:
+                entries = self.postings.get(term)
+                if entries is None:
+                    continue
+                entries.pop(chunk_id, None)
+                if not entries:
+                    del self.postings[term]
+
+    def idf(self, term: str) -> float:
+        df = len(self.postings.get(term, ()))
+        return math.log(1.0 + (len(self.doc_lengths) - df + 0.5) / (df + 0.5))
+
+    def scores(self, terms: Iterable[str]) -> Dict[int, float]:
+        """Accumulate BM25 scores by walking only the postings of ``terms``."""
+        scores: Dict[int, float] = {}
+        avg_length = self.avg_doc_length or 1.0
+        for term in terms:
+            entries = self.postings.get(term)
+            if not entries:
+                continue
+            idf = self.idf(term)
+            for chunk_id, tf in entries.items():
+                norm = BM25_K1 * (1.0 - BM25_B + BM25_B * self.doc_lengths[chunk_id] / avg_length)
+                scores[chunk_id] = scores.get(chunk_id, 0.0) + idf * tf * (BM25_K1 + 1.0) / (tf + norm)
+        return scores
+
+
+def build_knowledge_index(chunks: Iterable[KnowledgeChunk]) -> KnowledgeIndex:
+    index = KnowledgeIndex()
+    index.add(chunks)
+    return index
+
+
+@dataclass
+class _SourceState:
+    mtime_ns: int
+    size: int
+    digest: str
+    chunk_ids: List[int]
+    build_ms: float
+    from_snapshot: bool
+
+
+# Derived facts and the source file each one is parsed from.
+_FACT_SOURCES: Dict[str, str] = {
+    "travel_summary": "src/js/data/travel-locations.js",
+    "blog_posts": "src/js/modules/blog-data.js",
+    "changelog_entries": "src/js/data/changelog-entries.js",
+}
+
+
+class SiteKnowledgeStore:
+    """Per-source knowledge index that re-indexes only files that changed.
 
-        for chunk_text in _chunk_text(text):
-            combined = f"{source['title']} {source['path']} {chunk_text}"
-            chunks.append(
-                KnowledgeChunk(
-                    source=source["path"],
-                    title=source["title"],
-                    url=source["url"],
-                    text=chunk_text,
-                    tokens=_tokenize(combined),
+    Sources are re-checked at most every ``refresh_interval`` seconds: an unchanged
+    ``(mtime, size)`` skips the file, and an unchanged content hash skips parsing.
+    Only a changed source has its chunks re-extracted and postings swapped. The
+    build-time snapshot seeds any source whose hash still matches.
+    """
+
+    def __init__(self, snapshot_path: Optional[Path] = None, refresh_interval: float = 5.0) -> None:
+        self.index = KnowledgeIndex()
+        self.generation = 0
+        self.refresh_interval = refresh_interval
+        self.last_refresh_ms = 0.0
+        self.built_at: Optional[str] = None
+        self.checked_at: Optional[str] = None
+        self._snapshot_path = snapshot_path
+        self._lock = threading.RLock()
+        self._sources: Dict[str, _SourceState] = {}
+        self._facts: Dict[str, Any] = {}
+        self._derived_ids: List[int] = []
+        self._fingerprint = ""
+        self._last_checked: Optional[float] = None
+
+    def refresh(self, force: bool = False) -> bool:
+        """Re-index changed sources; return True when the index generation advanced."""
+        with self._lock:
+            now = time.monotonic()
+            if not force and self._last_checked is not None and now - self._last_checked < self.refresh_interval:
+                return False
+            self._last_checked = now
+            self.checked_at = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+            started = time.perf_counter()
+
+            snapshot = None
+            if self.generation == 0 and self._snapshot_path is not None:
+                snapshot = _read_knowledge_snapshot(self._snapshot_path)
+            snapshot_sources = (snapshot or {}).get("sources", {})
+
+            changed: List[str] = []
+            for source in PUBLIC_SOURCES:
+                path = source["path"]
+                state = self._sources.get(path)
+                mtime_ns, size = _stat_public_source(path)
+                if state is not None and (state.mtime_ns, state.size) == (mtime_ns, size):
+                    continue
+
+                raw = _read_public_source(path)
+                digest = _source_digest(raw)
+                if state is not None and state.digest == digest:
+                    state.mtime_ns, state.size = mtime_ns, size
+                    continue
+
+                source_started = time.perf_counter()
+                cached = snapshot_sources.get(path)
+                from_snapshot = bool(cached) and cached.get("digest") == digest
+                if from_snapshot:
+                    chunks = [_chunk_from_row(row) for row in cached["chunks"]]
+                else:
+                    chunks = _source_chunks(source, raw)
+                if state is not None:
+                    self.index.remove(state.chunk_ids)
+                self._sources[path] = _SourceState(
+                    mtime_ns=mtime_ns,
+                    size=size,
+                    digest=digest,
+                    chunk_ids=self.index.add(chunks),
+                    build_ms=round((time.perf_counter() - source_started) * 1000, 3),
+                    from_snapshot=from_snapshot,
                 )
-            )
+                changed.append(path)
+
+            if not changed:
+                return False
+
+            self._fingerprint = _fingerprint_from_digests({path: state.digest for path, state in self._sources.items()})
+            if snapshot is not None and snapshot.get("fingerprint") == self._fingerprint:
+                self._facts = dict(snapshot["facts"])
+                derived_rows = snapshot.get("derived") or []
+                derived_chunks = [_chunk_from_row(row) for row in derived_rows]
+            else:
+                for name, fact_path in _FACT_SOURCES.items():
+                    if fact_path in changed or name not in self._facts:
+                        self._facts[name] = _FACT_PARSERS[name]()
+                # Nested fact lookups see the fresh facts: _last_checked is already current.
+                derived = build_derived_knowledge_text()
+                derived_chunks = [_derived_chunk(derived)] if derived else []
+            self.index.remove(self._derived_ids)
+            self._derived_ids = self.index.add(derived_chunks)
+
+            self.generation += 1
+            self.last_refresh_ms = round((time.perf_counter() - started) * 1000, 3)
+            self.built_at = self.checked_at
+            if self.generation > 1:
+                logger.info("Site knowledge re-indexed %s (generation %s)", ", ".join(changed), self.generation)
+            return True
+
+    def fact(self, name: str) -> Any:
+        self.refresh()
+        return self._facts[name] if name in self._facts else _FACT_PARSERS[name]()
+
+    def chunks(self) -> List[KnowledgeChunk]:
+        """Chunks in ``PUBLIC_SOURCES`` order followed by the derived facts chunk."""
+        self.refresh()
+        with self._lock:
+            ordered = [
+                self.index.chunks[chunk_id]
+                for source in PUBLIC_SOURCES
+                for chunk_id in (self._sources[source["path"]].chunk_ids if source["path"] in self._sources else ())
+            ]
+            ordered.extend(self.index.chunks[chunk_id] for chunk_id in self._derived_ids)
+            return ordered
+
+    def search(self, terms: Iterable[str]) -> Dict[int, Tuple[float, KnowledgeChunk]]:
+        """BM25-score ``terms`` and return ``{chunk_id: (score, chunk)}`` for every match."""
+        self.refresh()
+        with self._lock:
+            return {
+                chunk_id: (score, self.index.chunks[chunk_id])
+                for chunk_id, score in self.index.scores(terms).items()
+            }
 
-    derived = build_derived_knowledge_text()
-    if derived:
-        chunks.append(
-            KnowledgeChunk(
-                source="derived:portfolio-facts",
-                title="Derived portfolio facts",
-                url="https://mangeshraut.pro/",
-                text=derived,
-                tokens=_tokenize(derived),
-            )
-        )
+    def snapshot_payload(self) -> Dict[str, Any]:
+        self.refresh()
+        with self._lock:
+            return {
+                "fingerprint": self._fingerprint,
+                "sources": {
+                    path: {
+                        "digest": state.digest,
+                        "chunks": [_chunk_row(self.index.chunks[chunk_id]) for chunk_id in state.chunk_ids],
+                    }
+                    for path, state in self._sources.items()
+                },
+                "facts": self._facts,
+                "derived": [_chunk_row(self.index.chunks[chunk_id]) for chunk_id in self._derived_ids],
+            }
 
-    return chunks
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "generation": self.generation,
+                "built_at": self.built_at,
+                "checked_at": self.checked_at,
+                "last_refresh_ms": self.last_refresh_ms,
+                "refresh_interval_seconds": self.refresh_interval,
+                "total_chunks": len(self.index.chunks),
+                "total_terms": len(self.index.postings),
+                "avg_chunk_tokens": round(self.index.avg_doc_length, 1),
+                "derived_chunks": len(self._derived_ids),
+                "sources": [
+                    {
+                        "path": path,
+                        "chunks": len(state.chunk_ids),
+                        "bytes": max(state.size, 0),
+                        "build_ms": state.build_ms,
+                        "from_snapshot": state.from_snapshot,
+                        "digest": state.digest[:12],
+                    }
+                    for path, state in self._sources.items()
+                ],
+            }
+
+
+_FACT_PARSERS = {
+    "travel_summary": _parse_travel_summary,
+    "blog_posts": _parse_blog_posts,
+    "changelog_entries": _parse_changelog_entries,
+}
+
+knowledge_store = SiteKnowledgeStore(
+    snapshot_path=SNAPSHOT_PATH,
+    refresh_interval=float(os.getenv("SITE_KNOWLEDGE_REFRESH_SECONDS", "5") or 5),
+)
+
+
+def build_site_knowledge() -> List[KnowledgeChunk]:
+    return knowledge_store.chunks()
+
+
+def write_knowledge_snapshot(path: Optional[Path] = None) -> Path:
+    """Serialize per-source chunks, hashes and derived facts into a versioned binary artifact.
+
+    Layout: ``SNAPSHOT_MAGIC`` + 2-byte big-endian version + zlib-compressed JSON.
+    """
+    target = Path(path or SNAPSHOT_PATH)
+    payload = SiteKnowledgeStore().snapshot_payload()
+    body = zlib.compress(json.dumps(payload, separators=(",", ":")).encode("utf-8"), 9)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_suffix(target.suffix + ".tmp")
+    tmp.write_bytes(SNAPSHOT_MAGIC + SNAPSHOT_VERSION.to_bytes(2, "big") + body)
+    tmp.replace(target)
+    return target
+
+
+def _read_knowledge_snapshot(path: Path) -> Optional[Dict[str, Any]]:
+    """Decode a snapshot file; per-source hashes are validated by the store."""
+    try:
+        blob = path.read_bytes()
+    except OSError:
+        return None
+    header_len = len(SNAPSHOT_MAGIC) + 2
+    if blob[: len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC:
+        logger.warning("Ignoring site knowledge snapshot with bad header: %s", path)
+        return None
+    if int.from_bytes(blob[len(SNAPSHOT_MAGIC) : header_len], "big") != SNAPSHOT_VERSION:
+        logger.info("Site knowledge snapshot version mismatch; parsing sources live")
+        return None
+    try:
+        return json.loads(zlib.decompress(blob[header_len:]))
+    except (zlib.error, ValueError) as exc:
+        logger.warning("Unreadable site knowledge snapshot %s: %s", path, exc)
+        return None
 
 
 def _query_terms(query: str, context: Optional[Dict[str, Any]] = None) -> frozenset[str]:
@@ -490,27 +887,32 @@ def retrieve_site_context(
     if not terms:
         return ""
 
-    scored = []
+    matches = knowledge_store.search(terms)
+    if not matches:
+        return ""
+
     lower_query = query.lower()
-    for chunk in build_site_knowledge():
-        overlap = terms & chunk.tokens
-        if not overlap:
-            continue
-        score = len(overlap)
-        if any(hint in lower_query for hint in ("travel", "city", "cities", "atlas")):
-            score += 3 if "travel" in chunk.title.lower() else 0
-        if any(hint in lower_query for hint in ("monitor", "api", "backend", "status")):
-            score += 3 if "monitor" in chunk.title.lower() else 0
-        if any(hint in lower_query for hint in ("blog", "article", "writing")):
-            score += 3 if "blog" in chunk.title.lower() else 0
-        scored.append((score, chunk))
+    boosted_titles = [
+        title_marker
+        for query_markers, title_marker in TITLE_HINTS
+        if any(hint in lower_query for hint in query_markers)
+    ]
+    scored = [
+        (
+            score + sum(TITLE_HINT_BOOST for marker in boosted_titles if marker in chunk.title.lower()),
+            chunk_id,
+            chunk,
+        )
+        for chunk_id, (score, chunk) in matches.items()
+    ]
 
-    scored.sort(key=lambda item: item[0], reverse=True)
+    # Over-select so duplicate chunks skipped below do not starve the result.
+    candidates = heapq.nlargest(max_chunks * 3, scored, key=lambda item: (item[0], -item[1]))
 
     selected: List[str] = []
     used_sources = set()
     used_chars = 0
-    for score, chunk in scored:
+    for score, _chunk_id, chunk in candidates:
         if score <= 0:
             continue
         source_key = (chunk.source, chunk.text[:80])
@@ -528,39 +930,24 @@ def retrieve_site_context(
     return "\n\n---\n\n".join(selected)
 
 
-def should_use_web_tools(query: str, site_context: str = "") -> bool:
+def should_use_web_tools(
+    query: str, site_context: str = "", features: Optional[QueryFeatures] = None
+) -> bool:
     """Gate live web access to questions that need fresh or external data."""
-    if not WEB_FRESHNESS_RE.search(query):
+    if features is None:
+        features = classify_query(query)
+    if not features.has("web_freshness"):
         return False
     # Portfolio pages with site context — only search when freshness is explicit
-    if site_context and is_portfolio_context_query(query):
-        return bool(
-            re.search(
-                r"\b(latest|current|today|now|news|recent|2026|search|browse)\b",
-                query,
-                re.I,
-            )
-        )
+    if site_context and is_portfolio_context_query(query, features):
+        return features.has("explicit_freshness")
     return True
 
 
-def is_portfolio_context_query(query: str) -> bool:
-    lower = query.lower()
-    return not any(
-        marker in lower
-        for marker in (
-            "latest",
-            "current",
-            "today",
-            "now",
-            "news",
-            "recent",
-            "openrouter",
-            "parallel",
-            "search",
-            "browse",
-        )
-    )
+def is_portfolio_context_query(query: str, features: Optional[QueryFeatures] = None) -> bool:
+    if features is None:
+        features = classify_query(query)
+    return not features.has("live_marker")
 
 
 def build_site_knowledge_prompt(site_context: str, web_enabled: bool) -> str:
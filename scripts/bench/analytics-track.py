@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""Microbenchmark file-mode ``PortfolioAnalyticsStore.track_visit``.
+
+Tracks visits against a temporary snapshot seeded with ``--days`` of history
+and ``--sessions`` live sessions, through the write-ahead log in
+api/analytics_wal.py and, with ``--compare``, through the previous
+load / deep-copy / prune / rewrite-the-whole-file path.
+
+    python3 scripts/bench/analytics-track.py --visits 5000 --sessions 2000 --compare
+"""
+import argparse
+import asyncio
+import copy
+import json
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from api.analytics_store import PortfolioAnalyticsStore  # noqa: E402
+from api.analytics_wal import AnalyticsLog  # noqa: E402
+
+
+def _seed(path, days, sessions):
+    today = datetime.now(timezone.utc).date()
+    now = time.time()
+    data = PortfolioAnalyticsStore()._initial_data()
+    data["daily_views"] = {(today - timedelta(days=offset)).isoformat(): 40 for offset in range(days)}
+    data["recent_sessions"] = {f"seed-{index}": now for index in range(sessions)}
+    data["total_views"] = 40 * days
+    path.write_text(json.dumps(data))
+
+
+class RewriteStore(PortfolioAnalyticsStore):
+    """The previous file path: reload, copy, prune and rewrite on every visit."""
+
+    def __init__(self, path):
+        super().__init__()
+        self._path = path
+        self._lock = asyncio.Lock()
+
+    async def _track_visit_file(self, session_id, path, is_homepage, referrer, user_agent):
+        async with self._lock:
+            data = copy.deepcopy(json.loads(self._path.read_text()))
+            self._apply_visit(data, self._visit(session_id, path, is_homepage, referrer, user_agent))
+            self._prune_snapshot(data)
+            self._path.write_text(json.dumps(data))
+        return self._metrics_from_data(copy.deepcopy(json.loads(self._path.read_text())), persistent=False)
+
+
+async def _run(label, store, visits):
+    start = time.perf_counter()
+    for index in range(visits):
+        await store.track_visit(f"visitor-{index % 500}", "/", index % 3 == 0)
+    await store._wal.stop()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<10} {visits / elapsed:9.0f} visits/s  {elapsed * 1e6 / visits:8.1f}us/visit")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--visits", type=int, default=5000)
+    parser.add_argument("--days", type=int, default=120)
+    parser.add_argument("--sessions", type=int, default=2000)
+    parser.add_argument("--compare", action="store_true", help="also run the previous full-rewrite path")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        wal_path = Path(tmp) / "wal.json"
+        _seed(wal_path, args.days, args.sessions)
+        store = PortfolioAnalyticsStore()
+        store._wal = AnalyticsLog(
+            wal_path, initial=store._initial_data, apply=store._apply_visit, compact=store._prune_snapshot
+        )
+        asyncio.run(_run("wal", store, args.visits))
+        if args.compare:
+            rewrite_path = Path(tmp) / "rewrite.json"
+            _seed(rewrite_path, args.days, args.sessions)
+            asyncio.run(_run("rewrite", RewriteStore(rewrite_path), args.visits))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""Measure chat stream framing: per-delta ``json.dumps`` vs ``ChatStreamWriter``.
+
+Replays a synthetic answer split into small token-sized deltas through the
+previous framing (one ``json.dumps`` NDJSON frame per delta) and through the
+coalescing writer in api/chat_stream.py (NDJSON and SSE), reporting frames per
+answer, frames/sec and CPU time per streamed answer. Each frame is also pushed
+through a zlib compressor with a sync flush, as GZipMiddleware does per body
+message (``--no-gzip`` to skip). ``--token-ms`` paces the deltas like a live
+model so the time-based flush window takes effect; with the default of 0 only
+the byte cap coalesces.
+
+    python3 scripts/bench/chat-stream.py --answers 200 --tokens 400
+    python3 scripts/bench/chat-stream.py --answers 5 --tokens 400 --token-ms 2
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+import zlib
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from api.chat_stream import ChatStreamWriter  # noqa: E402
+
+WORDS = "the quick brown fox jumps over lazy dogs while fastapi streams tokens to ü clients".split()
+
+
+def _deltas(tokens, seed):
+    rng = random.Random(seed)
+    return [rng.choice(WORDS) + (" " if rng.random() < 0.8 else ", ") for _ in range(tokens)]
+
+
+async def _events(deltas, token_s):
+    yield {"type": "typing", "status": "stop"}
+    for delta in deltas:
+        if token_s:
+            await asyncio.sleep(token_s)
+        yield {"type": "chunk", "content": delta}
+    yield {"type": "done", "full_content": "".join(deltas), "metadata": {"chunks": len(deltas)}}
+
+
+async def _legacy(events):
+    chunk_id = 0
+    async for event in events:
+        if event["type"] == "chunk":
+            chunk_id += 1
+            yield json.dumps({"type": "chunk", "content": event["content"], "chunk_id": chunk_id}) + "\n"
+        else:
+            yield json.dumps(event) + "\n"
+
+
+async def _run(label, make_stream, answers, deltas, token_s, gzip):
+    frames = 0
+    wire_bytes = 0
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    for _ in range(answers):
+        compressor = zlib.compressobj(9, zlib.DEFLATED, 31) if gzip else None
+        async for frame in make_stream(_events(deltas, token_s)):
+            frames += 1
+            if compressor is None:
+                wire_bytes += len(frame)
+            else:
+                body = compressor.compress(frame.encode()) + compressor.flush(zlib.Z_SYNC_FLUSH)
+                wire_bytes += len(body)
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+    print(
+        f"{label:<14} frames/answer={frames / answers:7.1f}  frames/s={frames / wall:10.0f}  "
+        f"cpu/answer={cpu / answers * 1e6:8.0f}us  bytes/answer={wire_bytes // answers}"
+    )
+
+
+async def main_async(args):
+    deltas = _deltas(args.tokens, 7)
+    token_s = args.token_ms / 1000
+    flush = args.flush_ms / 1000
+    print(f"{args.answers} answers x {args.tokens} deltas, token gap {args.token_ms}ms, flush window {args.flush_ms}ms")
+    await _run("per-delta", _legacy, args.answers, deltas, token_s, args.gzip)
+    await _run(
+        "writer-ndjson",
+        ChatStreamWriter("ndjson", flush_interval=flush, flush_bytes=args.flush_bytes).stream,
+        args.answers,
+        deltas,
+        token_s,
+        args.gzip,
+    )
+    await _run(
+        "writer-sse",
+        ChatStreamWriter("sse", flush_interval=flush, flush_bytes=args.flush_bytes).stream,
+        args.answers,
+        deltas,
+        token_s,
+        args.gzip,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--answers", type=int, default=200)
+    parser.add_argument("--tokens", type=int, default=400)
+    parser.add_argument("--token-ms", type=float, default=0.0, help="delay between upstream deltas")
+    parser.add_argument("--flush-ms", type=float, default=30.0)
+    parser.add_argument("--flush-bytes", type=int, default=1024)
+    parser.add_argument("--no-gzip", dest="gzip", action="store_false", help="skip per-frame gzip flushes")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
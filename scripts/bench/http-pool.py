@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""Compare per-call ``httpx.AsyncClient`` against the pooled clients in api/http_clients.py.
+
+Starts a local keep-alive HTTP/1.1 stub server (no network access needed) that
+charges ``--handshake-ms`` once per new connection to stand in for TCP+TLS
+setup, then fires the same request mix both ways and prints p50/p99 latency.
+
+    python3 scripts/bench/http-pool.py --requests 400 --concurrency 16
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+import httpx  # noqa: E402
+
+from api.http_clients import aclose_http_clients, get_http_client  # noqa: E402
+
+BODY = b'{"ok":true}'
+RESPONSE = (
+    b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+    b"Content-Length: " + str(len(BODY)).encode() + b"\r\nConnection: keep-alive\r\n\r\n" + BODY
+)
+
+
+async def _serve(handshake_s: float, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    await asyncio.sleep(handshake_s)
+    try:
+        while True:
+            head = await reader.readuntil(b"\r\n\r\n")
+            if not head:
+                break
+            writer.write(RESPONSE)
+            await writer.drain()
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+def _percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+async def _run(label, fetch, url, total, concurrency):
+    gate = asyncio.Semaphore(concurrency)
+    samples = []
+
+    async def one():
+        async with gate:
+            start = time.perf_counter()
+            response = await fetch(url)
+            response.raise_for_status()
+            samples.append((time.perf_counter() - start) * 1000)
+
+    wall = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    wall = time.perf_counter() - wall
+    print(
+        f"{label:<10} p50={_percentile(samples, 50):7.2f}ms  p99={_percentile(samples, 99):7.2f}ms  "
+        f"mean={statistics.fmean(samples):7.2f}ms  throughput={total / wall:8.1f} req/s"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--handshake-ms", type=float, default=15.0)
+    args = parser.parse_args()
+
+    server = await asyncio.start_server(
+        lambda r, w: _serve(args.handshake_ms / 1000, r, w), "127.0.0.1", 0
+    )
+    url = f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}/models"
+
+    async def fresh(target):
+        async with httpx.AsyncClient(timeout=10.0) as client:
+            return await client.get(target)
+
+    async def pooled(target):
+        return await get_http_client("default").get(target)
+
+    async with server:
+        await _run("per-call", fresh, url, args.requests, args.concurrency)
+        await _run("pooled", pooled, url, args.requests, args.concurrency)
+        await aclose_http_clients()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
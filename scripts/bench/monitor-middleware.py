@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""Measure per-request overhead of the monitoring middleware.
+
+Drives a tiny Starlette app directly over ASGI (no sockets) three ways:
+
+    bare        no monitoring middleware (baseline)
+    legacy      ``BaseHTTPMiddleware`` that aggregates every request inline,
+                as ``MonitoringMiddleware`` did before
+    pure-asgi   the current ``MonitoringMiddleware``: status captured from
+                ``http.response.start``, a tuple queued, aggregation deferred
+
+and reports microseconds per request plus the overhead over ``bare``. The
+deferred aggregation cost (``flush_requests``) is timed separately between
+batches, since it runs in the background task rather than on the request path.
+
+    python3 scripts/bench/monitor-middleware.py --requests 20000
+"""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from starlette.applications import Starlette  # noqa: E402
+from starlette.middleware.base import BaseHTTPMiddleware  # noqa: E402
+from starlette.responses import PlainTextResponse  # noqa: E402
+from starlette.routing import Route  # noqa: E402
+
+from api.middleware import MonitoringMiddleware  # noqa: E402
+from api.monitoring import system_monitor  # noqa: E402
+
+
+class LegacyMonitoringMiddleware(BaseHTTPMiddleware):
+    def __init__(self, app, monitor):
+        super().__init__(app)
+        self.monitor = monitor
+
+    async def dispatch(self, request, call_next):
+        start = time.time()
+        response = await call_next(request)
+        from api.config import get_client_ip
+
+        self.monitor.record_request(
+            path=request.url.path,
+            method=request.method,
+            status_code=response.status_code,
+            response_time_ms=(time.time() - start) * 1000,
+            user_agent=request.headers.get("user-agent", "unknown"),
+            client_ip=get_client_ip(request),
+        )
+        self.monitor.flush_requests()
+        return response
+
+
+async def _ok(_request):
+    return PlainTextResponse("ok")
+
+
+def _app(middleware):
+    app = Starlette(routes=[Route("/api/ping", _ok)])
+    if middleware is not None:
+        app.add_middleware(middleware, monitor=system_monitor)
+    return app
+
+
+SCOPE = {
+    "type": "http",
+    "asgi": {"version": "3.0"},
+    "http_version": "1.1",
+    "method": "GET",
+    "scheme": "http",
+    "path": "/api/ping",
+    "raw_path": b"/api/ping",
+    "query_string": b"",
+    "root_path": "",
+    "headers": [(b"host", b"bench"), (b"user-agent", b"bench/1.0"), (b"x-forwarded-for", b"198.51.100.7")],
+    "client": ("127.0.0.1", 5000),
+    "server": ("bench", 80),
+}
+
+
+async def _receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def _send(_message):
+    return None
+
+
+async def _drive(app, requests, batch=256):
+    """Time requests in batches; queued samples are flushed between batches, off the clock."""
+    for _ in range(200):  # warm up routing / middleware stack
+        await app(dict(SCOPE), _receive, _send)
+    system_monitor.flush_requests()
+    request_s = flush_s = 0.0
+    deferred = 0
+    for done in range(0, requests, batch):
+        start = time.perf_counter()
+        for _ in range(min(batch, requests - done)):
+            await app(dict(SCOPE), _receive, _send)
+        request_s += time.perf_counter() - start
+        start = time.perf_counter()
+        deferred += system_monitor.flush_requests()
+        flush_s += time.perf_counter() - start
+    return request_s / requests, flush_s, deferred
+
+
+async def main_async(args):
+    print(f"{args.requests} requests per variant")
+    bare, _, _ = await _drive(_app(None), args.requests)
+    print(f"bare       {bare * 1e6:7.1f} us/request")
+    for label, middleware in (("legacy", LegacyMonitoringMiddleware), ("pure-asgi", MonitoringMiddleware)):
+        per_request, flush_s, deferred = await _drive(_app(middleware), args.requests)
+        line = f"{label:<10} {per_request * 1e6:7.1f} us/request  overhead {(per_request - bare) * 1e6:6.1f} us"
+        if deferred:
+            line += f"  (+{flush_s / deferred * 1e6:.1f} us/request aggregated in the background)"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20000)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""Microbenchmark ``InMemoryRateLimitStore.allow`` across many synthetic clients.
+
+Replays the same pseudo-random client mix against the sliding-window-counter
+store in api/rate_limit.py and, with ``--compare``, against the previous
+timestamp-log implementation, reporting throughput (and peak memory with ``--memory``).
+
+    python3 scripts/bench/rate-limit.py --calls 2000000 --clients 100000 --compare
+"""
+import argparse
+import random
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from api.rate_limit import InMemoryRateLimitStore  # noqa: E402
+
+
+class TimestampLogStore:
+    """The previous implementation: rebuilds a per-client list on every call."""
+
+    def __init__(self):
+        self._store = defaultdict(list)
+
+    def allow(self, client_id, *, limit, window_sec):
+        now = time.time()
+        recent = [ts for ts in self._store[client_id] if now - ts < window_sec]
+        if len(recent) >= limit:
+            self._store[client_id] = recent
+            return False
+        recent.append(now)
+        self._store[client_id] = recent
+        return True
+
+
+def _run(label, store, ids, limit, window, trace_memory):
+    if trace_memory:
+        tracemalloc.start()
+    allow = store.allow
+    allowed = 0
+    start = time.perf_counter()
+    for client_id in ids:
+        allowed += allow(client_id, limit=limit, window_sec=window)
+    elapsed = time.perf_counter() - start
+    memory = ""
+    if trace_memory:
+        memory = f"  peak={tracemalloc.get_traced_memory()[1] / 1e6:.1f}MB"
+        tracemalloc.stop()
+    print(
+        f"{label:<16} {len(ids) / elapsed / 1e6:6.2f}M allow()/s  {elapsed * 1e9 / len(ids):6.0f}ns/call  "
+        f"allowed={allowed}{memory}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=2_000_000)
+    parser.add_argument("--clients", type=int, default=100_000)
+    parser.add_argument("--limit", type=int, default=40)
+    parser.add_argument("--window", type=float, default=60.0)
+    parser.add_argument("--compare", action="store_true", help="also run the timestamp-log store")
+    parser.add_argument("--memory", action="store_true", help="trace peak memory (slows every call)")
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    names = [f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}" for i in range(args.clients)]
+    # Skewed mix: a few hot clients hit the limit, the long tail stays under it.
+    ids = [names[min(int(rng.paretovariate(1.2)) - 1, args.clients - 1)] if rng.random() < 0.3
+           else names[rng.randrange(args.clients)] for _ in range(args.calls)]
+
+    _run("window-counter", InMemoryRateLimitStore(max_clients=args.clients), ids, args.limit, args.window, args.memory)
+    if args.compare:
+        _run("timestamp-log", TimestampLogStore(), ids, args.limit, args.window, args.memory)
+
+
+if __name__ == "__main__":
+    main()
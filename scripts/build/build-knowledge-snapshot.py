@@ -0,0 +1,15 @@
+#!/usr/bin/env python3
+"""Write the AssistMe site knowledge snapshot consumed by api/site_knowledge.py.
+
+Run from the repo root (``npm run build:knowledge``). The API falls back to live
+parsing whenever the snapshot is missing or its source hashes no longer match.
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from api.site_knowledge import build_site_knowledge, write_knowledge_snapshot  # noqa: E402
+
+path = write_knowledge_snapshot(Path(sys.argv[1]) if len(sys.argv) > 1 else None)
+print(f"Wrote {len(build_site_knowledge())} knowledge chunks to {path} ({path.stat().st_size} bytes)")
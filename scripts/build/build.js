@@ -1,7 +1,7 @@
 import { fileURLToPath } from 'url';
 import { dirname, resolve, join, relative } from 'path';
 import { mkdir, rm, readdir, stat, readFile, writeFile } from 'fs/promises';
-import { execSync } from 'child_process';
+import { execSync, spawnSync } from 'child_process';
 import { transform } from 'esbuild';
 import { blogPosts } from '../../src/js/modules/blog-data.js';
 import { generateBlogPages } from './generate-blog-pages.mjs';
@@ -500,9 +500,28 @@ async function build() {
     generateFeeds(distDir),
   ]);
 
+  buildKnowledgeSnapshot();
+
   console.log(`✨ Build complete. Static assets written to ${distDir}`);
 }
 
+/**
+ * Pre-parse public site content into api/data/site_knowledge.snapshot so the
+ * Python chat function skips HTML/JS extraction on cold start. Best-effort:
+ * without Python the API parses sources live, exactly as before.
+ */
+function buildKnowledgeSnapshot() {
+  const script = resolve(projectRoot, 'scripts/build/build-knowledge-snapshot.py');
+  for (const python of [process.env.PYTHON, 'python3', 'python'].filter(Boolean)) {
+    const result = spawnSync(python, [script], { cwd: projectRoot, encoding: 'utf8' });
+    if (!result.error && result.status === 0) {
+      console.log(`🧠 ${result.stdout.trim()}`);
+      return;
+    }
+  }
+  console.warn('⚠️  Skipped site knowledge snapshot (python unavailable); API will parse sources live.');
+}
+
 function escapeXml(value = '') {
   return String(value)
     .replace(/&/g, '&amp;')
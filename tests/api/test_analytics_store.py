@@ -1,5 +1,6 @@
 """Tests for portfolio analytics store metric derivation."""
 
+import asyncio
 from datetime import datetime, timedelta, timezone
 
 from api.analytics_store import PortfolioAnalyticsStore
@@ -49,3 +50,74 @@ def test_first_seen_uses_oldest_daily_view():
     metrics = store._metrics_from_data(data, persistent=True)
 
     assert metrics["portfolio_age_days"] >= 40
+
+
+class _FakeUpstash:
+    """Executes the pipelined commands the Redis backend sends against a dict."""
+
+    def __init__(self):
+        self.data = {}
+        self.posts = []
+
+    def _run(self, command):
+        name, *args = command
+        data = self.data
+        if name == "EVAL":
+            _, _, session_key, visitors_key, _ = args
+            if session_key not in data:
+                data[session_key] = "1"
+                data[visitors_key] = str(int(data.get(visitors_key, 0)) + 1)
+            return int(data.get(visitors_key, 0))
+        if name == "SET":
+            key, value, *flags = args
+            if "NX" in flags and key in data:
+                return None
+            data[key] = value
+            return "OK"
+        if name == "INCR":
+            data[args[0]] = str(int(data.get(args[0], 0)) + 1)
+            return int(data[args[0]])
+        if name == "GET":
+            return data.get(args[0])
+        if name == "MGET":
+            return [data.get(key) for key in args]
+        if name == "MSET":
+            data.update(zip(args[::2], args[1::2]))
+            return "OK"
+        raise AssertionError(f"unexpected command {name}")
+
+    async def post(self, url, headers=None, json=None, **kwargs):
+        import httpx
+
+        self.posts.append(json)
+        return httpx.Response(
+            200,
+            json=[{"result": self._run(command)} for command in json],
+            request=httpx.Request("POST", url),
+        )
+
+
+def test_redis_track_visit_is_one_round_trip(monkeypatch):
+    monkeypatch.setenv("UPSTASH_REDIS_REST_URL", "https://redis.example")
+    monkeypatch.setenv("UPSTASH_REDIS_REST_TOKEN", "token")
+    monkeypatch.delenv("GEMINI_FIREBASE_API_KEY", raising=False)
+    monkeypatch.delenv("FIREBASE_API_KEY", raising=False)
+    upstash = _FakeUpstash()
+    monkeypatch.setattr("api.analytics_store.get_http_client", lambda name: upstash)
+    store = PortfolioAnalyticsStore()
+
+    async def scenario():
+        await store.track_visit("session-a", "/", True)
+        await store.track_visit("session-a", "/projects", False)
+        return await store.track_visit("session-b", "/", True)
+
+    metrics = asyncio.run(scenario())
+
+    assert len(upstash.posts) == 3
+    assert metrics["views"]["total"] == 3
+    assert metrics["views"]["homepage_total"] == 2
+    assert metrics["views"]["unique_visitors"] == 2
+    assert metrics["views"]["today"] == 3
+    assert metrics["daily_trend"][-1]["views"] == 3
+    assert metrics["storage"] == {"backend": "redis", "persistent": True}
+    assert asyncio.run(store.get_metrics())["views"] == metrics["views"]
@@ -0,0 +1,141 @@
+"""Tests for the file-mode analytics write-ahead log."""
+
+import asyncio
+import json
+
+from api.analytics_store import PortfolioAnalyticsStore
+from api.analytics_wal import AnalyticsLog
+
+
+def _file_store(monkeypatch, path, **options):
+    for name in ("UPSTASH_REDIS_REST_URL", "REDIS_REST_URL", "KV_REST_API_URL", "GEMINI_FIREBASE_API_KEY", "FIREBASE_API_KEY"):
+        monkeypatch.delenv(name, raising=False)
+    store = PortfolioAnalyticsStore()
+    store._wal = AnalyticsLog(
+        path,
+        initial=store._initial_data,
+        apply=store._apply_visit,
+        compact=store._prune_snapshot,
+        **options,
+    )
+    return store
+
+
+def test_flushed_visits_survive_a_restart(monkeypatch, tmp_path):
+    path = tmp_path / "analytics.json"
+    store = _file_store(monkeypatch, path, flush_interval=60)
+
+    async def scenario():
+        await store.track_visit("a", "/", True)
+        await store.track_visit("a", "/projects", False)
+        await store.track_visit("b", "/", True)
+        await store._wal.flush()
+        await store.track_visit("c", "/", True)  # not flushed: lost in the "crash"
+
+    asyncio.run(scenario())
+    assert len(store._wal.log_path.read_text().splitlines()) == 3
+    assert not path.exists()
+
+    restarted = _file_store(monkeypatch, path)
+    metrics = asyncio.run(restarted.get_metrics())
+    assert metrics["views"]["total"] == 3
+    assert metrics["views"]["homepage_total"] == 2
+    assert metrics["views"]["unique_visitors"] == 2
+    assert metrics["storage"] == {"backend": "file", "persistent": False}
+
+
+def test_compaction_writes_snapshot_and_replay_skips_compacted_visits(monkeypatch, tmp_path):
+    path = tmp_path / "analytics.json"
+    store = _file_store(monkeypatch, path, flush_interval=60, compact_every=2)
+
+    async def scenario():
+        await store.track_visit("a", "/", True)
+        await store.track_visit("b", "/", False)
+        await store._wal.flush()
+
+    asyncio.run(scenario())
+    assert json.loads(path.read_text())["total_views"] == 2
+    assert store._wal.log_path.read_text() == ""
+
+    # A crash between the snapshot rename and the log truncation leaves
+    # already-compacted visits in the log; they must not count twice.
+    writer = store._wal.writer
+    stale = [json.dumps({"writer": writer, "seq": seq, "ts": 0, "session_id": "x", "path": "/"}) for seq in (1, 2)]
+    store._wal.log_path.write_text("\n".join(stale) + "\n" + '{"seq": 3, "ts"')
+
+    metrics = asyncio.run(_file_store(monkeypatch, path).get_metrics())
+    assert metrics["views"]["total"] == 2
+    assert metrics["views"]["unique_visitors"] == 2
+
+
+def test_visits_flushed_after_a_torn_tail_survive_a_restart(monkeypatch, tmp_path):
+    path = tmp_path / "analytics.json"
+    store = _file_store(monkeypatch, path, flush_interval=60)
+
+    async def first_run():
+        await store.track_visit("a", "/", True)
+        await store.stop()
+
+    asyncio.run(first_run())
+    store._wal.log_path.write_text('{"seq": 2, "ts"')  # crash mid-append, nothing valid after it
+
+    restarted = _file_store(monkeypatch, path, flush_interval=60)
+
+    async def second_run():
+        await restarted.track_visit("b", "/", True)
+        await restarted._wal.flush()
+
+    asyncio.run(second_run())
+
+    metrics = asyncio.run(_file_store(monkeypatch, path).get_metrics())
+    assert metrics["views"]["total"] == 2
+
+
+def test_stop_compacts_and_repeat_sessions_count_once(monkeypatch, tmp_path):
+    path = tmp_path / "analytics.json"
+    store = _file_store(monkeypatch, path, flush_interval=60)
+
+    async def scenario():
+        store.start()
+        for _ in range(5):
+            await store.track_visit("same", "/", True)
+        await store.stop()
+
+    asyncio.run(scenario())
+
+    snapshot = json.loads(path.read_text())
+    assert snapshot["total_views"] == 5
+    assert snapshot["unique_visitors"] == 1
+    assert snapshot["wal_seqs"] == {store._wal.writer: 5}
+    assert list(snapshot["recent_sessions"]) == ["same"]
+
+
+def test_workers_sharing_a_log_see_each_others_visits_across_compactions(monkeypatch, tmp_path):
+    path = tmp_path / "analytics.json"
+    first = _file_store(monkeypatch, path, flush_interval=60, compact_every=3)
+    second = _file_store(monkeypatch, path, flush_interval=60, compact_every=1000)
+
+    async def scenario():
+        await first.track_visit("a", "/", True)
+        await first._wal.flush()
+        await second.track_visit("b", "/", True)
+        await second.track_visit("a", "/", False)  # a repeat session on another worker
+        await second._wal.flush()
+        await first._wal.flush()  # picks up the second worker's visits
+        assert first._wal.data["total_views"] == 3
+        await first.track_visit("c", "/", False)
+        await first.track_visit("d", "/", False)
+        await first._wal.flush()  # compacts and replaces the log
+        await second.track_visit("e", "/", False)
+        await second._wal.flush()  # reloads the compacted snapshot, keeps its queued visit
+        await first._wal.flush()
+        assert first._wal.data["total_views"] == second._wal.data["total_views"] == 6
+        await first.stop()
+        await second.stop()
+
+    asyncio.run(scenario())
+
+    metrics = asyncio.run(_file_store(monkeypatch, path).get_metrics())
+    assert metrics["views"]["total"] == 6
+    assert metrics["views"]["unique_visitors"] == 5
+    assert metrics["views"]["homepage_total"] == 2
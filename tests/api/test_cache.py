@@ -0,0 +1,89 @@
+"""Tests for the bounded LRU + TTL cache."""
+
+import asyncio
+
+import pytest
+
+import api.cache as cache_module
+from api.cache import BoundedCache, cache_stats
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_evicts_least_recently_used_entry(clock):
+    cache = BoundedCache("test_lru", max_entries=2, register=False)
+    cache["a"] = 1
+    cache["b"] = 2
+    assert cache["a"] == 1  # "b" is now the coldest entry
+    cache["c"] = 3
+
+    assert "b" not in cache
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = BoundedCache("test_ttl", max_entries=8, ttl=10, register=False)
+    cache.set("short", "x", ttl=2)
+    cache["long"] = "y"
+
+    clock[0] += 5
+    assert cache.get("short") is None
+    assert cache.get("long") == "y"
+    assert len(cache) == 1
+    assert cache.stats()["expirations"] == 1
+
+
+def test_byte_cap_evicts_oldest_payloads(clock):
+    cache = BoundedCache("test_bytes", max_entries=100, max_bytes=25, register=False)
+    cache["a"] = "x" * 10
+    cache["b"] = "y" * 10
+    cache["c"] = "z" * 10
+
+    assert "a" not in cache
+    assert cache.stats()["bytes"] == 20
+
+
+def test_stale_window_serves_old_value_and_revalidates_once():
+    cache = BoundedCache("test_swr", max_entries=8, ttl=0.05, stale_ttl=60, register=False)
+    loads = []
+
+    async def loader():
+        loads.append(1)
+        await asyncio.sleep(0)
+        return f"v{len(loads)}"
+
+    async def scenario():
+        first = await cache.get_or_load("k", loader)
+        await asyncio.sleep(0.06)
+        assert cache.get("k") is None
+        assert cache.get_entry("k") == ("v1", True)
+        stale = await asyncio.gather(cache.get_or_load("k", loader), cache.get_or_load("k", loader))
+        await asyncio.sleep(0.01)
+        return first, stale, await cache.get_or_load("k", loader)
+
+    first, stale, refreshed = asyncio.run(scenario())
+
+    assert first == "v1"
+    assert stale == ["v1", "v1"]
+    assert refreshed == "v2"
+    assert len(loads) == 2
+    assert cache.stats()["stale_hits"] >= 2
+
+
+def test_registered_caches_report_stats(clock):
+    cache = BoundedCache("test_registered", max_entries=4)
+    cache["a"] = 1
+    cache.get("a")
+    cache.get("missing")
+
+    stats = cache_stats()["test_registered"]
+    assert stats["entries"] == 1
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_rate"] == 50.0
@@ -1,5 +1,7 @@
 """Tests for chat API validation and error handling."""
 
+import asyncio
+import json
 import os
 
 import httpx
@@ -9,6 +11,7 @@ from fastapi.testclient import TestClient
 os.environ.setdefault("VERCEL_ENV", "production")
 
 from api.config import (
+    PRIMARY_OPENROUTER_MODEL,
     adaptive_llm_params,
     build_context_prompt,
     build_multimodal_user_content,
@@ -16,19 +19,39 @@ from api.config import (
     rate_limit_store,
     sanitize_context,
 )
+import api.site_knowledge as site_knowledge
+from api.chat_stream import ChatStreamWriter
 from api.index import app
-from api.routes.chat import openrouter_request_body
+from api.response_cache import chat_response_cache, normalize_chat_query
+from api.model_router import build_model_fallback_chain
+from api.model_scoreboard import model_scoreboard
+from api.routes.chat import openrouter_request_body, stream_openrouter_response
 from api.site_knowledge import (
+    KnowledgeChunk,
+    SiteKnowledgeStore,
+    _parse_site_knowledge,
+    _read_knowledge_snapshot,
+    _term_counts,
+    build_knowledge_index,
     format_blog_release_summary,
     format_usa_state_summary,
     retrieve_site_context,
     should_use_web_tools,
+    write_knowledge_snapshot,
 )
 
 
+@pytest.fixture(autouse=True)
+def reset_model_scoreboard():
+    model_scoreboard.reset()
+    yield
+    model_scoreboard.reset()
+
+
 @pytest.fixture
 def client():
     rate_limit_store.clear()
+    chat_response_cache.clear()
     return TestClient(app)
 
 
@@ -39,7 +62,10 @@ def test_chat_rejects_whitespace_only_message(client):
 
 
 def test_chat_rate_limited_returns_429(client, monkeypatch):
-    monkeypatch.setattr("api.routes.chat.check_rate_limit", lambda _client_ip: False)
+    async def deny(_client_ip):
+        return False
+
+    monkeypatch.setattr("api.routes.chat.check_rate_limit", deny)
 
     response = client.post("/api/chat", json={"message": "hello", "stream": False})
 
@@ -59,6 +85,82 @@ def test_site_knowledge_retrieves_travel_and_monitor_pages():
     assert "api" in monitor.lower()
 
 
+def test_knowledge_index_bm25_scores_only_posted_chunks():
+    def chunk(text):
+        counts = _term_counts(text)
+        return KnowledgeChunk("doc", "Doc", "https://example.test", text, frozenset(counts), counts)
+
+    index = build_knowledge_index(
+        [
+            chunk("atlas atlas atlas cities"),
+            chunk("atlas monitor"),
+            chunk("unrelated resume content"),
+        ]
+    )
+
+    assert index.postings["atlas"] == {0: 3, 1: 1}
+    assert index.idf("resume") > index.idf("atlas")
+
+    scores = index.scores({"atlas", "missing"})
+    assert set(scores) == {0, 1}
+    assert scores[0] > scores[1]
+
+    index.remove([0])
+    assert index.postings["atlas"] == {1: 1}
+    assert "cities" not in index.postings
+
+
+def test_knowledge_snapshot_seeds_only_sources_with_matching_hashes(tmp_path, monkeypatch):
+    path = write_knowledge_snapshot(tmp_path / "site_knowledge.snapshot")
+    snapshot = _read_knowledge_snapshot(path)
+    assert snapshot is not None
+    assert snapshot["facts"]["travel_summary"]["usa_state_count"] == 18
+
+    store = SiteKnowledgeStore(snapshot_path=path)
+    assert [chunk.text for chunk in store.chunks()] == [chunk.text for chunk in _parse_site_knowledge()]
+    assert all(source["from_snapshot"] for source in store.stats()["sources"])
+
+    real_read = site_knowledge._read_public_source
+    monkeypatch.setattr(
+        "api.site_knowledge._read_public_source",
+        lambda rel: real_read(rel) + (" Edited." if rel == "README.md" else ""),
+    )
+    stale = SiteKnowledgeStore(snapshot_path=path)
+    stale.refresh()
+    sources = {source["path"]: source for source in stale.stats()["sources"]}
+    assert sources["README.md"]["from_snapshot"] is False
+    assert sources["src/travel.html"]["from_snapshot"] is True
+
+    path.write_bytes(b"garbage")
+    assert _read_knowledge_snapshot(path) is None
+
+
+def test_knowledge_store_reindexes_only_changed_sources(monkeypatch):
+    store = SiteKnowledgeStore(refresh_interval=0)
+    store.refresh()
+    before = {source["path"]: source for source in store.stats()["sources"]}
+    generation = store.generation
+    travel_ids = list(store._sources["src/travel.html"].chunk_ids)
+
+    assert store.refresh() is False
+    assert store.generation == generation
+
+    monkeypatch.setattr(
+        "api.site_knowledge._stat_public_source",
+        lambda rel: (1, 1) if rel == "README.md" else (0, -1),
+    )
+    real_read = site_knowledge._read_public_source
+    monkeypatch.setattr(
+        "api.site_knowledge._read_public_source",
+        lambda rel: real_read(rel) + (" Zanzibarquartz release." if rel == "README.md" else ""),
+    )
+    assert store.refresh() is True
+    assert store.generation == generation + 1
+    assert store._sources["src/travel.html"].chunk_ids == travel_ids
+    assert store.stats()["sources"][0]["digest"] != before["README.md"]["digest"]
+    assert "zanzibarquartz" in store.index.postings
+
+
 def test_web_tools_are_gated_to_fresh_external_questions():
     site_context = retrieve_site_context("What is on the travel atlas page?", {})
 
@@ -116,6 +218,237 @@ def test_chat_upstream_http_error_returns_local_fallback(client, monkeypatch):
     assert "temporarily unavailable" in payload["answer"].lower()
 
 
+def test_chat_response_cache_serves_repeat_questions_and_replays_stream(client, monkeypatch):
+    from api.monitoring import system_monitor
+
+    monkeypatch.setattr("api.routes.chat.get_openrouter_api_key", lambda: "configured")
+    calls = []
+
+    async def fake_model_call(model, *_args, **_kwargs):
+        calls.append(model)
+        return {"answer": "Python, FastAPI and distributed systems.", "usage": None, "model": model}
+
+    monkeypatch.setattr("api.routes.chat.call_openrouter", fake_model_call)
+    hits_before = system_monitor.ai_metrics["response_cache"]["hits"]
+
+    first = client.post("/api/chat", json={"message": "What are his skills?", "stream": False})
+    second = client.post("/api/chat", json={"message": "what are his   skills", "stream": False})
+
+    assert normalize_chat_query("Hey, what are his skills?") == "what are his skills"
+    assert len(calls) == 1
+    assert first.json()["answer"] == second.json()["answer"]
+    assert second.json()["cache"] == "hit"
+    assert system_monitor.ai_metrics["response_cache"]["hits"] == hits_before + 1
+
+    with client.stream("POST", "/api/chat", json={"message": "What are his skills?", "stream": True}) as response:
+        frames = [json.loads(line) for line in response.iter_lines() if line]
+
+    assert len(calls) == 1
+    assert [frame["type"] for frame in frames][-1] == "done"
+    assert "".join(f["content"] for f in frames if f["type"] == "chunk") == "Python, FastAPI and distributed systems."
+    assert frames[-1]["metadata"]["cache"] == "hit"
+
+
+class _FakeOpenRouterStream:
+    """Async context manager standing in for ``httpx.AsyncClient.stream``."""
+
+    def __init__(self, status_code, lines, first_delay, log):
+        self.status_code = status_code
+        self._lines = lines
+        self._first_delay = first_delay
+        self._log = log
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *_exc):
+        return False
+
+    async def aread(self):
+        return b""
+
+    async def aiter_lines(self):
+        try:
+            await asyncio.sleep(self._first_delay)
+            for line in self._lines:
+                yield line
+        except asyncio.CancelledError:
+            self._log.append("cancelled")
+            raise
+
+
+def _sse(text):
+    return "data: " + json.dumps({"choices": [{"delta": {"content": text}}]})
+
+
+def _fake_openrouter(monkeypatch, behaviours):
+    started = []
+    cancelled = []
+
+    class FakeClient:
+        def stream(self, _method, _url, *, json, **_kwargs):
+            model = json["model"]
+            started.append(model)
+            status, lines, delay = behaviours.get(model, (402, [], 0))
+            return _FakeOpenRouterStream(status, lines, delay, cancelled)
+
+    monkeypatch.setattr("api.routes.chat.get_openrouter_api_key", lambda: "configured")
+    monkeypatch.setattr("api.routes.chat.get_http_client", lambda _name: FakeClient())
+    return started, cancelled
+
+
+async def _collect_async(model):
+    return [event async for event in stream_openrouter_response(model, [{"role": "user", "content": "hi"}])]
+
+
+def _collect_stream(model, messages):
+    async def scenario():
+        return [event async for event in stream_openrouter_response(model, messages)]
+
+    return asyncio.run(scenario())
+
+
+def test_stream_hedges_slow_primary_with_next_fallback(monkeypatch):
+    from api.monitoring import system_monitor
+
+    monkeypatch.setenv("OPENROUTER_HEDGE_DELAY", "0.05")
+    chain = build_model_fallback_chain(PRIMARY_OPENROUTER_MODEL)
+    started, cancelled = _fake_openrouter(
+        monkeypatch,
+        {
+            chain[0]: (200, [_sse("slow primary")], 5.0),
+            chain[1]: (200, [_sse("Hello"), _sse(" there"), "data: [DONE]"], 0.0),
+        },
+    )
+    wins_before = system_monitor.ai_metrics["hedging"]["hedge_wins"]
+
+    frames = _collect_stream(PRIMARY_OPENROUTER_MODEL, [{"role": "user", "content": "hi"}])
+
+    assert started == chain[:2]
+    assert cancelled == ["cancelled"]
+    assert "".join(f["content"] for f in frames if f["type"] == "chunk") == "Hello there"
+    assert frames[-1]["type"] == "done"
+    assert frames[-1]["metadata"]["model"] == chain[1]
+    assert system_monitor.ai_metrics["hedging"]["hedge_wins"] == wins_before + 1
+    assert system_monitor.model_ttft_percentiles()[chain[1]]["samples"] >= 1
+
+
+def test_stream_hedge_loser_is_not_credited_with_a_fast_first_token(monkeypatch):
+    monkeypatch.setenv("OPENROUTER_HEDGE_DELAY", "0.2")
+    chain = build_model_fallback_chain(PRIMARY_OPENROUTER_MODEL)
+    _fake_openrouter(
+        monkeypatch,
+        {
+            chain[0]: (200, [_sse("Primary"), "data: [DONE]"], 0.25),
+            chain[1]: (200, [_sse("stalled hedge")], 5.0),
+        },
+    )
+
+    frames = _collect_stream(PRIMARY_OPENROUTER_MODEL, [{"role": "user", "content": "hi"}])
+
+    assert frames[-1]["metadata"]["model"] == chain[0]
+    scores = model_scoreboard.snapshot()
+    assert scores[chain[0]]["ewma_ttft_ms"] >= 250
+    # The hedge ran ~50ms without a token: that is no TTFT sample.
+    assert scores[chain[1]]["ewma_ttft_ms"] is None
+    assert build_model_fallback_chain(PRIMARY_OPENROUTER_MODEL)[:2] == chain[:2]
+
+
+def test_stream_without_hedging_falls_back_in_sequence(monkeypatch):
+    monkeypatch.setenv("OPENROUTER_HEDGE_DELAY", "0")
+    chain = build_model_fallback_chain(PRIMARY_OPENROUTER_MODEL)
+    started, cancelled = _fake_openrouter(
+        monkeypatch,
+        {
+            chain[0]: (402, [], 0.0),
+            chain[1]: (200, [_sse("safe")], 0.0),
+            chain[2]: (200, [_sse("Real answer")], 0.01),
+        },
+    )
+
+    frames = _collect_stream(PRIMARY_OPENROUTER_MODEL, [{"role": "user", "content": "hi"}])
+
+    assert started == chain[:3]
+    assert not cancelled
+    assert frames[-1]["type"] == "done"
+    assert frames[-1]["metadata"]["model"] == chain[2]
+    assert frames[-1]["full_content"] == "Real answer"
+
+    scores = model_scoreboard.snapshot()
+    assert scores[chain[0]]["http_402"] == 1 and scores[chain[0]]["state"] == "open"
+    assert scores[chain[1]]["garbage"] == 1
+    assert scores[chain[2]]["successes"] == 1
+    # The out-of-credit primary is now tried last.
+    assert build_model_fallback_chain(PRIMARY_OPENROUTER_MODEL)[-1] == chain[0]
+
+
+def test_stream_non_http_pump_failure_falls_back_instead_of_hanging(monkeypatch):
+    monkeypatch.setenv("OPENROUTER_HEDGE_DELAY", "0")
+    chain = build_model_fallback_chain(PRIMARY_OPENROUTER_MODEL)
+    started, _ = _fake_openrouter(monkeypatch, {chain[1]: (200, [_sse("Recovered")], 0.0)})
+    import api.routes.chat as chat_route
+
+    working_client = chat_route.get_http_client("openrouter")
+
+    def flaky_client(_name):
+        if not started:
+            started.append(chain[0])
+            raise RuntimeError("client pool closed")
+        return working_client
+
+    monkeypatch.setattr("api.routes.chat.get_http_client", flaky_client)
+
+    async def scenario():
+        return await asyncio.wait_for(_collect_async(PRIMARY_OPENROUTER_MODEL), 3)
+
+    frames = asyncio.run(scenario())
+
+    assert started[:2] == chain[:2]
+    assert frames[-1]["type"] == "done"
+    assert frames[-1]["full_content"] == "Recovered"
+    assert model_scoreboard.snapshot()[chain[0]]["last_error"] == "RuntimeError"
+
+
+def test_stream_writer_coalesces_deltas_and_flushes_idle_windows():
+    async def deltas():
+        yield {"type": "typing", "status": "stop"}
+        for piece in ("Hel", "lo", " wor", "ld"):
+            yield {"type": "chunk", "content": piece}
+        await asyncio.sleep(0.05)  # upstream stalls: the pending window must flush on its own
+        yield {"type": "chunk", "content": "!"}
+        yield {"type": "done", "full_content": "Hello world!"}
+
+    async def scenario(writer):
+        return [frame async for frame in writer.stream(deltas())]
+
+    frames = asyncio.run(scenario(ChatStreamWriter("ndjson", flush_interval=0.01, flush_bytes=1024)))
+    decoded = [json.loads(frame) for frame in frames]
+
+    assert [frame["type"] for frame in decoded] == ["typing", "chunk", "chunk", "done"]
+    assert [frame["content"] for frame in decoded if frame["type"] == "chunk"] == ["Hello world", "!"]
+    assert frames[1] == json.dumps({"type": "chunk", "content": "Hello world", "chunk_id": 1}) + "\n"
+
+    sse = asyncio.run(scenario(ChatStreamWriter("sse", flush_interval=0.01)))
+    assert all(frame.startswith("data: {") and frame.endswith("\n\n") for frame in sse)
+
+
+def test_chat_stream_negotiates_sse_framing(client, monkeypatch):
+    monkeypatch.setattr("api.routes.chat.get_openrouter_api_key", lambda: "")
+
+    with client.stream(
+        "POST",
+        "/api/chat",
+        json={"message": "How many states of USA have I visited?", "stream": True},
+        headers={"Accept": "text/event-stream"},
+    ) as response:
+        body = "".join(response.iter_text())
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = [json.loads(line[6:]) for line in body.split("\n\n") if line.startswith("data: ")]
+    assert events[-1]["type"] == "done"
+    assert "18 states/districts" in "".join(e["content"] for e in events if e["type"] == "chunk")
+
+
 def test_chat_local_mode_uses_public_site_knowledge(client, monkeypatch):
     monkeypatch.setattr("api.routes.chat.get_openrouter_api_key", lambda: "")
 
@@ -0,0 +1,40 @@
+"""Tests for the indexed monitor event store."""
+
+from api.event_store import EventStore
+
+
+def _filled(count, maxlen=5):
+    store = EventStore(maxlen=maxlen)
+    for index in range(count):
+        store.add(f"e{index}", ts=1000.0 + index, kind="error" if index % 2 else "info", source=f"s{index % 3}")
+    return store
+
+
+def test_eviction_keeps_ids_contiguous_and_counters_exact():
+    store = _filled(12)
+
+    assert len(store) == 5 and store.last_id == 12
+    assert list(store) == ["e7", "e8", "e9", "e10", "e11"]
+    assert store.get(7) is None and store.get(8) == "e7"
+    assert store.count("error") == 3 and store.count("info") == 2
+    assert sum(store.counts_by_source().values()) == 5
+    assert store.count_since(1009.0) == 3
+
+    assert store.mark_resolved(9) == "e8"
+    assert store.mark_resolved(3) is None
+    assert store.count(resolved=True) == 1 and store.count("info", resolved=False) == 1
+
+
+def test_cursor_pages_walk_forward_with_filters():
+    store = _filled(9, maxlen=100)
+
+    first, cursor = store.page(2)
+    second, cursor = store.page(2, after=cursor)
+    errors, error_cursor = store.page(10, kind="error")
+
+    assert [event_id for event_id, _ in first] == [1, 2]
+    assert [event_id for event_id, _ in second] == [3, 4]
+    assert cursor == 4
+    assert [item for _, item in errors] == ["e1", "e3", "e5", "e7"]
+    assert error_cursor is None
+    assert store.page(5, after=store.last_id) == ([], None)
@@ -0,0 +1,50 @@
+"""Tests for the pooled outbound HTTP client registry."""
+
+import asyncio
+
+import pytest
+
+from api.http_clients import UPSTREAMS, aclose_http_clients, get_http_client
+
+
+def test_http_client_is_reused_per_upstream_within_a_loop():
+    async def scenario():
+        first = get_http_client("github")
+        again = get_http_client("github")
+        other = get_http_client("supabase")
+        unknown = get_http_client("not-configured")
+        await aclose_http_clients()
+        return first, again, other, unknown
+
+    first, again, other, unknown = asyncio.run(scenario())
+
+    assert first is again
+    assert first is not other
+    assert unknown.timeout.read == UPSTREAMS["default"].timeout
+    assert first.is_closed and other.is_closed
+
+
+def test_http_client_is_rebuilt_for_a_new_event_loop():
+    async def grab():
+        return get_http_client("openrouter")
+
+    first = asyncio.run(grab())
+    second = asyncio.run(grab())
+
+    assert first is not second
+    assert first.timeout.read == UPSTREAMS["openrouter"].timeout
+
+
+def test_http2_upstreams_negotiate_http2_when_h2_is_installed():
+    pytest.importorskip("h2")
+
+    async def scenario():
+        clients = {name: get_http_client(name) for name in ("google", "withings")}
+        pools = {name: client._transport._pool for name, client in clients.items()}
+        await aclose_http_clients()
+        return pools
+
+    pools = asyncio.run(scenario())
+
+    assert UPSTREAMS["google"].http2 and pools["google"]._http2 is True
+    assert not UPSTREAMS["withings"].http2 and pools["withings"]._http2 is False
@@ -0,0 +1,64 @@
+"""Tests for the rolling log-bucket latency histograms."""
+
+from api.latency_sketch import (
+    BUCKET_BYTES,
+    LogHistogram,
+    WindowedLatency,
+    bucket_index,
+    bucket_value,
+)
+
+
+def test_bucket_midpoint_stays_within_relative_error():
+    for value in (0.3, 1.0, 7.5, 42.0, 250.0, 1234.5, 30000.0):
+        assert abs(bucket_value(bucket_index(value)) - value) / value < 0.065
+
+
+def test_percentiles_and_merge():
+    fast, slow = LogHistogram(), LogHistogram()
+    for _ in range(90):
+        fast.record(10.0)
+    for _ in range(10):
+        slow.record(1000.0)
+
+    merged = LogHistogram().merge(fast).merge(slow)
+
+    assert merged.total == 100
+    assert abs(merged.percentile(50) - 10.0) < 1
+    assert abs(merged.percentile(99) - 1000.0) < 65
+    assert fast.summary()["p95_ms"] is not None
+    assert LogHistogram().summary() == {"count": 0, "p50_ms": None, "p95_ms": None, "p99_ms": None}
+
+
+def test_windows_roll_and_memory_is_fixed():
+    sketch = WindowedLatency()
+    start = 1_000_000.0
+    sketch.record(start, 5.0)
+    slots_before = [len(ring.slots) for ring in sketch._rings.values()]
+    for second in range(0, 7200, 7):
+        sketch.record(start + second, 20.0)
+
+    now = start + 7200
+    summary = sketch.summary(now)
+
+    assert summary["1m"]["count"] < summary["5m"]["count"] < summary["1h"]["count"]
+    assert summary["1h"]["p50_ms"] == round(bucket_value(bucket_index(20.0)), 1)
+    assert [len(ring.slots) for ring in sketch._rings.values()] == slots_before
+    assert all(len(slot.counts) * slot.counts.itemsize == BUCKET_BYTES
+               for ring in sketch._rings.values() for slot in ring.slots if slot)
+    assert sketch.summary(now + 7200)["1h"]["count"] == 0
+
+
+def test_lifetime_histogram_feeds_cumulative_prometheus_buckets():
+    from api.openmetrics import _LE_LABELS, _LE_SLOT, LATENCY_BOUNDS_SECONDS
+    from api.latency_sketch import bucket_upper
+
+    for index, slot in enumerate(_LE_SLOT):
+        if slot < len(LATENCY_BOUNDS_SECONDS):
+            assert bucket_upper(index) / 1000 <= LATENCY_BOUNDS_SECONDS[slot]
+    assert _LE_LABELS[-1] == "+Inf" and _LE_SLOT[-1] == len(LATENCY_BOUNDS_SECONDS)
+
+    sketch = WindowedLatency()
+    sketch.record(0.0, 4.0)
+    sketch.record(7200.0, 40.0)
+    assert sketch.lifetime.total == 2 and sketch.sum_ms == 44.0
@@ -0,0 +1,57 @@
+"""Tests for the table-driven local intelligence engine."""
+
+from api.local_intelligence import LOCAL_INTENTS, answer_locally
+
+
+def test_specific_intent_outscores_greeting_and_generic_topics():
+    greeting_and_skills = answer_locally("Hi, what are his skills?")
+    travel_for_work = answer_locally("How many USA states has he visited for work?")
+
+    assert greeting_and_skills["intent"] == "skills"
+    assert "Technical Stack" in greeting_and_skills["answer"]
+    assert travel_for_work["intent"] == "usa_travel"
+    assert "18 states/districts" in travel_for_work["answer"]
+
+
+def test_site_context_snippet_answers_when_it_covers_the_question():
+    site_context = "Travel Atlas: 54 USA stops across 18 states, with Philadelphia and Pittsburgh city notes."
+
+    covered = answer_locally("Philadelphia Pittsburgh notes", site_context)
+    unrelated = answer_locally("Tell me about his education", site_context)
+    no_context = answer_locally("Philadelphia Pittsburgh notes")
+
+    assert covered["category"] == "Site Knowledge"
+    assert "Philadelphia and Pittsburgh" in covered["answer"]
+    assert unrelated["intent"] == "education"
+    assert no_context["intent"] == "default"
+
+
+def test_static_answers_are_prerendered_once():
+    static = [intent for intent in LOCAL_INTENTS if intent.render is None]
+
+    assert static and all(intent.answer for intent in static)
+    contact = next(intent for intent in LOCAL_INTENTS if intent.name == "contact")
+    assert answer_locally("How do I contact him?")["answer"] is contact.answer
+
+
+def test_factual_keyword_alone_falls_back_to_default():
+    for question in (
+        "what certification does he have",
+        "any publication?",
+        "where is his location",
+        "what gpa did he get",
+    ):
+        result = answer_locally(question)
+        assert result["intent"] == "default", question
+        assert result["score"] == 0.0
+
+
+def test_ties_between_topics_keep_the_previous_first_match_order():
+    # Equal scores resolve in table order, which mirrors the old if-chain.
+    project_and_contact = answer_locally("can I contact him about a project")
+    resume_and_skills = answer_locally("resume skills")
+
+    assert project_and_contact["intent"] == "projects"
+    assert answer_locally("can I contact him")["score"] == project_and_contact["score"]
+    assert resume_and_skills["intent"] == "resume"
+    assert answer_locally("skills")["score"] == resume_and_skills["score"]
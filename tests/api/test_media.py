@@ -1,5 +1,7 @@
 """Tests for media proxy behavior."""
 
+import asyncio
+import json
 import os
 import time
 
@@ -274,3 +276,103 @@ def test_pick_itunes_artwork_ignores_feat_and_remaster_noise():
     )
 
     assert artwork == "https://itunes/stan/600x600bb.jpg"
+
+
+def _patch_slow_poster_providers(monkeypatch, google_delay=0.2):
+    async def tmdb(title, media_type="movie"):
+        await asyncio.sleep(0.2)
+        return f"https://image.tmdb.org/{media_type}/{title}.jpg"
+
+    async def google_books(title, author=""):
+        await asyncio.sleep(google_delay)
+        return ""
+
+    async def openlibrary(title, author=""):
+        await asyncio.sleep(0.05)
+        return f"https://covers.openlibrary.org/{title}.jpg"
+
+    monkeypatch.setattr("api.routes.media.GOOGLE_BOOKS_API_KEY", "configured")
+    monkeypatch.setattr("api.routes.media.fetch_tmdb_poster", tmdb)
+    monkeypatch.setattr("api.routes.media.fetch_google_books_cover", google_books)
+    monkeypatch.setattr("api.routes.media.fetch_openlibrary_cover", openlibrary)
+
+
+def test_poster_batch_resolves_items_concurrently_in_order(monkeypatch):
+    _patch_slow_poster_providers(monkeypatch)
+    client = TestClient(app)
+    items = [{"id": str(i), "type": "movie", "title": f"m{i}"} for i in range(6)]
+    items.append({"id": "b", "type": "book", "title": "dune"})
+
+    started = time.perf_counter()
+    response = client.get("/api/posters/batch", params={"items": json.dumps(items)})
+    elapsed = time.perf_counter() - started
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [r["id"] for r in results] == [str(i) for i in range(6)] + ["b"]
+    # Six 200ms lookups finish in roughly one round, not six.
+    assert elapsed < 0.8
+    # Google Books answered empty, so the Open Library hedge supplies the cover.
+    assert results[-1]["source"] == "openlibrary"
+    assert results[-1]["poster_url"].endswith("dune.jpg")
+
+
+def test_poster_batch_hedges_slow_google_books(monkeypatch):
+    _patch_slow_poster_providers(monkeypatch, google_delay=5.0)
+    client = TestClient(app)
+    items = [{"id": "b", "type": "book", "title": "dune"}]
+
+    started = time.perf_counter()
+    response = client.get("/api/posters/batch", params={"items": json.dumps(items)})
+
+    assert time.perf_counter() - started < 2.0
+    assert response.json()["results"][0]["source"] == "openlibrary"
+
+
+def test_poster_batch_streams_ndjson_results(monkeypatch):
+    _patch_slow_poster_providers(monkeypatch)
+    client = TestClient(app)
+    items = [{"id": "m", "type": "movie", "title": "arrival"}, {"id": "x", "type": "game", "title": "?"}]
+
+    with client.stream(
+        "GET", "/api/posters/batch", params={"items": json.dumps(items), "stream": "true"}
+    ) as response:
+        frames = [json.loads(line) for line in response.iter_lines() if line]
+
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert frames[0] == {"type": "result", "index": 1, "id": "x", "poster_url": "", "source": "unknown", "cached": False}
+    assert frames[1]["index"] == 0 and frames[1]["source"] == "tmdb"
+    assert frames[-1] == {"type": "done", "count": 2}
+
+
+def test_poster_batch_provider_limits_are_shared_across_requests(monkeypatch):
+    import httpx
+
+    from api.routes.media import POSTER_PROVIDER_LIMITS
+
+    in_flight = {"now": 0, "peak": 0}
+
+    async def tmdb(title, media_type="movie"):
+        in_flight["now"] += 1
+        in_flight["peak"] = max(in_flight["peak"], in_flight["now"])
+        await asyncio.sleep(0.05)
+        in_flight["now"] -= 1
+        return f"https://image.tmdb.org/{media_type}/{title}.jpg"
+
+    monkeypatch.setattr("api.routes.media.fetch_tmdb_poster", tmdb)
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            batches = [
+                [{"id": f"{batch}-{i}", "type": "movie", "title": f"shared-limit-{batch}-{i}"} for i in range(6)]
+                for batch in range(3)
+            ]
+            return await asyncio.gather(
+                *(client.get("/api/posters/batch", params={"items": json.dumps(items)}) for items in batches)
+            )
+
+    responses = asyncio.run(scenario())
+
+    assert all(response.status_code == 200 for response in responses)
+    assert in_flight["peak"] == POSTER_PROVIDER_LIMITS["tmdb"]
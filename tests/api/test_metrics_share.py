@@ -0,0 +1,65 @@
+"""Tests for cross-worker monitor counter sharing."""
+
+import asyncio
+import json
+
+import pytest
+
+from api.metrics_share import MetricsSharer, SharedFileBackend
+from api.monitoring import system_monitor
+
+
+def test_workers_merge_deltas_through_shared_file(tmp_path):
+    backend = SharedFileBackend(tmp_path / "monitor.json")
+    other_worker = {
+        "requests": 10,
+        "errors": 1,
+        "e|GET:/api/other|total_requests": 10,
+        "e|GET:/api/other|failed_requests": 1,
+        "e|GET:/api/other|c2": 9,
+        "e|GET:/api/other|c5": 1,
+        "h|GET:/api/other|40": 10,
+        "a|model|test/model": 3,
+    }
+    asyncio.run(backend.exchange(other_worker))
+    sharer = MetricsSharer(system_monitor, backend)
+    assert asyncio.run(sharer.sync())
+    assert asyncio.run(sharer.sync())  # nothing new: totals unchanged
+
+    system_monitor.record_request("GET", "/api/merge-probe", 200, 3.0)
+    system_monitor.metrics_sharer = sharer
+    try:
+        merged = sharer.merged()
+        metrics = system_monitor.get_metrics()
+        ai = system_monitor.ai_counters()
+    finally:
+        system_monitor.metrics_sharer = None
+
+    assert merged["requests"] == system_monitor.total_requests + 10
+    assert metrics["aggregation"]["scope"] == "cluster"
+    assert metrics["total_requests"] == system_monitor.total_requests + 10
+    endpoints = {f"{e['method']}:{e['path']}": e for e in metrics["endpoints"]}
+    assert endpoints["GET:/api/other"]["total_requests"] == 10
+    assert endpoints["GET:/api/other"]["error_rate"] == 10.0
+    assert endpoints["GET:/api/merge-probe"]["total_requests"] >= 1
+    assert ai["model_usage"]["test/model"] >= 3
+
+
+def test_shared_file_survives_a_failed_write_and_recovers_from_corruption(tmp_path, monkeypatch):
+    path = tmp_path / "monitor.json"
+    backend = SharedFileBackend(path)
+    assert asyncio.run(backend.exchange({"requests": 2})) == {"requests": 2}
+
+    def killed_mid_write(*args, **kwargs):
+        raise OSError("disk full")
+
+    monkeypatch.setattr("api.metrics_share.json.dump", killed_mid_write)
+    with pytest.raises(OSError):
+        asyncio.run(backend.exchange({"requests": 5}))
+    monkeypatch.undo()
+    assert json.loads(path.read_text()) == {"requests": 2}
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["monitor.json", "monitor.json.lock"]
+
+    path.write_text('{"requests": 2, "err')  # torn by an older in-place writer
+    assert asyncio.run(backend.exchange({"requests": 1})) == {"requests": 1}
+    assert json.loads(path.read_text()) == {"requests": 1}
@@ -12,6 +12,7 @@ from api.model_router import (
     build_model_fallback_chain,
     resolve_chat_model,
 )
+from api.model_scoreboard import ModelScoreboard
 from api.routes.chat import openrouter_request_body
 
 
@@ -113,3 +114,58 @@ def test_resolve_image_query_uses_free_vision_model():
     assert model == FREE_VISION_OPENROUTER_MODEL
     assert tier == "vision-free"
     assert web is False
+
+
+def test_scoreboard_demotes_out_of_credit_and_garbage_models():
+    board = ModelScoreboard(failure_threshold=2, base_cooldown=30)
+    chain = build_model_fallback_chain(ROUTER_PRIMARY_MODEL, ranked=False)
+    free_model, spare = chain[1], chain[2]
+
+    board.record_error(ROUTER_PRIMARY_MODEL, "insufficient credits", 402)
+    board.record_garbage(free_model)
+    board.record_garbage(free_model)
+    board.record_first_token(spare, 0.4)
+    board.record_success(spare, tokens=200, elapsed=2.0)
+    ranked = board.rank(chain)
+
+    assert ranked[0] == spare
+    assert set(ranked[-2:]) == {ROUTER_PRIMARY_MODEL, free_model}
+    snapshot = board.snapshot()
+    assert snapshot[ROUTER_PRIMARY_MODEL]["state"] == "open"
+    assert snapshot[ROUTER_PRIMARY_MODEL]["http_402"] == 1
+    assert snapshot[free_model]["garbage_rate"] > 0
+    assert snapshot[spare]["ewma_tokens_per_sec"] == 100.0
+
+
+def test_scoreboard_breaker_half_opens_and_closes_on_success(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("api.model_scoreboard.time.monotonic", lambda: now[0])
+    board = ModelScoreboard(failure_threshold=1, base_cooldown=10)
+    chain = build_model_fallback_chain(ROUTER_PRIMARY_MODEL, ranked=False)
+
+    board.record_error(ROUTER_PRIMARY_MODEL, "ReadTimeout")
+    assert board.rank(chain)[-1] == ROUTER_PRIMARY_MODEL
+
+    now[0] += 11
+    assert board.snapshot()[ROUTER_PRIMARY_MODEL]["state"] == "half_open"
+    assert board.rank(chain)[0] != ROUTER_PRIMARY_MODEL
+
+    board.record_success(ROUTER_PRIMARY_MODEL)
+    assert board.snapshot()[ROUTER_PRIMARY_MODEL]["state"] == "closed"
+    assert board.rank(chain) == chain
+
+
+def test_scoreboard_lost_race_never_lowers_expected_ttft():
+    board = ModelScoreboard()
+    model = build_model_fallback_chain(ROUTER_PRIMARY_MODEL, ranked=False)[1]
+
+    board.record_lost_race(model, 0.05)  # less than the unknown-model default
+    assert board.snapshot()[model]["ewma_ttft_ms"] is None
+
+    board.record_first_token(model, 0.4)
+    for elapsed in (0.05, 0.3):
+        board.record_lost_race(model, elapsed)
+        assert board.snapshot()[model]["ewma_ttft_ms"] == 400.0
+
+    board.record_lost_race(model, 3.0)
+    assert board.snapshot()[model]["ewma_ttft_ms"] >= 3000.0
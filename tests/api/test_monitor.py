@@ -1,6 +1,8 @@
 """Tests for monitor API endpoints — health, metrics, status, docs, and events."""
 
+import asyncio
 import os
+import time
 
 import pytest
 from fastapi.testclient import TestClient
@@ -110,6 +112,23 @@ class TestMonitorEvents:
         data = response.json()
         assert len(data["events"]) <= 5
 
+    def test_events_cursor_pages_and_resolves_by_id(self, client):
+        from api.monitoring import EventType, system_monitor
+
+        for index in range(3):
+            system_monitor.log_event(f"cursor probe {index}", EventType.WARNING, source="cursor_probe")
+        newest = system_monitor.events.last_id
+
+        page = client.get("/api/monitor/events", params={"after": newest - 3, "limit": 2}).json()
+        rest = client.get("/api/monitor/events", params={"after": page["next_cursor"]}).json()
+
+        assert [e["id"] for e in page["events"]] == [newest - 2, newest - 1]
+        assert [e["id"] for e in rest["events"]][0] == newest
+        assert page["totals"]["by_source"]["cursor_probe"] >= 3
+        assert system_monitor.resolve_event(str(newest))
+        assert system_monitor.events.get(newest).resolved
+        assert not system_monitor.resolve_event("not-an-id")
+
 
 class TestMonitorExternalServices:
     def test_external_services_returns_200(self, client):
@@ -129,6 +148,32 @@ class TestMonitorHostingSurfaces:
         assert isinstance(data["surfaces"], list)
 
 
+class TestMonitorProbes:
+    def test_probes_endpoint_reports_scheduler_state(self, client):
+        response = client.get("/api/monitor/probes?history=2")
+        assert response.status_code == 200
+        data = response.json()
+        assert "running" in data
+        assert isinstance(data["probes"], dict)
+
+    def test_scheduled_service_results_are_published_to_the_services_cache(self, monkeypatch):
+        from api.monitoring import system_monitor
+
+        scheduler = system_monitor._build_probe_scheduler()
+        monkeypatch.setattr(system_monitor, "probe_scheduler", scheduler)
+        monkeypatch.setattr(system_monitor, "_services_cache", None)
+        monkeypatch.setattr(system_monitor, "_services_cache_expires_at", 0.0)
+        service_names = [name for name in scheduler.probes if name.startswith("service:")]
+        for name in service_names:
+            scheduler.probes[name].result = {"name": name, "status": "healthy"}
+            scheduler.probes[name].completed_at = time.time()
+        system_monitor._publish_services(service_names[0], {})
+
+        payload = asyncio.run(system_monitor.get_external_services_status())
+        assert [service["name"] for service in payload["services"]] == service_names
+        assert payload["summary"]["healthy"] == len(service_names)
+
+
 class TestMonitorWebVitals:
     def test_web_vitals_endpoint_returns_200(self, client):
         response = client.post("/api/monitor/web-vitals", json={"LCP": 1200.0, "FID": 15.0})
@@ -169,3 +214,123 @@ class TestMonitorAIMetrics:
         assert response.status_code == 200
         data = response.json()
         assert isinstance(data, dict)
+        assert isinstance(data["model_scoreboard"], dict)
+        assert "hedging" in data
+
+
+class TestMonitorKnowledgeIndex:
+    def test_knowledge_index_requires_admin_token_in_production(self, client, monkeypatch):
+        monkeypatch.delenv("MONITOR_ADMIN_TOKEN", raising=False)
+        response = client.get("/api/monitor/knowledge-index")
+        assert response.status_code == 403
+
+    def test_knowledge_index_reports_generation_and_sources(self, client, monkeypatch):
+        monkeypatch.setenv("MONITOR_ADMIN_TOKEN", "test-admin-token")
+        response = client.get(
+            "/api/monitor/knowledge-index",
+            headers={"x-monitor-admin-token": "test-admin-token"},
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["generation"] >= 1
+        assert data["total_chunks"] > 0
+        paths = {source["path"] for source in data["sources"]}
+        assert "src/travel.html" in paths
+        assert all("build_ms" in source for source in data["sources"])
+
+
+class TestMonitorMiddleware:
+    def test_queued_requests_are_aggregated_before_metrics_are_read(self, client):
+        def deployments_count():
+            endpoints = client.get("/api/monitor/metrics").json()["endpoints"]
+            entry = next((e for e in endpoints if e["path"] == "/api/monitor/deployments"), None)
+            return entry["total_requests"] if entry else 0
+
+        before = deployments_count()
+        for _ in range(3):
+            client.get("/api/monitor/deployments")
+
+        assert deployments_count() == before + 3
+
+    def test_suspicious_path_records_security_event_with_client_identity(self, client):
+        from api.monitoring import system_monitor
+
+        client.get("/api/.git/config", headers={"x-forwarded-for": "203.0.113.9", "user-agent": "scanner/1.0"})
+        system_monitor.flush_requests()
+
+        event = system_monitor.security_events.latest(1)[-1]
+        assert event["path"] == "/api/.git/config"
+        assert event["ip"] == "203.0.113.9"
+        assert event["user_agent"] == "scanner/1.0"
+        assert event["severity"] == "high"
+
+    def test_real_time_reports_windowed_latency_percentiles(self, client):
+        for _ in range(3):
+            client.get("/api/monitor/deployments")
+
+        data = client.get("/api/monitor/real-time").json()
+
+        assert set(data["latency_ms"]) == {"1m", "5m", "1h"}
+        assert data["latency_ms"]["1m"]["count"] >= 3
+        endpoint = data["endpoint_latency_ms"]["GET:/api/monitor/deployments"]
+        assert endpoint["1m"]["p99_ms"] >= endpoint["1m"]["p50_ms"] > 0
+
+    def test_rate_series_counts_recent_requests_per_endpoint(self, client):
+        for _ in range(4):
+            client.get("/api/monitor/deployments")
+
+        overall = client.get("/api/monitor/rates").json()
+        endpoint = client.get(
+            "/api/monitor/rates", params={"resolution": "minute", "endpoint": "GET:/api/monitor/deployments"}
+        ).json()
+
+        assert len(overall["requests"]) == 300 and overall["step_seconds"] == 1
+        assert sum(overall["requests"][-5:]) >= 4
+        assert len(endpoint["requests"]) == 1440 and endpoint["requests"][-1] >= 4
+        assert client.get("/api/monitor/real-time").json()["requests_per_second"] > 0
+        assert client.get("/api/monitor/rates", params={"resolution": "hour"}).status_code == 400
+        assert client.get("/api/monitor/rates", params={"endpoint": "GET:/nope"}).status_code == 404
+
+    def test_prometheus_exposition_is_openmetrics_text(self, client):
+        client.get("/api/monitor/deployments")
+
+        response = client.get("/api/monitor/metrics/prometheus")
+        body = response.text
+
+        assert response.headers["content-type"].startswith("application/openmetrics-text")
+        assert body.endswith("# EOF\n")
+        assert 'assistme_http_requests_total{method="GET",path="/api/monitor/deployments",code="2xx"}' in body
+        assert 'assistme_http_request_duration_seconds_bucket{method="GET",path="/api/monitor/deployments",le="+Inf"}' in body
+        assert "# TYPE assistme_ai_tokens counter" in body
+        assert 'assistme_poster_requests_total{outcome="success"}' in body
+        assert "assistme_cache_hits_total{cache=" in body
+        families = [line.split()[2] for line in body.splitlines() if line.startswith("# TYPE")]
+        assert len(families) == len(set(families))
+
+    def test_streamed_body_passes_through_untouched(self):
+        import asyncio
+
+        from api.middleware import MonitoringMiddleware
+        from api.monitoring import system_monitor
+
+        async def streaming_app(scope, receive, send):
+            await send({"type": "http.response.start", "status": 201, "headers": []})
+            await send({"type": "http.response.body", "body": b"a", "more_body": True})
+            await send({"type": "http.response.body", "body": b"b", "more_body": False})
+
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        scope = {"type": "http", "method": "GET", "path": "/stream-probe", "headers": [], "client": ("127.0.0.1", 1)}
+        asyncio.run(MonitoringMiddleware(streaming_app, system_monitor)(scope, receive, send))
+        system_monitor.flush_requests()
+
+        assert [m.get("body") for m in sent] == [None, b"a", b"b"]
+        metrics = system_monitor.endpoint_metrics["GET:/stream-probe"]
+        assert metrics.last_status_code == 201
+        assert metrics.total_requests >= 1
@@ -24,7 +24,10 @@ def test_newsletter_rejects_invalid_email(client):
 
 
 def test_newsletter_rate_limited_returns_429(client, monkeypatch):
-    monkeypatch.setattr("api.routes.general.check_rate_limit", lambda _client_ip: False)
+    async def deny(_client_ip):
+        return False
+
+    monkeypatch.setattr("api.routes.general.check_rate_limit", deny)
 
     response = client.post(
         "/api/newsletter/subscribe", json={"email": "reader@example.com"}
@@ -1,4 +1,7 @@
-"""Portfolio catalog definitions for the system monitor."""
+"""Portfolio catalog definitions and platform health collection for the system monitor."""
+
+import asyncio
+import time
 
 from api.platform_health import PORTFOLIO_API_CATALOG, PORTFOLIO_PAGE_CATALOG
 
@@ -22,3 +25,66 @@ def test_portfolio_api_catalog_covers_critical_routes():
     assert "/api/monitor/portfolio-catalog" in paths
     assert any(p.startswith("/api/github") for p in paths)
     assert any("music" in p for p in paths)
+
+
+def test_collect_platform_health_runs_checks_concurrently(monkeypatch):
+    import api.platform_health as platform_health
+
+    calls = []
+
+    async def fake_connection_states(providers):
+        calls.append(list(providers))
+        await asyncio.sleep(0.2)
+        return {provider: provider == "whoop" for provider in providers}
+
+    async def fake_health_summary():
+        await asyncio.sleep(0.2)
+        return {"status": "live", "source": "supabase", "data": {}}
+
+    async def fake_portfolio():
+        await asyncio.sleep(0.2)
+        return {"summary": {"healthy": 0, "degraded": 0, "unhealthy": 0, "total": 0}, "items": []}
+
+    monkeypatch.setattr(platform_health, "integration_connection_states", fake_connection_states)
+    monkeypatch.setattr(platform_health, "fetch_latest_health_summary", fake_health_summary)
+    monkeypatch.setattr(platform_health, "probe_portfolio_catalog", fake_portfolio)
+
+    started = time.perf_counter()
+    payload = asyncio.run(platform_health.collect_platform_health())
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < 0.45
+    assert calls == [["google_calendar", "whoop", "withings"]]
+    checks = {check["id"]: check for check in payload["checks"]}
+    assert checks["health_vitals_summary"]["detail"].startswith("source=supabase")
+    assert "portfolio_catalog" not in checks
+
+
+def test_collect_platform_health_degrades_checks_past_deadline(monkeypatch):
+    import api.platform_health as platform_health
+
+    async def slow_connection_states(providers):
+        await asyncio.sleep(5)
+        return {}
+
+    async def fake_health_summary():
+        return {"status": "live", "source": "supabase", "data": {}}
+
+    async def slow_portfolio():
+        await asyncio.sleep(5)
+        return {}
+
+    monkeypatch.setattr(platform_health, "integration_connection_states", slow_connection_states)
+    monkeypatch.setattr(platform_health, "fetch_latest_health_summary", fake_health_summary)
+    monkeypatch.setattr(platform_health, "probe_portfolio_catalog", slow_portfolio)
+    monkeypatch.setattr(platform_health, "SUPABASE_CHECK_DEADLINE", 0.05)
+    monkeypatch.setattr(platform_health, "PORTFOLIO_CHECK_DEADLINE", 0.1)
+
+    started = time.perf_counter()
+    payload = asyncio.run(platform_health.collect_platform_health())
+
+    assert time.perf_counter() - started < 1
+    checks = {check["id"]: check for check in payload["checks"]}
+    assert checks["portfolio_catalog"]["status"] == "degraded"
+    assert payload["portfolio_catalog"]["timed_out"] is True
+    assert payload["success"] is True
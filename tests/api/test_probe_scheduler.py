@@ -0,0 +1,131 @@
+"""Tests for the background monitor probe scheduler."""
+
+import asyncio
+import time
+
+from api.probe_scheduler import HISTORY_SIZE, ProbeScheduler
+
+
+def test_run_once_records_result_duration_and_history():
+    published = []
+
+    async def probe():
+        return {"name": "Example", "status": "healthy"}
+
+    scheduler = ProbeScheduler()
+    scheduler.add("example", probe, interval=60, timeout=1, on_result=lambda name, result: published.append(name))
+
+    async def scenario():
+        for _ in range(HISTORY_SIZE + 5):
+            await scheduler.run_once("example")
+
+    asyncio.run(scenario())
+
+    assert scheduler.result("example") == {"name": "Example", "status": "healthy"}
+    status = scheduler.status(history=3)["probes"]["example"]
+    assert status["runs"] == HISTORY_SIZE + 5
+    assert status["last_outcome"] == "ok"
+    assert status["stale"] is False
+    assert len(status["history"]) == 3
+    assert len(scheduler.probes["example"].history) == HISTORY_SIZE
+    assert len(published) == HISTORY_SIZE + 5
+
+
+def test_timeouts_use_fallback_and_errors_keep_previous_result():
+    calls = {"count": 0}
+
+    async def slow():
+        await asyncio.sleep(1)
+
+    async def flaky():
+        calls["count"] += 1
+        if calls["count"] > 1:
+            raise RuntimeError("boom")
+        return {"status": "healthy"}
+
+    scheduler = ProbeScheduler()
+    scheduler.add("slow", slow, interval=60, timeout=0.05, on_timeout=lambda: {"status": "unhealthy"})
+    scheduler.add("flaky", flaky, interval=60, timeout=1)
+
+    async def scenario():
+        await scheduler.run_once("slow")
+        await scheduler.run_once("flaky")
+        await scheduler.run_once("flaky")
+
+    asyncio.run(scenario())
+
+    assert scheduler.result("slow") == {"status": "unhealthy"}
+    assert scheduler.status()["probes"]["slow"]["timeouts"] == 1
+    assert scheduler.result("flaky") == {"status": "healthy"}
+    assert scheduler.status()["probes"]["flaky"]["errors"] == 1
+
+
+def test_concurrency_budget_limits_probes_in_flight():
+    in_flight = {"now": 0, "peak": 0}
+
+    async def probe():
+        in_flight["now"] += 1
+        in_flight["peak"] = max(in_flight["peak"], in_flight["now"])
+        await asyncio.sleep(0.02)
+        in_flight["now"] -= 1
+        return {"status": "healthy"}
+
+    scheduler = ProbeScheduler(concurrency=2)
+    for index in range(6):
+        scheduler.add(f"probe:{index}", probe, interval=60, timeout=1)
+
+    async def scenario():
+        scheduler.start(initial_spread=0)
+        deadline = time.monotonic() + 2
+        while any(probe.runs == 0 for probe in scheduler.probes.values()) and time.monotonic() < deadline:
+            await asyncio.sleep(0.01)
+        await scheduler.stop()
+
+    asyncio.run(scenario())
+
+    assert in_flight["peak"] == 2
+    assert all(probe.runs == 1 for probe in scheduler.probes.values())
+    assert scheduler.running is False
+
+
+def test_stale_results_are_not_served_as_fresh():
+    async def probe():
+        return {"status": "healthy"}
+
+    scheduler = ProbeScheduler()
+    scheduler.add("example", probe, interval=1, timeout=1)
+    asyncio.run(scheduler.run_once("example"))
+    scheduler.probes["example"].completed_at -= 10
+
+    assert scheduler.result("example") is None
+    assert scheduler.result("example", fresh=False) == {"status": "healthy"}
+    assert scheduler.status()["probes"]["example"]["stale"] is True
+
+
+def test_failing_hooks_are_logged_and_do_not_stop_the_probe_loop():
+    async def slow():
+        await asyncio.sleep(1)
+
+    async def fast():
+        return {"status": "healthy"}
+
+    def broken(*args):
+        raise RuntimeError("publish failed")
+
+    scheduler = ProbeScheduler()
+    scheduler.add("slow", slow, interval=0.01, timeout=0.01, on_timeout=broken)
+    scheduler.add("fast", fast, interval=0.01, timeout=1, on_result=broken)
+
+    async def scenario():
+        scheduler.start(initial_spread=0)
+        deadline = time.monotonic() + 2
+        while any(probe.runs < 3 for probe in scheduler.probes.values()) and time.monotonic() < deadline:
+            await asyncio.sleep(0.01)
+        still_running = scheduler.running
+        await scheduler.stop()
+        return still_running
+
+    assert asyncio.run(scenario()) is True
+    assert all(probe.runs >= 3 for probe in scheduler.probes.values())
+    assert scheduler.status()["probes"]["slow"]["timeouts"] >= 3
+    assert scheduler.result("fast") == {"status": "healthy"}
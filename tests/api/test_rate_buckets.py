@@ -0,0 +1,38 @@
+"""Tests for the circular per-second / per-minute rate counters."""
+
+from api.rate_buckets import ERRORS, RATE_LIMITED, REQUESTS, UPSTREAM_FAILURES, RateCounters, TimeBuckets
+
+
+def test_rates_follow_recent_traffic_not_lifetime_average():
+    counters = RateCounters()
+    start = 1_000_000.0
+    for second in range(60):
+        counters.record_response(start + second, 200)
+    for _ in range(50):
+        counters.record_response(start + 3600, 200)
+    counters.record_response(start + 3600, 429)
+    counters.record_response(start + 3600, 503)
+
+    now = start + 3600.5
+    assert counters.per_second(REQUESTS, now, 10) == 5.2
+    assert counters.per_minute(ERRORS, now) == 2
+    assert counters.per_minute(RATE_LIMITED, now) == 1
+    assert counters.per_minute(UPSTREAM_FAILURES, now) == 1
+    assert counters.per_minute(REQUESTS, now, 120) == 112 / 120
+    assert counters.per_second(REQUESTS, now + 60, 10) == 0
+
+
+def test_ring_reuses_slots_and_drops_samples_older_than_it():
+    ring = TimeBuckets(1, 5)
+    ring.add(100, REQUESTS)
+    ring.add(103, REQUESTS, 2)
+    ring.add(107, REQUESTS)
+    ring.add(101, REQUESTS)  # older than the 5-slot window ending at 107
+
+    series = ring.series(107)
+
+    assert series["start"] == 103
+    assert series["step_seconds"] == 1
+    assert series["requests"] == [2, 0, 0, 0, 1]
+    assert series["errors"] == [0] * 5
+    assert all(len(column) == 5 for column in ring.columns)
@@ -1,17 +1,22 @@
 """Tests for API rate limiting helpers."""
 
+import asyncio
 import time
 from types import SimpleNamespace
 
 from api.config import (
     RATE_LIMIT_REQUESTS,
     RATE_LIMIT_WINDOW,
-    check_rate_limit,
+    check_rate_limit as check_rate_limit_async,
     get_client_ip,
     rate_limit_store,
 )
 
 
+def check_rate_limit(client_id):
+    return asyncio.run(check_rate_limit_async(client_id))
+
+
 def setup_function():
     rate_limit_store.clear()
 
@@ -89,3 +94,146 @@ def test_upstash_store_falls_back_to_memory_on_http_error(monkeypatch):
     assert store.allow("client-a", limit=2, window_sec=60) is True
     assert store.allow("client-a", limit=2, window_sec=60) is True
     assert store.allow("client-a", limit=2, window_sec=60) is False
+
+
+def test_upstash_store_pipelines_incr_and_spends_local_tokens(monkeypatch):
+    from api.rate_limit import InMemoryRateLimitStore, UpstashRateLimitStore
+
+    calls = []
+    counts = {}
+
+    class FakeResponse:
+        def __init__(self, payload):
+            self._payload = payload
+
+        def raise_for_status(self):
+            return None
+
+        def json(self):
+            return self._payload
+
+    class FakeAsyncClient:
+        is_closed = False
+
+        def __init__(self, *args, **kwargs):
+            pass
+
+        async def post(self, url, headers=None, json=None, timeout=None):
+            calls.append((url, json))
+            key, increment = json[0][1], int(json[0][2])
+            counts[key] = counts.get(key, 0) + increment
+            return FakeResponse([{"result": counts[key]}, {"result": 1}])
+
+    monkeypatch.setattr("httpx.AsyncClient", FakeAsyncClient)
+    store = UpstashRateLimitStore(
+        "https://example.upstash.io",
+        "token",
+        InMemoryRateLimitStore(),
+        local_share=0.5,
+    )
+
+    async def scenario():
+        return [await store.allow_async("client-b", limit=10, window_sec=60) for _ in range(12)]
+
+    results = asyncio.run(scenario())
+
+    assert results.count(True) == 10
+    assert results[-2:] == [False, False]
+    assert len(calls) < 12
+    assert all(url.endswith("/pipeline") for url, _ in calls)
+    assert [cmd[0] for cmd in calls[0][1]] == ["INCRBY", "EXPIRE"]
+    assert sum(counts.values()) == 12
+
+
+def _fake_upstash_client(counts, reply=None):
+    class FakeResponse:
+        def __init__(self, payload):
+            self._payload = payload
+
+        def raise_for_status(self):
+            return None
+
+        def json(self):
+            return self._payload
+
+    class FakeClient:
+        def __init__(self, *args, **kwargs):
+            pass
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *args):
+            return False
+
+        def post(self, url, headers=None, json=None):
+            if reply is not None:
+                return FakeResponse(reply)
+            key, increment = json[0][1], int(json[0][2])
+            counts[key] = counts.get(key, 0) + increment
+            return FakeResponse([{"result": counts[key]}, {"result": 1}])
+
+    return FakeClient
+
+
+def test_upstash_instances_sharing_a_window_never_over_admit(monkeypatch):
+    from api.rate_limit import InMemoryRateLimitStore, UpstashRateLimitStore
+
+    monkeypatch.setattr("httpx.Client", _fake_upstash_client({}))
+    instances = [
+        UpstashRateLimitStore("https://example.upstash.io", "token", InMemoryRateLimitStore(), local_share=0.5)
+        for _ in range(3)
+    ]
+
+    results = [instances[index % 3].allow("client-c", limit=10, window_sec=60) for index in range(30)]
+
+    assert results.count(True) == 10
+
+
+def test_upstash_error_reply_fails_soft(monkeypatch):
+    from api.rate_limit import InMemoryRateLimitStore, UpstashRateLimitStore
+
+    fallback = InMemoryRateLimitStore()
+    for reply in ([{"error": "WRONGPASS invalid password"}], [{}], []):
+        monkeypatch.setattr("httpx.Client", _fake_upstash_client({}, reply=reply))
+        store = UpstashRateLimitStore("https://example.upstash.io", "token", fallback, local_share=0.5)
+        fallback.clear()
+        assert store.allow("client-d", limit=1, window_sec=60) is True
+        assert store.allow("client-d", limit=1, window_sec=60) is False
+        assert "client-d" in fallback
+
+
+def test_memory_store_caps_clients_and_sweeps_idle_records(monkeypatch):
+    from api.rate_limit import InMemoryRateLimitStore
+
+    clock = [1_000_000.0]
+    monkeypatch.setattr("api.rate_limit.time.time", lambda: clock[0])
+    store = InMemoryRateLimitStore(max_clients=3, sweep_interval=30.0)
+
+    for client_id in ("a", "b", "c", "d"):
+        assert store.allow(client_id, limit=2, window_sec=10) is True
+    assert len(store) == 3
+    assert "a" not in store
+
+    clock[0] += 15
+    assert store.allow("d", limit=2, window_sec=10) is True
+    clock[0] += 16
+    assert store.allow("d", limit=2, window_sec=10) is True
+    assert sorted(store.snapshot()) == ["d"]
+
+
+def test_memory_store_weights_previous_window(monkeypatch):
+    from api.rate_limit import InMemoryRateLimitStore
+
+    clock = [1_000_000.0]
+    monkeypatch.setattr("api.rate_limit.time.time", lambda: clock[0])
+    store = InMemoryRateLimitStore()
+
+    for _ in range(4):
+        assert store.allow("client", limit=4, window_sec=10) is True
+    assert store.allow("client", limit=4, window_sec=10) is False
+
+    # A quarter into the next bucket the previous four still weigh three.
+    clock[0] += 12.5
+    assert store.allow("client", limit=4, window_sec=10) is True
+    assert store.allow("client", limit=4, window_sec=10) is False
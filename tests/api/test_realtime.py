@@ -109,20 +109,14 @@ def test_mint_gateway_realtime_client_secret(monkeypatch):
             return {"token": "vcst_test_token"}
 
     class FakeClient:
-        async def __aenter__(self):
-            return self
-
-        async def __aexit__(self, exc_type, exc, tb):
-            return False
-
-        async def post(self, url, headers=None, json=None):
+        async def post(self, url, headers=None, json=None, **kwargs):
             assert url.endswith("/v1/realtime/client-secrets")
             assert headers["Authorization"] == "Bearer gateway-test-key"
             assert json["model"] == "openai/gpt-realtime-2"
             assert "instructions" in json["session"]
             return FakeResponse()
 
-    monkeypatch.setattr("api.ai_gateway_realtime.httpx.AsyncClient", lambda **kwargs: FakeClient())
+    monkeypatch.setattr("api.ai_gateway_realtime.get_http_client", lambda _name: FakeClient())
 
     import asyncio
     from api.ai_gateway_realtime import mint_gateway_realtime_client_secret
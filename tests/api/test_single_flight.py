@@ -0,0 +1,71 @@
+"""Tests for single-flight coalescing of identical upstream calls."""
+
+import asyncio
+
+import pytest
+
+from api.single_flight import SingleFlight, coalesce, single_flight_stats
+
+
+def test_concurrent_callers_share_one_execution():
+    calls = []
+
+    @coalesce("test_shared", key=lambda item: item.lower())
+    async def fetch(item):
+        calls.append(item)
+        await asyncio.sleep(0.01)
+        return f"poster:{item.lower()}"
+
+    async def scenario():
+        return await asyncio.gather(fetch("Dune"), fetch("dune"), fetch("DUNE"), fetch("Arrival"))
+
+    results = asyncio.run(scenario())
+
+    assert results == ["poster:dune", "poster:dune", "poster:dune", "poster:arrival"]
+    assert len(calls) == 2
+    stats = single_flight_stats()["test_shared"]
+    assert stats["coalesced"] == 2
+    assert stats["executions"] == 2
+    assert stats["in_flight"] == 0
+
+
+def test_errors_reach_every_waiter_and_are_not_cached():
+    group = SingleFlight("test_errors")
+    attempts = []
+
+    async def boom():
+        attempts.append(1)
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream down")
+
+    async def scenario():
+        first = await asyncio.gather(group.do("k", boom), group.do("k", boom), return_exceptions=True)
+        second = await asyncio.gather(group.do("k", boom), return_exceptions=True)
+        return first + second
+
+    results = asyncio.run(scenario())
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert len(attempts) == 2
+    assert group.stats()["errors"] == 2
+
+
+def test_cancelled_leader_does_not_cancel_followers():
+    group = SingleFlight("test_cancel")
+
+    async def slow():
+        await asyncio.sleep(0.02)
+        return "ok"
+
+    async def scenario():
+        leader = asyncio.create_task(group.do("k", slow))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(group.do("k", slow))
+        await asyncio.sleep(0)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    assert asyncio.run(scenario()) == "ok"
+    assert group.stats()["executions"] == 1